@@ -23,3 +23,20 @@ b['numarray'] = ('a=np.array(None,shape=(%d,%d), typecode="i");a.sort(0)'%(N1,N2
 b['numpy'] = ('a=np.empty(shape=(%d,%d),dtype="i");np.sort(a,0)'%(N1,N2),'')
 b['Numeric'] = ('a=np.empty(shape=(%d,%d),typecode="i");np.sort(a,0)'%(N1,N2),'')
 b.run()
+
+N = 1000000
+b = Benchmark(['numpy'],runs=3,reps=10)
+setups = [('random int32', 'a=np.random.randint(-2**31,2**31-1,%d).astype("i4")'%N),
+          ('random int64', 'a=np.random.randint(-2**31,2**31-1,%d).astype("i8")'%N),
+          ('nearly sorted timestamps',
+           'a=np.cumsum(np.random.randint(0,100,%d)).astype("M8[us]");'
+           'a[np.random.randint(0,%d,%d)]=a[0]'%(N,N,N//100)),
+          ('random float64', 'a=np.random.rand(%d)'%N)]
+for name, setup in setups:
+    for kind in ['quicksort','mergesort','radix','timsort']:
+        b.title = 'Sorting %d %s, kind=%s' % (N, name, kind)
+        b['numpy'] = ('np.sort(a, kind="%s")' % kind, setup)
+        b.run()
+        b.title = 'Argsorting %d %s, kind=%s' % (N, name, kind)
+        b['numpy'] = ('a.argsort(kind="%s")' % kind, setup)
+        b.run()
@@ -6,6 +6,7 @@
 #include "npy_descriptor.h"
 #include "npy_iterators.h"
 #include "npy_index.h"
+#include "npy_datamem.h"
 
 
 #define NpyArray_UCS4 npy_ucs4
@@ -145,6 +146,10 @@ NDARRAY_API NpyArray *NpyArray_InnerProduct(NpyArray *ap1, NpyArray *ap2,
                                             int typenum);
 NDARRAY_API NpyArray *NpyArray_MatrixProduct(NpyArray *ap1, NpyArray *ap2,
                                              int typenum);
+NDARRAY_API NpyArray *NpyArray_InnerProduct2(NpyArray *ap1, NpyArray *ap2,
+                                             int typenum, NpyArray *out);
+NDARRAY_API NpyArray *NpyArray_MatrixProduct2(NpyArray *ap1, NpyArray *ap2,
+                                              int typenum, NpyArray *out);
 NDARRAY_API NpyArray *NpyArray_CopyAndTranspose(NpyArray *arr);
 NDARRAY_API NpyArray *NpyArray_Correlate2(NpyArray *ap1, NpyArray *ap2,
                                           int typenum, int mode);
@@ -248,6 +253,10 @@ NDARRAY_API NpyArray * NpyArray_Choose(NpyArray *ip, NpyArray** mps, int n, NpyA
                                        NPY_CLIPMODE clipmode);
 NDARRAY_API int NpyArray_Sort(NpyArray *op, int axis, NPY_SORTKIND which);
 NDARRAY_API NpyArray * NpyArray_ArgSort(NpyArray *op, int axis, NPY_SORTKIND which);
+NDARRAY_API int NpyArray_Partition(NpyArray *op, NpyArray *ktharray, int axis,
+                                   NPY_SELECTKIND which);
+NDARRAY_API NpyArray * NpyArray_ArgPartition(NpyArray *op, NpyArray *ktharray,
+                                              int axis, NPY_SELECTKIND which);
 NDARRAY_API NpyArray * NpyArray_LexSort(NpyArray** mps, int n, int axis);
 NDARRAY_API NpyArray * NpyArray_SearchSorted(NpyArray *op1, NpyArray *op2,
                                              NPY_SEARCHSIDE side);
@@ -332,9 +341,9 @@ NDARRAY_API NpyArray* NpyArray_CompareStringArrays(NpyArray* a1, NpyArray* a2,
 /*
  * Memory
  */
-#define NpyDataMem_NEW(sz) malloc(sz)
-#define NpyDataMem_RENEW(p, sz) realloc(p, sz)
-#define NpyDataMem_FREE(p) free(p)
+#define NpyDataMem_NEW(sz) NpyDataMem_Alloc(sz)
+#define NpyDataMem_RENEW(p, sz) NpyDataMem_Realloc(p, sz)
+#define NpyDataMem_FREE(p) NpyDataMem_Free(p)
 
 #define NpyDimMem_NEW(size) ((npy_intp *)malloc(size*sizeof(npy_intp)))
 #define NpyDimMem_RENEW(p, sz) ((npy_intp *)realloc(p, sz*sizeof(npy_intp)))
@@ -0,0 +1,657 @@
+/*
+ * npy_datamem.c -
+ *
+ * Allocator used for array data: aligned blocks, free lists of size
+ * classes for small and medium blocks and optional huge page mappings
+ * for very large ones.  See npy_datamem.h.
+ */
+
+#include <stdlib.h>
+#include <string.h>
+
+#include "npy_config.h"
+#include "npy_api.h"
+#include "npy_os.h"
+#include "npy_datamem.h"
+
+#if defined(NPY_OS_WIN32)
+#include <Windows.h>
+#include <malloc.h>
+
+typedef SRWLOCK npy_mutex;
+
+#define NPY_MUTEX_INITIALIZER SRWLOCK_INIT
+#define npy_mutex_lock(m) AcquireSRWLockExclusive(m)
+#define npy_mutex_unlock(m) ReleaseSRWLockExclusive(m)
+
+#else
+#include <pthread.h>
+
+typedef pthread_mutex_t npy_mutex;
+
+#define NPY_MUTEX_INITIALIZER PTHREAD_MUTEX_INITIALIZER
+#define npy_mutex_lock(m) pthread_mutex_lock(m)
+#define npy_mutex_unlock(m) pthread_mutex_unlock(m)
+#endif
+
+#if defined(NPY_OS_LINUX)
+#include <sys/mman.h>
+#if defined(MAP_ANONYMOUS)
+#define NPY_DATAMEM_HAVE_MMAP
+#endif
+#endif
+
+
+/* Huge page mappings are rounded up to a multiple of this. */
+#define NPY_DATAMEM_HUGEPAGE (2 << 20)
+
+/*
+ * Size classes: 64 bytes, then four classes per doubling up to
+ * NPY_DATAMEM_POOL_MAXBLOCK, so at most a quarter of a block is wasted.
+ */
+#define NPY_DATAMEM_MINCLASS 64
+#define NPY_DATAMEM_NCLASSES 64
+
+enum {
+    NPY_BLOCK_POOL,          /* size class block, may go on a free list */
+    NPY_BLOCK_LARGE,         /* aligned block from the system allocator */
+    NPY_BLOCK_HUGE           /* anonymous mapping */
+};
+
+typedef struct {
+    void *ptr;
+    size_t size;             /* usable size of the block */
+    size_t align;            /* alignment it was allocated with */
+    int kind;
+    int sclass;
+} npy_block;
+
+
+/*
+ * Allocator state, protected by datamem_lock.  Every live block is
+ * recorded in an open addressing hash table keyed by its address; blocks
+ * on the free lists are not in the table and are linked through their
+ * first word.
+ */
+static npy_mutex datamem_lock = NPY_MUTEX_INITIALIZER;
+
+static size_t datamem_alignment = NPY_DATAMEM_DEFAULT_ALIGNMENT;
+static size_t datamem_poolsize = NPY_DATAMEM_DEFAULT_POOLSIZE;
+static size_t datamem_hugepages = 0;
+
+static NpyDataMem_Handler datamem_handler;
+static int datamem_have_handler = 0;
+
+static npy_block *blocks = NULL;
+static size_t blocks_mask = 0;
+static size_t blocks_used = 0;
+
+static void *freelists[NPY_DATAMEM_NCLASSES];
+
+static NpyDataMem_Stats stats;
+
+
+static size_t
+_block_hash(void *ptr)
+{
+    size_t h = (size_t)ptr >> 4;
+
+    h ^= h >> 16;
+    h *= 0x45d9f3b;
+    h ^= h >> 16;
+    return h;
+}
+
+static npy_intp
+_block_find(void *ptr)
+{
+    size_t i;
+
+    if (blocks == NULL) {
+        return -1;
+    }
+    for (i = _block_hash(ptr) & blocks_mask; blocks[i].ptr != NULL;
+         i = (i + 1) & blocks_mask) {
+        if (blocks[i].ptr == ptr) {
+            return (npy_intp)i;
+        }
+    }
+    return -1;
+}
+
+static void
+_block_put(npy_block *table, size_t mask, npy_block *block)
+{
+    size_t i;
+
+    for (i = _block_hash(block->ptr) & mask; table[i].ptr != NULL;
+         i = (i + 1) & mask);
+    table[i] = *block;
+}
+
+/* Records a block, growing the table when it gets half full. */
+static int
+_block_insert(npy_block *block)
+{
+    if (2*(blocks_used + 1) > blocks_mask + 1) {
+        size_t n = (blocks == NULL) ? 256 : 2*(blocks_mask + 1);
+        npy_block *table = (npy_block *)calloc(n, sizeof(npy_block));
+        size_t i;
+
+        if (table == NULL) {
+            return -1;
+        }
+        if (blocks != NULL) {
+            for (i = 0; i <= blocks_mask; i++) {
+                if (blocks[i].ptr != NULL) {
+                    _block_put(table, n - 1, &blocks[i]);
+                }
+            }
+            free(blocks);
+        }
+        blocks = table;
+        blocks_mask = n - 1;
+    }
+    _block_put(blocks, blocks_mask, block);
+    blocks_used++;
+    return 0;
+}
+
+/* Removes entry i, shifting back the entries of its probe sequence. */
+static void
+_block_remove(size_t i)
+{
+    size_t j, k;
+
+    for (;;) {
+        blocks[i].ptr = NULL;
+        j = i;
+        for (;;) {
+            j = (j + 1) & blocks_mask;
+            if (blocks[j].ptr == NULL) {
+                blocks_used--;
+                return;
+            }
+            k = _block_hash(blocks[j].ptr) & blocks_mask;
+            if ((i <= j) ? (i < k && k <= j) : (i < k || k <= j)) {
+                continue;
+            }
+            break;
+        }
+        blocks[i] = blocks[j];
+        i = j;
+    }
+}
+
+
+static int
+_size_class(size_t size, size_t *csize)
+{
+    size_t base, step, q;
+    int k = 0;
+
+    if (size <= NPY_DATAMEM_MINCLASS) {
+        *csize = NPY_DATAMEM_MINCLASS;
+        return 0;
+    }
+    while (((size_t)NPY_DATAMEM_MINCLASS << (k + 1)) < size) {
+        k++;
+    }
+    base = (size_t)NPY_DATAMEM_MINCLASS << k;
+    step = base / 4;
+    q = (size - base + step - 1) / step;
+    *csize = base + q*step;
+    return 1 + 4*k + (int)(q - 1);
+}
+
+static void *
+_system_alloc(size_t size, size_t align)
+{
+#if defined(NPY_OS_WIN32)
+    return _aligned_malloc(size, align);
+#else
+    void *ptr;
+
+    if (align < sizeof(void *)) {
+        align = sizeof(void *);
+    }
+    if (posix_memalign(&ptr, align, size) != 0) {
+        return NULL;
+    }
+    return ptr;
+#endif
+}
+
+static void
+_system_free(void *ptr)
+{
+#if defined(NPY_OS_WIN32)
+    _aligned_free(ptr);
+#else
+    free(ptr);
+#endif
+}
+
+/*
+ * Resizes a large block in place where the system allocator can.
+ * Returns NULL, leaving ptr alone, on failure.
+ */
+static void *
+_system_realloc(void *ptr, size_t size, size_t align)
+{
+#if defined(NPY_OS_WIN32)
+    return _aligned_realloc(ptr, size, align);
+#else
+    void *ret, *tmp = realloc(ptr, size);
+
+    if (tmp == NULL || ((npy_uintp)tmp & (align - 1)) == 0) {
+        return tmp;
+    }
+    ret = _system_alloc(size, align);
+    if (ret == NULL) {
+        /* Still usable, just not as well aligned. */
+        return tmp;
+    }
+    memcpy(ret, tmp, size);
+    free(tmp);
+    return ret;
+#endif
+}
+
+static void *
+_huge_alloc(size_t size)
+{
+#if defined(NPY_DATAMEM_HAVE_MMAP)
+    void *ptr = mmap(NULL, size, PROT_READ | PROT_WRITE,
+                     MAP_PRIVATE | MAP_ANONYMOUS, -1, 0);
+
+    if (ptr == MAP_FAILED) {
+        return NULL;
+    }
+#if defined(MADV_HUGEPAGE)
+    madvise(ptr, size, MADV_HUGEPAGE);
+#endif
+    return ptr;
+#else
+    return NULL;
+#endif
+}
+
+static void
+_block_release(npy_block *block)
+{
+#if defined(NPY_DATAMEM_HAVE_MMAP)
+    if (block->kind == NPY_BLOCK_HUGE) {
+        munmap(block->ptr, block->size);
+        return;
+    }
+#endif
+    _system_free(block->ptr);
+}
+
+/* Frees the blocks on the free lists.  Called with the lock held. */
+static void
+_pool_clear(void)
+{
+    void *ptr;
+    int c;
+
+    for (c = 0; c < NPY_DATAMEM_NCLASSES; c++) {
+        while ((ptr = freelists[c]) != NULL) {
+            freelists[c] = *(void **)ptr;
+            _system_free(ptr);
+        }
+    }
+    stats.cached = 0;
+}
+
+static void
+_stats_add(npy_block *block)
+{
+    stats.inuse += block->size;
+    if (stats.inuse > stats.peak) {
+        stats.peak = stats.inuse;
+    }
+    if (block->kind == NPY_BLOCK_HUGE) {
+        stats.nhuge++;
+    }
+}
+
+
+static void *
+_builtin_alloc(size_t size)
+{
+    npy_block block;
+    void *ptr = NULL;
+
+    block.sclass = -1;
+    npy_mutex_lock(&datamem_lock);
+    stats.nalloc++;
+    block.align = datamem_alignment;
+    if (size <= NPY_DATAMEM_POOL_MAXBLOCK) {
+        block.kind = NPY_BLOCK_POOL;
+        block.sclass = _size_class(size, &block.size);
+        ptr = freelists[block.sclass];
+        if (ptr != NULL) {
+            freelists[block.sclass] = *(void **)ptr;
+            stats.cached -= block.size;
+            stats.pool_hits++;
+        }
+        else {
+            stats.pool_misses++;
+        }
+    }
+    else if (datamem_hugepages > 0 && size >= datamem_hugepages) {
+        block.kind = NPY_BLOCK_HUGE;
+        block.size = (size + NPY_DATAMEM_HUGEPAGE - 1) &
+            ~(size_t)(NPY_DATAMEM_HUGEPAGE - 1);
+    }
+    else {
+        block.kind = NPY_BLOCK_LARGE;
+        block.size = size;
+    }
+    npy_mutex_unlock(&datamem_lock);
+
+    if (ptr == NULL && block.kind == NPY_BLOCK_HUGE) {
+        ptr = _huge_alloc(block.size);
+        if (ptr == NULL) {
+            block.kind = NPY_BLOCK_LARGE;
+            block.size = size;
+        }
+    }
+    if (ptr == NULL) {
+        ptr = _system_alloc(block.size, block.align);
+        if (ptr == NULL) {
+            return NULL;
+        }
+    }
+    block.ptr = ptr;
+
+    npy_mutex_lock(&datamem_lock);
+    if (_block_insert(&block) < 0) {
+        npy_mutex_unlock(&datamem_lock);
+        _block_release(&block);
+        return NULL;
+    }
+    _stats_add(&block);
+    npy_mutex_unlock(&datamem_lock);
+    return ptr;
+}
+
+
+/*
+ * Allocates a block of at least size bytes for array data.  Returns NULL
+ * if there is not enough memory; no error is set.
+ */
+NDARRAY_API void *
+NpyDataMem_Alloc(size_t size)
+{
+    if (size == 0) {
+        size = 1;
+    }
+    if (datamem_have_handler) {
+        void *ptr;
+
+        npy_mutex_lock(&datamem_lock);
+        stats.nalloc++;
+        npy_mutex_unlock(&datamem_lock);
+        ptr = datamem_handler.alloc(size, datamem_handler.ctx);
+        return ptr;
+    }
+    return _builtin_alloc(size);
+}
+
+
+/*
+ * Returns a block to the allocator.  Pointers which were not allocated
+ * by NpyDataMem_Alloc are passed to the installed handler, or to free().
+ */
+NDARRAY_API void
+NpyDataMem_Free(void *ptr)
+{
+    npy_block block;
+    npy_intp i;
+
+    if (ptr == NULL) {
+        return;
+    }
+    npy_mutex_lock(&datamem_lock);
+    stats.nfree++;
+    i = _block_find(ptr);
+    if (i < 0) {
+        npy_mutex_unlock(&datamem_lock);
+        if (datamem_have_handler) {
+            datamem_handler.free(ptr, datamem_handler.ctx);
+        }
+        else {
+            free(ptr);
+        }
+        return;
+    }
+    block = blocks[i];
+    _block_remove((size_t)i);
+    stats.inuse -= block.size;
+    if (block.kind == NPY_BLOCK_POOL && block.align == datamem_alignment &&
+        stats.cached + block.size <= datamem_poolsize) {
+        *(void **)ptr = freelists[block.sclass];
+        freelists[block.sclass] = ptr;
+        stats.cached += block.size;
+        npy_mutex_unlock(&datamem_lock);
+        return;
+    }
+    npy_mutex_unlock(&datamem_lock);
+    _block_release(&block);
+}
+
+
+/*
+ * Resizes a block, moving it if necessary.  Returns NULL, leaving the
+ * block alone, if there is not enough memory.
+ */
+NDARRAY_API void *
+NpyDataMem_Realloc(void *ptr, size_t size)
+{
+    npy_block block;
+    npy_intp i;
+    void *ret;
+
+    if (ptr == NULL) {
+        return NpyDataMem_Alloc(size);
+    }
+    if (size == 0) {
+        size = 1;
+    }
+    npy_mutex_lock(&datamem_lock);
+    i = _block_find(ptr);
+    if (i < 0) {
+        npy_mutex_unlock(&datamem_lock);
+        if (datamem_have_handler) {
+            return datamem_handler.realloc(ptr, size, datamem_handler.ctx);
+        }
+        return realloc(ptr, size);
+    }
+    block = blocks[i];
+    if (block.kind == NPY_BLOCK_POOL && size <= block.size &&
+        size > block.size/2) {
+        npy_mutex_unlock(&datamem_lock);
+        return ptr;
+    }
+    if (block.kind == NPY_BLOCK_LARGE && !datamem_have_handler &&
+        size > NPY_DATAMEM_POOL_MAXBLOCK &&
+        (datamem_hugepages == 0 || size < datamem_hugepages)) {
+        /* Let the system allocator grow or shrink it in place. */
+        _block_remove((size_t)i);
+        npy_mutex_unlock(&datamem_lock);
+        ret = _system_realloc(ptr, size, block.align);
+        npy_mutex_lock(&datamem_lock);
+        if (ret == NULL) {
+            /* Cannot fail: the table has room for the entry removed. */
+            _block_insert(&block);
+            npy_mutex_unlock(&datamem_lock);
+            return NULL;
+        }
+        stats.inuse -= block.size;
+        block.ptr = ret;
+        block.size = size;
+        _block_insert(&block);
+        _stats_add(&block);
+        npy_mutex_unlock(&datamem_lock);
+        return ret;
+    }
+    npy_mutex_unlock(&datamem_lock);
+
+    ret = NpyDataMem_Alloc(size);
+    if (ret == NULL) {
+        return NULL;
+    }
+    memcpy(ret, ptr, (size < block.size) ? size : block.size);
+    NpyDataMem_Free(ptr);
+    return ret;
+}
+
+
+/*
+ * Installs an allocator used instead of the built-in one for new blocks,
+ * or restores the built-in allocator if handler is NULL.
+ */
+NDARRAY_API void
+NpyDataMem_SetHandler(const NpyDataMem_Handler *handler)
+{
+    npy_mutex_lock(&datamem_lock);
+    if (handler != NULL) {
+        datamem_handler = *handler;
+        datamem_have_handler = 1;
+    }
+    else {
+        datamem_have_handler = 0;
+    }
+    npy_mutex_unlock(&datamem_lock);
+}
+
+
+/*
+ * Sets the alignment of new blocks, a power of two of at most
+ * NPY_DATAMEM_MAX_ALIGNMENT.  Returns the previous alignment, or -1 if
+ * the value is not valid.
+ */
+NDARRAY_API npy_intp
+NpyDataMem_SetAlignment(npy_intp alignment)
+{
+    npy_intp old;
+
+    if (alignment < 1 || alignment > NPY_DATAMEM_MAX_ALIGNMENT ||
+        (alignment & (alignment - 1)) != 0) {
+        return -1;
+    }
+    npy_mutex_lock(&datamem_lock);
+    old = (npy_intp)datamem_alignment;
+    if ((size_t)alignment != datamem_alignment) {
+        datamem_alignment = (size_t)alignment;
+        _pool_clear();
+    }
+    npy_mutex_unlock(&datamem_lock);
+    return old;
+}
+
+NDARRAY_API npy_intp
+NpyDataMem_GetAlignment(void)
+{
+    return (npy_intp)datamem_alignment;
+}
+
+
+/*
+ * Sets the maximum number of bytes kept on the free lists; 0 disables
+ * pooling.  Returns the previous value, or -1 if size is negative.
+ */
+NDARRAY_API npy_intp
+NpyDataMem_SetPoolSize(npy_intp size)
+{
+    npy_intp old;
+
+    if (size < 0) {
+        return -1;
+    }
+    npy_mutex_lock(&datamem_lock);
+    old = (npy_intp)datamem_poolsize;
+    datamem_poolsize = (size_t)size;
+    if (stats.cached > size) {
+        _pool_clear();
+    }
+    npy_mutex_unlock(&datamem_lock);
+    return old;
+}
+
+NDARRAY_API npy_intp
+NpyDataMem_GetPoolSize(void)
+{
+    return (npy_intp)datamem_poolsize;
+}
+
+
+/*
+ * Sets the size from which blocks are mapped with huge pages; 0 disables
+ * it.  Has no effect on platforms without anonymous mappings.  Returns
+ * the previous value, or -1 if size is negative.
+ */
+NDARRAY_API npy_intp
+NpyDataMem_SetHugePageThreshold(npy_intp size)
+{
+    npy_intp old;
+
+    if (size < 0) {
+        return -1;
+    }
+    npy_mutex_lock(&datamem_lock);
+    old = (npy_intp)datamem_hugepages;
+    datamem_hugepages = (size_t)size;
+    npy_mutex_unlock(&datamem_lock);
+    return old;
+}
+
+NDARRAY_API npy_intp
+NpyDataMem_GetHugePageThreshold(void)
+{
+    return (npy_intp)datamem_hugepages;
+}
+
+
+NDARRAY_API void
+NpyDataMem_GetStats(NpyDataMem_Stats *result)
+{
+    npy_mutex_lock(&datamem_lock);
+    *result = stats;
+    npy_mutex_unlock(&datamem_lock);
+}
+
+
+/* Returns the blocks kept on the free lists to the system. */
+NDARRAY_API void
+NpyDataMem_Trim(void)
+{
+    npy_mutex_lock(&datamem_lock);
+    _pool_clear();
+    npy_mutex_unlock(&datamem_lock);
+}
+
+
+/*
+ * Picks up the initial settings from the NPY_DATAMEM_ALIGNMENT,
+ * NPY_DATAMEM_POOLSIZE and NPY_DATAMEM_HUGEPAGES environment variables.
+ * Called from npy_initlib.
+ */
+void
+npy_datamem_init(void)
+{
+    char *env;
+
+    if ((env = getenv("NPY_DATAMEM_ALIGNMENT")) != NULL) {
+        NpyDataMem_SetAlignment(atol(env));
+    }
+    if ((env = getenv("NPY_DATAMEM_POOLSIZE")) != NULL) {
+        NpyDataMem_SetPoolSize(atol(env));
+    }
+    if ((env = getenv("NPY_DATAMEM_HUGEPAGES")) != NULL) {
+        NpyDataMem_SetHugePageThreshold(atol(env));
+    }
+}
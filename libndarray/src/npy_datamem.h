@@ -0,0 +1,98 @@
+#ifndef _NPY_DATAMEM_H_
+#define _NPY_DATAMEM_H_
+
+#include <stddef.h>
+#include "npy_defs.h"
+
+
+/*
+ * Allocator for array data and the scratch buffers of the core library.
+ * NpyDataMem_NEW, NpyDataMem_RENEW and NpyDataMem_FREE go through the
+ * functions below.
+ *
+ * By default blocks are aligned to NPY_DATAMEM_DEFAULT_ALIGNMENT bytes.
+ * Blocks of up to NPY_DATAMEM_POOL_MAXBLOCK bytes are rounded up to a
+ * size class and, when freed, kept on a free list for that class so the
+ * next allocation of a similar size does not go back to malloc.  Very
+ * large blocks can optionally be mapped separately and marked for
+ * transparent huge pages.
+ *
+ * The library keeps track of every block it hands out, so pointers which
+ * did not come from NpyDataMem_Alloc (for example data set by an
+ * interface layer with plain malloc) are passed on to free/realloc.
+ *
+ * An interface can install its own allocator with NpyDataMem_SetHandler.
+ * Blocks allocated before the handler was installed are still returned
+ * to the built-in allocator; other blocks are passed to the handler's
+ * free function, so a handler must stay valid as long as blocks it
+ * allocated are alive.
+ */
+
+#define NPY_DATAMEM_DEFAULT_ALIGNMENT 64
+#define NPY_DATAMEM_MAX_ALIGNMENT 4096
+
+/* Largest block managed by the free lists. */
+#define NPY_DATAMEM_POOL_MAXBLOCK (1 << 20)
+
+/* Default limit on the number of bytes kept on the free lists. */
+#define NPY_DATAMEM_DEFAULT_POOLSIZE (32 << 20)
+
+typedef struct {
+    void *(*alloc)(size_t size, void *ctx);
+    void *(*realloc)(void *ptr, size_t size, void *ctx);
+    void (*free)(void *ptr, void *ctx);
+    void *ctx;
+} NpyDataMem_Handler;
+
+typedef struct {
+    npy_intp nalloc;        /* calls to NpyDataMem_Alloc/Realloc(NULL) */
+    npy_intp nfree;         /* calls to NpyDataMem_Free with a block */
+    npy_intp pool_hits;     /* allocations served from a free list */
+    npy_intp pool_misses;   /* allocations of pool sizes from malloc */
+    npy_intp nhuge;         /* allocations mapped with huge pages */
+    npy_intp inuse;         /* bytes currently allocated */
+    npy_intp peak;          /* largest value of inuse */
+    npy_intp cached;        /* bytes kept on the free lists */
+} NpyDataMem_Stats;
+
+
+NDARRAY_API void *
+NpyDataMem_Alloc(size_t size);
+
+NDARRAY_API void *
+NpyDataMem_Realloc(void *ptr, size_t size);
+
+NDARRAY_API void
+NpyDataMem_Free(void *ptr);
+
+NDARRAY_API void
+NpyDataMem_SetHandler(const NpyDataMem_Handler *handler);
+
+NDARRAY_API npy_intp
+NpyDataMem_SetAlignment(npy_intp alignment);
+
+NDARRAY_API npy_intp
+NpyDataMem_GetAlignment(void);
+
+NDARRAY_API npy_intp
+NpyDataMem_SetPoolSize(npy_intp size);
+
+NDARRAY_API npy_intp
+NpyDataMem_GetPoolSize(void);
+
+NDARRAY_API npy_intp
+NpyDataMem_SetHugePageThreshold(npy_intp size);
+
+NDARRAY_API npy_intp
+NpyDataMem_GetHugePageThreshold(void);
+
+NDARRAY_API void
+NpyDataMem_GetStats(NpyDataMem_Stats *stats);
+
+NDARRAY_API void
+NpyDataMem_Trim(void);
+
+void
+npy_datamem_init(void);
+
+#endif
@@ -176,9 +176,17 @@ enum NPY_TYPES {    NPY_BOOL=0,
 typedef enum {
     NPY_QUICKSORT=0,
     NPY_HEAPSORT=1,
-    NPY_MERGESORT=2
+    NPY_MERGESORT=2,
+    NPY_RADIXSORT=3,
+    NPY_TIMSORT=4
 } NPY_SORTKIND;
-#define NPY_NSORTS (NPY_MERGESORT + 1)
+#define NPY_NSORTS (NPY_TIMSORT + 1)
+
+
+typedef enum {
+    NPY_INTROSELECT=0
+} NPY_SELECTKIND;
+#define NPY_NSELECTS (NPY_INTROSELECT + 1)
 
 
 typedef enum {
@@ -591,6 +599,11 @@ typedef int (NpyArray_SortFunc)(void *, npy_intp, struct NpyArray *);
 typedef int (NpyArray_ArgSortFunc)(void *, npy_intp *, npy_intp,
                                    struct NpyArray *);
 
+typedef int (NpyArray_PartitionFunc)(void *, npy_intp, npy_intp,
+                                     struct NpyArray *);
+typedef int (NpyArray_ArgPartitionFunc)(void *, npy_intp *, npy_intp,
+                                        npy_intp, struct NpyArray *);
+
 typedef int (NpyArray_FillWithScalarFunc)(void *, npy_intp, void *,
                                           struct NpyArray *);
 
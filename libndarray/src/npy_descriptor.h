@@ -167,12 +167,18 @@ struct NpyArray_ArrFuncs {
     NpyArray_FastPutmaskFunc *fastputmask;
     NpyArray_FastTakeFunc *fasttake;
 
+    /*
+     * Selection functions: move the kth element to its sorted position,
+     * with smaller elements before it and larger ones after it.
+     * Can be NULL
+     */
+    NpyArray_PartitionFunc *partition[NPY_NSELECTS];
+    NpyArray_ArgPartitionFunc *argpartition[NPY_NSELECTS];
+
     /*
      * A little room to grow --- should use generic function
      * interface for most additions
      */
-    void *pad1;
-    void *pad2;
     void *pad3;
     void *pad4;
 
@@ -0,0 +1,330 @@
+/*
+ * npy_gemm.c -
+ *
+ * Blocked matrix multiplication for the float, double and complex types,
+ * used by dot when there is no BLAS.  See npy_gemm.h.
+ *
+ * The product is computed the way the optimized BLAS libraries do it: a
+ * KC x NC block of B is copied into panels NR columns wide and an MC x KC
+ * block of A into panels MR rows high, so that both are read contiguously
+ * from the cache, and the kernel multiplies one panel of A by one panel
+ * of B into an MR x NR tile of C kept in local variables.
+ */
+
+#include <stdlib.h>
+#include <string.h>
+
+#include "npy_config.h"
+#include "npy_api.h"
+#include "npy_threads.h"
+#include "npy_gemm.h"
+
+
+/*
+ * Products with fewer multiplications than this are left to the dot
+ * functions, which need no buffers.
+ */
+#define GEMM_MIN_WORK 4096
+
+/* Block sizes in elements; GEMM_MC must be a multiple of every MR. */
+#define GEMM_MC 64
+#define GEMM_KC 256
+#define GEMM_NC 1024
+
+
+/*
+ * Computes the mr x nr top left corner of the tile of the product of the
+ * panels a and b, which are kc elements long, and stores it to c, or adds
+ * it to c if add is set.
+ */
+typedef void (gemm_kernel)(npy_intp kc, const char *a, const char *b,
+                           char *c, npy_intp cs0, npy_intp cs1,
+                           int mr, int nr, int add);
+
+typedef struct {
+    int elsize;
+    int mr, nr;                 /* size of the tile of C */
+    gemm_kernel *kernel;
+} gemm_type;
+
+
+#define GEMM_STORE(type, t)                                             \
+    for (i = 0; i < mr; i++) {                                          \
+        for (j = 0; j < nr; j++) {                                      \
+            type *cp = (type *)(c + i*cs0 + j*cs1);                     \
+            *cp = add ? *cp + t[i][j] : t[i][j];                        \
+        }                                                               \
+    }
+
+/* 4 x 4 tiles of the real types. */
+#define GEMM_REAL_KERNEL(name, type)                                    \
+static void                                                             \
+name(npy_intp kc, const char *pa, const char *pb, char *c,              \
+     npy_intp cs0, npy_intp cs1, int mr, int nr, int add)               \
+{                                                                       \
+    const type *a = (const type *)pa, *b = (const type *)pb;            \
+    type c00 = 0, c01 = 0, c02 = 0, c03 = 0;                            \
+    type c10 = 0, c11 = 0, c12 = 0, c13 = 0;                            \
+    type c20 = 0, c21 = 0, c22 = 0, c23 = 0;                            \
+    type c30 = 0, c31 = 0, c32 = 0, c33 = 0;                            \
+    type t[4][4];                                                       \
+    npy_intp p;                                                         \
+    int i, j;                                                           \
+                                                                        \
+    for (p = 0; p < kc; p++, a += 4, b += 4) {                          \
+        type a0 = a[0], a1 = a[1], a2 = a[2], a3 = a[3];                \
+        type b0 = b[0], b1 = b[1], b2 = b[2], b3 = b[3];                \
+                                                                        \
+        c00 += a0*b0; c01 += a0*b1; c02 += a0*b2; c03 += a0*b3;         \
+        c10 += a1*b0; c11 += a1*b1; c12 += a1*b2; c13 += a1*b3;         \
+        c20 += a2*b0; c21 += a2*b1; c22 += a2*b2; c23 += a2*b3;         \
+        c30 += a3*b0; c31 += a3*b1; c32 += a3*b2; c33 += a3*b3;         \
+    }                                                                   \
+    t[0][0] = c00; t[0][1] = c01; t[0][2] = c02; t[0][3] = c03;         \
+    t[1][0] = c10; t[1][1] = c11; t[1][2] = c12; t[1][3] = c13;         \
+    t[2][0] = c20; t[2][1] = c21; t[2][2] = c22; t[2][3] = c23;         \
+    t[3][0] = c30; t[3][1] = c31; t[3][2] = c32; t[3][3] = c33;         \
+    GEMM_STORE(type, t)                                                 \
+}
+
+/*
+ * 2 x 2 tiles of the complex types, which are stored as pairs of the
+ * real type.
+ */
+#define GEMM_COMPLEX_KERNEL(name, type)                                 \
+static void                                                             \
+name(npy_intp kc, const char *pa, const char *pb, char *c,              \
+     npy_intp cs0, npy_intp cs1, int mr, int nr, int add)               \
+{                                                                       \
+    const type *a = (const type *)pa, *b = (const type *)pb;            \
+    type r00 = 0, i00 = 0, r01 = 0, i01 = 0;                            \
+    type r10 = 0, i10 = 0, r11 = 0, i11 = 0;                            \
+    type t[2][2][2];                                                    \
+    npy_intp p;                                                         \
+    int i, j;                                                           \
+                                                                        \
+    for (p = 0; p < kc; p++, a += 4, b += 4) {                          \
+        type ar0 = a[0], ai0 = a[1], ar1 = a[2], ai1 = a[3];            \
+        type br0 = b[0], bi0 = b[1], br1 = b[2], bi1 = b[3];            \
+                                                                        \
+        r00 += ar0*br0 - ai0*bi0; i00 += ar0*bi0 + ai0*br0;             \
+        r01 += ar0*br1 - ai0*bi1; i01 += ar0*bi1 + ai0*br1;             \
+        r10 += ar1*br0 - ai1*bi0; i10 += ar1*bi0 + ai1*br0;             \
+        r11 += ar1*br1 - ai1*bi1; i11 += ar1*bi1 + ai1*br1;             \
+    }                                                                   \
+    t[0][0][0] = r00; t[0][0][1] = i00; t[0][1][0] = r01; t[0][1][1] = i01; \
+    t[1][0][0] = r10; t[1][0][1] = i10; t[1][1][0] = r11; t[1][1][1] = i11; \
+    for (i = 0; i < mr; i++) {                                          \
+        for (j = 0; j < nr; j++) {                                      \
+            type *cp = (type *)(c + i*cs0 + j*cs1);                     \
+                                                                        \
+            if (add) {                                                  \
+                cp[0] += t[i][j][0];                                    \
+                cp[1] += t[i][j][1];                                    \
+            }                                                           \
+            else {                                                      \
+                cp[0] = t[i][j][0];                                     \
+                cp[1] = t[i][j][1];                                     \
+            }                                                           \
+        }                                                               \
+    }                                                                   \
+}
+
+GEMM_REAL_KERNEL(_gemm_float_kernel, npy_float)
+GEMM_REAL_KERNEL(_gemm_double_kernel, npy_double)
+GEMM_COMPLEX_KERNEL(_gemm_cfloat_kernel, npy_float)
+GEMM_COMPLEX_KERNEL(_gemm_cdouble_kernel, npy_double)
+
+static const gemm_type gemm_float = {
+    sizeof(npy_float), 4, 4, _gemm_float_kernel
+};
+static const gemm_type gemm_double = {
+    sizeof(npy_double), 4, 4, _gemm_double_kernel
+};
+static const gemm_type gemm_cfloat = {
+    2*sizeof(npy_float), 2, 2, _gemm_cfloat_kernel
+};
+static const gemm_type gemm_cdouble = {
+    2*sizeof(npy_double), 2, 2, _gemm_cdouble_kernel
+};
+
+
+#define GEMM_PACK_COPY(type, n)                                         \
+    for (i = 0; i < w; i++) {                                           \
+        const type *s = (const type *)(col + i*s0);                     \
+        type *d = (type *)dst + i*(n);                                  \
+                                                                        \
+        d[0] = s[0];                                                    \
+        if ((n) > 1) {                                                  \
+            d[1] = s[1];                                                \
+        }                                                               \
+    }
+
+/*
+ * Copies the rows x cols block at src, whose strides are s0 and s1, into
+ * panels of width rows each, which are stored column by column.  The last
+ * panel is padded with zeros.
+ */
+static void
+_gemm_pack(char *dst, const char *src, npy_intp s0, npy_intp s1,
+           npy_intp rows, npy_intp cols, int width, int elsize)
+{
+    npy_intp r, p;
+    int i, w;
+
+    for (r = 0; r < rows; r += width) {
+        const char *col = src + r*s0;
+
+        w = (rows - r < width) ? (int)(rows - r) : width;
+        for (p = 0; p < cols; p++, col += s1) {
+            switch (elsize) {
+            case 4:
+                GEMM_PACK_COPY(npy_float, 1);
+                break;
+            case 8:
+                GEMM_PACK_COPY(npy_double, 1);
+                break;
+            default:
+                GEMM_PACK_COPY(npy_double, 2);
+                break;
+            }
+            if (w < width) {
+                memset(dst + w*elsize, 0, (width - w)*elsize);
+            }
+            dst += width*elsize;
+        }
+    }
+}
+
+
+typedef struct {
+    const gemm_type *type;
+    npy_intp m, n, k;
+    char *a, *b, *c;
+    npy_intp as0, as1, bs0, bs1, cs0, cs1;
+    int failed[NPY_MAX_THREADS];
+} gemm_args;
+
+#define GEMM_MIN(x, y) ((x) < (y) ? (x) : (y))
+
+/* Computes the rows of C in the panels [start, end). */
+static void
+_gemm_chunk(void *data, npy_intp start, npy_intp end, int chunk)
+{
+    gemm_args *g = (gemm_args *)data;
+    int elsize = g->type->elsize, mr = g->type->mr, nr = g->type->nr;
+    gemm_kernel *kernel = g->type->kernel;
+    npy_intp m0 = start*mr, m1 = GEMM_MIN(end*mr, g->m);
+    npy_intp n = g->n, k = g->k;
+    npy_intp ic, jc, pc, ir, jr, mc, nc, kc;
+    char *abuf, *bbuf;
+
+    /* The buffers hold whole panels, so round up to the tile size. */
+    mc = GEMM_MIN(GEMM_MC, (m1 - m0 + mr - 1)/mr*mr);
+    nc = GEMM_MIN(GEMM_NC, (n + nr - 1)/nr*nr);
+    kc = GEMM_MIN(GEMM_KC, k);
+    abuf = NpyDataMem_NEW(mc*kc*elsize);
+    bbuf = NpyDataMem_NEW(kc*nc*elsize);
+    if (abuf == NULL || bbuf == NULL) {
+        g->failed[chunk] = 1;
+        goto finish;
+    }
+
+    for (jc = 0; jc < n; jc += GEMM_NC) {
+        nc = GEMM_MIN(GEMM_NC, n - jc);
+        for (pc = 0; pc < k; pc += GEMM_KC) {
+            kc = GEMM_MIN(GEMM_KC, k - pc);
+            /* Panels of B are panels of rows of its transpose. */
+            _gemm_pack(bbuf, g->b + pc*g->bs0 + jc*g->bs1, g->bs1, g->bs0,
+                       nc, kc, nr, elsize);
+            for (ic = m0; ic < m1; ic += GEMM_MC) {
+                mc = GEMM_MIN(GEMM_MC, m1 - ic);
+                _gemm_pack(abuf, g->a + ic*g->as0 + pc*g->as1, g->as0,
+                           g->as1, mc, kc, mr, elsize);
+                for (jr = 0; jr < nc; jr += nr) {
+                    for (ir = 0; ir < mc; ir += mr) {
+                        kernel(kc, abuf + ir*kc*elsize, bbuf + jr*kc*elsize,
+                               g->c + (ic + ir)*g->cs0 + (jc + jr)*g->cs1,
+                               g->cs0, g->cs1, (int)GEMM_MIN(mr, mc - ir),
+                               (int)GEMM_MIN(nr, nc - jr), pc > 0);
+                    }
+                }
+            }
+        }
+    }
+
+ finish:
+    NpyDataMem_FREE(abuf);
+    NpyDataMem_FREE(bbuf);
+}
+
+
+int
+npy_gemm(int type_num, npy_intp m, npy_intp n, npy_intp k,
+         char *a, npy_intp as0, npy_intp as1,
+         char *b, npy_intp bs0, npy_intp bs1,
+         char *c, npy_intp cs0, npy_intp cs1)
+{
+    gemm_args g;
+    npy_intp panels;
+    int nchunks, i;
+
+    switch (type_num) {
+    case NPY_FLOAT:
+        g.type = &gemm_float;
+        break;
+    case NPY_DOUBLE:
+        g.type = &gemm_double;
+        break;
+    case NPY_CFLOAT:
+        g.type = &gemm_cfloat;
+        break;
+    case NPY_CDOUBLE:
+        g.type = &gemm_cdouble;
+        break;
+    default:
+        return 1;
+    }
+    if ((double)m*n*k < GEMM_MIN_WORK) {
+        return 1;
+    }
+
+    /* The threads split the rows of C, so make them the longer side. */
+    if (n > m) {
+        g.m = n;
+        g.n = m;
+        g.a = b;
+        g.as0 = bs1;
+        g.as1 = bs0;
+        g.b = a;
+        g.bs0 = as1;
+        g.bs1 = as0;
+        g.cs0 = cs1;
+        g.cs1 = cs0;
+    }
+    else {
+        g.m = m;
+        g.n = n;
+        g.a = a;
+        g.as0 = as0;
+        g.as1 = as1;
+        g.b = b;
+        g.bs0 = bs0;
+        g.bs1 = bs1;
+        g.cs0 = cs0;
+        g.cs1 = cs1;
+    }
+    g.k = k;
+    g.c = c;
+    memset(g.failed, 0, sizeof(g.failed));
+
+    panels = (g.m + g.type->mr - 1)/g.type->mr;
+    nchunks = NpyThreads_NumChunks(m*n*k);
+    NpyThreads_Run(_gemm_chunk, &g, panels, nchunks);
+    for (i = 0; i < nchunks && i < panels; i++) {
+        if (g.failed[i]) {
+            return -1;
+        }
+    }
+    return 0;
+}
@@ -0,0 +1,35 @@
+#ifndef _NPY_GEMM_H_
+#define _NPY_GEMM_H_
+
+#include "npy_defs.h"
+
+
+/*
+ * Matrix multiplication used by NpyArray_MatrixProduct and
+ * NpyArray_InnerProduct for the float, double and complex types when no
+ * BLAS is available.
+ *
+ * npy_gemm computes the m x n matrix C = A B, where A is m x k and B is
+ * k x n.  Each matrix is given by a pointer to its first element and the
+ * strides in bytes of its rows and columns, which may be anything (zero,
+ * negative, not contiguous), but the elements must be aligned and in
+ * native byte order.  C must not overlap A or B.
+ *
+ * Blocks of A and B are copied into contiguous panels that stay in the
+ * cache and multiplied a small tile of C at a time, with the tile held in
+ * registers.  Large products are split by panels of rows of C (or of
+ * columns, if there are more of those) and run on the thread pool.
+ *
+ * The return value is 0 when C has been computed, 1 when the type is not
+ * handled or the product is too small to be worth it, and -1 when out of
+ * memory, without setting an error.  Nothing touches the interface, so
+ * it can run without the GIL.
+ */
+
+int
+npy_gemm(int type_num, npy_intp m, npy_intp n, npy_intp k,
+         char *a, npy_intp as0, npy_intp as1,
+         char *b, npy_intp bs0, npy_intp bs1,
+         char *c, npy_intp cs0, npy_intp cs1);
+
+#endif
@@ -0,0 +1,552 @@
+/*
+ * npy_hashset.c -
+ *
+ * Hash tables of array elements for unique and in1d.  See npy_hashset.h.
+ *
+ * NpyDict chains its entries in separately allocated nodes and reaches
+ * the keys through generic pointers, which is far too slow for tables of
+ * millions of array elements.  The table here uses open addressing with
+ * linear probing and only stores the number of each distinct element;
+ * the element itself is found through the index of its first occurrence.
+ * The table is kept at most half full.
+ */
+
+#include <stdlib.h>
+#include <string.h>
+
+#include "npy_config.h"
+#include "npy_utils.h"
+#include "npy_api.h"
+#include "npy_arrayobject.h"
+#include "npy_threads.h"
+#include "npy_hashset.h"
+
+
+/* Size of the first table, grown as distinct elements are found. */
+#define NPY_HASHSET_MINSIZE 1024
+
+
+typedef npy_uint64 (npy_hash_func)(const char *p, npy_intp i, int elsize);
+typedef int (npy_equal_func)(const char *p, const char *q, int elsize);
+
+typedef struct {
+    const char *data;           /* contiguous elements */
+    int elsize;
+    npy_hash_func *hash;
+    npy_equal_func *equal;
+    npy_intp *slots;            /* number of the element in a slot, or -1 */
+    npy_intp mask;              /* number of slots - 1 */
+    npy_intp *first;            /* index of the first occurrence of each */
+    npy_intp *counts;           /* occurrences of each, or NULL */
+    npy_intp nunique;
+    npy_intp maxunique;
+} npy_hashset;
+
+
+static NPY_INLINE npy_uint64
+_mix(npy_uint64 h)
+{
+    h ^= h >> 32;
+    h ^= h >> 16;
+    h *= 0x45d9f3b;
+    h ^= h >> 16;
+    h *= 0x45d9f3b;
+    h ^= h >> 16;
+    return h;
+}
+
+/*
+ * nan values are different from everything, so they are spread over the
+ * table by their index instead of piling up in one probe sequence.
+ */
+#define NAN_HASH(i) _mix(~(npy_uint64)(i))
+
+
+/*
+ * Types compared by their bytes.
+ */
+static npy_uint64
+_hash_bytes(const char *p, npy_intp NPY_UNUSED(i), int elsize)
+{
+    npy_uint64 h = (npy_uint64)elsize, w;
+
+    while (elsize >= 8) {
+        memcpy(&w, p, 8);
+        h = _mix(h ^ w);
+        p += 8;
+        elsize -= 8;
+    }
+    if (elsize > 0) {
+        w = 0;
+        memcpy(&w, p, elsize);
+        h = _mix(h ^ w);
+    }
+    return h;
+}
+
+static int
+_equal_bytes(const char *p, const char *q, int elsize)
+{
+    return memcmp(p, q, elsize) == 0;
+}
+
+#define INT_HASH(type)                                                  \
+static npy_uint64                                                       \
+_hash_##type(const char *p, npy_intp NPY_UNUSED(i),                     \
+             int NPY_UNUSED(elsize))                                    \
+{                                                                       \
+    return _mix((npy_uint64)*(const type *)p);                          \
+}                                                                       \
+                                                                        \
+static int                                                              \
+_equal_##type(const char *p, const char *q, int NPY_UNUSED(elsize))     \
+{                                                                       \
+    return *(const type *)p == *(const type *)q;                        \
+}
+
+INT_HASH(npy_uint8)
+INT_HASH(npy_uint16)
+INT_HASH(npy_uint32)
+INT_HASH(npy_uint64)
+
+#undef INT_HASH
+
+
+/*
+ * Floating point types compared as numbers.  -0.0 is hashed as 0.0.
+ */
+#define FLOAT_HASH(type, utype)                                         \
+static npy_uint64                                                       \
+_hash_##type(const char *p, npy_intp i, int NPY_UNUSED(elsize))         \
+{                                                                       \
+    type v = *(const type *)p;                                          \
+    utype bits;                                                         \
+                                                                        \
+    if (v != v) {                                                       \
+        return NAN_HASH(i);                                             \
+    }                                                                   \
+    if (v == 0) {                                                       \
+        v = 0;                                                          \
+    }                                                                   \
+    memcpy(&bits, &v, sizeof(v));                                       \
+    return _mix((npy_uint64)bits);                                      \
+}                                                                       \
+                                                                        \
+static int                                                              \
+_equal_##type(const char *p, const char *q, int NPY_UNUSED(elsize))     \
+{                                                                       \
+    return *(const type *)p == *(const type *)q;                        \
+}                                                                       \
+                                                                        \
+static npy_uint64                                                       \
+_hash_c##type(const char *p, npy_intp i, int elsize)                    \
+{                                                                       \
+    const type *v = (const type *)p;                                    \
+                                                                        \
+    if (v[0] != v[0] || v[1] != v[1]) {                                 \
+        return NAN_HASH(i);                                             \
+    }                                                                   \
+    return _mix(_hash_##type(p, i, elsize) ^                            \
+                _hash_##type(p + sizeof(type), i, elsize));             \
+}                                                                       \
+                                                                        \
+static int                                                              \
+_equal_c##type(const char *p, const char *q, int NPY_UNUSED(elsize))    \
+{                                                                       \
+    const type *a = (const type *)p, *b = (const type *)q;              \
+                                                                        \
+    return a[0] == b[0] && a[1] == b[1];                                \
+}
+
+FLOAT_HASH(npy_float, npy_uint32)
+FLOAT_HASH(npy_double, npy_uint64)
+
+#undef FLOAT_HASH
+
+
+/*
+ * Sets the hash and equality functions for descr, returns -1 if the type
+ * is not supported.
+ */
+static int
+_hash_funcs(NpyArray_Descr *descr, npy_hash_func **hash,
+            npy_equal_func **equal)
+{
+    switch (descr->type_num) {
+        case NPY_FLOAT:
+        case NPY_DOUBLE:
+        case NPY_CFLOAT:
+        case NPY_CDOUBLE:
+            if (!NpyArray_ISNBO(descr->byteorder)) {
+                return -1;
+            }
+            break;
+        case NPY_BOOL:
+        case NPY_BYTE:
+        case NPY_UBYTE:
+        case NPY_SHORT:
+        case NPY_USHORT:
+        case NPY_INT:
+        case NPY_UINT:
+        case NPY_LONG:
+        case NPY_ULONG:
+        case NPY_LONGLONG:
+        case NPY_ULONGLONG:
+        case NPY_DATETIME:
+        case NPY_TIMEDELTA:
+        case NPY_STRING:
+        case NPY_UNICODE:
+            break;
+        default:
+            return -1;
+    }
+
+    switch (descr->type_num) {
+        case NPY_FLOAT:
+            *hash = _hash_npy_float;
+            *equal = _equal_npy_float;
+            return 0;
+        case NPY_DOUBLE:
+            *hash = _hash_npy_double;
+            *equal = _equal_npy_double;
+            return 0;
+        case NPY_CFLOAT:
+            *hash = _hash_cnpy_float;
+            *equal = _equal_cnpy_float;
+            return 0;
+        case NPY_CDOUBLE:
+            *hash = _hash_cnpy_double;
+            *equal = _equal_cnpy_double;
+            return 0;
+        case NPY_STRING:
+        case NPY_UNICODE:
+            break;
+        default:
+            /* integers are compared by their bytes, whatever the order */
+            switch (descr->elsize) {
+                case 1:
+                    *hash = _hash_npy_uint8;
+                    *equal = _equal_npy_uint8;
+                    return 0;
+                case 2:
+                    *hash = _hash_npy_uint16;
+                    *equal = _equal_npy_uint16;
+                    return 0;
+                case 4:
+                    *hash = _hash_npy_uint32;
+                    *equal = _equal_npy_uint32;
+                    return 0;
+                case 8:
+                    *hash = _hash_npy_uint64;
+                    *equal = _equal_npy_uint64;
+                    return 0;
+            }
+    }
+    *hash = _hash_bytes;
+    *equal = _equal_bytes;
+    return 0;
+}
+
+
+/*
+ * Returns 1 if the elements of arrays of type descr can be hashed.
+ */
+NDARRAY_API int
+NpyArray_CanHash(NpyArray_Descr *descr)
+{
+    npy_hash_func *hash;
+    npy_equal_func *equal;
+
+    return _hash_funcs(descr, &hash, &equal) == 0;
+}
+
+
+static void
+_hashset_clear(npy_hashset *set)
+{
+    free(set->slots);
+    NpyDataMem_FREE(set->first);
+    if (set->counts != NULL) {
+        NpyDataMem_FREE(set->counts);
+    }
+}
+
+/* Makes room for maxunique distinct elements in a table twice that size */
+static int
+_hashset_resize(npy_hashset *set, npy_intp maxunique)
+{
+    npy_intp *slots, *first, *counts, mask, u, h;
+
+    first = NpyDataMem_RENEW(set->first, maxunique*sizeof(npy_intp));
+    if (first == NULL) {
+        return -1;
+    }
+    set->first = first;
+    if (set->counts != NULL) {
+        counts = NpyDataMem_RENEW(set->counts, maxunique*sizeof(npy_intp));
+        if (counts == NULL) {
+            return -1;
+        }
+        set->counts = counts;
+    }
+    slots = malloc(2*maxunique*sizeof(npy_intp));
+    if (slots == NULL) {
+        return -1;
+    }
+    memset(slots, -1, 2*maxunique*sizeof(npy_intp));
+    mask = 2*maxunique - 1;
+    for (u = 0; u < set->nunique; u++) {
+        h = (npy_intp)(set->hash(set->data + first[u]*set->elsize, first[u],
+                                 set->elsize) & mask);
+        while (slots[h] >= 0) {
+            h = (h + 1) & mask;
+        }
+        slots[h] = u;
+    }
+    free(set->slots);
+    set->slots = slots;
+    set->mask = mask;
+    set->maxunique = maxunique;
+    return 0;
+}
+
+static int
+_hashset_init(npy_hashset *set, NpyArray *arr, int counts)
+{
+    npy_intp n = NpyArray_SIZE(arr), size = NPY_HASHSET_MINSIZE;
+
+    if (_hash_funcs(arr->descr, &set->hash, &set->equal) < 0) {
+        NpyErr_SetString(NpyExc_TypeError,
+                         "cannot hash the elements of this type");
+        return -1;
+    }
+    while (size < n && size < NPY_HASHSET_MINSIZE*64) {
+        size *= 2;
+    }
+    set->data = arr->data;
+    set->elsize = arr->descr->elsize;
+    set->slots = NULL;
+    set->first = NULL;
+    set->counts = NULL;
+    set->nunique = 0;
+    if (counts) {
+        set->counts = NpyDataMem_NEW(sizeof(npy_intp));
+        if (set->counts == NULL) {
+            NpyErr_MEMORY;
+            return -1;
+        }
+    }
+    if (_hashset_resize(set, size) < 0) {
+        _hashset_clear(set);
+        NpyErr_MEMORY;
+        return -1;
+    }
+    return 0;
+}
+
+/*
+ * Adds the n elements of the set's data, storing the number of each
+ * distinct element in inverse if it is not NULL.
+ */
+static int
+_hashset_fill(npy_hashset *set, npy_intp n, npy_intp *inverse)
+{
+    const char *p = set->data, *data = set->data;
+    int elsize = set->elsize;
+    npy_hash_func *hash = set->hash;
+    npy_equal_func *equal = set->equal;
+    npy_intp i, h, u;
+
+    for (i = 0; i < n; i++, p += elsize) {
+        if (set->nunique == set->maxunique &&
+                _hashset_resize(set, 2*set->maxunique) < 0) {
+            return -1;
+        }
+        h = (npy_intp)(hash(p, i, elsize) & set->mask);
+        while ((u = set->slots[h]) >= 0 &&
+               !equal(data + set->first[u]*elsize, p, elsize)) {
+            h = (h + 1) & set->mask;
+        }
+        if (u < 0) {
+            u = set->nunique++;
+            set->slots[h] = u;
+            set->first[u] = i;
+            if (set->counts != NULL) {
+                set->counts[u] = 0;
+            }
+        }
+        if (set->counts != NULL) {
+            set->counts[u]++;
+        }
+        if (inverse != NULL) {
+            inverse[i] = u;
+        }
+    }
+    return 0;
+}
+
+
+static NpyArray *
+_intp_array(npy_intp n, npy_intp *data)
+{
+    NpyArray *ret;
+
+    ret = NpyArray_New(NULL, 1, &n, NPY_INTP, NULL, NULL, 0, 0, NULL);
+    if (ret != NULL && data != NULL) {
+        memcpy(ret->data, data, n*sizeof(npy_intp));
+    }
+    return ret;
+}
+
+/*
+ * Returns the distinct elements of op in the order of their first
+ * occurrence.  If index, inverse or counts are not NULL they are set to
+ * new arrays of the indices of the first occurrences, the positions in
+ * the result of the elements of op, and the number of occurrences of
+ * each element of the result.
+ */
+NDARRAY_API NpyArray *
+NpyArray_HashUnique(NpyArray *op, NpyArray **index, NpyArray **inverse,
+                    NpyArray **counts)
+{
+    NpyArray *arr, *ret = NULL, *inv = NULL;
+    npy_hashset set;
+    npy_intp n, u;
+    char *dst;
+
+    arr = NpyArray_FromArray(op, NULL, NPY_IN_ARRAY);
+    if (arr == NULL) {
+        return NULL;
+    }
+    n = NpyArray_SIZE(arr);
+    if (_hashset_init(&set, arr, counts != NULL) < 0) {
+        Npy_DECREF(arr);
+        return NULL;
+    }
+    if (inverse != NULL) {
+        inv = _intp_array(n, NULL);
+        if (inv == NULL) {
+            goto fail;
+        }
+    }
+    if (_hashset_fill(&set, n, inv ? (npy_intp *)inv->data : NULL) < 0) {
+        NpyErr_MEMORY;
+        goto fail;
+    }
+
+    Npy_INCREF(arr->descr);
+    ret = NpyArray_Alloc(arr->descr, 1, &set.nunique, NPY_FALSE, NULL);
+    if (ret == NULL) {
+        goto fail;
+    }
+    dst = ret->data;
+    for (u = 0; u < set.nunique; u++, dst += set.elsize) {
+        memcpy(dst, set.data + set.first[u]*set.elsize, set.elsize);
+    }
+    if (index != NULL) {
+        *index = _intp_array(set.nunique, set.first);
+        if (*index == NULL) {
+            goto fail;
+        }
+    }
+    if (counts != NULL) {
+        *counts = _intp_array(set.nunique, set.counts);
+        if (*counts == NULL) {
+            if (index != NULL) {
+                Npy_DECREF(*index);
+            }
+            goto fail;
+        }
+    }
+    if (inverse != NULL) {
+        *inverse = inv;
+    }
+    _hashset_clear(&set);
+    Npy_DECREF(arr);
+    return ret;
+
+fail:
+    _hashset_clear(&set);
+    Npy_DECREF(arr);
+    Npy_XDECREF(inv);
+    Npy_XDECREF(ret);
+    return NULL;
+}
+
+
+typedef struct {
+    npy_hashset *set;
+    const char *data;
+    npy_bool *out;
+} npy_hash_lookup;
+
+static void
+_lookup_chunk(void *data, npy_intp start, npy_intp end,
+              int NPY_UNUSED(chunk))
+{
+    npy_hash_lookup *par = (npy_hash_lookup *)data;
+    npy_hashset *set = par->set;
+    int elsize = set->elsize;
+    const char *p = par->data + start*elsize;
+    npy_intp i, h, u;
+
+    for (i = start; i < end; i++, p += elsize) {
+        h = (npy_intp)(set->hash(p, i, elsize) & set->mask);
+        while ((u = set->slots[h]) >= 0 &&
+               !set->equal(set->data + set->first[u]*elsize, p, elsize)) {
+            h = (h + 1) & set->mask;
+        }
+        par->out[i] = (u >= 0);
+    }
+}
+
+/*
+ * Returns a boolean array of the size of ar1 telling whether each of its
+ * elements is in ar2.  The arrays must have the same type.  The table is
+ * built from ar2 and looked up in parallel.
+ */
+NDARRAY_API NpyArray *
+NpyArray_HashIn1d(NpyArray *ar1, NpyArray *ar2)
+{
+    NpyArray *a1, *a2, *ret = NULL;
+    npy_hashset set;
+    npy_hash_lookup par;
+    npy_intp n;
+
+    if (!NpyArray_EquivTypes(ar1->descr, ar2->descr)) {
+        NpyErr_SetString(NpyExc_TypeError,
+                         "the arrays must have the same type");
+        return NULL;
+    }
+    a1 = NpyArray_FromArray(ar1, NULL, NPY_IN_ARRAY);
+    if (a1 == NULL) {
+        return NULL;
+    }
+    a2 = NpyArray_FromArray(ar2, NULL, NPY_IN_ARRAY);
+    if (a2 == NULL) {
+        Npy_DECREF(a1);
+        return NULL;
+    }
+    if (_hashset_init(&set, a2, 0) < 0) {
+        goto finish;
+    }
+    if (_hashset_fill(&set, NpyArray_SIZE(a2), NULL) < 0) {
+        NpyErr_MEMORY;
+        _hashset_clear(&set);
+        goto finish;
+    }
+    n = NpyArray_SIZE(a1);
+    ret = NpyArray_New(NULL, 1, &n, NPY_BOOL, NULL, NULL, 0, 0, NULL);
+    if (ret != NULL) {
+        par.set = &set;
+        par.data = a1->data;
+        par.out = (npy_bool *)ret->data;
+        NpyThreads_Run(_lookup_chunk, &par, n, NpyThreads_NumChunks(n));
+    }
+    _hashset_clear(&set);
+
+ finish:
+    Npy_DECREF(a1);
+    Npy_DECREF(a2);
+    return ret;
+}
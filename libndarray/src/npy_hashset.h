@@ -0,0 +1,32 @@
+#ifndef _NPY_HASHSET_H_
+#define _NPY_HASHSET_H_
+
+#include "npy_defs.h"
+
+
+/*
+ * Hash based set operations on the elements of an array, used by unique
+ * and in1d when the result does not need to be sorted.
+ *
+ * Only types whose equality can be decided without the interface are
+ * supported: booleans, integers, datetimes, single and double precision
+ * floating point and complex values, and strings.  Floating point values
+ * compare as numbers, so 0.0 and -0.0 are the same element and every nan
+ * is different from everything, like with ==.  Strings, integers and
+ * datetimes compare by their bytes.  NpyArray_CanHash tells whether a
+ * descriptor is supported.
+ *
+ * The arrays are used as if they were flattened.
+ */
+
+NDARRAY_API int
+NpyArray_CanHash(NpyArray_Descr *descr);
+
+NDARRAY_API NpyArray *
+NpyArray_HashUnique(NpyArray *op, NpyArray **index, NpyArray **inverse,
+                    NpyArray **counts);
+
+NDARRAY_API NpyArray *
+NpyArray_HashIn1d(NpyArray *ar1, NpyArray *ar2);
+
+#endif
@@ -3,6 +3,8 @@
 #include "npy_config.h"
 #include "npy_api.h"
 #include "npy_arrayobject.h"
+#include "npy_sort.h"
+#include "npy_threads.h"
 
 
 /* TODO: Get rid of use of PyArray_INCREF here */
@@ -690,87 +692,286 @@ NpyArray_Choose(NpyArray *ip, NpyArray** mps, int n, NpyArray *ret,
  * underlying sort function for the type is available.  Note that axis is
  * already valid. The sort functions require 1-d contiguous and well-behaved
  * data.  Therefore, a copy will be made of the data if needed before handing
- * it to the sorting routine.  An iterator is constructed and adjusted to walk
- * over all but the desired sorting axis.
+ * it to the sorting routine.
+ *
+ * The rows along the sort axis are independent, so when there are many
+ * of them they are split between the threads of the pool.  A single large
+ * row is sorted with the parallel merge sort of npy_sort.c instead.
+ * Neither is done for types which need the interface (object arrays).
+ */
+typedef struct {
+    NpyArray *op, *ret;
+    int axis;
+    NPY_SORTKIND which;
+    npy_intp *kth;              /* positions to partition at, or NULL */
+    npy_intp nkth;
+    npy_intp N;
+    int elsize, swap, needcopy;
+    npy_intp astride, rstride;
+    int failed[NPY_MAX_THREADS];
+} npy_sort_rows;
+
+/*
+ * Returns a pointer to the start of row i of ap, the rows being all the
+ * 1-d slices along axis taken in C order.
+ */
+static char *
+_sort_row_pointer(NpyArray *ap, int axis, npy_intp i)
+{
+    char *ptr = ap->data;
+    int k;
+
+    for (k = ap->nd - 1; k >= 0; k--) {
+        if (k != axis) {
+            ptr += (i % ap->dimensions[k]) * ap->strides[k];
+            i /= ap->dimensions[k];
+        }
+    }
+    return ptr;
+}
+
+/*
+ * Sorts one row, through buffer if the data needs copying.  nchunks > 1
+ * uses the parallel merge sort.
  */
 static int
-_new_sort(NpyArray *op, int axis, NPY_SORTKIND which)
+_sort_row(npy_sort_rows *par, char *row, char *buffer, int nchunks)
 {
-    NpyArrayIterObject *it;
-    int needcopy = 0, swap;
-    npy_intp N, size;
-    int elsize;
-    npy_intp astride;
-    NpyArray_SortFunc *sort;
-    NPY_BEGIN_THREADS_DEF
+    NpyArray *op = par->op;
+    npy_intp N = par->N;
+    int elsize = par->elsize;
+    char *data = row;
+    int ret;
+
+    if (par->needcopy) {
+        _unaligned_strided_byte_copy(buffer, (npy_intp) elsize, row,
+                                     par->astride, N, elsize, NULL);
+        if (par->swap) {
+            _strided_byte_swap(buffer, (npy_intp) elsize, N, elsize);
+        }
+        data = buffer;
+    }
+    if (par->kth != NULL) {
+        ret = npy_partition(data, N, op, NPY_INTROSELECT, par->kth, par->nkth);
+    }
+    else {
+        ret = npy_parallel_sort(data, N, op, par->which, nchunks);
+    }
+    if (par->needcopy) {
+        if (par->swap) {
+            _strided_byte_swap(buffer, (npy_intp) elsize, N, elsize);
+        }
+        _unaligned_strided_byte_copy(row, par->astride, buffer,
+                                     (npy_intp) elsize, N, elsize, NULL);
+    }
+    return ret;
+}
 
-    it = NpyArray_IterAllButAxis(op, &axis);
-    swap = !NpyArray_ISNOTSWAPPED(op);
-    if (it == NULL) {
-        return -1;
+static void
+_sort_rows_chunk(void *data, npy_intp start, npy_intp end, int chunk)
+{
+    npy_sort_rows *par = (npy_sort_rows *)data;
+    char *buffer = NULL;
+    npy_intp i;
+
+    if (par->needcopy) {
+        buffer = NpyDataMem_NEW(par->N * par->elsize);
+        if (buffer == NULL) {
+            par->failed[chunk] = 1;
+            return;
+        }
     }
+    for (i = start; i < end; i++) {
+        char *row = _sort_row_pointer(par->op, par->axis, i);
 
-    NPY_BEGIN_THREADS_DESCR(op->descr);
-    sort = op->descr->f->sort[which];
-    size = it->size;
-    N = op->dimensions[axis];
-    elsize = op->descr->elsize;
-    astride = op->strides[axis];
+        if (_sort_row(par, row, buffer, 1) < 0) {
+            par->failed[chunk] = 1;
+            break;
+        }
+    }
+    NpyDataMem_FREE(buffer);
+}
 
-    needcopy = !(op->flags & NPY_ALIGNED) || (astride != (npy_intp) elsize) ||
-                                                                         swap;
-    if (needcopy) {
-        char *buffer = NpyDataMem_NEW(N * elsize);
+/*
+ * Argsorts one row, through buffers if the data or the result need
+ * copying.  nchunks > 1 uses the parallel merge sort.
+ */
+static int
+_argsort_row(npy_sort_rows *par, char *row, char *rrow,
+             char *valbuffer, char *indbuffer, int nchunks)
+{
+    NpyArray *op = par->op;
+    npy_intp N = par->N, i, *iptr;
+    int elsize = par->elsize;
+    char *data = row;
+    npy_intp *ind = (npy_intp *)rrow;
+    int ret;
+
+    if (par->needcopy) {
+        _unaligned_strided_byte_copy(valbuffer, (npy_intp) elsize,
+                                     row, par->astride, N, elsize, NULL);
+        if (par->swap) {
+            _strided_byte_swap(valbuffer, (npy_intp) elsize, N, elsize);
+        }
+        data = valbuffer;
+        ind = (npy_intp *)indbuffer;
+    }
+    iptr = ind;
+    for (i = 0; i < N; i++) {
+        *iptr++ = i;
+    }
+    if (par->kth != NULL) {
+        ret = npy_argpartition(data, ind, N, op, NPY_INTROSELECT,
+                               par->kth, par->nkth);
+    }
+    else {
+        ret = npy_parallel_argsort(data, ind, N, op, par->which, nchunks);
+    }
+    if (par->needcopy) {
+        _unaligned_strided_byte_copy(rrow, par->rstride, indbuffer,
+                                     sizeof(npy_intp), N, sizeof(npy_intp),
+                                     NULL);
+    }
+    return ret;
+}
 
-        while (size--) {
-            _unaligned_strided_byte_copy(buffer, (npy_intp) elsize, it->dataptr,
-                                         astride, N, elsize, NULL);
-            if (swap) {
-                _strided_byte_swap(buffer, (npy_intp) elsize, N, elsize);
-            }
-            if (sort(buffer, N, op) < 0) {
-                NpyDataMem_FREE(buffer);
-                goto fail;
-            }
-            if (swap) {
-                _strided_byte_swap(buffer, (npy_intp) elsize, N, elsize);
-            }
-            _unaligned_strided_byte_copy(it->dataptr, astride, buffer,
-                                         (npy_intp) elsize, N, elsize, NULL);
-            NpyArray_ITER_NEXT(it);
+static void
+_argsort_rows_chunk(void *data, npy_intp start, npy_intp end, int chunk)
+{
+    npy_sort_rows *par = (npy_sort_rows *)data;
+    char *valbuffer = NULL, *indbuffer = NULL;
+    npy_intp i;
+
+    if (par->needcopy) {
+        valbuffer = NpyDataMem_NEW(par->N * par->elsize);
+        indbuffer = NpyDataMem_NEW(par->N * sizeof(npy_intp));
+        if (valbuffer == NULL || indbuffer == NULL) {
+            par->failed[chunk] = 1;
+            goto finish;
+        }
+    }
+    for (i = start; i < end; i++) {
+        char *row = _sort_row_pointer(par->op, par->axis, i);
+        char *rrow = _sort_row_pointer(par->ret, par->axis, i);
+
+        if (_argsort_row(par, row, rrow, valbuffer, indbuffer, 1) < 0) {
+            par->failed[chunk] = 1;
+            break;
+        }
+    }
+
+ finish:
+    NpyDataMem_FREE(valbuffer);
+    NpyDataMem_FREE(indbuffer);
+}
+
+/*
+ * Decides how to split the sort of nrows rows of N elements between
+ * threads: returns the number of chunks of rows, and sets *rowchunks to
+ * the number of pieces each row is split into for the merge sort.  The
+ * rows of a partition are not split.
+ */
+static int
+_sort_nchunks(npy_sort_rows *par, npy_intp nrows, int *rowchunks)
+{
+    NpyArray *op = par->op;
+    int nchunks = 1;
+
+    *rowchunks = 1;
+    if (!NpyDataType_FLAGCHK(op->descr, NPY_NEEDS_PYAPI) &&
+        op->descr->f->compare != NULL && nrows > 0) {
+        nchunks = NpyThreads_NumChunks(nrows * par->N);
+    }
+    if (nchunks > 1 && nrows == 1 && par->kth == NULL) {
+        *rowchunks = nchunks;
+        return 1;
+    }
+    if (nchunks > nrows) {
+        nchunks = (int)nrows;
+    }
+    return nchunks;
+}
+
+/*
+ * The radix sort and the timsort are only provided for some types; as
+ * they are stable, the merge sort is used in their place for the others.
+ */
+static NPY_SORTKIND
+_sort_kind(NpyArray_Descr *descr, NPY_SORTKIND which)
+{
+    if ((which == NPY_RADIXSORT || which == NPY_TIMSORT) &&
+        descr->f->sort[which] == NULL && descr->f->argsort[which] == NULL) {
+        return NPY_MERGESORT;
+    }
+    return which;
+}
+
+static int
+_new_sort(NpyArray *op, int axis, NPY_SORTKIND which,
+          npy_intp *kth, npy_intp nkth)
+{
+    npy_sort_rows par;
+    npy_intp size;
+    int nchunks, rowchunks, i, failed = 0;
+    NPY_BEGIN_THREADS_DEF
+
+    par.op = op;
+    par.ret = NULL;
+    par.axis = axis;
+    par.which = which;
+    par.kth = kth;
+    par.nkth = nkth;
+    par.N = op->dimensions[axis];
+    par.elsize = op->descr->elsize;
+    par.astride = op->strides[axis];
+    par.swap = !NpyArray_ISNOTSWAPPED(op);
+    par.needcopy = !(op->flags & NPY_ALIGNED) ||
+        (par.astride != (npy_intp) par.elsize) || par.swap;
+    memset(par.failed, 0, sizeof(par.failed));
+    size = (par.N == 0) ? 0 : NpyArray_SIZE(op) / par.N;
+
+    nchunks = _sort_nchunks(&par, size, &rowchunks);
+    NPY_BEGIN_THREADS_DESCR(op->descr);
+    if (rowchunks > 1) {
+        char *buffer = NULL;
+
+        if (par.needcopy) {
+            buffer = NpyDataMem_NEW(par.N * par.elsize);
+        }
+        if ((par.needcopy && buffer == NULL) ||
+            _sort_row(&par, op->data, buffer, rowchunks) < 0) {
+            failed = 1;
         }
         NpyDataMem_FREE(buffer);
     }
     else {
-        while (size--) {
-            if (sort(it->dataptr, N, op) < 0) {
-                goto fail;
-            }
-            NpyArray_ITER_NEXT(it);
+        NpyThreads_Run(_sort_rows_chunk, &par, size, nchunks);
+        for (i = 0; i < nchunks; i++) {
+            failed |= par.failed[i];
         }
     }
     NPY_END_THREADS_DESCR(op->descr);
-    Npy_DECREF(it);
-    return 0;
 
- fail:
-    NPY_END_THREADS;
-    Npy_DECREF(it);
+    if (failed) {
+        if (!NpyErr_Occurred()) {
+            NpyErr_MEMORY;
+        }
+        return -1;
+    }
+    if (NpyDataType_FLAGCHK(op->descr, NPY_NEEDS_PYAPI) && NpyErr_Occurred()) {
+        return -1;
+    }
     return 0;
 }
 
 static NpyArray*
-_new_argsort(NpyArray *op, int axis, NPY_SORTKIND which)
+_new_argsort(NpyArray *op, int axis, NPY_SORTKIND which,
+             npy_intp *kth, npy_intp nkth)
 {
-
-    NpyArrayIterObject *it = NULL;
-    NpyArrayIterObject *rit = NULL;
+    npy_sort_rows par;
     NpyArray *ret;
-    int needcopy = 0, i;
-    npy_intp N, size;
-    int elsize, swap;
-    npy_intp astride, rstride, *iptr;
-    NpyArray_ArgSortFunc *argsort;
+    npy_intp size;
+    int nchunks, rowchunks, i, failed = 0;
     NPY_BEGIN_THREADS_DEF
 
     ret = NpyArray_New(NULL, op->nd,
@@ -779,90 +980,61 @@ _new_argsort(NpyArray *op, int axis, NPY_SORTKIND which)
     if (ret == NULL) {
         return NULL;
     }
-    it = NpyArray_IterAllButAxis(op, &axis);
-    rit = NpyArray_IterAllButAxis(ret, &axis);
-    if (rit == NULL || it == NULL) {
-        goto fail;
-    }
-    swap = !NpyArray_ISNOTSWAPPED(op);
 
+    par.op = op;
+    par.ret = ret;
+    par.axis = axis;
+    par.which = which;
+    par.kth = kth;
+    par.nkth = nkth;
+    par.N = op->dimensions[axis];
+    par.elsize = op->descr->elsize;
+    par.astride = op->strides[axis];
+    par.rstride = NpyArray_STRIDE(ret, axis);
+    par.swap = !NpyArray_ISNOTSWAPPED(op);
+    par.needcopy = par.swap || !(op->flags & NPY_ALIGNED) ||
+        (par.astride != (npy_intp) par.elsize) ||
+        (par.rstride != sizeof(npy_intp));
+    memset(par.failed, 0, sizeof(par.failed));
+    size = (par.N == 0) ? 0 : NpyArray_SIZE(op) / par.N;
+
+    nchunks = _sort_nchunks(&par, size, &rowchunks);
     NPY_BEGIN_THREADS_DESCR(op->descr);
-    argsort = op->descr->f->argsort[which];
-    size = it->size;
-    N = op->dimensions[axis];
-    elsize = op->descr->elsize;
-    astride = op->strides[axis];
-    rstride = NpyArray_STRIDE(ret,axis);
-
-    needcopy = swap || !(op->flags & NPY_ALIGNED) ||
-        (astride != (npy_intp) elsize) || (rstride != sizeof(npy_intp));
-    if (needcopy) {
-        char *valbuffer, *indbuffer;
+    if (rowchunks > 1) {
+        char *valbuffer = NULL, *indbuffer = NULL;
 
-        valbuffer = NpyDataMem_NEW(N*elsize);
-        indbuffer = NpyDataMem_NEW(N*sizeof(npy_intp));
-        while (size--) {
-            _unaligned_strided_byte_copy(valbuffer, (npy_intp) elsize,
-                                         it->dataptr, astride, N, elsize, NULL);
-            if (swap) {
-                _strided_byte_swap(valbuffer, (npy_intp) elsize, N, elsize);
-            }
-            iptr = (npy_intp *)indbuffer;
-            for (i = 0; i < N; i++) {
-                *iptr++ = i;
-            }
-            if (argsort(valbuffer, (npy_intp *)indbuffer, N, op) < 0) {
-                NpyDataMem_FREE(valbuffer);
-                NpyDataMem_FREE(indbuffer);
-                goto fail;
-            }
-            _unaligned_strided_byte_copy(rit->dataptr, rstride, indbuffer,
-                                         sizeof(npy_intp), N, sizeof(npy_intp), NULL);
-            NpyArray_ITER_NEXT(it);
-            NpyArray_ITER_NEXT(rit);
+        if (par.needcopy) {
+            valbuffer = NpyDataMem_NEW(par.N * par.elsize);
+            indbuffer = NpyDataMem_NEW(par.N * sizeof(npy_intp));
+        }
+        if ((par.needcopy && (valbuffer == NULL || indbuffer == NULL)) ||
+            _argsort_row(&par, op->data, ret->data, valbuffer, indbuffer,
+                         rowchunks) < 0) {
+            failed = 1;
         }
         NpyDataMem_FREE(valbuffer);
         NpyDataMem_FREE(indbuffer);
     }
     else {
-        while (size--) {
-            iptr = (npy_intp *)rit->dataptr;
-            for (i = 0; i < N; i++) {
-                *iptr++ = i;
-            }
-            if (argsort(it->dataptr, (npy_intp *)rit->dataptr, N, op) < 0) {
-                goto fail;
-            }
-            NpyArray_ITER_NEXT(it);
-            NpyArray_ITER_NEXT(rit);
+        NpyThreads_Run(_argsort_rows_chunk, &par, size, nchunks);
+        for (i = 0; i < nchunks; i++) {
+            failed |= par.failed[i];
         }
     }
-
     NPY_END_THREADS_DESCR(op->descr);
 
-    Npy_DECREF(it);
-    Npy_DECREF(rit);
+    if (failed || (NpyDataType_FLAGCHK(op->descr, NPY_NEEDS_PYAPI) &&
+                   NpyErr_Occurred())) {
+        if (!NpyErr_Occurred()) {
+            NpyErr_MEMORY;
+        }
+        Npy_DECREF(ret);
+        return NULL;
+    }
     return ret;
-
- fail:
-    NPY_END_THREADS;
-    Npy_DECREF(ret);
-    Npy_XDECREF(it);
-    Npy_XDECREF(rit);
-    return NULL;
 }
 
 
-/* Be sure to save this global_compare when necessary */
-/* XXX: This may be an issue in an MT case. */
-static NpyArray* global_obj;
-
-static int
-qsortCompare (const void *a, const void *b)
-{
-    return global_obj->descr->f->compare(a,b,global_obj);
-}
-
 /*
  * Consumes reference to ap (op gets it) op contains a version of
  * the array with axes swapped if local variable axis is not the
@@ -917,7 +1089,7 @@ qsortCompare (const void *a, const void *b)
 NDARRAY_API int
 NpyArray_Sort(NpyArray *op, int axis, NPY_SORTKIND which)
 {
-    NpyArray *ap = NULL, *store_arr = NULL;
+    NpyArray *ap = NULL;
     char *ip;
     int i, n, m, elsize, orign;
     char msg[1024];
@@ -941,8 +1113,9 @@ NpyArray_Sort(NpyArray *op, int axis, NPY_SORTKIND which)
     }
 
     /* Determine if we should use type-specific algorithm or not */
+    which = _sort_kind(op->descr, which);
     if (op->descr->f->sort[which] != NULL) {
-        return _new_sort(op, axis, which);
+        return _new_sort(op, axis, which, NULL, 0);
     }
     if ((which != NPY_QUICKSORT)
         || op->descr->f->compare == NULL) {
@@ -964,14 +1137,12 @@ NpyArray_Sort(NpyArray *op, int axis, NPY_SORTKIND which)
     }
     n = NpyArray_SIZE(ap)/m;
 
-    /* Store global -- allows re-entry -- restore before leaving*/
-    store_arr = global_obj;
-    global_obj = ap;
     for (ip = ap->data, i = 0; i < n; i++, ip += elsize*m) {
-        qsort(ip, m, elsize, qsortCompare);
+        if (npy_generic_quicksort(ip, m, ap) < 0) {
+            NpyErr_MEMORY;
+            goto fail;
+        }
     }
-    global_obj = store_arr;
-
     if (NpyErr_Occurred()) {
         goto fail;
     }
@@ -994,31 +1165,17 @@ NpyArray_Sort(NpyArray *op, int axis, NPY_SORTKIND which)
 }
 
 
-/* XXX: This could be a problem for MT. */
-static char *global_data;
-
-static int
-argsort_static_compare(const void *ip1, const void *ip2)
-{
-    int isize = global_obj->descr->elsize;
-    const npy_intp *ipa = ip1;
-    const npy_intp *ipb = ip2;
-    return global_obj->descr->f->compare(global_data + (isize * *ipa),
-                                         global_data + (isize * *ipb),
-                                         global_obj);
-}
-
 /*
  * ArgSort an array
  */
 NDARRAY_API NpyArray *
 NpyArray_ArgSort(NpyArray *op, int axis, NPY_SORTKIND which)
 {
-    NpyArray *ap = NULL, *ret = NULL, *store, *op2;
+    NpyArray *ap = NULL, *ret = NULL, *op2;
     npy_intp *ip;
     npy_intp i, j, n, m, orign;
     int argsort_elsize;
-    char *store_ptr;
+    char *data;
 
     n = op->nd;
     if ((n == 0) || (NpyArray_SIZE(op) == 1)) {
@@ -1039,8 +1196,9 @@ NpyArray_ArgSort(NpyArray *op, int axis, NPY_SORTKIND which)
         return NULL;
     }
     /* Determine if we should use new algorithm or not */
+    which = _sort_kind(op2->descr, which);
     if (op2->descr->f->argsort[which] != NULL) {
-        ret = _new_argsort(op2, axis, which);
+        ret = _new_argsort(op2, axis, which, NULL, 0);
         Npy_DECREF(op2);
         return ret;
     }
@@ -1073,18 +1231,16 @@ NpyArray_ArgSort(NpyArray *op, int axis, NPY_SORTKIND which)
         goto finish;
     }
     n = NpyArray_SIZE(op)/m;
-    store_ptr = global_data;
-    global_data = op->data;
-    store = global_obj;
-    global_obj = op;
-    for (i = 0; i < n; i++, ip += m, global_data += m*argsort_elsize) {
+    data = op->data;
+    for (i = 0; i < n; i++, ip += m, data += m*argsort_elsize) {
         for (j = 0; j < m; j++) {
             ip[j] = j;
         }
-        qsort((char *)ip, m, sizeof(npy_intp), argsort_static_compare);
+        npy_generic_aquicksort(data, ip, m, op);
+    }
+    if (NpyErr_Occurred()) {
+        goto fail;
     }
-    global_data = store_ptr;
-    global_obj = store;
 
  finish:
     Npy_DECREF(op);
@@ -1098,6 +1254,160 @@ NpyArray_ArgSort(NpyArray *op, int axis, NPY_SORTKIND which)
 
 }
 
+/*
+ * Returns the positions in ktharray (at most 1-d) for an axis of length
+ * N, made non-negative, sorted and without duplicates, and sets *nkth to
+ * their number.  The result must be freed with NpyDimMem_FREE.
+ */
+static npy_intp *
+_partition_kth(NpyArray *ktharray, npy_intp N, npy_intp *nkth)
+{
+    NpyArray *kcont;
+    npy_intp *kth, *kdata, n, i, j, k;
+    char msg[1024];
+
+    if (ktharray->nd > 1) {
+        NpyErr_SetString(NpyExc_ValueError,
+                         "kth array must have dimension <= 1");
+        return NULL;
+    }
+    kcont = NpyArray_ContiguousFromArray(ktharray, NPY_INTP);
+    if (kcont == NULL) {
+        return NULL;
+    }
+    n = NpyArray_SIZE(kcont);
+    kdata = (npy_intp *)kcont->data;
+    kth = NpyDimMem_NEW((n + 1));
+    if (kth == NULL) {
+        Npy_DECREF(kcont);
+        NpyErr_MEMORY;
+        return NULL;
+    }
+    for (i = 0; i < n; i++) {
+        k = kdata[i];
+        if (k < 0) {
+            k += N;
+        }
+        if (k < 0 || k >= N) {
+            sprintf(msg, "kth(=%" NPY_INTP_FMT ") out of bounds (%"
+                    NPY_INTP_FMT ")", kdata[i], N);
+            NpyErr_SetString(NpyExc_ValueError, msg);
+            Npy_DECREF(kcont);
+            NpyDimMem_FREE(kth);
+            return NULL;
+        }
+        /* insertion sort, there are usually very few */
+        for (j = i; j > 0 && kth[j - 1] > k; j--) {
+            kth[j] = kth[j - 1];
+        }
+        kth[j] = k;
+    }
+    Npy_DECREF(kcont);
+
+    for (i = 0, j = 0; i < n; i++) {
+        if (j == 0 || kth[i] != kth[j - 1]) {
+            kth[j++] = kth[i];
+        }
+    }
+    *nkth = j;
+    return kth;
+}
+
+
+/*
+ * Partition an array in-place: along the axis, the elements at the
+ * positions in ktharray end up where they would be in the sorted array,
+ * with no larger element before them and no smaller one after them.
+ */
+NDARRAY_API int
+NpyArray_Partition(NpyArray *op, NpyArray *ktharray, int axis,
+                   NPY_SELECTKIND which)
+{
+    npy_intp *kth, nkth;
+    int n, ret;
+    char msg[1024];
+
+    n = op->nd;
+    if (n == 0) {
+        NpyErr_SetString(NpyExc_ValueError,
+                         "cannot partition a 0-d array");
+        return -1;
+    }
+    if (axis < 0) {
+        axis += n;
+    }
+    if ((axis < 0) || (axis >= n)) {
+        sprintf(msg, "axis(=%d) out of bounds", axis);
+        NpyErr_SetString(NpyExc_ValueError, msg);
+        return -1;
+    }
+    if (!NpyArray_ISWRITEABLE(op)) {
+        NpyErr_SetString(NpyExc_RuntimeError,
+                        "attempted partition on unwriteable array.");
+        return -1;
+    }
+    if (which < 0 || which >= NPY_NSELECTS) {
+        NpyErr_SetString(NpyExc_ValueError, "not a valid partition kind");
+        return -1;
+    }
+    if (op->descr->f->compare == NULL) {
+        NpyErr_SetString(NpyExc_TypeError,
+                         "partition not supported for this type");
+        return -1;
+    }
+
+    kth = _partition_kth(ktharray, op->dimensions[axis], &nkth);
+    if (kth == NULL) {
+        return -1;
+    }
+    ret = _new_sort(op, axis, NPY_QUICKSORT, kth, nkth);
+    NpyDimMem_FREE(kth);
+    return ret;
+}
+
+
+/*
+ * ArgPartition an array: returns the indices which would partition it
+ * along the axis as NpyArray_Partition does.
+ */
+NDARRAY_API NpyArray *
+NpyArray_ArgPartition(NpyArray *op, NpyArray *ktharray, int axis,
+                      NPY_SELECTKIND which)
+{
+    NpyArray *op2, *ret;
+    npy_intp *kth, nkth;
+
+    if (op->nd == 0) {
+        NpyErr_SetString(NpyExc_ValueError,
+                         "cannot partition a 0-d array");
+        return NULL;
+    }
+    if (which < 0 || which >= NPY_NSELECTS) {
+        NpyErr_SetString(NpyExc_ValueError, "not a valid partition kind");
+        return NULL;
+    }
+    if (op->descr->f->compare == NULL) {
+        NpyErr_SetString(NpyExc_TypeError,
+                         "partition not supported for this type");
+        return NULL;
+    }
+
+    /* Creates new reference op2 */
+    if ((op2 = NpyArray_CheckAxis(op, &axis, 0)) == NULL) {
+        return NULL;
+    }
+    kth = _partition_kth(ktharray, op2->dimensions[axis], &nkth);
+    if (kth == NULL) {
+        Npy_DECREF(op2);
+        return NULL;
+    }
+    ret = _new_argsort(op2, axis, NPY_QUICKSORT, kth, nkth);
+    NpyDimMem_FREE(kth);
+    Npy_DECREF(op2);
+    return ret;
+}
+
+
 /*
  * LexSort an array providing indices that will sort a collection of arrays
  * lexicographically.  The first key is sorted on first, followed by the
@@ -1284,6 +1594,10 @@ NpyArray_LexSort(NpyArray** mps, int n, int axis)
 
  fail:
     NPY_END_THREADS;
+    if (!NpyErr_Occurred()) {
+        /* the sort functions do not set an error when out of memory */
+        NpyErr_MEMORY;
+    }
     Npy_XDECREF(rit);
     Npy_XDECREF(ret);
     for (i = 0; i < n; i++) {
@@ -16,6 +16,9 @@
 #include "npy_iterators.h"
 #include "npy_os.h"
 #include "npy_calculation.h"
+#include "npy_threads.h"
+#include "npy_datamem.h"
+#include "npy_gemm.h"
 
 #if defined(_WIN32)
 #include <Windows.h>
@@ -88,6 +91,9 @@ npy_initlib(struct NpyArray_FunctionDefs *functionDefs,
     _NpyInterface_Incref = incref;
     _NpyInterface_Decref = decref;
 
+    npy_threads_init();
+    npy_datamem_init();
+
     /* Must be last because it uses some of the above functions. */
     if (NULL != functionDefs) {
         _init_type_functions(functionDefs);
@@ -404,16 +410,79 @@ NpyArray_CanCoerceScalar(int thistype, int neededtype,
 
 
 
+/*
+ * Finds the lowest and one past the highest byte of the data of ap.
+ */
+static void
+_byte_bounds(NpyArray *ap, char **low, char **high)
+{
+    npy_intp lo = 0, hi = ap->descr->elsize;
+    int i;
+
+    for (i = 0; i < ap->nd; i++) {
+        if (ap->dimensions[i] == 0) {
+            *low = *high = ap->data;
+            return;
+        }
+        if (ap->strides[i] < 0) {
+            lo += (ap->dimensions[i] - 1)*ap->strides[i];
+        }
+        else {
+            hi += (ap->dimensions[i] - 1)*ap->strides[i];
+        }
+    }
+    *low = ap->data + lo;
+    *high = ap->data + hi;
+}
+
+static int
+_arrays_overlap(NpyArray *ap1, NpyArray *ap2)
+{
+    char *low1, *high1, *low2, *high2;
+
+    _byte_bounds(ap1, &low1, &high1);
+    _byte_bounds(ap2, &low2, &high2);
+    return low1 < high2 && low2 < high1;
+}
+
+
 /*
  * Make a new empty array, of the passed size, of a type that takes the
  * priority of ap1 and ap2 into account.
+ *
+ * If out is given it is checked and returned instead, or a copy of it
+ * that is written back on NpyArray_ForceUpdate if it overlaps ap1 or
+ * ap2.
  */
 static NpyArray *
-new_array_for_sum(NpyArray *ap1, NpyArray *ap2,
+new_array_for_sum(NpyArray *ap1, NpyArray *ap2, NpyArray *out,
                   int nd, npy_intp dimensions[], int typenum)
 {
     int tmp;
 
+    if (out != NULL) {
+        if (out->nd != nd || out->descr->type_num != typenum ||
+            !NpyArray_ISCARRAY(out)) {
+            NpyErr_SetString(NpyExc_ValueError,
+                             "output array is not acceptable (must have the "
+                             "right type, nr dimensions, and be a C-Array)");
+            return NULL;
+        }
+        if (!NpyArray_CompareLists(out->dimensions, dimensions, nd)) {
+            NpyErr_SetString(NpyExc_ValueError,
+                             "output array has wrong dimensions");
+            return NULL;
+        }
+        if (_arrays_overlap(out, ap1) || _arrays_overlap(out, ap2)) {
+            Npy_INCREF(out->descr);
+            return NpyArray_FromArray(out, out->descr,
+                                      NPY_CARRAY | NPY_ENSURECOPY |
+                                      NPY_UPDATEIFCOPY);
+        }
+        Npy_INCREF(out);
+        return out;
+    }
+
     /*
      * Need to choose an output array that can hold a sum
      */
@@ -424,12 +493,153 @@ new_array_for_sum(NpyArray *ap1, NpyArray *ap2,
                         Npy_INTERFACE(tmp ? ap2 : ap1));
 }
 
+/*
+ * Returns out in place of the copy of it made by new_array_for_sum, after
+ * writing the result back.
+ */
+static NpyArray *
+_update_out(NpyArray *ret, NpyArray *out)
+{
+    if (out != NULL && ret != out) {
+        Npy_INCREF(out);
+        NpyArray_ForceUpdate(ret);
+        Npy_DECREF(ret);
+        ret = out;
+    }
+    return ret;
+}
+
+
+/*
+ * Finds the number of rows of ap and their stride when all the axes but
+ * 'axis' are taken together in C order.  Returns 0 if the rows are not
+ * evenly spaced.
+ */
+static int
+_gemm_rows(NpyArray *ap, int axis, npy_intp *nrows, npy_intp *stride)
+{
+    npy_intp next = 0;
+    int i, found = 0;
+
+    *nrows = 1;
+    *stride = 0;
+    for (i = ap->nd - 1; i >= 0; i--) {
+        if (i == axis || ap->dimensions[i] == 1) {
+            continue;
+        }
+        if (!found) {
+            *stride = ap->strides[i];
+            found = 1;
+        }
+        else if (ap->strides[i] != next) {
+            return 0;
+        }
+        next = ap->strides[i]*ap->dimensions[i];
+        *nrows *= ap->dimensions[i];
+    }
+    return 1;
+}
+
+/*
+ * Computes ret = dot(ap1, ap2), or inner(ap1, ap2) if inner is set, with
+ * npy_gemm.  Returns 0 when done, 1 if npy_gemm does not handle the
+ * arrays, so that the caller has to, and -1 on error.
+ */
+static int
+_dot_gemm(NpyArray *ap1, NpyArray *ap2, NpyArray *ret, int inner)
+{
+    int typenum = ret->descr->type_num;
+    npy_intp es = ret->descr->elsize;
+    npy_intp m, n, k, l, i, j, as0, as1, bs0, bs1, cs0;
+    char *b;
+    int d, nd2 = ap2->nd, res;
+    NPY_BEGIN_THREADS_DEF
+
+    if (ap1->descr->type_num != typenum || ap2->descr->type_num != typenum ||
+        !NpyArray_ISBEHAVED_RO(ap1) || !NpyArray_ISBEHAVED_RO(ap2) ||
+        !NpyArray_ISCARRAY(ret)) {
+        return 1;
+    }
+    k = ap1->dimensions[ap1->nd - 1];
+    as1 = ap1->strides[ap1->nd - 1];
+    if (!_gemm_rows(ap1, ap1->nd - 1, &m, &as0)) {
+        return 1;
+    }
+
+    if (inner) {
+        /* The rows of ap2 are the columns of B. */
+        bs0 = ap2->strides[nd2 - 1];
+        if (!_gemm_rows(ap2, nd2 - 1, &n, &bs1)) {
+            return 1;
+        }
+        NPY_BEGIN_THREADS_DESCR(ap2->descr);
+        res = npy_gemm(typenum, m, n, k, ap1->data, as0, as1,
+                       ap2->data, bs0, bs1, ret->data, n*es, es);
+        NPY_END_THREADS_DESCR(ap2->descr);
+    }
+    else if (nd2 <= 2) {
+        n = (nd2 == 2) ? ap2->dimensions[1] : 1;
+        bs0 = ap2->strides[0];
+        bs1 = (nd2 == 2) ? ap2->strides[1] : 0;
+        NPY_BEGIN_THREADS_DESCR(ap2->descr);
+        res = npy_gemm(typenum, m, n, k, ap1->data, as0, as1,
+                       ap2->data, bs0, bs1, ret->data, n*es, es);
+        NPY_END_THREADS_DESCR(ap2->descr);
+    }
+    else {
+        /*
+         * ap2 is a stack of matrices, and the product with each of them
+         * goes to every l-th row of the result.
+         */
+        n = ap2->dimensions[nd2 - 1];
+        bs0 = ap2->strides[nd2 - 2];
+        bs1 = ap2->strides[nd2 - 1];
+        l = 1;
+        for (d = 0; d < nd2 - 2; d++) {
+            l *= ap2->dimensions[d];
+        }
+        cs0 = l*n*es;
+        res = 1;
+        NPY_BEGIN_THREADS_DESCR(ap2->descr);
+        for (i = 0; i < l; i++) {
+            b = ap2->data;
+            for (j = i, d = nd2 - 3; d >= 0; d--) {
+                b += (j % ap2->dimensions[d])*ap2->strides[d];
+                j /= ap2->dimensions[d];
+            }
+            res = npy_gemm(typenum, m, n, k, ap1->data, as0, as1,
+                           b, bs0, bs1, ret->data + i*n*es, cs0, es);
+            if (res != 0) {
+                break;
+            }
+        }
+        NPY_END_THREADS_DESCR(ap2->descr);
+    }
+    if (res < 0) {
+        NpyErr_MEMORY;
+    }
+    return res;
+}
+
 
 /*
  * Numeric.innerproduct(a,v)
  */
 NDARRAY_API NpyArray *
 NpyArray_InnerProduct(NpyArray *ap1, NpyArray *ap2, int typenum)
+{
+    return NpyArray_InnerProduct2(ap1, ap2, typenum, NULL);
+}
+
+
+/*
+ * Numeric.innerproduct(a,v), storing the result to out if it is not NULL.
+ * out must be a C array of the type and shape of the result; it is
+ * returned, with a new reference.
+ */
+NDARRAY_API NpyArray *
+NpyArray_InnerProduct2(NpyArray *ap1, NpyArray *ap2, int typenum,
+                       NpyArray *out)
 {
     NpyArray *ret = NULL;
     NpyArrayIterObject *it1, *it2;
@@ -460,15 +670,26 @@ NpyArray_InnerProduct(NpyArray *ap1, NpyArray *ap2, int typenum)
      * Need to choose an output array that can hold a sum
      * -- use priority to determine which subtype.
      */
-    ret = new_array_for_sum(ap1, ap2, nd, dimensions, typenum);
+    ret = new_array_for_sum(ap1, ap2, out, nd, dimensions, typenum);
     if (ret == NULL) {
         return NULL;
     }
+    /* Ensure that multiarray.inner(<Nx0>,<Mx0>) -> zeros((N,M)) */
+    if (l == 0) {
+        memset(NpyArray_DATA(ret), 0, NpyArray_NBYTES(ret));
+        return _update_out(ret, out);
+    }
     dot = ret->descr->f->dotfunc;
     if (dot == NULL) {
         NpyErr_SetString(NpyExc_ValueError, "dot not available for this type");
         goto fail;
     }
+    switch (_dot_gemm(ap1, ap2, ret, 1)) {
+    case 0:
+        return _update_out(ret, out);
+    case -1:
+        goto fail;
+    }
     is1 = ap1->strides[ap1->nd - 1];
     is2 = ap2->strides[ap2->nd - 1];
     op = ret->data;
@@ -496,10 +717,10 @@ NpyArray_InnerProduct(NpyArray *ap1, NpyArray *ap2, int typenum)
     if (NpyErr_Occurred()) {
         goto fail;
     }
-    return ret;
+    return _update_out(ret, out);
 
  fail:
-    Npy_DECREF(ret);
+    NpyArray_XDECREF_ERR(ret);
     return NULL;
 }
 
@@ -510,6 +731,18 @@ NpyArray_InnerProduct(NpyArray *ap1, NpyArray *ap2, int typenum)
  */
 NDARRAY_API NpyArray *
 NpyArray_MatrixProduct(NpyArray *ap1, NpyArray *ap2, int typenum)
+{
+    return NpyArray_MatrixProduct2(ap1, ap2, typenum, NULL);
+}
+
+
+/*
+ * Numeric.matrixproduct(a,v), storing the result to out if it is not
+ * NULL, like NpyArray_InnerProduct2.
+ */
+NDARRAY_API NpyArray *
+NpyArray_MatrixProduct2(NpyArray *ap1, NpyArray *ap2, int typenum,
+                        NpyArray *out)
 {
     NpyArray *ret = NULL;
     NpyArrayIterObject *it1, *it2;
@@ -549,7 +782,7 @@ NpyArray_MatrixProduct(NpyArray *ap1, NpyArray *ap2, int typenum)
     is1 = ap1->strides[ap1->nd - 1];
     is2 = ap2->strides[matchDim];
     /* Choose which subtype to return */
-    ret = new_array_for_sum(ap1, ap2, nd, dimensions, typenum);
+    ret = new_array_for_sum(ap1, ap2, out, nd, dimensions, typenum);
     if (ret == NULL) {
         return NULL;
     }
@@ -567,6 +800,12 @@ NpyArray_MatrixProduct(NpyArray *ap1, NpyArray *ap2, int typenum)
         NpyErr_SetString(NpyExc_ValueError, "dot not available for this type");
         goto fail;
     }
+    switch (_dot_gemm(ap1, ap2, ret, 0)) {
+    case 0:
+        return _update_out(ret, out);
+    case -1:
+        goto fail;
+    }
 
     op = NpyArray_BYTES(ret);
     os = NpyArray_ITEMSIZE(ret);
@@ -592,10 +831,10 @@ NpyArray_MatrixProduct(NpyArray *ap1, NpyArray *ap2, int typenum)
     if (NpyErr_Occurred()) {
         goto fail;
     }
-    return ret;
+    return _update_out(ret, out);
 
 fail:
-    Npy_XDECREF(ret);
+    NpyArray_XDECREF_ERR(ret);
     return NULL;
 }
 
@@ -717,7 +956,7 @@ _npyarray_correlate(NpyArray *ap1, NpyArray *ap2,
      * Need to choose an output array that can hold a sum
      * -- use priority to determine which subtype.
      */
-    ret = new_array_for_sum(ap1, ap2, 1, &length, typenum);
+    ret = new_array_for_sum(ap1, ap2, NULL, 1, &length, typenum);
     if (ret == NULL) {
         return NULL;
     }
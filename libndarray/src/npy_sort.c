@@ -0,0 +1,657 @@
+/*
+ * npy_sort.c -
+ *
+ * Generic (compare function based) sorts and the parallel merge sort used
+ * for large 1-d arrays.  See npy_sort.h.
+ */
+
+#include <stdlib.h>
+#include <string.h>
+
+#include "npy_config.h"
+#include "npy_api.h"
+#include "npy_arrayobject.h"
+#include "npy_threads.h"
+#include "npy_sort.h"
+
+
+#define NPY_QS_STACK 128
+#define SMALL_QUICKSORT 15
+
+
+static void
+_swap_items(char *a, char *b, npy_intp n)
+{
+    char tmp;
+
+    while (n--) {
+        tmp = *a;
+        *a++ = *b;
+        *b++ = tmp;
+    }
+}
+
+
+/*
+ * Quicksort using the compare function of arr's type.  Errors raised by
+ * the compare function are left set for the caller to check.
+ */
+int
+npy_generic_quicksort(void *start, npy_intp num, NpyArray *arr)
+{
+    NpyArray_CompareFunc *cmp = arr->descr->f->compare;
+    npy_intp elsize = arr->descr->elsize;
+    char *pl = (char *)start;
+    char *pr = pl + (num - 1)*elsize;
+    char *stack[NPY_QS_STACK], **sptr = stack, *pm, *pi, *pj, *pk, *vp;
+
+    if (num <= 1) {
+        return 0;
+    }
+    vp = malloc(elsize);
+    if (vp == NULL) {
+        return -1;
+    }
+    for (;;) {
+        while ((pr - pl) > SMALL_QUICKSORT*elsize) {
+            /* quicksort partition */
+            pm = pl + (((pr - pl)/elsize) >> 1)*elsize;
+            if (cmp(pm, pl, arr) < 0) {
+                _swap_items(pm, pl, elsize);
+            }
+            if (cmp(pr, pm, arr) < 0) {
+                _swap_items(pr, pm, elsize);
+            }
+            if (cmp(pm, pl, arr) < 0) {
+                _swap_items(pm, pl, elsize);
+            }
+            memcpy(vp, pm, elsize);
+            pi = pl;
+            pj = pr - elsize;
+            _swap_items(pm, pj, elsize);
+            for (;;) {
+                do {
+                    pi += elsize;
+                } while (cmp(pi, vp, arr) < 0);
+                do {
+                    pj -= elsize;
+                } while (cmp(vp, pj, arr) < 0);
+                if (pi >= pj) {
+                    break;
+                }
+                _swap_items(pi, pj, elsize);
+            }
+            pk = pr - elsize;
+            _swap_items(pi, pk, elsize);
+            /* push largest partition on stack */
+            if (pi - pl < pr - pi) {
+                *sptr++ = pi + elsize;
+                *sptr++ = pr;
+                pr = pi - elsize;
+            }
+            else {
+                *sptr++ = pl;
+                *sptr++ = pi - elsize;
+                pl = pi + elsize;
+            }
+        }
+
+        /* insertion sort */
+        for (pi = pl + elsize; pi <= pr; pi += elsize) {
+            memcpy(vp, pi, elsize);
+            pj = pi;
+            pk = pi - elsize;
+            while (pj > pl && cmp(vp, pk, arr) < 0) {
+                memcpy(pj, pk, elsize);
+                pj -= elsize;
+                pk -= elsize;
+            }
+            memcpy(pj, vp, elsize);
+        }
+        if (sptr == stack) {
+            break;
+        }
+        pr = *(--sptr);
+        pl = *(--sptr);
+    }
+    free(vp);
+    return 0;
+}
+
+
+/*
+ * Quicksort of the indices in tosort by the values they point to in v,
+ * using the compare function of arr's type.
+ */
+int
+npy_generic_aquicksort(void *v, npy_intp *tosort, npy_intp num,
+                       NpyArray *arr)
+{
+    NpyArray_CompareFunc *cmp = arr->descr->f->compare;
+    npy_intp elsize = arr->descr->elsize;
+    char *data = (char *)v, *vp;
+    npy_intp *pl = tosort;
+    npy_intp *pr = tosort + num - 1;
+    npy_intp *stack[NPY_QS_STACK], **sptr = stack, *pm, *pi, *pj, *pk;
+    npy_intp vi, tmp;
+
+#define VAL(i) (data + (i)*elsize)
+#define INTP_SWAP(a, b) {tmp = (b); (b) = (a); (a) = tmp;}
+
+    for (;;) {
+        while ((pr - pl) > SMALL_QUICKSORT) {
+            /* quicksort partition */
+            pm = pl + ((pr - pl) >> 1);
+            if (cmp(VAL(*pm), VAL(*pl), arr) < 0) {
+                INTP_SWAP(*pm, *pl);
+            }
+            if (cmp(VAL(*pr), VAL(*pm), arr) < 0) {
+                INTP_SWAP(*pr, *pm);
+            }
+            if (cmp(VAL(*pm), VAL(*pl), arr) < 0) {
+                INTP_SWAP(*pm, *pl);
+            }
+            vp = VAL(*pm);
+            pi = pl;
+            pj = pr - 1;
+            INTP_SWAP(*pm, *pj);
+            for (;;) {
+                do {
+                    ++pi;
+                } while (cmp(VAL(*pi), vp, arr) < 0);
+                do {
+                    --pj;
+                } while (cmp(vp, VAL(*pj), arr) < 0);
+                if (pi >= pj) {
+                    break;
+                }
+                INTP_SWAP(*pi, *pj);
+            }
+            pk = pr - 1;
+            INTP_SWAP(*pi, *pk);
+            /* push largest partition on stack */
+            if (pi - pl < pr - pi) {
+                *sptr++ = pi + 1;
+                *sptr++ = pr;
+                pr = pi - 1;
+            }
+            else {
+                *sptr++ = pl;
+                *sptr++ = pi - 1;
+                pl = pi + 1;
+            }
+        }
+
+        /* insertion sort */
+        for (pi = pl + 1; pi <= pr; ++pi) {
+            vi = *pi;
+            vp = VAL(vi);
+            pj = pi;
+            pk = pi - 1;
+            while (pj > pl && cmp(vp, VAL(*pk), arr) < 0) {
+                *pj-- = *pk--;
+            }
+            *pj = vi;
+        }
+        if (sptr == stack) {
+            break;
+        }
+        pr = *(--sptr);
+        pl = *(--sptr);
+    }
+
+#undef VAL
+#undef INTP_SWAP
+    return 0;
+}
+
+
+/* Number of quickselect steps before falling back on a full sort. */
+static int
+_select_depth(npy_intp num)
+{
+    int depth = 0;
+
+    while (num > 1) {
+        num >>= 1;
+        depth += 2;
+    }
+    return depth;
+}
+
+
+/*
+ * Moves the kth element of start to where it would be if the array were
+ * sorted, with no larger element before it and no smaller one after it,
+ * using the compare function of arr's type.  This is a quickselect with
+ * a median of three pivot, which sorts what is left of the array if it
+ * makes too little progress, so the worst case is O(n*log(n)).
+ */
+int
+npy_generic_introselect(void *start, npy_intp num, npy_intp kth,
+                        NpyArray *arr)
+{
+    NpyArray_CompareFunc *cmp = arr->descr->f->compare;
+    npy_intp elsize = arr->descr->elsize;
+    char *data = (char *)start, *vp;
+    npy_intp low = 0, high = num - 1, mid, i, j;
+    int depth = _select_depth(num);
+
+#define ITEM(i) (data + (i)*elsize)
+
+    if (num <= 1) {
+        return 0;
+    }
+    vp = malloc(elsize);
+    if (vp == NULL) {
+        return -1;
+    }
+    while (high - low > SMALL_QUICKSORT) {
+        if (depth-- == 0) {
+            break;
+        }
+        mid = low + ((high - low) >> 1);
+        if (cmp(ITEM(mid), ITEM(low), arr) < 0) {
+            _swap_items(ITEM(mid), ITEM(low), elsize);
+        }
+        if (cmp(ITEM(high), ITEM(mid), arr) < 0) {
+            _swap_items(ITEM(high), ITEM(mid), elsize);
+        }
+        if (cmp(ITEM(mid), ITEM(low), arr) < 0) {
+            _swap_items(ITEM(mid), ITEM(low), elsize);
+        }
+        memcpy(vp, ITEM(mid), elsize);
+        i = low;
+        j = high - 1;
+        _swap_items(ITEM(mid), ITEM(j), elsize);
+        for (;;) {
+            do {
+                ++i;
+            } while (cmp(ITEM(i), vp, arr) < 0);
+            do {
+                --j;
+            } while (cmp(vp, ITEM(j), arr) < 0);
+            if (i >= j) {
+                break;
+            }
+            _swap_items(ITEM(i), ITEM(j), elsize);
+        }
+        _swap_items(ITEM(i), ITEM(high - 1), elsize);
+        if (kth < i) {
+            high = i - 1;
+        }
+        else if (kth > i) {
+            low = i + 1;
+        }
+        else {
+            low = high = i;
+        }
+    }
+    free(vp);
+#undef ITEM
+    if (high > low) {
+        return npy_generic_quicksort(data + low*elsize, high - low + 1, arr);
+    }
+    return 0;
+}
+
+
+/*
+ * Like npy_generic_introselect, for the indices in tosort of the values
+ * in v.
+ */
+int
+npy_generic_aintroselect(void *v, npy_intp *tosort, npy_intp num,
+                         npy_intp kth, NpyArray *arr)
+{
+    NpyArray_CompareFunc *cmp = arr->descr->f->compare;
+    npy_intp elsize = arr->descr->elsize;
+    char *data = (char *)v, *vp;
+    npy_intp low = 0, high = num - 1, mid, i, j, tmp;
+    int depth = _select_depth(num);
+
+#define VAL(i) (data + tosort[i]*elsize)
+#define INTP_SWAP(a, b) {tmp = (b); (b) = (a); (a) = tmp;}
+
+    while (high - low > SMALL_QUICKSORT) {
+        if (depth-- == 0) {
+            break;
+        }
+        mid = low + ((high - low) >> 1);
+        if (cmp(VAL(mid), VAL(low), arr) < 0) {
+            INTP_SWAP(tosort[mid], tosort[low]);
+        }
+        if (cmp(VAL(high), VAL(mid), arr) < 0) {
+            INTP_SWAP(tosort[high], tosort[mid]);
+        }
+        if (cmp(VAL(mid), VAL(low), arr) < 0) {
+            INTP_SWAP(tosort[mid], tosort[low]);
+        }
+        vp = VAL(mid);
+        i = low;
+        j = high - 1;
+        INTP_SWAP(tosort[mid], tosort[j]);
+        for (;;) {
+            do {
+                ++i;
+            } while (cmp(VAL(i), vp, arr) < 0);
+            do {
+                --j;
+            } while (cmp(vp, VAL(j), arr) < 0);
+            if (i >= j) {
+                break;
+            }
+            INTP_SWAP(tosort[i], tosort[j]);
+        }
+        INTP_SWAP(tosort[i], tosort[high - 1]);
+        if (kth < i) {
+            high = i - 1;
+        }
+        else if (kth > i) {
+            low = i + 1;
+        }
+        else {
+            low = high = i;
+        }
+    }
+#undef VAL
+#undef INTP_SWAP
+    if (high > low) {
+        return npy_generic_aquicksort(v, tosort + low, high - low + 1, arr);
+    }
+    return 0;
+}
+
+
+/*
+ * Parallel merge sort.  The array is split into nchunks runs which are
+ * sorted independently.  Pairs of runs are then merged until one is
+ * left, alternating between the array and a buffer of the same size.
+ * Each merge is itself split into nchunks pieces of equal output length;
+ * the boundaries of a piece in the two input runs are found by bisection,
+ * so all threads take part in every round, including the last one.
+ */
+typedef struct {
+    NpyArray *arr;
+    NpyArray_CompareFunc *cmp;
+    NpyArray_SortFunc *sort;
+    NpyArray_ArgSortFunc *argsort;
+    char *v;                    /* values, when sorting indices */
+    npy_intp elsize;            /* size of a value */
+    npy_intp isize;             /* size of the items moved around */
+    char *src, *dst;
+    npy_intp num;
+    int nchunks;
+    npy_intp bounds[NPY_MAX_THREADS + 1];  /* runs in src */
+    int nruns;
+    int failed[NPY_MAX_THREADS];
+} npy_parallel_msort;
+
+static NPY_INLINE int
+_item_cmp(npy_parallel_msort *par, char *a, char *b)
+{
+    if (par->v != NULL) {
+        return par->cmp(par->v + par->elsize * *(npy_intp *)a,
+                        par->v + par->elsize * *(npy_intp *)b, par->arr);
+    }
+    return par->cmp(a, b, par->arr);
+}
+
+static void
+_msort_run_chunk(void *data, npy_intp start, npy_intp end, int chunk)
+{
+    npy_parallel_msort *par = (npy_parallel_msort *)data;
+    char *run = par->src + start*par->isize;
+    int ret;
+
+    if (par->v != NULL) {
+        ret = par->argsort(par->v, (npy_intp *)run, end - start, par->arr);
+    }
+    else {
+        ret = par->sort(run, end - start, par->arr);
+    }
+    if (ret < 0) {
+        par->failed[chunk] = 1;
+    }
+}
+
+/*
+ * Number of items taken from run a (of length na) among the first k
+ * items of the stable merge of a and b.
+ */
+static npy_intp
+_merge_split(npy_parallel_msort *par, char *a, npy_intp na,
+             char *b, npy_intp nb, npy_intp k)
+{
+    npy_intp lo = (k > nb) ? k - nb : 0;
+    npy_intp hi = (k < na) ? k : na;
+    npy_intp i;
+
+    while (lo < hi) {
+        i = lo + (hi - lo)/2;
+        /* a[i] goes before b[k-i-1]: more items of a are needed */
+        if (_item_cmp(par, a + i*par->isize,
+                      b + (k - i - 1)*par->isize) <= 0) {
+            lo = i + 1;
+        }
+        else {
+            hi = i;
+        }
+    }
+    return lo;
+}
+
+/*
+ * Task t of a round merges the output range [k0, k1) of pair t/nchunks,
+ * or copies its part of a final unpaired run.
+ */
+static void
+_msort_merge_chunk(void *data, npy_intp start, npy_intp end, int chunk)
+{
+    npy_parallel_msort *par = (npy_parallel_msort *)data;
+    npy_intp isize = par->isize;
+    npy_intp t;
+
+    for (t = start; t < end; t++) {
+        int pair = (int)(t / par->nchunks);
+        int part = (int)(t % par->nchunks);
+        npy_intp lo = par->bounds[2*pair];
+        npy_intp mid, hi, n, k0, k1, i, j, iend, jend;
+        char *a, *b, *out;
+
+        if (2*pair + 1 >= par->nruns) {
+            /* unpaired run, copy it over */
+            hi = par->bounds[par->nruns];
+            NpyThreads_ChunkRange(hi - lo, par->nchunks, part, &k0, &k1);
+            memcpy(par->dst + (lo + k0)*isize, par->src + (lo + k0)*isize,
+                   (k1 - k0)*isize);
+            continue;
+        }
+        mid = par->bounds[2*pair + 1];
+        hi = par->bounds[2*pair + 2];
+        n = hi - lo;
+        a = par->src + lo*isize;
+        b = par->src + mid*isize;
+        NpyThreads_ChunkRange(n, par->nchunks, part, &k0, &k1);
+        if (k0 == k1) {
+            continue;
+        }
+        i = _merge_split(par, a, mid - lo, b, hi - mid, k0);
+        j = k0 - i;
+        iend = _merge_split(par, a, mid - lo, b, hi - mid, k1);
+        jend = k1 - iend;
+        out = par->dst + (lo + k0)*isize;
+        while (i < iend && j < jend) {
+            if (_item_cmp(par, b + j*isize, a + i*isize) < 0) {
+                memcpy(out, b + j*isize, isize);
+                j++;
+            }
+            else {
+                memcpy(out, a + i*isize, isize);
+                i++;
+            }
+            out += isize;
+        }
+        if (i < iend) {
+            memcpy(out, a + i*isize, (iend - i)*isize);
+        }
+        else if (j < jend) {
+            memcpy(out, b + j*isize, (jend - j)*isize);
+        }
+    }
+}
+
+static int
+_parallel_msort(npy_parallel_msort *par, char *start)
+{
+    char *buffer, *tmp;
+    npy_intp s, e;
+    int i, npairs;
+
+    buffer = NpyDataMem_NEW(par->num*par->isize);
+    if (buffer == NULL) {
+        return -1;
+    }
+    memset(par->failed, 0, sizeof(par->failed));
+    par->src = start;
+    par->dst = buffer;
+    par->nruns = par->nchunks;
+    for (i = 0; i < par->nchunks; i++) {
+        NpyThreads_ChunkRange(par->num, par->nchunks, i, &s, &e);
+        par->bounds[i] = s;
+    }
+    par->bounds[par->nchunks] = par->num;
+
+    NpyThreads_Run(_msort_run_chunk, par, par->num, par->nchunks);
+    for (i = 0; i < par->nchunks; i++) {
+        if (par->failed[i]) {
+            NpyDataMem_FREE(buffer);
+            return -1;
+        }
+    }
+
+    while (par->nruns > 1) {
+        npairs = (par->nruns + 1)/2;
+        NpyThreads_Run(_msort_merge_chunk, par,
+                       (npy_intp)npairs*par->nchunks, par->nchunks);
+        for (i = 0; i < npairs; i++) {
+            par->bounds[i] = par->bounds[2*i];
+        }
+        par->bounds[npairs] = par->num;
+        par->nruns = npairs;
+        tmp = par->src;
+        par->src = par->dst;
+        par->dst = tmp;
+    }
+    if (par->src != start) {
+        memcpy(start, par->src, par->num*par->isize);
+    }
+    NpyDataMem_FREE(buffer);
+    return 0;
+}
+
+
+int
+npy_parallel_sort(void *start, npy_intp num, NpyArray *arr,
+                  NPY_SORTKIND which, int nchunks)
+{
+    npy_parallel_msort par;
+
+    if (nchunks > num) {
+        nchunks = (int)num;
+    }
+    if (nchunks <= 1) {
+        return arr->descr->f->sort[which](start, num, arr);
+    }
+    par.arr = arr;
+    par.cmp = arr->descr->f->compare;
+    par.sort = arr->descr->f->sort[which];
+    par.argsort = NULL;
+    par.v = NULL;
+    par.elsize = arr->descr->elsize;
+    par.isize = par.elsize;
+    par.num = num;
+    par.nchunks = nchunks;
+    return _parallel_msort(&par, (char *)start);
+}
+
+int
+npy_parallel_argsort(void *v, npy_intp *tosort, npy_intp num,
+                     NpyArray *arr, NPY_SORTKIND which, int nchunks)
+{
+    npy_parallel_msort par;
+
+    if (nchunks > num) {
+        nchunks = (int)num;
+    }
+    if (nchunks <= 1) {
+        return arr->descr->f->argsort[which](v, tosort, num, arr);
+    }
+    par.arr = arr;
+    par.cmp = arr->descr->f->compare;
+    par.sort = NULL;
+    par.argsort = arr->descr->f->argsort[which];
+    par.v = (char *)v;
+    par.elsize = arr->descr->elsize;
+    par.isize = sizeof(npy_intp);
+    par.num = num;
+    par.nchunks = nchunks;
+    return _parallel_msort(&par, (char *)tosort);
+}
+
+
+/*
+ * Partitions start around each of the nkth sorted, distinct positions in
+ * kth, using the type's selection function if it has one.
+ */
+int
+npy_partition(void *start, npy_intp num, NpyArray *arr,
+              NPY_SELECTKIND which, const npy_intp *kth, npy_intp nkth)
+{
+    NpyArray_PartitionFunc *part = arr->descr->f->partition[which];
+    npy_intp elsize = arr->descr->elsize;
+    char *data = (char *)start;
+    npy_intp i, low = 0;
+    int ret;
+
+    for (i = 0; i < nkth; i++) {
+        /* the elements before low are already in place */
+        if (part != NULL) {
+            ret = part(data + low*elsize, num - low, kth[i] - low, arr);
+        }
+        else {
+            ret = npy_generic_introselect(data + low*elsize, num - low,
+                                          kth[i] - low, arr);
+        }
+        if (ret < 0) {
+            return -1;
+        }
+        low = kth[i] + 1;
+    }
+    return 0;
+}
+
+
+int
+npy_argpartition(void *v, npy_intp *tosort, npy_intp num, NpyArray *arr,
+                 NPY_SELECTKIND which, const npy_intp *kth, npy_intp nkth)
+{
+    NpyArray_ArgPartitionFunc *part = arr->descr->f->argpartition[which];
+    npy_intp i, low = 0;
+    int ret;
+
+    for (i = 0; i < nkth; i++) {
+        if (part != NULL) {
+            ret = part(v, tosort + low, num - low, kth[i] - low, arr);
+        }
+        else {
+            ret = npy_generic_aintroselect(v, tosort + low, num - low,
+                                           kth[i] - low, arr);
+        }
+        if (ret < 0) {
+            return -1;
+        }
+        low = kth[i] + 1;
+    }
+    return 0;
+}
@@ -0,0 +1,62 @@
+#ifndef _NPY_SORT_H_
+#define _NPY_SORT_H_
+
+#include "npy_defs.h"
+
+
+/*
+ * Sorting helpers used by NpyArray_Sort, NpyArray_ArgSort and the
+ * partitions.
+ *
+ * The generic sorts only use the compare function of the array's type and
+ * pass the array to it, so they need no global state and can be nested.
+ *
+ * The parallel sorts split a 1-d array into nchunks pieces, sort them on
+ * the thread pool with the type's sort function for the given kind and
+ * merge the pieces in parallel.  The sorted values are the same as those
+ * of the serial sort function.  So is the permutation of an argsort for
+ * the stable kinds, where equal elements keep their order, but not for
+ * NPY_QUICKSORT and NPY_HEAPSORT, which may order equal elements
+ * differently.
+ * They must only be used for types that do not need the interface (no
+ * NPY_NEEDS_PYAPI) and have both a sort function for the kind and a
+ * compare function.  They return -1 when out of memory without setting
+ * an error, like the sort functions themselves.
+ *
+ * The partitions move the elements at the nkth positions in kth, which
+ * must be sorted and distinct, to where they would be in the sorted
+ * array, with only smaller or equal elements before each of them.
+ */
+
+int
+npy_generic_quicksort(void *start, npy_intp num, NpyArray *arr);
+
+int
+npy_generic_aquicksort(void *v, npy_intp *tosort, npy_intp num,
+                       NpyArray *arr);
+
+int
+npy_parallel_sort(void *start, npy_intp num, NpyArray *arr,
+                  NPY_SORTKIND which, int nchunks);
+
+int
+npy_parallel_argsort(void *v, npy_intp *tosort, npy_intp num,
+                     NpyArray *arr, NPY_SORTKIND which, int nchunks);
+
+int
+npy_generic_introselect(void *start, npy_intp num, npy_intp kth,
+                        NpyArray *arr);
+
+int
+npy_generic_aintroselect(void *v, npy_intp *tosort, npy_intp num,
+                         npy_intp kth, NpyArray *arr);
+
+int
+npy_partition(void *start, npy_intp num, NpyArray *arr,
+              NPY_SELECTKIND which, const npy_intp *kth, npy_intp nkth);
+
+int
+npy_argpartition(void *v, npy_intp *tosort, npy_intp num, NpyArray *arr,
+                 NPY_SELECTKIND which, const npy_intp *kth, npy_intp nkth);
+
+#endif
@@ -0,0 +1,666 @@
+/*
+ * npy_textparse.c -
+ *
+ * Parsing of delimited text into rows of numbers.  See npy_textparse.h.
+ *
+ * The text is split and converted in a single pass straight into the rows
+ * of the output, without making strings or Python objects for the values.
+ */
+
+#include <stdlib.h>
+#include <string.h>
+
+#include "npy_config.h"
+#include "npy_utils.h"
+#include "npy_api.h"
+#include "npy_os.h"
+#include "npy_textparse.h"
+
+
+/* Values up to this long are converted from a copy on the stack. */
+#define NPY_TEXT_TOKENLEN 64
+
+
+static NPY_INLINE int
+_isspace(char c)
+{
+    return c == ' ' || c == '\t' || c == '\r' || c == '\v' || c == '\f';
+}
+
+/* Whether the n characters at s are the lower case word w in any case. */
+static int
+_equal_nocase(const char *s, const char *w, npy_intp n)
+{
+    for (; n > 0; n--, s++, w++) {
+        if (*s != *w && *s != *w - ('a' - 'A')) {
+            return 0;
+        }
+    }
+    return 1;
+}
+
+static void
+_set_error(NpyTextError *err, int kind, npy_intp line, int column,
+           const char *s, const char *e)
+{
+    npy_intp n = e - s;
+
+    err->kind = kind;
+    err->line = line;
+    err->column = column;
+    if (n >= NPY_TEXT_ERRLEN) {
+        n = NPY_TEXT_ERRLEN - 1;
+    }
+    memcpy(err->text, s, n);
+    err->text[n] = '\0';
+}
+
+/*
+ * Parses the decimal integer [s, e), which must be the whole value, into
+ * its sign and magnitude.  Returns 0 if it is not one or does not fit.
+ */
+static int
+_parse_integer(const char *s, const char *e, int *negative,
+               npy_uint64 *value)
+{
+    npy_uint64 v = 0;
+    int d;
+
+    *negative = 0;
+    if (s < e && (*s == '-' || *s == '+')) {
+        *negative = (*s == '-');
+        s++;
+    }
+    if (s == e) {
+        return 0;
+    }
+    for (; s < e; s++) {
+        d = *s - '0';
+        if (d < 0 || d > 9) {
+            return 0;
+        }
+        if (v > (NPY_MAX_UINT64 - d) / 10) {
+            return 0;
+        }
+        v = 10*v + d;
+    }
+    *value = v;
+    return 1;
+}
+
+/*
+ * Whether the integer of sign negative and magnitude v is in the range of
+ * the integer type.
+ */
+static int
+_integer_fits(int type, int negative, npy_uint64 v)
+{
+    npy_uint64 max, negmax = 0;
+
+    switch (type) {
+        case NPY_BYTE:
+            max = NPY_MAX_BYTE;
+            negmax = (npy_uint64)NPY_MAX_BYTE + 1;
+            break;
+        case NPY_UBYTE:
+            max = NPY_MAX_UBYTE;
+            break;
+        case NPY_SHORT:
+            max = NPY_MAX_SHORT;
+            negmax = (npy_uint64)NPY_MAX_SHORT + 1;
+            break;
+        case NPY_USHORT:
+            max = NPY_MAX_USHORT;
+            break;
+        case NPY_INT:
+            max = NPY_MAX_INT;
+            negmax = (npy_uint64)NPY_MAX_INT + 1;
+            break;
+        case NPY_UINT:
+            max = NPY_MAX_UINT;
+            break;
+        case NPY_LONG:
+            max = NPY_MAX_LONG;
+            negmax = (npy_uint64)NPY_MAX_LONG + 1;
+            break;
+        case NPY_ULONG:
+            max = NPY_MAX_ULONG;
+            break;
+        case NPY_LONGLONG:
+            max = NPY_MAX_LONGLONG;
+            negmax = (npy_uint64)NPY_MAX_LONGLONG + 1;
+            break;
+        case NPY_ULONGLONG:
+            max = NPY_MAX_ULONGLONG;
+            break;
+        default:
+            return 0;
+    }
+    return negative ? v <= negmax : v <= max;
+}
+
+/*
+ * Checks that [s, e), without surrounding whitespace, is a number in the
+ * syntax of Python's float() and converts it.
+ */
+static int
+_python_float(const char *s, const char *e, double *value)
+{
+    char buffer[NPY_TEXT_TOKENLEN];
+    const char *p;
+    int ndigits = 0;
+    npy_intp n;
+
+    p = s;
+    if (p < e && (*p == '+' || *p == '-')) {
+        p++;
+    }
+    n = e - p;
+    if (n > 0 && !(*p >= '0' && *p <= '9') && *p != '.') {
+        if (!((n == 3 && _equal_nocase(p, "nan", 3)) ||
+              (n == 3 && _equal_nocase(p, "inf", 3)) ||
+              (n == 8 && _equal_nocase(p, "infinity", 8)))) {
+            return 0;
+        }
+    }
+    else {
+        for (; p < e && *p >= '0' && *p <= '9'; p++) {
+            ndigits++;
+        }
+        if (p < e && *p == '.') {
+            for (p++; p < e && *p >= '0' && *p <= '9'; p++) {
+                ndigits++;
+            }
+        }
+        if (ndigits == 0) {
+            return 0;
+        }
+        if (p < e && (*p == 'e' || *p == 'E')) {
+            p++;
+            if (p < e && (*p == '+' || *p == '-')) {
+                p++;
+            }
+            if (p == e) {
+                return 0;
+            }
+            for (; p < e && *p >= '0' && *p <= '9'; p++) {
+            }
+        }
+        if (p != e) {
+            return 0;
+        }
+    }
+
+    n = e - s;
+    if (n >= NPY_TEXT_TOKENLEN) {
+        char *copy = (char *)malloc(n + 1);
+
+        if (copy == NULL) {
+            return 0;
+        }
+        memcpy(copy, s, n);
+        copy[n] = '\0';
+        *value = NpyOS_ascii_strtod(copy, NULL);
+        free(copy);
+    }
+    else {
+        memcpy(buffer, s, n);
+        buffer[n] = '\0';
+        *value = NpyOS_ascii_strtod(buffer, NULL);
+    }
+    return 1;
+}
+
+#define _STORE(type, value) {                   \
+        type v_ = (type)(value);                \
+        memcpy(dst, &v_, sizeof(type));         \
+    }
+
+#define _CASE_INTEGER(num, type)                                        \
+    case num:                                                           \
+        _STORE(type, negative ? 0 - ival : ival);                       \
+        break
+
+/*
+ * Converts the value in [s, e), without surrounding whitespace, to the
+ * type and writes it to dst, which need not be aligned.  Returns 0 if it
+ * is not a valid value or, for the integer types, is out of their range.
+ */
+static int
+_convert(const char *s, const char *e, int type, char *dst)
+{
+    int negative = 0, isint;
+    npy_uint64 ival = 0;
+    double dval = 0.0;
+
+    isint = (type != NPY_FLOAT && type != NPY_DOUBLE &&
+             _parse_integer(s, e, &negative, &ival));
+    if (!isint) {
+        /* strtod alone would also take the hexadecimal and nan(...)
+         * forms, which float() refuses. */
+        if (type == NPY_BOOL || !_python_float(s, e, &dval)) {
+            return 0;
+        }
+        /* Integers are truncated like int(float(s)). */
+        if (type != NPY_FLOAT && type != NPY_DOUBLE) {
+            if (!(dval > -18446744073709551616.0 &&
+                  dval < 18446744073709551616.0)) {
+                return 0;
+            }
+            negative = (dval < 0);
+            ival = (npy_uint64)(negative ? -dval : dval);
+        }
+    }
+    if (type != NPY_BOOL && type != NPY_FLOAT && type != NPY_DOUBLE &&
+            !_integer_fits(type, negative, ival)) {
+        return 0;
+    }
+
+    switch (type) {
+        case NPY_BOOL:
+            _STORE(npy_bool, ival != 0);
+            break;
+        _CASE_INTEGER(NPY_BYTE, npy_byte);
+        _CASE_INTEGER(NPY_UBYTE, npy_ubyte);
+        _CASE_INTEGER(NPY_SHORT, npy_short);
+        _CASE_INTEGER(NPY_USHORT, npy_ushort);
+        _CASE_INTEGER(NPY_INT, npy_int);
+        _CASE_INTEGER(NPY_UINT, npy_uint);
+        _CASE_INTEGER(NPY_LONG, npy_long);
+        _CASE_INTEGER(NPY_ULONG, npy_ulong);
+        _CASE_INTEGER(NPY_LONGLONG, npy_longlong);
+        _CASE_INTEGER(NPY_ULONGLONG, npy_ulonglong);
+        case NPY_FLOAT:
+            _STORE(npy_float, dval);
+            break;
+        case NPY_DOUBLE:
+            _STORE(npy_double, dval);
+            break;
+        default:
+            return 0;
+    }
+    return 1;
+}
+
+#undef _CASE_INTEGER
+#undef _STORE
+
+/*
+ * Converts the value in [s, e) and writes it to dst.  The bounds are
+ * explicit, so a NUL byte in the value makes it invalid.
+ */
+static int
+_convert_token(const char *s, const char *e, int type, char *dst)
+{
+    while (s < e && _isspace(*s)) {
+        s++;
+    }
+    while (e > s && _isspace(e[-1])) {
+        e--;
+    }
+    return _convert(s, e, type, dst);
+}
+
+/* Returns the first occurrence of the string [p, p + n) in [s, e), or e. */
+static NPY_INLINE const char *
+_find(const char *s, const char *e, const char *p, int n)
+{
+    const char *q;
+
+    while (e - s >= n) {
+        q = (const char *)memchr(s, p[0], e - s - n + 1);
+        if (q == NULL) {
+            break;
+        }
+        if (memcmp(q, p, n) == 0) {
+            return q;
+        }
+        s = q + 1;
+    }
+    return e;
+}
+
+
+/* Converts [s, e) like Python's int(), failing if it does not fit. */
+static int
+_python_int(const char *s, const char *e, npy_int64 *value)
+{
+    npy_uint64 v = 0, limit = NPY_MAX_INT64;
+    int negative = 0, d;
+
+    if (s < e && (*s == '+' || *s == '-')) {
+        negative = (*s == '-');
+        s++;
+    }
+    if (negative) {
+        limit += 1;
+    }
+    if (s == e) {
+        return 0;
+    }
+    for (; s < e; s++) {
+        d = *s - '0';
+        if (d < 0 || d > 9 || v > (limit - d) / 10) {
+            return 0;
+        }
+        v = 10*v + d;
+    }
+    *value = negative ? (npy_int64)(0 - v) : (npy_int64)v;
+    return 1;
+}
+
+
+NDARRAY_API int
+NpyText_CanParse(int type_num)
+{
+    switch (type_num) {
+        case NPY_BOOL:
+        case NPY_BYTE:
+        case NPY_UBYTE:
+        case NPY_SHORT:
+        case NPY_USHORT:
+        case NPY_INT:
+        case NPY_UINT:
+        case NPY_LONG:
+        case NPY_ULONG:
+        case NPY_LONGLONG:
+        case NPY_ULONGLONG:
+        case NPY_FLOAT:
+        case NPY_DOUBLE:
+            return 1;
+        default:
+            return 0;
+    }
+}
+
+/*
+ * Parses the lines of buf from *pos on into the rows of out, at most
+ * maxrows of them.  The last line is only parsed if it ends in a newline
+ * or final is true.  *pos is moved past the lines that were parsed and
+ * *lineno is increased by their number.
+ *
+ * Returns the number of rows written, or -1 with err filled in.
+ */
+NDARRAY_API npy_intp
+NpyText_Parse(const NpyTextFormat *fmt, const char *buf, npy_intp len,
+              npy_intp *pos, int final, char *out, npy_intp maxrows,
+              npy_intp *lineno, NpyTextError *err)
+{
+    const char *p = buf + *pos, *end = buf + len;
+    const char *line, *eol, *next, *s, *e;
+    npy_intp row = 0;
+    int col, field;
+
+    while (p < end) {
+        eol = (const char *)memchr(p, '\n', end - p);
+        if (eol == NULL) {
+            if (!final) {
+                break;
+            }
+            eol = next = end;
+        }
+        else {
+            next = eol + 1;
+        }
+
+        line = p;
+        if (fmt->comments != NULL) {
+            eol = _find(line, eol, fmt->comments, fmt->commentslen);
+        }
+        while (line < eol && _isspace(*line)) {
+            line++;
+        }
+        while (eol > line && _isspace(eol[-1])) {
+            eol--;
+        }
+        if (line == eol) {
+            p = next;
+            (*lineno)++;
+            continue;
+        }
+        if (row == maxrows) {
+            break;
+        }
+
+        col = 0;
+        s = line;
+        while (col < fmt->ncols) {
+            if (fmt->delimiter == NULL) {
+                while (s < eol && _isspace(*s)) {
+                    s++;
+                }
+                if (s == eol) {
+                    break;
+                }
+                e = s;
+                while (e < eol && !_isspace(*e)) {
+                    e++;
+                }
+            }
+            else {
+                e = _find(s, eol, fmt->delimiter, fmt->delimlen);
+            }
+
+            field = (fmt->colmap != NULL) ? fmt->colmap[col] : col;
+            if (field >= 0 &&
+                    !_convert_token(s, e, fmt->types[field],
+                                    out + fmt->offsets[field])) {
+                _set_error(err, NPY_TEXT_BADVALUE, *lineno + 1, col + 1,
+                           s, e);
+                return -1;
+            }
+            col++;
+
+            if (fmt->delimiter != NULL) {
+                if (e == eol) {
+                    break;
+                }
+                s = e + fmt->delimlen;
+            }
+            else {
+                s = e;
+            }
+        }
+        if (col < fmt->ncols) {
+            _set_error(err, NPY_TEXT_NCOLS, *lineno + 1, col, line, line);
+            return -1;
+        }
+
+        out += fmt->rowsize;
+        row++;
+        p = next;
+        (*lineno)++;
+    }
+    *pos = p - buf;
+    return row;
+}
+
+/* Raises the error found by NpyText_Parse. */
+NDARRAY_API void
+NpyText_SetError(const NpyTextError *err)
+{
+    char msg[NPY_TEXT_ERRLEN + 100];
+
+    if (err->kind == NPY_TEXT_MEMORY) {
+        NpyErr_MEMORY;
+        return;
+    }
+    if (err->kind == NPY_TEXT_NCOLS) {
+        NpyOS_snprintf(msg, sizeof(msg),
+                       "line %ld has only %d columns",
+                       (long)err->line, err->column);
+    }
+    else {
+        NpyOS_snprintf(msg, sizeof(msg),
+                       "could not convert '%s' in line %ld, column %d",
+                       err->text, (long)err->line, err->column);
+    }
+    NpyErr_SetString(NpyExc_ValueError, msg);
+}
+
+
+/*
+ * Splits the lines of buf from *pos on like the LineSplitter of
+ * genfromtxt: lines are cut at the first comment string and stripped of
+ * spaces and line ends, empty lines are skipped, and the others are split
+ * at the delimiter or at runs of whitespace.  The values are not stripped.
+ *
+ * For each of at most maxrows rows this stores the number of values in
+ * counts, the number of its line, counting from the first one given by
+ * *lineno, in lines, and the start and end offsets in buf of its first
+ * fmt->ncols values in cells, with empty values for the missing ones.
+ * The last line, *pos and *lineno are handled like in NpyText_Parse.
+ *
+ * Returns the number of rows.
+ */
+NDARRAY_API npy_intp
+NpyText_Split(const NpyTextFormat *fmt, const char *buf, npy_intp len,
+              npy_intp *pos, int final, npy_intp *cells, npy_intp *counts,
+              npy_intp *lines, npy_intp maxrows, npy_intp *lineno)
+{
+    const char *p = buf + *pos, *end = buf + len;
+    const char *line, *eol, *next, *s, *e;
+    npy_intp row = 0, col;
+
+    while (p < end) {
+        eol = (const char *)memchr(p, '\n', end - p);
+        if (eol == NULL) {
+            if (!final) {
+                break;
+            }
+            eol = next = end;
+        }
+        else {
+            next = eol + 1;
+        }
+
+        line = p;
+        if (fmt->comments != NULL) {
+            eol = _find(line, eol, fmt->comments, fmt->commentslen);
+        }
+        while (line < eol && (*line == ' ' || *line == '\r')) {
+            line++;
+        }
+        while (eol > line && (eol[-1] == ' ' || eol[-1] == '\r')) {
+            eol--;
+        }
+        if (line == eol) {
+            p = next;
+            (*lineno)++;
+            continue;
+        }
+        if (row == maxrows) {
+            break;
+        }
+
+        col = 0;
+        s = line;
+        while (1) {
+            if (fmt->delimiter == NULL) {
+                while (s < eol && (_isspace(*s) || *s == '\n')) {
+                    s++;
+                }
+                if (s == eol) {
+                    break;
+                }
+                e = s;
+                while (e < eol && !_isspace(*e)) {
+                    e++;
+                }
+            }
+            else {
+                e = _find(s, eol, fmt->delimiter, fmt->delimlen);
+            }
+            if (col < fmt->ncols) {
+                cells[2*col] = s - buf;
+                cells[2*col + 1] = e - buf;
+            }
+            col++;
+            if (fmt->delimiter != NULL) {
+                if (e == eol) {
+                    break;
+                }
+                s = e + fmt->delimlen;
+            }
+            else {
+                s = e;
+            }
+        }
+        counts[row] = col;
+        for (; col < fmt->ncols; col++) {
+            cells[2*col] = cells[2*col + 1] = 0;
+        }
+
+        lines[row] = *lineno;
+        cells += 2*fmt->ncols;
+        row++;
+        p = next;
+        (*lineno)++;
+    }
+    *pos = p - buf;
+    return row;
+}
+
+/*
+ * Converts n strings of elsize bytes, padded with NULs, like the functions
+ * genfromtxt uses for a column: kind 'b' gives booleans from 'True' or
+ * 'False' in any case, 'i' 64 bit integers like int(), 'I' like
+ * int(float()), and 'f' doubles like float().  ok tells which strings
+ * could be converted; the values of the others are undefined.
+ */
+NDARRAY_API void
+NpyText_ConvertStrings(const char *strings, npy_intp n, int elsize,
+                       char kind, void *values, npy_bool *ok)
+{
+    const char *s, *e;
+    npy_intp i;
+    double d;
+
+    for (i = 0; i < n; i++, strings += elsize) {
+        s = strings;
+        e = s + elsize;
+        while (e > s && e[-1] == '\0') {
+            e--;
+        }
+        if (kind == 'b') {
+            if (e - s == 4 && _equal_nocase(s, "true", 4)) {
+                ((npy_bool *)values)[i] = 1;
+                ok[i] = 1;
+            }
+            else if (e - s == 5 &&
+                     _equal_nocase(s, "false", 5)) {
+                ((npy_bool *)values)[i] = 0;
+                ok[i] = 1;
+            }
+            else {
+                ok[i] = 0;
+            }
+            continue;
+        }
+
+        while (s < e && (_isspace(*s) || *s == '\n')) {
+            s++;
+        }
+        while (e > s && (_isspace(e[-1]) || e[-1] == '\n')) {
+            e--;
+        }
+        switch (kind) {
+            case 'i':
+                ok[i] = _python_int(s, e, (npy_int64 *)values + i);
+                break;
+            case 'I':
+                ok[i] = (_python_float(s, e, &d) &&
+                         d >= -9223372036854775808.0 &&
+                         d < 9223372036854775808.0);
+                if (ok[i]) {
+                    ((npy_int64 *)values)[i] = (npy_int64)d;
+                }
+                break;
+            case 'f':
+                ok[i] = _python_float(s, e, (double *)values + i);
+                break;
+            default:
+                ok[i] = 0;
+        }
+    }
+}
@@ -0,0 +1,79 @@
+#ifndef _NPY_TEXTPARSE_H_
+#define _NPY_TEXTPARSE_H_
+
+#include "npy_defs.h"
+
+
+/*
+ * Parsing of delimited text into rows of numbers, used by loadtxt.
+ *
+ * Each line of the text is a row, which is split into columns at a
+ * delimiter or, without one, at runs of whitespace.  Lines are cut at the
+ * first comment string; lines that are empty after that are skipped.  The
+ * value in a column is stored in the field given by the column map,
+ * converted to the field's type: booleans and integers are written as
+ * decimal integers, but integers and floating point fields also accept
+ * anything that Python's float() does, which is truncated for the
+ * integers.  Integers out of the range of their field, and values with NUL
+ * bytes, are errors.  Columns past the last one mapped to a field are
+ * ignored.
+ *
+ * NpyText_Parse does not use the interface or set errors itself, so it can
+ * run without the GIL and on several pieces of the text at the same time;
+ * NpyText_SetError reports the error it found.
+ *
+ * genfromtxt reads the values as strings instead, which NpyText_Split
+ * finds column by column, and converts them with NpyText_ConvertStrings.
+ */
+
+typedef struct {
+    const char *delimiter;      /* NULL to split at whitespace */
+    int delimlen;
+    const char *comments;       /* NULL for no comments */
+    int commentslen;
+    int nfields;                /* number of values in a row */
+    const int *types;           /* type number of each field */
+    const npy_intp *offsets;    /* offset of each field in a row */
+    npy_intp rowsize;
+    const int *colmap;          /* field of each column or -1, or NULL */
+    int ncols;                  /* number of columns read from a line */
+} NpyTextFormat;
+
+enum {
+    NPY_TEXT_OK = 0,
+    NPY_TEXT_BADVALUE,
+    NPY_TEXT_NCOLS,
+    NPY_TEXT_MEMORY,
+};
+
+#define NPY_TEXT_ERRLEN 64
+
+typedef struct {
+    int kind;
+    npy_intp line;              /* number of the line, from 1 */
+    int column;                 /* number of the column, from 1 */
+    char text[NPY_TEXT_ERRLEN]; /* the value that could not be converted */
+} NpyTextError;
+
+
+NDARRAY_API int
+NpyText_CanParse(int type_num);
+
+NDARRAY_API npy_intp
+NpyText_Parse(const NpyTextFormat *fmt, const char *buf, npy_intp len,
+              npy_intp *pos, int final, char *out, npy_intp maxrows,
+              npy_intp *lineno, NpyTextError *err);
+
+NDARRAY_API void
+NpyText_SetError(const NpyTextError *err);
+
+NDARRAY_API npy_intp
+NpyText_Split(const NpyTextFormat *fmt, const char *buf, npy_intp len,
+              npy_intp *pos, int final, npy_intp *cells, npy_intp *counts,
+              npy_intp *lines, npy_intp maxrows, npy_intp *lineno);
+
+NDARRAY_API void
+NpyText_ConvertStrings(const char *strings, npy_intp n, int elsize,
+                       char kind, void *values, npy_bool *ok);
+
+#endif
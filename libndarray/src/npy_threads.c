@@ -0,0 +1,349 @@
+/*
+ * npy_threads.c -
+ *
+ * Thread pool used by the core library to run independent chunks of
+ * work in parallel.  See npy_threads.h for the contract.
+ */
+
+#include <stdlib.h>
+
+#include "npy_config.h"
+#include "npy_api.h"
+#include "npy_os.h"
+#include "npy_threads.h"
+
+#if defined(NPY_OS_WIN32)
+#include <Windows.h>
+#include <process.h>
+
+typedef SRWLOCK npy_mutex;
+typedef CONDITION_VARIABLE npy_cond;
+typedef HANDLE npy_thread;
+
+#define NPY_MUTEX_INITIALIZER SRWLOCK_INIT
+#define NPY_COND_INITIALIZER CONDITION_VARIABLE_INIT
+#define npy_mutex_lock(m) AcquireSRWLockExclusive(m)
+#define npy_mutex_unlock(m) ReleaseSRWLockExclusive(m)
+#define npy_cond_wait(c, m) SleepConditionVariableSRW((c), (m), INFINITE, 0)
+#define npy_cond_signal(c) WakeConditionVariable(c)
+#define npy_cond_broadcast(c) WakeAllConditionVariable(c)
+
+#else
+#include <pthread.h>
+
+typedef pthread_mutex_t npy_mutex;
+typedef pthread_cond_t npy_cond;
+typedef pthread_t npy_thread;
+
+#define NPY_MUTEX_INITIALIZER PTHREAD_MUTEX_INITIALIZER
+#define NPY_COND_INITIALIZER PTHREAD_COND_INITIALIZER
+#define npy_mutex_lock(m) pthread_mutex_lock(m)
+#define npy_mutex_unlock(m) pthread_mutex_unlock(m)
+#define npy_cond_wait(c, m) pthread_cond_wait((c), (m))
+#define npy_cond_signal(c) pthread_cond_signal(c)
+#define npy_cond_broadcast(c) pthread_cond_broadcast(c)
+#endif
+
+
+typedef struct {
+    npy_thread handle;
+    int chunk;               /* chunk of each job run by this worker */
+    npy_ulong generation;    /* last job seen by this worker */
+} npy_worker;
+
+/*
+ * Pool state.  Everything below is protected by pool_lock.  Only one job
+ * runs at a time; a caller finding the pool busy (another thread is
+ * using it, or a parallel function is itself calling NpyThreads_Run)
+ * runs its chunks serially instead of waiting.
+ */
+static npy_mutex pool_lock = NPY_MUTEX_INITIALIZER;
+static npy_cond pool_work = NPY_COND_INITIALIZER;
+static npy_cond pool_done = NPY_COND_INITIALIZER;
+
+static npy_worker *pool_workers = NULL;
+static int pool_nworkers = 0;
+static npy_ulong pool_generation = 0;
+static int pool_pending = 0;
+static int pool_busy = 0;
+
+static npy_parallel_func job_func = NULL;
+static void *job_data = NULL;
+static npy_intp job_n = 0;
+static int job_nchunks = 0;
+
+static int npy_nthreads = 1;
+static npy_intp npy_threshold = NPY_THREADS_DEFAULT_THRESHOLD;
+
+
+static void
+run_chunk(npy_parallel_func func, void *data, npy_intp n, int nchunks,
+          int chunk)
+{
+    npy_intp start, end;
+
+    NpyThreads_ChunkRange(n, nchunks, chunk, &start, &end);
+    if (start < end) {
+        func(data, start, end, chunk);
+    }
+}
+
+
+static void
+worker_loop(npy_worker *self)
+{
+    npy_parallel_func func;
+    void *data;
+    npy_intp n;
+    int nchunks;
+
+    npy_mutex_lock(&pool_lock);
+    for (;;) {
+        while (self->generation == pool_generation) {
+            npy_cond_wait(&pool_work, &pool_lock);
+        }
+        self->generation = pool_generation;
+        func = job_func;
+        data = job_data;
+        n = job_n;
+        nchunks = job_nchunks;
+        if (self->chunk >= nchunks) {
+            continue;
+        }
+        npy_mutex_unlock(&pool_lock);
+
+        run_chunk(func, data, n, nchunks, self->chunk);
+
+        npy_mutex_lock(&pool_lock);
+        if (--pool_pending == 0) {
+            npy_cond_signal(&pool_done);
+        }
+    }
+}
+
+
+#if defined(NPY_OS_WIN32)
+static unsigned __stdcall
+worker_main(void *arg)
+{
+    worker_loop((npy_worker *)arg);
+    return 0;
+}
+
+static int
+start_thread(npy_worker *worker)
+{
+    worker->handle = (HANDLE)_beginthreadex(NULL, 0, worker_main, worker,
+                                            0, NULL);
+    return (worker->handle == 0) ? -1 : 0;
+}
+#else
+static void *
+worker_main(void *arg)
+{
+    worker_loop((npy_worker *)arg);
+    return NULL;
+}
+
+static int
+start_thread(npy_worker *worker)
+{
+    pthread_attr_t attr;
+    int ret;
+
+    pthread_attr_init(&attr);
+    pthread_attr_setdetachstate(&attr, PTHREAD_CREATE_DETACHED);
+    ret = pthread_create(&worker->handle, &attr, worker_main, worker);
+    pthread_attr_destroy(&attr);
+    return (ret != 0) ? -1 : 0;
+}
+#endif
+
+
+/*
+ * Makes sure at least nworkers threads are running.  Workers are never
+ * stopped; lowering the thread count simply leaves some of them idle.
+ * Must be called with pool_lock held.
+ */
+static int
+ensure_workers(int nworkers)
+{
+    npy_worker *workers;
+    int i;
+
+    if (nworkers <= pool_nworkers) {
+        return 0;
+    }
+    /*
+     * The worker structures are shared with the running threads, so the
+     * array is allocated once at its maximum size.
+     */
+    if (pool_workers == NULL) {
+        workers = (npy_worker *)malloc((NPY_MAX_THREADS - 1) *
+                                       sizeof(npy_worker));
+        if (workers == NULL) {
+            return -1;
+        }
+        pool_workers = workers;
+    }
+    for (i = pool_nworkers; i < nworkers; i++) {
+        pool_workers[i].chunk = i + 1;
+        pool_workers[i].generation = pool_generation;
+        if (start_thread(&pool_workers[i]) < 0) {
+            return -1;
+        }
+        pool_nworkers = i + 1;
+    }
+    return 0;
+}
+
+
+/*
+ * Sets the number of threads (including the calling thread) used for
+ * parallel work and returns the previous value.  A value of 1 disables
+ * threading.
+ */
+NDARRAY_API int
+NpyThreads_SetNumThreads(int nthreads)
+{
+    int old;
+
+    if (nthreads < 1) {
+        nthreads = 1;
+    }
+    if (nthreads > NPY_MAX_THREADS) {
+        nthreads = NPY_MAX_THREADS;
+    }
+    npy_mutex_lock(&pool_lock);
+    old = npy_nthreads;
+    npy_nthreads = nthreads;
+    npy_mutex_unlock(&pool_lock);
+    return old;
+}
+
+
+NDARRAY_API int
+NpyThreads_GetNumThreads(void)
+{
+    return npy_nthreads;
+}
+
+
+/*
+ * Sets the number of work items below which work is not split between
+ * threads and returns the previous value.
+ */
+NDARRAY_API npy_intp
+NpyThreads_SetThreshold(npy_intp threshold)
+{
+    npy_intp old = npy_threshold;
+
+    npy_threshold = (threshold < 1) ? 1 : threshold;
+    return old;
+}
+
+
+NDARRAY_API npy_intp
+NpyThreads_GetThreshold(void)
+{
+    return npy_threshold;
+}
+
+
+/*
+ * Returns the number of chunks n work items should be split into.  This
+ * is 1 when threading is disabled or n is below the threshold.
+ */
+NDARRAY_API int
+NpyThreads_NumChunks(npy_intp n)
+{
+    int nchunks = npy_nthreads;
+
+    if (nchunks <= 1 || n < npy_threshold) {
+        return 1;
+    }
+    if (n < nchunks) {
+        nchunks = (int)n;
+    }
+    return nchunks;
+}
+
+
+/*
+ * Computes the half-open range [start, end) of chunk 'chunk' when n
+ * items are split into nchunks nearly equal contiguous pieces.
+ */
+NDARRAY_API void
+NpyThreads_ChunkRange(npy_intp n, int nchunks, int chunk,
+                      npy_intp *start, npy_intp *end)
+{
+    npy_intp q = n / nchunks, r = n % nchunks;
+
+    *start = chunk*q + (chunk < r ? chunk : r);
+    *end = *start + q + (chunk < r ? 1 : 0);
+}
+
+
+/*
+ * Runs func over nchunks chunks of [0, n) and returns when all of them
+ * are done.  The calling thread runs chunk 0.  If the pool cannot be
+ * used the chunks are run one after another by the calling thread; the
+ * chunk boundaries are the same either way.
+ */
+NDARRAY_API void
+NpyThreads_Run(npy_parallel_func func, void *data, npy_intp n, int nchunks)
+{
+    int i;
+
+    if (nchunks > n) {
+        nchunks = (int)n;
+    }
+    if (nchunks <= 0) {
+        return;
+    }
+    if (nchunks > 1) {
+        npy_mutex_lock(&pool_lock);
+        if (!pool_busy && nchunks <= npy_nthreads &&
+            ensure_workers(nchunks - 1) == 0) {
+            pool_busy = 1;
+            job_func = func;
+            job_data = data;
+            job_n = n;
+            job_nchunks = nchunks;
+            pool_pending = nchunks - 1;
+            pool_generation++;
+            npy_cond_broadcast(&pool_work);
+            npy_mutex_unlock(&pool_lock);
+
+            run_chunk(func, data, n, nchunks, 0);
+
+            npy_mutex_lock(&pool_lock);
+            while (pool_pending > 0) {
+                npy_cond_wait(&pool_done, &pool_lock);
+            }
+            pool_busy = 0;
+            npy_mutex_unlock(&pool_lock);
+            return;
+        }
+        npy_mutex_unlock(&pool_lock);
+    }
+
+    for (i = 0; i < nchunks; i++) {
+        run_chunk(func, data, n, nchunks, i);
+    }
+}
+
+
+/*
+ * Picks up the initial thread count from the NPY_NUM_THREADS environment
+ * variable.  Called from npy_initlib.
+ */
+void
+npy_threads_init(void)
+{
+    char *env = getenv("NPY_NUM_THREADS");
+
+    if (env != NULL) {
+        NpyThreads_SetNumThreads(atoi(env));
+    }
+}
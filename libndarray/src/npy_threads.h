@@ -0,0 +1,60 @@
+#ifndef _NPY_THREADS_H_
+#define _NPY_THREADS_H_
+
+#include "npy_defs.h"
+
+
+/*
+ * A small pool of worker threads used to run the independent pieces of
+ * a computation (chunks of a ufunc loop, rows of a sort, ...) in
+ * parallel.  Threading is opt-in: the pool is not started until the
+ * number of threads is set to something larger than one.
+ *
+ * Work is described by a range [0, n) which is split into at most
+ * NpyThreads_NumChunks(n) contiguous chunks.  Chunk k is always
+ * [k*n/nchunks, (k+1)*n/nchunks) regardless of which thread runs it, so
+ * results which depend on the chunking are reproducible for a given
+ * thread count.
+ *
+ * Functions run by the pool must not call back into the interface layer
+ * (no reference counting, no error reporting through NpyErr_SetString);
+ * they should record failures in their own data and let the caller
+ * report them after NpyThreads_Run returns.
+ */
+
+typedef void (*npy_parallel_func)(void *data, npy_intp start, npy_intp end,
+                                  int chunk);
+
+/* Default number of work items below which everything runs serially. */
+#define NPY_THREADS_DEFAULT_THRESHOLD 65536
+
+/* Upper limit on the size of the pool. */
+#define NPY_MAX_THREADS 256
+
+
+NDARRAY_API int
+NpyThreads_SetNumThreads(int nthreads);
+
+NDARRAY_API int
+NpyThreads_GetNumThreads(void);
+
+NDARRAY_API npy_intp
+NpyThreads_SetThreshold(npy_intp threshold);
+
+NDARRAY_API npy_intp
+NpyThreads_GetThreshold(void);
+
+NDARRAY_API int
+NpyThreads_NumChunks(npy_intp n);
+
+NDARRAY_API void
+NpyThreads_ChunkRange(npy_intp n, int nchunks, int chunk,
+                      npy_intp *start, npy_intp *end);
+
+NDARRAY_API void
+NpyThreads_Run(npy_parallel_func func, void *data, npy_intp n, int nchunks);
+
+void
+npy_threads_init(void);
+
+#endif
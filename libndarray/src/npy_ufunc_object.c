@@ -16,6 +16,7 @@
 #include "npy_os.h"
 #include "npy_math.h"
 #include "npy_internal.h"
+#include "npy_threads.h"
 
 
 /*
@@ -37,6 +38,11 @@ select_types(NpyUFuncObject *self, int *arg_types,
              NPY_SCALARKIND *scalars,
              int ntypenums, int *rtypenums);
 static int
+search_types(NpyUFuncObject *self, int *arg_types,
+             NpyUFuncGenericFunction *function, void **data,
+             NPY_SCALARKIND *scalars,
+             int ntypenums, int *rtypenums);
+static int
 extract_specified_loop(NpyUFuncObject *self, int *arg_types,
                        NpyUFuncGenericFunction *function, void **data,
                        int ntypesnum, int *rtypenums, int userdef);
@@ -69,6 +75,13 @@ static int
 _parse_signature(NpyUFuncObject *self, const char *signature);
 static NpyArray *
 _getidentity(NpyUFuncObject *self, int otype, char *str);
+static int
+_parallel_nchunks(NpyUFuncLoopObject *loop);
+static int
+_run_parallel_loop(NpyUFuncLoopObject *loop, NpyArray **mps, int nchunks);
+static int
+_parallel_reduce(NpyUFuncReduceObject *loop, int operation, int axis,
+                 npy_intp *ind, npy_intp nind);
 
 
 
@@ -129,6 +142,7 @@ int NpyUFunc_GenericFunction(NpyUFuncObject *self, int nargs, NpyArray **mps,
     char *name = (NULL != self->name) ? self->name : "";
     int res;
     int i;
+    int nchunks;
 
     assert(NPY_VALID_MAGIC == self->nob_magic_number);
 
@@ -173,8 +187,18 @@ int NpyUFunc_GenericFunction(NpyUFuncObject *self, int nargs, NpyArray **mps,
         goto fail;
     }
 
+    /*
+     * Large loops that don't need the interface layer are split between
+     * the threads of the pool, otherwise the loop is run here.
+     */
+    nchunks = _parallel_nchunks(loop);
+    if (nchunks > 1) {
+        if (_run_parallel_loop(loop, mps, nchunks) < 0) {
+            goto fail;
+        }
+    }
     //    NPY_LOOP_BEGIN_THREADS;
-    switch(loop->meth) {
+    else switch(loop->meth) {
         case ONE_UFUNCLOOP:
             /*
              * Everything is contiguous, notswapped, aligned,
@@ -632,6 +656,7 @@ NpyUFunc_Reduce(NpyUFuncObject *self, NpyArray *arr, NpyArray *out,
     NpyUFuncReduceObject *loop;
     npy_intp i, n;
     char *dptr;
+    int parallel;
 //    NPY_BEGIN_THREADS_DEF
 
     assert(arr == NULL ||
@@ -644,9 +669,13 @@ NpyUFunc_Reduce(NpyUFuncObject *self, NpyArray *arr, NpyArray *out,
     if (!loop) {
         return NULL;
     }
+    parallel = _parallel_reduce(loop, NPY_UFUNC_REDUCE, axis, NULL, 0);
+    if (parallel < 0) {
+        goto fail;
+    }
 
 //    NPY_LOOP_BEGIN_THREADS;
-    switch(loop->meth) {
+    if (!parallel) switch(loop->meth) {
         case ZERO_EL_REDUCELOOP:
             /* fprintf(stderr, "ZERO..%d\n", loop->size); */
             for (i = 0; i < loop->size; i++) {
@@ -817,6 +846,7 @@ NpyUFunc_Accumulate(NpyUFuncObject *self, NpyArray *arr, NpyArray *out,
     NpyUFuncReduceObject *loop;
     npy_intp i, n;
     char *dptr;
+    int parallel;
 //    NPY_BEGIN_THREADS_DEF
 
     assert(NPY_VALID_MAGIC == self->nob_magic_number);
@@ -827,9 +857,13 @@ NpyUFunc_Accumulate(NpyUFuncObject *self, NpyArray *arr, NpyArray *out,
     if (!loop) {
         return NULL;
     }
+    parallel = _parallel_reduce(loop, NPY_UFUNC_ACCUMULATE, axis, NULL, 0);
+    if (parallel < 0) {
+        goto fail;
+    }
 
 //    NPY_LOOP_BEGIN_THREADS;
-    switch(loop->meth) {
+    if (!parallel) switch(loop->meth) {
         case ZERO_EL_REDUCELOOP:
             /* Accumulate */
             /* fprintf(stderr, "ZERO..%d\n", loop->size); */
@@ -1016,6 +1050,7 @@ NpyUFunc_Reduceat(NpyUFuncObject *self, NpyArray *arr, NpyArray *ind,
     npy_intp mm = NpyArray_DIM(arr, axis) - 1;
     npy_intp n, i, j;
     char *dptr;
+    int parallel;
 //    NPY_BEGIN_THREADS_DEF;
 
     assert(NPY_VALID_MAGIC == self->nob_magic_number);
@@ -1039,9 +1074,13 @@ NpyUFunc_Reduceat(NpyUFuncObject *self, NpyArray *arr, NpyArray *ind,
     if (!loop) {
         return NULL;
     }
+    parallel = _parallel_reduce(loop, NPY_UFUNC_REDUCEAT, axis, ptr, nn);
+    if (parallel < 0) {
+        goto fail;
+    }
 
 //    NPY_LOOP_BEGIN_THREADS;
-    switch(loop->meth) {
+    if (!parallel) switch(loop->meth) {
         case ZERO_EL_REDUCELOOP:
             /* zero-length index -- return array immediately */
             /* fprintf(stderr, "ZERO..\n"); */
@@ -1382,6 +1421,7 @@ NpyUFunc_RegisterLoopForType(NpyUFuncObject *ufunc,
         return -1;
     }
     Npy_DECREF(descr);
+    NpyUFunc_ClearLoopCache(ufunc);
 
     if (ufunc->userloops == NULL) {
         ufunc->userloops = npy_create_userloops_table();
@@ -1497,6 +1537,9 @@ NpyUFunc_FromFuncAndDataAndSignature(NpyUFuncGenericFunction *func,
     self->check_return = check_return;
     self->ptr = NULL;
     self->userloops=NULL;
+    self->loopcache = NULL;
+    self->cache_hits = 0;
+    self->cache_misses = 0;
 
     if (name == NULL) {
         self->name = "?";
@@ -2105,6 +2148,7 @@ construct_arrays(NpyUFuncLoopObject *loop, size_t nargs, NpyArray **mps,
         }
         memsize = loop->bufsize*(cnt+cntcast) + scbufsize*(scnt+scntcast);
         loop->buffer[0] = NpyDataMem_NEW(memsize);
+        loop->bufmemsize = memsize;
 
         /*
          * debug
@@ -2465,11 +2509,152 @@ static char *_types_msg =  "function not supported for these types, "   \
  * Called to determine coercion
  * Can change arg_types.
  */
+/*
+ * A loop cache entry.  The key holds the number of inputs followed by
+ * the input types and scalar kinds passed to select_types.
+ */
+typedef struct {
+    int arg_types[NPY_MAXARGS];
+    NpyUFuncGenericFunction function;
+    void *data;
+} NpyUFunc_CacheEntry;
+
+
+static int
+compare_cache_keys(const void *a, const void *b)
+{
+    const int *ka = (const int *)a, *kb = (const int *)b;
+
+    return memcmp(ka, kb, (2*ka[0] + 1)*sizeof(int));
+}
+
+
+static unsigned long
+hash_cache_key(const void *a)
+{
+    const int *key = (const int *)a;
+    unsigned long hash = 5381;
+    int i;
+
+    for (i = 0; i < 2*key[0] + 1; i++) {
+        hash = hash*33 + (unsigned long)key[i];
+    }
+    return hash;
+}
+
+
+static void
+free_cache_item(void *item)
+{
+    NpyArray_free(item);
+}
+
+
+static NpyDict *
+create_loopcache_table(void)
+{
+    NpyDict *new = NpyDict_CreateTable(17);
+
+    if (new == NULL) {
+        return NULL;
+    }
+    NpyDict_SetKeyComparisonFunction(new, compare_cache_keys);
+    NpyDict_SetHashFunction(new, hash_cache_key);
+    NpyDict_SetDeallocationFunctions(new, free_cache_item, free_cache_item);
+    return new;
+}
+
+
+/*
+ * Forgets the loops selected so far.  Must be called whenever the loops
+ * of a ufunc are changed.
+ */
+NDARRAY_API void
+NpyUFunc_ClearLoopCache(NpyUFuncObject *self)
+{
+    if (self->loopcache != NULL) {
+        NpyDict_RemoveAll(self->loopcache);
+    }
+}
+
+
+/*
+ * Selects the inner loop for the given input types, reusing the result of
+ * an earlier call with the same types and scalar kinds.  Loops requested
+ * with an explicit signature are not cached.
+ */
 static int
 select_types(NpyUFuncObject *self, int *arg_types,
              NpyUFuncGenericFunction *function, void **data,
              NPY_SCALARKIND *scalars,
              int ntypenums, int *rtypenums)
+{
+    int key[2*NPY_MAXARGS + 1];
+    int *newkey;
+    NpyUFunc_CacheEntry *entry;
+    int i;
+
+    if (rtypenums != NULL) {
+        return search_types(self, arg_types, function, data, scalars,
+                            ntypenums, rtypenums);
+    }
+
+    key[0] = self->nin;
+    for (i = 0; i < self->nin; i++) {
+        key[i + 1] = arg_types[i];
+        key[self->nin + i + 1] = scalars[i];
+    }
+    if (self->loopcache != NULL) {
+        entry = NpyDict_Get(self->loopcache, key);
+        if (entry != NULL) {
+            self->cache_hits++;
+            memcpy(arg_types, entry->arg_types, self->nargs*sizeof(int));
+            *function = entry->function;
+            *data = entry->data;
+            return 0;
+        }
+    }
+    self->cache_misses++;
+
+    if (search_types(self, arg_types, function, data, scalars,
+                     ntypenums, rtypenums) < 0) {
+        return -1;
+    }
+
+    /* Failing to cache the result is not an error. */
+    if (self->loopcache == NULL) {
+        self->loopcache = create_loopcache_table();
+        if (self->loopcache == NULL) {
+            return 0;
+        }
+    }
+    if (NpyDict_Size(self->loopcache) >= NPY_UFUNC_MAXCACHE) {
+        NpyDict_RemoveAll(self->loopcache);
+    }
+    newkey = NpyArray_malloc((2*self->nin + 1)*sizeof(int));
+    entry = NpyArray_malloc(sizeof(NpyUFunc_CacheEntry));
+    if (newkey == NULL || entry == NULL) {
+        NpyArray_free(newkey);
+        NpyArray_free(entry);
+        return 0;
+    }
+    memcpy(newkey, key, (2*self->nin + 1)*sizeof(int));
+    memcpy(entry->arg_types, arg_types, self->nargs*sizeof(int));
+    entry->function = *function;
+    entry->data = *data;
+    if (NpyDict_Put(self->loopcache, newkey, entry) < 0) {
+        NpyArray_free(newkey);
+        NpyArray_free(entry);
+    }
+    return 0;
+}
+
+
+static int
+search_types(NpyUFuncObject *self, int *arg_types,
+             NpyUFuncGenericFunction *function, void **data,
+             NPY_SCALARKIND *scalars,
+             int ntypenums, int *rtypenums)
 {
     int i, j;
     char start_type;
@@ -2585,6 +2770,9 @@ npy_ufunc_frompyfunc(int nin, int nout, char *fname, size_t fname_len,
     NpyObject_Init(self, &NpyUFunc_Type);
 
     self->userloops = NULL;
+    self->loopcache = NULL;
+    self->cache_hits = 0;
+    self->cache_misses = 0;
     self->nin = nin;
     self->nout = nout;
     self->nargs = nin + nout;
@@ -2756,6 +2944,9 @@ npy_ufunc_dealloc(NpyUFuncObject *self)
     if (NULL != self->userloops) {
         NpyDict_Destroy(self->userloops);
     }
+    if (NULL != self->loopcache) {
+        NpyDict_Destroy(self->loopcache);
+    }
     self->nob_magic_number = NPY_INVALID_MAGIC;
     free(self);
 }
@@ -3346,6 +3537,951 @@ _does_loop_use_arrays(void *data)
 }
 
 
+/*
+ * Parallel execution of ufunc loops.
+ *
+ * The outer iteration of a loop is split into contiguous chunks which are
+ * handed to the thread pool.  Each chunk walks its own copy of the
+ * iterator positions and, for buffered loops, uses its own buffers.  The
+ * floating point status flags are per-thread so every chunk samples its
+ * own and they are combined before calling the error handler.
+ */
+typedef struct {
+    NpyUFuncLoopObject *loop;
+    NpyArray **mps;
+    npy_intp nsplit;                /* pieces the inner loop is split into */
+    char *mem[NPY_MAX_THREADS];     /* buffer memory for each chunk */
+    int fperr[NPY_MAX_THREADS];     /* floating point status of each chunk */
+} npy_parallel_loop;
+
+
+/*
+ * Returns the number of chunks the loop should be split into, 1 if it
+ * should be run serially.
+ */
+static int
+_parallel_nchunks(NpyUFuncLoopObject *loop)
+{
+    npy_intp inner;
+    int i, nchunks;
+
+    /* Object and datetime loops call back into the interface. */
+    if (loop->obj || NpyThreads_GetNumThreads() <= 1) {
+        return 1;
+    }
+    switch (loop->meth) {
+        case ONE_UFUNCLOOP:
+            inner = 1;
+            break;
+        case NOBUFFER_UFUNCLOOP:
+        case BUFFER_UFUNCLOOP:
+            inner = loop->bufcnt;
+            break;
+        case SIGNATURE_NOBUFFER_UFUNCLOOP:
+            inner = 1;
+            for (i = 0; i <= loop->ufunc->core_num_dim_ix; i++) {
+                inner *= loop->core_dim_sizes[i];
+            }
+            break;
+        default:
+            return 1;
+    }
+    nchunks = NpyThreads_NumChunks(loop->iter->size * inner);
+    if (loop->meth == SIGNATURE_NOBUFFER_UFUNCLOOP &&
+        nchunks > loop->iter->size) {
+        nchunks = (int)loop->iter->size;
+    }
+    return nchunks;
+}
+
+
+/*
+ * Computes the data pointers of the outer iteration index 'index'.  The
+ * iterators have already been set up so that the dimension of the inner
+ * loop has length 1.
+ */
+static void
+_loop_goto(NpyUFuncLoopObject *loop, npy_intp index, npy_intp *coords,
+           char **ptrs)
+{
+    NpyArrayIterObject **iters = loop->iter->iters;
+    int nd = iters[0]->nd_m1 + 1;
+    int i, j;
+
+    for (j = nd - 1; j >= 0; j--) {
+        coords[j] = index % (iters[0]->dims_m1[j] + 1);
+        index /= (iters[0]->dims_m1[j] + 1);
+    }
+    for (i = 0; i < loop->ufunc->nargs; i++) {
+        ptrs[i] = iters[i]->dataptr;
+        for (j = 0; j < nd; j++) {
+            ptrs[i] += coords[j] * iters[i]->strides[j];
+        }
+    }
+}
+
+
+/* Advances the data pointers to the next outer iteration. */
+static void
+_loop_next(NpyUFuncLoopObject *loop, npy_intp *coords, char **ptrs)
+{
+    NpyArrayIterObject **iters = loop->iter->iters;
+    int i, j;
+
+    for (j = iters[0]->nd_m1; j >= 0; j--) {
+        if (coords[j] < iters[0]->dims_m1[j]) {
+            coords[j]++;
+            for (i = 0; i < loop->ufunc->nargs; i++) {
+                ptrs[i] += iters[i]->strides[j];
+            }
+            return;
+        }
+        coords[j] = 0;
+        for (i = 0; i < loop->ufunc->nargs; i++) {
+            ptrs[i] -= iters[i]->dims_m1[j] * iters[i]->strides[j];
+        }
+    }
+}
+
+
+static void
+_one_loop_chunk(void *data, npy_intp start, npy_intp end, int chunk)
+{
+    npy_parallel_loop *par = (npy_parallel_loop *)data;
+    NpyUFuncLoopObject *loop = par->loop;
+    char *ptrs[NPY_MAXARGS];
+    npy_intp n = end - start;
+    int i;
+
+    if (chunk > 0) {
+        NpyUFunc_clearfperr();
+    }
+    for (i = 0; i < loop->ufunc->nargs; i++) {
+        ptrs[i] = loop->bufptr[i] + start * loop->steps[i];
+    }
+    loop->function(ptrs, &n, loop->steps, loop->funcdata);
+    par->fperr[chunk] = NpyUFunc_getfperr();
+}
+
+
+/*
+ * The work of the NOBUFFER and BUFFER loops is counted in units: each
+ * outer iteration is made of par->nsplit units, each covering a piece of
+ * the inner loop.  The inner loop is only split when the outer iteration
+ * is too short to keep all of the threads busy.
+ */
+static void
+_nobuffer_loop_chunk(void *data, npy_intp start, npy_intp end, int chunk)
+{
+    npy_parallel_loop *par = (npy_parallel_loop *)data;
+    NpyUFuncLoopObject *loop = par->loop;
+    npy_intp coords[NPY_MAXDIMS];
+    char *ptrs[NPY_MAXARGS];
+    char *args[NPY_MAXARGS];
+    npy_intp unit, index, lo, hi, n;
+    int i;
+
+    if (chunk > 0) {
+        NpyUFunc_clearfperr();
+    }
+    index = start / par->nsplit;
+    _loop_goto(loop, index, coords, ptrs);
+    for (unit = start; unit < end; unit++) {
+        if (unit / par->nsplit != index) {
+            _loop_next(loop, coords, ptrs);
+            index++;
+        }
+        if (loop->meth == SIGNATURE_NOBUFFER_UFUNCLOOP) {
+            for (i = 0; i < loop->ufunc->nargs; i++) {
+                args[i] = ptrs[i];
+            }
+            loop->function(args, loop->core_dim_sizes,
+                           loop->core_strides, loop->funcdata);
+            continue;
+        }
+        NpyThreads_ChunkRange(loop->bufcnt, (int)par->nsplit,
+                              (int)(unit % par->nsplit), &lo, &hi);
+        for (i = 0; i < loop->ufunc->nargs; i++) {
+            args[i] = ptrs[i] + lo * loop->steps[i];
+        }
+        n = hi - lo;
+        loop->function(args, &n, loop->steps, loop->funcdata);
+    }
+    par->fperr[chunk] = NpyUFunc_getfperr();
+}
+
+
+/* Copies n items between a buffer and strided array memory. */
+static void
+_strided_to_buffer(char *dst, char *src, npy_intp n, int elsize,
+                   npy_intp stride)
+{
+    npy_intp j;
+
+    if (stride == elsize || n == 1) {
+        memcpy(dst, src, n * elsize);
+        return;
+    }
+    for (j = 0; j < n; j++) {
+        memcpy(dst, src, elsize);
+        dst += elsize;
+        src += stride;
+    }
+}
+
+
+static void
+_buffer_to_strided(char *dst, char *src, npy_intp n, int elsize,
+                   npy_intp stride)
+{
+    npy_intp j;
+
+    if (stride == elsize || n == 1) {
+        memcpy(dst, src, n * elsize);
+        return;
+    }
+    for (j = 0; j < n; j++) {
+        memcpy(dst, src, elsize);
+        dst += stride;
+        src += elsize;
+    }
+}
+
+
+/*
+ * Same as the BUFFER_UFUNCLOOP case of NpyUFunc_GenericFunction but for a
+ * range of the outer iteration and using the buffers in par->mem[chunk],
+ * which are laid out the same way as the loop's own buffers.  Only used
+ * for loops without object arrays.
+ */
+static void
+_buffer_loop_chunk(void *data, npy_intp start, npy_intp end, int chunk)
+{
+    npy_parallel_loop *par = (npy_parallel_loop *)data;
+    NpyUFuncLoopObject *loop = par->loop;
+    NpyArray **mps = par->mps;
+    int nin = loop->ufunc->nin, nargs = loop->ufunc->nargs;
+    int *needbuffer = loop->needbuffer;
+    npy_intp *steps = loop->steps;
+    char *buffer[NPY_MAXARGS], *castbuf[NPY_MAXARGS];
+    char *dptr[NPY_MAXARGS], *tptr[NPY_MAXARGS], *ptrs[NPY_MAXARGS];
+    npy_intp laststrides[NPY_MAXARGS];
+    int elsize[NPY_MAXARGS];
+    NpyArray_CopySwapNFunc *copyswapn[NPY_MAXARGS];
+    npy_intp coords[NPY_MAXDIMS];
+    npy_intp unit, index, lo, hi, remaining, bufcnt, datasize;
+    int i;
+
+    if (chunk > 0) {
+        NpyUFunc_clearfperr();
+    }
+    for (i = 0; i < nargs; i++) {
+        laststrides[i] = loop->iter->iters[i]->strides[loop->lastdim];
+        elsize[i] = NpyArray_ITEMSIZE(mps[i]);
+        copyswapn[i] = NpyArray_DESCR(mps[i])->f->copyswapn;
+        if (needbuffer[i]) {
+            buffer[i] = par->mem[chunk] + (loop->buffer[i] - loop->buffer[0]);
+            castbuf[i] = (loop->cast[i] == NULL) ? NULL :
+                par->mem[chunk] + (loop->castbuf[i] - loop->buffer[0]);
+        }
+    }
+
+    index = start / par->nsplit;
+    _loop_goto(loop, index, coords, ptrs);
+    for (unit = start; unit < end; unit++) {
+        if (unit / par->nsplit != index) {
+            _loop_next(loop, coords, ptrs);
+            index++;
+        }
+        NpyThreads_ChunkRange(loop->bufcnt, (int)par->nsplit,
+                              (int)(unit % par->nsplit), &lo, &hi);
+        for (i = 0; i < nargs; i++) {
+            tptr[i] = ptrs[i] + lo * laststrides[i];
+        }
+        remaining = hi - lo;
+        while (remaining > 0) {
+            bufcnt = (remaining < loop->bufsize) ? remaining : loop->bufsize;
+            for (i = 0; i < nargs; i++) {
+                if (!needbuffer[i]) {
+                    dptr[i] = tptr[i];
+                }
+                else {
+                    dptr[i] = (castbuf[i] != NULL) ? castbuf[i] : buffer[i];
+                }
+            }
+            for (i = 0; i < nin; i++) {
+                if (!needbuffer[i]) {
+                    continue;
+                }
+                datasize = steps[i] ? bufcnt : 1;
+                _strided_to_buffer(buffer[i], tptr[i], datasize, elsize[i],
+                                   laststrides[i]);
+                if (loop->swap[i]) {
+                    copyswapn[i](buffer[i], elsize[i], NULL, -1, datasize,
+                                 1, mps[i]);
+                }
+                if (loop->cast[i]) {
+                    loop->cast[i](buffer[i], castbuf[i], datasize,
+                                  NULL, NULL);
+                }
+            }
+
+            loop->function(dptr, &bufcnt, steps, loop->funcdata);
+
+            for (i = nin; i < nargs; i++) {
+                if (!needbuffer[i]) {
+                    continue;
+                }
+                datasize = steps[i] ? bufcnt : 1;
+                if (loop->cast[i]) {
+                    loop->cast[i](castbuf[i], buffer[i], datasize,
+                                  NULL, NULL);
+                }
+                if (loop->swap[i]) {
+                    copyswapn[i](buffer[i], elsize[i], NULL, -1, datasize,
+                                 1, mps[i]);
+                }
+                _buffer_to_strided(tptr[i], buffer[i], datasize, elsize[i],
+                                   laststrides[i]);
+            }
+            for (i = 0; i < nargs; i++) {
+                tptr[i] += bufcnt * laststrides[i];
+            }
+            remaining -= bufcnt;
+        }
+    }
+    par->fperr[chunk] = NpyUFunc_getfperr();
+}
+
+
+/*
+ * Runs the loop on nchunks threads and reports any floating point errors
+ * raised by them.  Returns -1 if the buffers could not be allocated.
+ */
+static int
+_run_parallel_loop(NpyUFuncLoopObject *loop, NpyArray **mps, int nchunks)
+{
+    npy_parallel_loop par;
+    npy_parallel_func func;
+    npy_intp nunits = loop->iter->size;
+    int i, fperr = 0, ret = 0;
+
+    par.loop = loop;
+    par.mps = mps;
+    par.nsplit = 1;
+    if ((loop->meth == NOBUFFER_UFUNCLOOP || loop->meth == BUFFER_UFUNCLOOP)
+        && nunits < nchunks) {
+        par.nsplit = (nchunks + nunits - 1) / nunits;
+        if (par.nsplit > loop->bufcnt) {
+            par.nsplit = loop->bufcnt;
+        }
+        nunits *= par.nsplit;
+    }
+    if (nchunks > nunits) {
+        nchunks = (int)nunits;
+    }
+    switch (loop->meth) {
+        case ONE_UFUNCLOOP:
+            func = _one_loop_chunk;
+            break;
+        case BUFFER_UFUNCLOOP:
+            func = _buffer_loop_chunk;
+            break;
+        default:
+            func = _nobuffer_loop_chunk;
+            break;
+    }
+    if (loop->meth == BUFFER_UFUNCLOOP) {
+        par.mem[0] = loop->buffer[0];
+        for (i = 1; i < nchunks; i++) {
+            par.mem[i] = NpyDataMem_NEW(loop->bufmemsize);
+            if (par.mem[i] == NULL) {
+                NpyErr_MEMORY;
+                nchunks = i;
+                ret = -1;
+                goto finish;
+            }
+        }
+    }
+
+    NpyThreads_Run(func, &par, nunits, nchunks);
+
+    for (i = 0; i < nchunks; i++) {
+        fperr |= par.fperr[i];
+    }
+    if (loop->errormask) {
+        fperr |= NpyUFunc_getfperr();
+        fp_error_handler(loop->ufunc->name ? loop->ufunc->name : "",
+                         loop->errormask, loop->errobj, fperr, &loop->first);
+    }
+
+ finish:
+    if (loop->meth == BUFFER_UFUNCLOOP) {
+        for (i = 1; i < nchunks; i++) {
+            NpyDataMem_FREE(par.mem[i]);
+        }
+    }
+    return ret;
+}
+
+
+/*
+ * Parallel reductions.
+ *
+ * Reduce, accumulate and reduceat are split between threads along the
+ * outer (non-reduced) dimensions whenever there are enough rows; each row
+ * is then computed exactly as in the serial loops.  When there are fewer
+ * rows than threads and the ufunc is associative, each row is split along
+ * the reduced axis instead: reduce combines the partial results of the
+ * pieces from left to right, and accumulate uses a two-pass prefix scan.
+ * Splitting the axis changes the order of the operations, so the result
+ * of a floating point sum may change with the number of threads.
+ *
+ * With NpyUFunc_SetPairwise(1) associative reductions are evaluated as a
+ * pairwise tree whose shape only depends on the length of the axis,
+ * giving the same result for any number of threads.
+ */
+
+/* Leaves of the pairwise tree are reduced with a single inner loop. */
+#define NPY_PAIRWISE_BLOCKSIZE 128
+
+static int npy_pairwise = 0;
+
+typedef struct {
+    NpyUFuncReduceObject *loop;
+    NpyArray_Descr *indescr;
+    int operation;
+    int pairwise;                   /* use the pairwise order for reduce */
+    npy_intp len;                   /* length of the reduced axis */
+    npy_intp instride;              /* stride of the input along the axis */
+    npy_intp *ind;                  /* reduceat indices */
+    npy_intp nind;
+    npy_intp retstride;             /* stride of ret along the axis */
+    char *inrow;                    /* row being split along the axis */
+    char *outrow;
+    int ntasks;                     /* subtrees of a pairwise reduction */
+    npy_intp taskstart[NPY_MAX_THREADS];
+    npy_intp tasklen[NPY_MAX_THREADS];
+    char *mem[NPY_MAX_THREADS];     /* buffer memory for each chunk */
+    int fperr[NPY_MAX_THREADS];     /* floating point status of each chunk */
+    npy_clongdouble partial[NPY_MAX_THREADS];
+} npy_parallel_reduce;
+
+
+/*
+ * Sets whether associative reductions use a pairwise order and returns
+ * the previous setting.
+ */
+NDARRAY_API int
+NpyUFunc_SetPairwise(int pairwise)
+{
+    int old = npy_pairwise;
+
+    npy_pairwise = (pairwise != 0);
+    return old;
+}
+
+
+NDARRAY_API int
+NpyUFunc_GetPairwise(void)
+{
+    return npy_pairwise;
+}
+
+
+/* Ufuncs whose reductions may be evaluated in any grouping. */
+static int
+_is_associative(NpyUFuncObject *self)
+{
+    static char *names[] = {"add", "multiply", "maximum", "minimum",
+                            "fmax", "fmin", "logical_and", "logical_or",
+                            "logical_xor", "bitwise_and", "bitwise_or",
+                            "bitwise_xor", NULL};
+    char **name;
+
+    if (self->name == NULL || self->nin != 2 || self->nout != 1) {
+        return 0;
+    }
+    for (name = names; *name != NULL; name++) {
+        if (strcmp(self->name, *name) == 0) {
+            return 1;
+        }
+    }
+    return 0;
+}
+
+
+/* Returns the data pointer of the index'th position of a reduce iterator. */
+static char *
+_iter_ptr(NpyArrayIterObject *it, npy_intp index)
+{
+    char *ptr = NpyArray_BYTES(it->ao);
+    npy_intp dim;
+    int i;
+
+    for (i = it->nd_m1; i >= 0; i--) {
+        dim = it->dims_m1[i] + 1;
+        ptr += (index % dim) * it->strides[i];
+        index /= dim;
+    }
+    return ptr;
+}
+
+
+/* Copies (casting if needed) the input item at in to out. */
+static void
+_reduce_first(npy_parallel_reduce *par, char *mem, char *out, char *in)
+{
+    NpyUFuncReduceObject *loop = par->loop;
+
+    if (loop->meth == NOBUFFER_UFUNCLOOP) {
+        memmove(out, in, loop->outsize);
+    }
+    else if (loop->cast) {
+        par->indescr->f->copyswap(mem, in, loop->swap, NULL);
+        loop->cast(mem, out, 1, NULL, NULL);
+    }
+    else {
+        par->indescr->f->copyswap(out, in, loop->swap, NULL);
+    }
+}
+
+
+/*
+ * Combines n input items starting at in into out.  For accumulate each
+ * result is written one output step further, as in the serial loops.
+ */
+static void
+_reduce_run(npy_parallel_reduce *par, char *mem, char *out, char *in,
+            npy_intp n)
+{
+    NpyUFuncReduceObject *loop = par->loop;
+    char *args[3], *dptr;
+    npy_intp steps[3], i;
+
+    steps[0] = steps[2] = loop->steps[0];
+    if (loop->meth == NOBUFFER_UFUNCLOOP) {
+        if (n > 0) {
+            args[0] = out;
+            args[1] = in;
+            args[2] = out + steps[0];
+            steps[1] = par->instride;
+            loop->function(args, &n, steps, loop->funcdata);
+        }
+        return;
+    }
+    steps[1] = loop->outsize;
+    while (n > 0) {
+        dptr = mem;
+        for (i = 0; i < loop->bufsize && i < n; i++) {
+            par->indescr->f->copyswap(dptr, in, loop->swap, NULL);
+            in += par->instride;
+            dptr += loop->insize;
+        }
+        args[0] = out;
+        args[1] = mem;
+        args[2] = out + steps[0];
+        if (loop->cast) {
+            args[1] = mem + loop->bufsize*loop->insize;
+            loop->cast(mem, args[1], i, NULL, NULL);
+        }
+        loop->function(args, &i, steps, loop->funcdata);
+        out += steps[0]*i;
+        n -= i;
+    }
+}
+
+
+/* out = out op other for a single item. */
+static void
+_reduce_combine(NpyUFuncReduceObject *loop, char *out, char *other)
+{
+    char *args[3];
+    npy_intp steps[3] = {0, 0, 0};
+    npy_intp one = 1;
+
+    args[0] = out;
+    args[1] = other;
+    args[2] = out;
+    loop->function(args, &one, steps, loop->funcdata);
+}
+
+
+/* Size of the left half of a pairwise node over n > BLOCKSIZE items. */
+static npy_intp
+_pairwise_split(npy_intp n)
+{
+    npy_intp nblocks = (n + NPY_PAIRWISE_BLOCKSIZE - 1) /
+        NPY_PAIRWISE_BLOCKSIZE;
+
+    return (nblocks / 2) * NPY_PAIRWISE_BLOCKSIZE;
+}
+
+
+static void
+_pairwise_reduce(npy_parallel_reduce *par, char *mem, char *out, char *in,
+                 npy_intp n)
+{
+    npy_clongdouble tmp;
+    npy_intp nleft;
+
+    if (n <= NPY_PAIRWISE_BLOCKSIZE) {
+        _reduce_first(par, mem, out, in);
+        _reduce_run(par, mem, out, in + par->instride, n - 1);
+        return;
+    }
+    nleft = _pairwise_split(n);
+    _pairwise_reduce(par, mem, out, in, nleft);
+    _pairwise_reduce(par, mem, (char *)&tmp,
+                     in + nleft*par->instride, n - nleft);
+    _reduce_combine(par->loop, out, (char *)&tmp);
+}
+
+
+/*
+ * Collects the nodes of the pairwise tree over [start, start+n) found at
+ * the given depth (or above it, for leaves) from left to right.
+ */
+static void
+_pairwise_tasks(npy_parallel_reduce *par, npy_intp start, npy_intp n,
+                int depth)
+{
+    npy_intp nleft;
+
+    if (depth == 0 || n <= NPY_PAIRWISE_BLOCKSIZE) {
+        par->taskstart[par->ntasks] = start;
+        par->tasklen[par->ntasks] = n;
+        par->ntasks++;
+        return;
+    }
+    nleft = _pairwise_split(n);
+    _pairwise_tasks(par, start, nleft, depth - 1);
+    _pairwise_tasks(par, start + nleft, n - nleft, depth - 1);
+}
+
+
+/* Combines the results of the tasks in the same order as the tree. */
+static void
+_pairwise_combine(npy_parallel_reduce *par, char *out, npy_intp n,
+                  int depth, int *task)
+{
+    npy_clongdouble tmp;
+    npy_intp nleft;
+
+    if (depth == 0 || n <= NPY_PAIRWISE_BLOCKSIZE) {
+        memcpy(out, &par->partial[(*task)++], par->loop->outsize);
+        return;
+    }
+    nleft = _pairwise_split(n);
+    _pairwise_combine(par, out, nleft, depth - 1, task);
+    _pairwise_combine(par, (char *)&tmp, n - nleft, depth - 1, task);
+    _reduce_combine(par->loop, out, (char *)&tmp);
+}
+
+
+/* Reduce or accumulate whole rows [start, end). */
+static void
+_reduce_rows_chunk(void *data, npy_intp start, npy_intp end, int chunk)
+{
+    npy_parallel_reduce *par = (npy_parallel_reduce *)data;
+    NpyUFuncReduceObject *loop = par->loop;
+    char *in, *out;
+    npy_intp index;
+
+    if (chunk > 0) {
+        NpyUFunc_clearfperr();
+    }
+    for (index = start; index < end; index++) {
+        in = _iter_ptr(loop->it, index);
+        if (par->operation == NPY_UFUNC_REDUCE) {
+            out = NpyArray_BYTES(loop->ret) + index*loop->outsize;
+        }
+        else {
+            out = _iter_ptr(loop->rit, index);
+        }
+        if (par->pairwise) {
+            _pairwise_reduce(par, par->mem[chunk], out, in, par->len);
+        }
+        else {
+            _reduce_first(par, par->mem[chunk], out, in);
+            _reduce_run(par, par->mem[chunk], out, in + par->instride,
+                        par->len - 1);
+        }
+    }
+    par->fperr[chunk] = NpyUFunc_getfperr();
+}
+
+
+/* Reduces the piece [start, end) of par->inrow into par->partial[chunk]. */
+static void
+_reduce_part_chunk(void *data, npy_intp start, npy_intp end, int chunk)
+{
+    npy_parallel_reduce *par = (npy_parallel_reduce *)data;
+    npy_intp stride = par->instride;
+    char *out = (char *)&par->partial[chunk];
+
+    if (chunk > 0) {
+        NpyUFunc_clearfperr();
+    }
+    _reduce_first(par, par->mem[chunk], out, par->inrow + start*stride);
+    _reduce_run(par, par->mem[chunk], out, par->inrow + (start+1)*stride,
+                end - start - 1);
+    par->fperr[chunk] = NpyUFunc_getfperr();
+}
+
+
+/* Reduces the pairwise subtrees [start, end) into par->partial. */
+static void
+_pairwise_task_chunk(void *data, npy_intp start, npy_intp end, int chunk)
+{
+    npy_parallel_reduce *par = (npy_parallel_reduce *)data;
+    npy_intp task;
+
+    if (chunk > 0) {
+        NpyUFunc_clearfperr();
+    }
+    for (task = start; task < end; task++) {
+        _pairwise_reduce(par, par->mem[chunk], (char *)&par->partial[task],
+                         par->inrow + par->taskstart[task] *
+                         par->instride,
+                         par->tasklen[task]);
+    }
+    par->fperr[chunk] = NpyUFunc_getfperr();
+}
+
+
+/* First pass of the scan: accumulate each piece on its own. */
+static void
+_scan_part_chunk(void *data, npy_intp start, npy_intp end, int chunk)
+{
+    npy_parallel_reduce *par = (npy_parallel_reduce *)data;
+    NpyUFuncReduceObject *loop = par->loop;
+    char *out = par->outrow + start*loop->steps[0];
+
+    if (chunk > 0) {
+        NpyUFunc_clearfperr();
+    }
+    _reduce_first(par, par->mem[chunk], out,
+                  par->inrow + start*par->instride);
+    _reduce_run(par, par->mem[chunk], out,
+                par->inrow + (start+1)*par->instride, end - start - 1);
+    par->fperr[chunk] = NpyUFunc_getfperr();
+}
+
+
+/* Second pass of the scan: fold the carry of the preceding pieces in. */
+static void
+_scan_fix_chunk(void *data, npy_intp start, npy_intp end, int chunk)
+{
+    npy_parallel_reduce *par = (npy_parallel_reduce *)data;
+    NpyUFuncReduceObject *loop = par->loop;
+    char *args[3];
+    npy_intp steps[3];
+    npy_intp n = end - start;
+
+    if (chunk == 0) {
+        return;
+    }
+    NpyUFunc_clearfperr();
+    args[0] = (char *)&par->partial[chunk];
+    args[1] = args[2] = par->outrow + start*loop->steps[0];
+    steps[0] = 0;
+    steps[1] = steps[2] = loop->steps[0];
+    loop->function(args, &n, steps, loop->funcdata);
+    par->fperr[chunk] |= NpyUFunc_getfperr();
+}
+
+
+/* Reduceat over units [start, end), one unit per row and index. */
+static void
+_reduceat_chunk(void *data, npy_intp start, npy_intp end, int chunk)
+{
+    npy_parallel_reduce *par = (npy_parallel_reduce *)data;
+    NpyUFuncReduceObject *loop = par->loop;
+    npy_intp unit, i, mm;
+    char *in, *out;
+
+    if (chunk > 0) {
+        NpyUFunc_clearfperr();
+    }
+    for (unit = start; unit < end; unit++) {
+        i = unit % par->nind;
+        in = _iter_ptr(loop->it, unit / par->nind) +
+            par->ind[i]*par->instride;
+        out = _iter_ptr(loop->rit, unit / par->nind) + i*par->retstride;
+        mm = (i == par->nind - 1 ? par->len : par->ind[i+1]) - par->ind[i];
+        if (loop->meth == NOBUFFER_UFUNCLOOP) {
+            memcpy(out, in, loop->outsize);
+            _reduce_run(par, par->mem[chunk], out, in + par->instride,
+                        mm - 1);
+        }
+        else {
+            memcpy(out, loop->idptr, loop->outsize);
+            _reduce_run(par, par->mem[chunk], out, in, (mm < 1) ? 1 : mm);
+        }
+    }
+    par->fperr[chunk] = NpyUFunc_getfperr();
+}
+
+
+/*
+ * Runs a reduce, accumulate or reduceat loop in parallel if it is worth
+ * it.  Returns 1 if the loop was run, 0 if it should be run serially and
+ * -1 on error.
+ */
+static int
+_parallel_reduce(NpyUFuncReduceObject *loop, int operation, int axis,
+                 npy_intp *ind, npy_intp nind)
+{
+    npy_parallel_reduce par;
+    npy_intp nrows = loop->size, len, nunits, index;
+    int associative, pairwise, nchunks, nmem, depth, task, i;
+    int fperr = 0, ret = 1;
+
+    if ((loop->meth != NOBUFFER_UFUNCLOOP &&
+         loop->meth != BUFFER_UFUNCLOOP) || loop->obj) {
+        return 0;
+    }
+    len = NpyArray_DIM(loop->it->ao, axis);
+    associative = _is_associative(loop->ufunc) &&
+        (size_t)loop->outsize <= sizeof(npy_clongdouble);
+    pairwise = npy_pairwise && associative &&
+        operation == NPY_UFUNC_REDUCE;
+    nchunks = NpyThreads_NumChunks(nrows*len);
+    if (nchunks == 1 && !pairwise) {
+        return 0;
+    }
+
+    par.loop = loop;
+    par.indescr = NpyArray_DESCR(loop->it->ao);
+    par.operation = operation;
+    par.pairwise = pairwise;
+    par.len = len;
+    par.instride = NpyArray_STRIDE(loop->it->ao, axis);
+    par.ind = ind;
+    par.nind = nind;
+    par.retstride = 0;
+    if (operation == NPY_UFUNC_REDUCEAT) {
+        nunits = nrows*nind;
+        par.retstride = NpyArray_STRIDE(loop->ret, axis);
+    }
+    else if (nrows >= nchunks || !associative) {
+        nunits = nrows;
+    }
+    else {
+        nunits = len;
+    }
+    if (nchunks > nunits) {
+        nchunks = (int)nunits;
+    }
+    if (nchunks == 1 && !pairwise) {
+        return 0;
+    }
+
+    /* Every chunk gets its own buffer memory. */
+    nmem = 0;
+    if (loop->meth == BUFFER_UFUNCLOOP) {
+        size_t memsize = loop->bufsize*loop->outsize;
+
+        if (loop->cast) {
+            memsize += loop->bufsize*loop->insize;
+        }
+        par.mem[0] = loop->buffer;
+        for (nmem = 1; nmem < nchunks; nmem++) {
+            par.mem[nmem] = NpyDataMem_NEW(memsize);
+            if (par.mem[nmem] == NULL) {
+                NpyErr_MEMORY;
+                ret = -1;
+                goto finish;
+            }
+        }
+    }
+    for (i = 0; i < nchunks; i++) {
+        par.fperr[i] = 0;
+    }
+
+    if (operation == NPY_UFUNC_REDUCEAT) {
+        NpyThreads_Run(_reduceat_chunk, &par, nunits, nchunks);
+    }
+    else if (nunits == nrows) {
+        NpyThreads_Run(_reduce_rows_chunk, &par, nrows, nchunks);
+    }
+    else {
+        depth = 0;
+        while ((1 << depth) < nchunks) {
+            depth++;
+        }
+        for (index = 0; index < nrows; index++) {
+            par.inrow = _iter_ptr(loop->it, index);
+            if (operation == NPY_UFUNC_REDUCE) {
+                par.outrow = NpyArray_BYTES(loop->ret) + index*loop->outsize;
+            }
+            else {
+                par.outrow = _iter_ptr(loop->rit, index);
+            }
+            if (pairwise) {
+                par.ntasks = 0;
+                _pairwise_tasks(&par, 0, len, depth);
+                NpyThreads_Run(_pairwise_task_chunk, &par, par.ntasks,
+                               (nchunks < par.ntasks) ? nchunks : par.ntasks);
+                task = 0;
+                _pairwise_combine(&par, par.outrow, len, depth, &task);
+            }
+            else if (operation == NPY_UFUNC_REDUCE) {
+                NpyThreads_Run(_reduce_part_chunk, &par, len, nchunks);
+                memcpy(par.outrow, &par.partial[0], loop->outsize);
+                for (i = 1; i < nchunks; i++) {
+                    _reduce_combine(loop, par.outrow,
+                                    (char *)&par.partial[i]);
+                }
+            }
+            else {
+                npy_intp start, end;
+
+                char *last;
+
+                NpyThreads_Run(_scan_part_chunk, &par, len, nchunks);
+                /* partial[i] is the accumulated value before piece i */
+                for (i = 1; i < nchunks; i++) {
+                    NpyThreads_ChunkRange(len, nchunks, i - 1, &start, &end);
+                    last = par.outrow + (end - 1)*loop->steps[0];
+                    if (i == 1) {
+                        memcpy(&par.partial[i], last, loop->outsize);
+                    }
+                    else {
+                        memcpy(&par.partial[i], &par.partial[i-1],
+                               loop->outsize);
+                        _reduce_combine(loop, (char *)&par.partial[i], last);
+                    }
+                }
+                NpyThreads_Run(_scan_fix_chunk, &par, len, nchunks);
+            }
+            for (i = 0; i < nchunks; i++) {
+                fperr |= par.fperr[i];
+            }
+        }
+    }
+
+    for (i = 0; i < nchunks; i++) {
+        fperr |= par.fperr[i];
+    }
+    if (loop->errormask) {
+        fperr |= NpyUFunc_getfperr();
+        fp_error_handler(loop->ufunc->name ? loop->ufunc->name : "",
+                         loop->errormask, loop->errobj, fperr, &loop->first);
+        if (NpyErr_Occurred()) {
+            ret = -1;
+        }
+    }
+
+ finish:
+    for (i = 1; i < nmem; i++) {
+        NpyDataMem_FREE(par.mem[i]);
+    }
+    return ret;
+}
+
+
 /*
  * Floating point error handling.
  */
@@ -62,6 +62,11 @@ struct NpyUFuncObject {
     int *core_offsets;     /* positions of 1st core dimensions of each
                             argument in core_dim_ixs */
     char *core_signature;  /* signature string for printing purpose */
+
+    /* loops already selected for given input types, see select_types */
+    struct NpyDict_struct *loopcache;
+    npy_intp cache_hits;
+    npy_intp cache_misses;
 };
 
 typedef struct NpyUFuncObject NpyUFuncObject;
@@ -70,6 +75,9 @@ typedef struct NpyUFuncObject NpyUFuncObject;
 
 extern struct NpyDict_struct *npy_create_userloops_table(void);
 
+/* The loop cache of a ufunc is emptied when it reaches this size. */
+#define NPY_UFUNC_MAXCACHE 256
+
 
 /* A linked-list of function information for
  user-defined 1-d loops.
@@ -122,6 +130,7 @@ typedef struct NpyUFuncLoopObject {
     /* Buffers for the loop */
     char *buffer[NPY_MAXARGS];
     int bufsize;
+    int bufmemsize;        /* bytes allocated at buffer[0] */
     npy_intp bufcnt;
     char *dptr[NPY_MAXARGS];
 
@@ -279,6 +288,15 @@ NpyArray *
 NpyUFunc_Reduceat(NpyUFuncObject *self, NpyArray *arr, NpyArray *ind,
                   NpyArray *out, int axis, int otype);
 
+NDARRAY_API int
+NpyUFunc_SetPairwise(int pairwise);
+
+NDARRAY_API int
+NpyUFunc_GetPairwise(void);
+
+NDARRAY_API void
+NpyUFunc_ClearLoopCache(NpyUFuncObject *self);
+
 int
 NpyUFunc_SetUsesArraysAsData(void **data, size_t i);
 int
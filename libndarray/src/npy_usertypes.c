@@ -132,6 +132,10 @@ NpyArray_InitArrFuncs(NpyArray_ArrFuncs *f)
         f->sort[i] = NULL;
         f->argsort[i] = NULL;
     }
+    for(i = 0; i < NPY_NSELECTS; i++) {
+        f->partition[i] = NULL;
+        f->argpartition[i] = NULL;
+    }
     f->castfuncs = NULL;
     f->scalarkind = NULL;
     f->cancastscalarkindto = NULL;
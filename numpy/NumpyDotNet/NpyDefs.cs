@@ -92,9 +92,11 @@ namespace NumpyDotNet {
         {
             NPY_QUICKSORT = 0,
             NPY_HEAPSORT = 1,
-            NPY_MERGESORT = 2
+            NPY_MERGESORT = 2,
+            NPY_RADIXSORT = 3,
+            NPY_TIMSORT = 4
         }
-        internal const int NPY_NSORTS = 3;
+        internal const int NPY_NSORTS = 5;
 
         public enum NPY_SEARCHSIDE
         {
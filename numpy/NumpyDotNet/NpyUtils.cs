@@ -586,6 +586,12 @@ namespace NumpyDotNet {
                 case 'm':
                 case 'M':
                     return NpyDefs.NPY_SORTKIND.NPY_MERGESORT;
+                case 'r':
+                case 'R':
+                    return NpyDefs.NPY_SORTKIND.NPY_RADIXSORT;
+                case 't':
+                case 'T':
+                    return NpyDefs.NPY_SORTKIND.NPY_TIMSORT;
                 default:
                     throw new ArgumentException(String.Format("{0} is an unrecognized kind of SortedDictionary", kind));
             }
@@ -771,7 +771,7 @@ add_newdoc('numpy.core.multiarray', 'concatenate',
 
 add_newdoc('numpy.core', 'inner',
     """
-    inner(a, b)
+    inner(a, b, out=None)
 
     Inner product of two arrays.
 
@@ -782,6 +782,9 @@ add_newdoc('numpy.core', 'inner',
     ----------
     a, b : array_like
         If `a` and `b` are nonscalar, their last dimensions of must match.
+    out : ndarray, optional
+        Array to store the result in, which is returned.  It must be
+        C-contiguous and have the type and shape of the result.
 
     Returns
     -------
@@ -1233,7 +1236,7 @@ add_newdoc('numpy.core.multiarray', 'getbuffer',
 
 add_newdoc('numpy.core', 'dot',
     """
-    dot(a, b)
+    dot(a, b, out=None)
 
     Dot product of two arrays.
 
@@ -1250,13 +1253,17 @@ add_newdoc('numpy.core', 'dot',
         First argument.
     b : array_like
         Second argument.
+    out : ndarray, optional
+        Array to store the result in, which is returned.  It must be
+        C-contiguous and have the type and shape of the result.  Repeated
+        products into the same `out` need no new arrays for the result.
 
     Returns
     -------
     output : ndarray
         Returns the dot product of `a` and `b`.  If `a` and `b` are both
         scalars or both 1-D arrays then a scalar is returned; otherwise
-        an array is returned.
+        an array is returned.  If `out` is given it is returned.
 
     Raises
     ------
@@ -2192,6 +2199,21 @@ add_newdoc('numpy.core.multiarray', 'ndarray', ('argsort',
     """))
 
 
+add_newdoc('numpy.core.multiarray', 'ndarray', ('argpartition',
+    """
+    a.argpartition(kth, axis=-1, kind='introselect', order=None)
+
+    Returns the indices that would partition this array.
+
+    Refer to `numpy.argpartition` for full documentation.
+
+    See Also
+    --------
+    numpy.argpartition : equivalent function
+
+    """))
+
+
 add_newdoc('numpy.core.multiarray', 'ndarray', ('astype',
     """
     a.astype(t)
@@ -2714,6 +2736,45 @@ add_newdoc('numpy.core.multiarray', 'ndarray', ('nonzero',
     """))
 
 
+add_newdoc('numpy.core.multiarray', 'ndarray', ('partition',
+    """
+    a.partition(kth, axis=-1, kind='introselect', order=None)
+
+    Partition an array in-place, so that the element in the `kth`
+    position is where it would be in the sorted array, with no larger
+    element before it and no smaller element after it.
+
+    Parameters
+    ----------
+    kth : int or sequence of ints
+        Index of the element to put in its sorted position.  With a
+        sequence, all the elements at those positions are put in their
+        sorted positions at once.
+    axis : int, optional
+        Axis along which to partition.  Default is -1, the last axis.
+    kind : {'introselect'}, optional
+        Selection algorithm.  Default is 'introselect'.
+    order : list, optional
+        When `a` is an array with fields defined, this argument specifies
+        which fields to compare first, second, etc.  Not all fields need be
+        specified.
+
+    See Also
+    --------
+    numpy.partition : Return a partitioned copy of an array.
+    argpartition : Indirect partition.
+    sort : Full sort.
+
+    Examples
+    --------
+    >>> a = np.array([3, 4, 2, 1])
+    >>> a.partition(3)
+    >>> a
+    array([2, 1, 3, 4])
+
+    """))
+
+
 add_newdoc('numpy.core.multiarray', 'ndarray', ('prod',
     """
     a.prod(axis=None, dtype=None, out=None)
@@ -3102,7 +3163,7 @@ add_newdoc('numpy.core.multiarray', 'ndarray', ('sort',
     axis : int, optional
         Axis along which to sort. Default is -1, which means sort along the
         last axis.
-    kind : {'quicksort', 'mergesort', 'heapsort'}, optional
+    kind : {'quicksort', 'mergesort', 'heapsort', 'radix', 'timsort'}, optional
         Sorting algorithm. Default is 'quicksort'.
     order : list, optional
         When `a` is an array with fields defined, this argument specifies
@@ -4180,6 +4241,28 @@ add_newdoc('numpy.core', 'ufunc', ('types',
 
     """))
 
+add_newdoc('numpy.core', 'ufunc', ('cacheinfo',
+    """
+    Statistics of the cache of inner loops selected for input types.
+
+    Finding the inner loop matching the types of the inputs is done once
+    for each combination of input types (and scalar kinds); later calls
+    with the same types reuse the cached loop.  The cache is emptied when
+    loops are registered or replaced.
+
+    Returns a tuple ``(hits, misses, size)`` with the number of lookups
+    answered from the cache, the number of lookups which had to search the
+    loops of the ufunc, and the number of entries currently cached.
+
+    Examples
+    --------
+    >>> hits, misses, size = np.add.cacheinfo
+    >>> a = np.add(np.arange(3.), 1.)
+    >>> np.add.cacheinfo[0] - hits + np.add.cacheinfo[1] - misses
+    1
+
+    """))
+
 
 ##############################################################################
 #
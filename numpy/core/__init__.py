@@ -22,6 +22,7 @@ import records as rec
 from records import *
 from memmap import *
 from defchararray import chararray
+from lazy import *
 
 if sys.platform != 'cli':
     import scalarmath
@@ -43,7 +44,7 @@ __all__ = ['char','rec','memmap']
 __all__ += numeric.__all__
 __all__ += fromnumeric.__all__
 __all__ += rec.__all__
-__all__ += ['chararray']
+__all__ += ['chararray', 'lazy']
 __all__ += function_base.__all__
 __all__ += machar.__all__
 __all__ += getlimits.__all__
@@ -13,6 +13,7 @@ optimized\nmatrix multiply, inner product and dot for numpy arrays";
 #include CBLAS_HEADER
 
 #include <stdio.h>
+#include <limits.h>
 
 #if (PY_VERSION_HEX < 0x02060000)
 #define Py_TYPE(o)    (((PyObject*)(o))->ob_type)
@@ -22,17 +23,41 @@ optimized\nmatrix multiply, inner product and dot for numpy arrays";
 
 static PyArray_DotFunc *oldFunctions[PyArray_NTYPES];
 
+/*
+ * Finds the BLAS increment *inc of n elements that are stride bytes apart
+ * from *ptr, and moves *ptr to the one at the lowest address, which is
+ * where the BLAS starts a vector with a negative increment.  Returns 0 if
+ * the BLAS can't step through them.
+ */
+static int
+_blas_stride(char **ptr, npy_intp n, npy_intp stride, int itemsize, int *inc)
+{
+    if (n <= 1) {
+        *inc = 1;
+        return 1;
+    }
+    if (stride == 0 || stride % itemsize != 0 || stride / itemsize > INT_MAX ||
+        stride / itemsize < -INT_MAX) {
+        return 0;
+    }
+    *inc = (int)(stride / itemsize);
+    if (*inc < 0) {
+        *ptr += (n - 1)*stride;
+    }
+    return 1;
+}
+
 static void
 FLOAT_dot(void *a, npy_intp stridea, void *b, npy_intp strideb, void *res,
           npy_intp n, void *tmp)
 {
-    register npy_intp na = stridea / sizeof(float);
-    register npy_intp nb = strideb / sizeof(float);
+    char *pa = a, *pb = b;
+    int na, nb;
 
-    if ((sizeof(float) * na == (size_t)stridea) &&
-        (sizeof(float) * nb == (size_t)strideb) &&
-        (na >= 0) && (nb >= 0))
-            *((float *)res) = cblas_sdot((int)n, (float *)a, na, (float *)b, nb);
+    if (n <= INT_MAX &&
+        _blas_stride(&pa, n, stridea, sizeof(float), &na) &&
+        _blas_stride(&pb, n, strideb, sizeof(float), &nb))
+            *((float *)res) = cblas_sdot((int)n, (float *)pa, na, (float *)pb, nb);
 
     else
             oldFunctions[PyArray_FLOAT](a, stridea, b, strideb, res, n, tmp);
@@ -42,13 +67,13 @@ static void
 DOUBLE_dot(void *a, npy_intp stridea, void *b, npy_intp strideb, void *res,
            npy_intp n, void *tmp)
 {
-    register int na = stridea / sizeof(double);
-    register int nb = strideb / sizeof(double);
+    char *pa = a, *pb = b;
+    int na, nb;
 
-    if ((sizeof(double) * na == (size_t)stridea) &&
-        (sizeof(double) * nb == (size_t)strideb) &&
-        (na >= 0) && (nb >= 0))
-            *((double *)res) = cblas_ddot((int)n, (double *)a, na, (double *)b, nb);
+    if (n <= INT_MAX &&
+        _blas_stride(&pa, n, stridea, sizeof(double), &na) &&
+        _blas_stride(&pb, n, strideb, sizeof(double), &nb))
+            *((double *)res) = cblas_ddot((int)n, (double *)pa, na, (double *)pb, nb);
     else
             oldFunctions[PyArray_DOUBLE](a, stridea, b, strideb, res, n, tmp);
 }
@@ -57,14 +82,13 @@ static void
 CFLOAT_dot(void *a, npy_intp stridea, void *b, npy_intp strideb, void *res,
            npy_intp n, void *tmp)
 {
+    char *pa = a, *pb = b;
+    int na, nb;
 
-    register int na = stridea / sizeof(npy_cfloat);
-    register int nb = strideb / sizeof(npy_cfloat);
-
-    if ((sizeof(npy_cfloat) * na == (size_t)stridea) &&
-        (sizeof(npy_cfloat) * nb == (size_t)strideb) &&
-        (na >= 0) && (nb >= 0))
-            cblas_cdotu_sub((int)n, (float *)a, na, (float *)b, nb, (float *)res);
+    if (n <= INT_MAX &&
+        _blas_stride(&pa, n, stridea, sizeof(npy_cfloat), &na) &&
+        _blas_stride(&pb, n, strideb, sizeof(npy_cfloat), &nb))
+            cblas_cdotu_sub((int)n, (float *)pa, na, (float *)pb, nb, (float *)res);
     else
             oldFunctions[PyArray_CFLOAT](a, stridea, b, strideb, res, n, tmp);
 }
@@ -73,13 +97,13 @@ static void
 CDOUBLE_dot(void *a, npy_intp stridea, void *b, npy_intp strideb, void *res,
             npy_intp n, void *tmp)
 {
-    register int na = stridea / sizeof(npy_cdouble);
-    register int nb = strideb / sizeof(npy_cdouble);
+    char *pa = a, *pb = b;
+    int na, nb;
 
-    if ((sizeof(npy_cdouble) * na == (size_t)stridea) &&
-        (sizeof(npy_cdouble) * nb == (size_t)strideb) &&
-        (na >= 0) && (nb >= 0))
-            cblas_zdotu_sub((int)n, (double *)a, na, (double *)b, nb, (double *)res);
+    if (n <= INT_MAX &&
+        _blas_stride(&pa, n, stridea, sizeof(npy_cdouble), &na) &&
+        _blas_stride(&pb, n, strideb, sizeof(npy_cdouble), &nb))
+            cblas_zdotu_sub((int)n, (double *)pa, na, (double *)pb, nb, (double *)res);
     else
             oldFunctions[PyArray_CDOUBLE](a, stridea, b, strideb, res, n, tmp);
 }
@@ -209,33 +233,376 @@ _bad_strides(PyArrayObject *ap)
     return 0;
 }
 
+
+/*
+ * Finds the leading dimension of rows of cols elements that are stride
+ * bytes apart.  Returns 0 if the BLAS can't use it.
+ */
+static int
+_blas_ld(npy_intp stride, npy_intp rows, npy_intp cols, int itemsize, int *ld)
+{
+    npy_intp min = (cols > 1 ? cols : 1);
+
+    if (rows <= 1) {
+        *ld = (int)min;
+        return 1;
+    }
+    if (stride % itemsize != 0 || stride / itemsize < min ||
+        stride / itemsize > INT_MAX) {
+        return 0;
+    }
+    *ld = (int)(stride / itemsize);
+    return 1;
+}
+
+/*
+ * Finds how the BLAS can read the 2-d array ap without copying it: as a
+ * row major matrix (CblasNoTrans) or as the transpose of one (CblasTrans),
+ * with leading dimension *ld.  Returns -1 if it has to be copied, which is
+ * the case when neither axis is contiguous or a stride is negative.
+ */
+static int
+_blas_matrix(PyArrayObject *ap, int *ld)
+{
+    int itemsize = PyArray_ITEMSIZE(ap);
+    npy_intp d0 = PyArray_DIM(ap, 0), d1 = PyArray_DIM(ap, 1);
+    npy_intp s0 = PyArray_STRIDE(ap, 0), s1 = PyArray_STRIDE(ap, 1);
+
+    if ((d1 <= 1 || s1 == itemsize) && _blas_ld(s0, d0, d1, itemsize, ld)) {
+        return CblasNoTrans;
+    }
+    if ((d0 <= 1 || s0 == itemsize) && _blas_ld(s1, d1, d0, itemsize, ld)) {
+        return CblasTrans;
+    }
+    return -1;
+}
+
+/*
+ * Finds the BLAS increment of the vector ap, which has at most one axis
+ * longer than one, and where the BLAS starts it, like _blas_stride.
+ */
+static int
+_blas_vector(PyArrayObject *ap, char **ptr, int *inc)
+{
+    npy_intp n = 1, stride = 0;
+    int i;
+
+    for (i = 0; i < PyArray_NDIM(ap); i++) {
+        if (PyArray_DIM(ap, i) > 1) {
+            n = PyArray_DIM(ap, i);
+            stride = PyArray_STRIDE(ap, i);
+        }
+    }
+    *ptr = PyArray_BYTES(ap);
+    return _blas_stride(ptr, n, stride, PyArray_ITEMSIZE(ap), inc);
+}
+
+/*
+ * Replaces *ap by a C contiguous copy of it.
+ */
+static int
+_blas_copy(PyArrayObject **ap)
+{
+    PyObject *new = PyArray_NewCopy(*ap, PyArray_CORDER);
+
+    Py_DECREF(*ap);
+    *ap = (PyArrayObject *)new;
+    return (new == NULL) ? -1 : 0;
+}
+
+/*
+ * Stores the dot product of the vectors *xp and *yp, of l elements, to
+ * res -- Level 1 BLAS.
+ */
+static int
+_blas_dot(int typenum, int l, PyArrayObject **xp, PyArrayObject **yp,
+          char *res)
+{
+    char *x, *y;
+    int incx, incy;
+
+    if (!_blas_vector(*xp, &x, &incx)) {
+        if (_blas_copy(xp) < 0) {
+            return -1;
+        }
+        _blas_vector(*xp, &x, &incx);
+    }
+    if (!_blas_vector(*yp, &y, &incy)) {
+        if (_blas_copy(yp) < 0) {
+            return -1;
+        }
+        _blas_vector(*yp, &y, &incy);
+    }
+
+    NPY_BEGIN_ALLOW_THREADS;
+    if (typenum == PyArray_DOUBLE) {
+        *((double *)res) = cblas_ddot(l, (double *)x, incx,
+                                      (double *)y, incy);
+    }
+    else if (typenum == PyArray_FLOAT) {
+        *((float *)res) = cblas_sdot(l, (float *)x, incx, (float *)y, incy);
+    }
+    else if (typenum == PyArray_CDOUBLE) {
+        cblas_zdotu_sub(l, (double *)x, incx, (double *)y, incy,
+                        (double *)res);
+    }
+    else if (typenum == PyArray_CFLOAT) {
+        cblas_cdotu_sub(l, (float *)x, incx, (float *)y, incy,
+                        (float *)res);
+    }
+    NPY_END_ALLOW_THREADS;
+    return 0;
+}
+
+/*
+ * Stores the product of the matrix *ap, transposed if trans is set, and
+ * the vector *xp to res -- Level 2 BLAS.  Matrices with a contiguous axis
+ * are read in place with the matching transpose flag.
+ */
+static int
+_blas_gemv(int typenum, PyArrayObject **ap, int trans, PyArrayObject **xp,
+           char *res)
+{
+    static const float oneF[2] = {1.0, 0.0};
+    static const float zeroF[2] = {0.0, 0.0};
+    static const double oneD[2] = {1.0, 0.0};
+    static const double zeroD[2] = {0.0, 0.0};
+    enum CBLAS_TRANSPOSE Trans;
+    int stored, lda, incx, M, N;
+    char *a, *x;
+
+    stored = _blas_matrix(*ap, &lda);
+    if (stored < 0) {
+        if (_blas_copy(ap) < 0) {
+            return -1;
+        }
+        stored = _blas_matrix(*ap, &lda);
+    }
+    if (!_blas_vector(*xp, &x, &incx)) {
+        if (_blas_copy(xp) < 0) {
+            return -1;
+        }
+        _blas_vector(*xp, &x, &incx);
+    }
+    a = PyArray_BYTES(*ap);
+    /* M x N is the shape of the matrix as the BLAS sees it */
+    M = PyArray_DIM(*ap, stored == CblasNoTrans ? 0 : 1);
+    N = PyArray_DIM(*ap, stored == CblasNoTrans ? 1 : 0);
+    Trans = ((stored == CblasTrans) != (trans != 0)) ? CblasTrans
+                                                     : CblasNoTrans;
+
+    NPY_BEGIN_ALLOW_THREADS;
+    if (typenum == PyArray_DOUBLE) {
+        cblas_dgemv(CblasRowMajor, Trans, M, N, 1.0, (double *)a, lda,
+                    (double *)x, incx, 0.0, (double *)res, 1);
+    }
+    else if (typenum == PyArray_FLOAT) {
+        cblas_sgemv(CblasRowMajor, Trans, M, N, 1.0, (float *)a, lda,
+                    (float *)x, incx, 0.0, (float *)res, 1);
+    }
+    else if (typenum == PyArray_CDOUBLE) {
+        cblas_zgemv(CblasRowMajor, Trans, M, N, oneD, (double *)a, lda,
+                    (double *)x, incx, zeroD, (double *)res, 1);
+    }
+    else if (typenum == PyArray_CFLOAT) {
+        cblas_cgemv(CblasRowMajor, Trans, M, N, oneF, (float *)a, lda,
+                    (float *)x, incx, zeroF, (float *)res, 1);
+    }
+    NPY_END_ALLOW_THREADS;
+    return 0;
+}
+
+/*
+ * Stores the product of the matrices *ap1 and *ap2, either transposed if
+ * trans1 or trans2 is set, to the C contiguous ret -- Level 3 BLAS.
+ */
+static int
+_blas_gemm(int typenum, PyArrayObject **ap1, int trans1,
+           PyArrayObject **ap2, int trans2, PyArrayObject *ret)
+{
+    static const float oneF[2] = {1.0, 0.0};
+    static const float zeroF[2] = {0.0, 0.0};
+    static const double oneD[2] = {1.0, 0.0};
+    static const double zeroD[2] = {0.0, 0.0};
+    enum CBLAS_TRANSPOSE Trans1, Trans2;
+    int stored1, stored2, lda, ldb, ldc, M, N, L;
+    char *a, *b, *c;
+
+    stored1 = _blas_matrix(*ap1, &lda);
+    if (stored1 < 0) {
+        if (_blas_copy(ap1) < 0) {
+            return -1;
+        }
+        stored1 = _blas_matrix(*ap1, &lda);
+    }
+    stored2 = _blas_matrix(*ap2, &ldb);
+    if (stored2 < 0) {
+        if (_blas_copy(ap2) < 0) {
+            return -1;
+        }
+        stored2 = _blas_matrix(*ap2, &ldb);
+    }
+    a = PyArray_BYTES(*ap1);
+    b = PyArray_BYTES(*ap2);
+    c = PyArray_BYTES(ret);
+    /* L x M  multiplied by M x N */
+    L = PyArray_DIM(*ap1, trans1 ? 1 : 0);
+    M = PyArray_DIM(*ap1, trans1 ? 0 : 1);
+    N = PyArray_DIM(*ap2, trans2 ? 0 : 1);
+    ldc = (N > 1 ? N : 1);
+    Trans1 = ((stored1 == CblasTrans) != (trans1 != 0)) ? CblasTrans
+                                                        : CblasNoTrans;
+    Trans2 = ((stored2 == CblasTrans) != (trans2 != 0)) ? CblasTrans
+                                                        : CblasNoTrans;
+
+    NPY_BEGIN_ALLOW_THREADS;
+    if (typenum == PyArray_DOUBLE) {
+        cblas_dgemm(CblasRowMajor, Trans1, Trans2, L, N, M,
+                    1.0, (double *)a, lda, (double *)b, ldb,
+                    0.0, (double *)c, ldc);
+    }
+    else if (typenum == PyArray_FLOAT) {
+        cblas_sgemm(CblasRowMajor, Trans1, Trans2, L, N, M,
+                    1.0, (float *)a, lda, (float *)b, ldb,
+                    0.0, (float *)c, ldc);
+    }
+    else if (typenum == PyArray_CDOUBLE) {
+        cblas_zgemm(CblasRowMajor, Trans1, Trans2, L, N, M,
+                    oneD, (double *)a, lda, (double *)b, ldb,
+                    zeroD, (double *)c, ldc);
+    }
+    else if (typenum == PyArray_CFLOAT) {
+        cblas_cgemm(CblasRowMajor, Trans1, Trans2, L, N, M,
+                    oneF, (float *)a, lda, (float *)b, ldb,
+                    zeroF, (float *)c, ldc);
+    }
+    NPY_END_ALLOW_THREADS;
+    return 0;
+}
+
+static int
+_arrays_overlap(PyArrayObject *ap1, PyArrayObject *ap2)
+{
+    char *low[2], *high[2];
+    PyArrayObject *ap[2];
+    int i, j;
+
+    ap[0] = ap1;
+    ap[1] = ap2;
+    for (i = 0; i < 2; i++) {
+        low[i] = high[i] = PyArray_BYTES(ap[i]);
+        high[i] += PyArray_ITEMSIZE(ap[i]);
+        for (j = 0; j < PyArray_NDIM(ap[i]); j++) {
+            npy_intp extent = (PyArray_DIM(ap[i], j) - 1) *
+                              PyArray_STRIDE(ap[i], j);
+            if (PyArray_DIM(ap[i], j) == 0) {
+                return 0;
+            }
+            if (extent < 0) {
+                low[i] += extent;
+            }
+            else {
+                high[i] += extent;
+            }
+        }
+    }
+    return low[0] < high[1] && low[1] < high[0];
+}
+
 /*
- * dot(a,b)
+ * Makes the array for the result of a product, of a subtype that takes
+ * the priority of ap1 and ap2 into account.  If out is given it is checked
+ * and returned instead, unless it overlaps ap1 or ap2, in which case a new
+ * array is returned that the caller copies to out.
+ */
+static PyArrayObject *
+new_array_for_sum(PyArrayObject *ap1, PyArrayObject *ap2, PyArrayObject *out,
+                  int nd, npy_intp dimensions[], int typenum)
+{
+    double prior1, prior2;
+    PyTypeObject *subtype;
+
+    if (out != NULL) {
+        if (PyArray_NDIM(out) != nd || PyArray_TYPE(out) != typenum ||
+            !PyArray_ISCARRAY(out)) {
+            PyErr_SetString(PyExc_ValueError,
+                            "output array is not acceptable (must have the "
+                            "right type, nr dimensions, and be a C-Array)");
+            return NULL;
+        }
+        if (!PyArray_CompareLists(PyArray_DIMS(out), dimensions, nd)) {
+            PyErr_SetString(PyExc_ValueError,
+                            "output array has wrong dimensions");
+            return NULL;
+        }
+        if (!_arrays_overlap(out, ap1) && !_arrays_overlap(out, ap2)) {
+            Py_INCREF(out);
+            return out;
+        }
+    }
+
+    /* Choose which subtype to return */
+    if (Py_TYPE(ap1) != Py_TYPE(ap2)) {
+        prior2 = PyArray_GetPriority((PyObject *)ap2, 0.0);
+        prior1 = PyArray_GetPriority((PyObject *)ap1, 0.0);
+        subtype = (prior2 > prior1 ? Py_TYPE(ap2) : Py_TYPE(ap1));
+    }
+    else {
+        prior1 = prior2 = 0.0;
+        subtype = Py_TYPE(ap1);
+    }
+
+    return (PyArrayObject *)PyArray_New(subtype, nd, dimensions,
+                                        typenum, NULL, NULL, 0, 0,
+                                        (PyObject *)
+                                        (prior2 > prior1 ? ap2 : ap1));
+}
+
+/*
+ * Returns the result of a product, copied to out if it was given.
+ */
+static PyObject *
+_product_return(PyArrayObject *ret, PyArrayObject *out)
+{
+    if (out == NULL) {
+        return PyArray_Return(ret);
+    }
+    if (ret != out) {
+        if (PyArray_CopyInto(out, ret) < 0) {
+            Py_DECREF(ret);
+            return NULL;
+        }
+        Py_DECREF(ret);
+        Py_INCREF(out);
+    }
+    return (PyObject *)out;
+}
+
+/*
+ * dot(a,b,out=None)
  * Returns the dot product of a and b for arrays of floating point types.
  * Like the generic numpy equivalent the product sum is over
  * the last dimension of a and the second-to-last dimension of b.
  * NB: The first argument is not conjugated.;
  */
 static PyObject *
-dotblas_matrixproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
+dotblas_matrixproduct(PyObject *NPY_UNUSED(dummy), PyObject *args,
+                      PyObject *kwds)
 {
     PyObject *op1, *op2;
-    PyArrayObject *ap1 = NULL, *ap2 = NULL, *ret = NULL;
-    int j, l, lda, ldb, ldc;
+    PyArrayObject *ap1 = NULL, *ap2 = NULL, *ret = NULL, *out = NULL;
+    int j, l;
     int typenum, nd;
     npy_intp ap1stride = 0;
     npy_intp dimensions[NPY_MAXDIMS];
     npy_intp numbytes;
-    static const float oneF[2] = {1.0, 0.0};
-    static const float zeroF[2] = {0.0, 0.0};
-    static const double oneD[2] = {1.0, 0.0};
-    static const double zeroD[2] = {0.0, 0.0};
-    double prior1, prior2;
-    PyTypeObject *subtype;
     PyArray_Descr *dtype;
     MatrixShape ap1shape, ap2shape;
+    static char *kwlist[] = {"a", "b", "out", NULL};
 
-    if (!PyArg_ParseTuple(args, "OO", &op1, &op2)) {
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "OO|O&", kwlist,
+                                     &op1, &op2,
+                                     PyArray_OutputConverter, &out)) {
         return NULL;
     }
 
@@ -250,6 +617,9 @@ dotblas_matrixproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
     /* This function doesn't handle other types */
     if ((typenum != PyArray_DOUBLE && typenum != PyArray_CDOUBLE &&
          typenum != PyArray_FLOAT && typenum != PyArray_CFLOAT)) {
+        if (out != NULL) {
+            return PyArray_MatrixProduct2(op1, op2, out);
+        }
         return PyArray_Return((PyArrayObject *)PyArray_MatrixProduct(op1, op2));
     }
 
@@ -270,10 +640,11 @@ dotblas_matrixproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
     }
 
     if ((PyArray_NDIM(ap1) > 2) || (PyArray_NDIM(ap2) > 2)) {
+        PyObject *result;
+
         /*
          * This function doesn't handle dimensions greater than 2
-         * (or negative striding)  -- other
-         * than to ensure the dot function is altered
+         * -- other than to ensure the dot function is altered
          */
         if (!altered) {
             /* need to alter dot product */
@@ -283,34 +654,33 @@ dotblas_matrixproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
             Py_DECREF(tmp1);
             Py_DECREF(tmp2);
         }
-        ret = (PyArrayObject *)PyArray_MatrixProduct((PyObject *)ap1,
-                                                     (PyObject *)ap2);
+        if (out != NULL) {
+            result = PyArray_MatrixProduct2((PyObject *)ap1,
+                                            (PyObject *)ap2, out);
+        }
+        else {
+            result = PyArray_Return((PyArrayObject *)
+                                    PyArray_MatrixProduct((PyObject *)ap1,
+                                                          (PyObject *)ap2));
+        }
         Py_DECREF(ap1);
         Py_DECREF(ap2);
-        return PyArray_Return(ret);
+        return result;
     }
 
-    if (_bad_strides(ap1)) {
-            op1 = PyArray_NewCopy(ap1, PyArray_ANYORDER);
-            Py_DECREF(ap1);
-            ap1 = (PyArrayObject *)op1;
-            if (ap1 == NULL) {
-                goto fail;
-            }
-    }
-    if (_bad_strides(ap2)) {
-            op2 = PyArray_NewCopy(ap2, PyArray_ANYORDER);
-            Py_DECREF(ap2);
-            ap2 = (PyArrayObject *)op2;
-            if (ap2 == NULL) {
-                goto fail;
-            }
-    }
     ap1shape = _select_matrix_shape(ap1);
     ap2shape = _select_matrix_shape(ap2);
 
     if (ap1shape == _scalar || ap2shape == _scalar) {
         PyArrayObject *oap1, *oap2;
+
+        /* The Level 1 BLAS code below needs positive strides */
+        if (_bad_strides(ap1) && _blas_copy(&ap1) < 0) {
+            goto fail;
+        }
+        if (_bad_strides(ap2) && _blas_copy(&ap2) < 0) {
+            goto fail;
+        }
         oap1 = ap1; oap2 = ap2;
         /* One of ap1 or ap2 is a scalar */
         if (ap1shape == _scalar) {              /* Make ap2 the scalar */
@@ -320,7 +690,6 @@ dotblas_matrixproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
             ap1shape = ap2shape;
             ap2shape = _scalar;
         }
-
         if (ap1shape == _row) {
             ap1stride = PyArray_STRIDE(ap1, 1);
         }
@@ -411,31 +780,16 @@ dotblas_matrixproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
         }
     }
 
-    /* Choose which subtype to return */
-    if (Py_TYPE(ap1) != Py_TYPE(ap2)) {
-        prior2 = PyArray_GetPriority((PyObject *)ap2, 0.0);
-        prior1 = PyArray_GetPriority((PyObject *)ap1, 0.0);
-        subtype = (prior2 > prior1 ? Py_TYPE(ap2) : Py_TYPE(ap1));
-    }
-    else {
-        prior1 = prior2 = 0.0;
-        subtype = Py_TYPE(ap1);
-    }
-
-    ret = (PyArrayObject *)PyArray_New(subtype, nd, dimensions,
-                                       typenum, NULL, NULL, 0, 0,
-                                       (PyObject *)
-                                       (prior2 > prior1 ? ap2 : ap1));
-
+    ret = new_array_for_sum(ap1, ap2, out, nd, dimensions, typenum);
     if (ret == NULL) {
         goto fail;
     }
     numbytes = PyArray_NBYTES(ret);
-    memset(PyArray_BYTES(ret), 0, numbytes);
-    if (numbytes==0 || l == 0) {
-            Py_DECREF(ap1);
-            Py_DECREF(ap2);
-            return PyArray_Return(ret);
+    if (numbytes == 0 || l == 0) {
+        memset(PyArray_BYTES(ret), 0, numbytes);
+        Py_DECREF(ap1);
+        Py_DECREF(ap2);
+        return _product_return(ret, out);
     }
 
 
@@ -445,6 +799,7 @@ dotblas_matrixproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
          * if ap1shape is a matrix and we are not contiguous, then we can't
          * just blast through the entire array using a single striding factor
          */
+        memset(PyArray_BYTES(ret), 0, numbytes);
         NPY_BEGIN_ALLOW_THREADS;
 
         if (typenum == PyArray_DOUBLE) {
@@ -580,227 +935,37 @@ dotblas_matrixproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
         NPY_END_ALLOW_THREADS;
     }
     else if ((ap2shape == _column) && (ap1shape != _matrix)) {
-        int ap1s, ap2s;
-        NPY_BEGIN_ALLOW_THREADS;
-
-        ap2s = PyArray_STRIDE(ap2, 0) / PyArray_ITEMSIZE(ap2);
-        if (ap1shape == _row) {
-            ap1s = PyArray_STRIDE(ap1, 1) / PyArray_ITEMSIZE(ap1);
-        }
-        else {
-            ap1s = PyArray_STRIDE(ap1, 0) / PyArray_ITEMSIZE(ap1);
-        }
-
-        /* Dot product between two vectors -- Level 1 BLAS */
-        if (typenum == PyArray_DOUBLE) {
-            double result = cblas_ddot(l, (double *)PyArray_BYTES(ap1), ap1s,
-                                       (double *)PyArray_BYTES(ap2), ap2s);
-            *((double *)PyArray_BYTES(ret)) = result;
-        }
-        else if (typenum == PyArray_FLOAT) {
-            float result = cblas_sdot(l, (float *)PyArray_BYTES(ap1), ap1s,
-                                      (float *)PyArray_BYTES(ap2), ap2s);
-            *((float *)PyArray_BYTES(ret)) = result;
-        }
-        else if (typenum == PyArray_CDOUBLE) {
-            cblas_zdotu_sub(l, (double *)PyArray_BYTES(ap1), ap1s,
-                            (double *)PyArray_BYTES(ap2), ap2s, (double *)PyArray_BYTES(ret));
-        }
-        else if (typenum == PyArray_CFLOAT) {
-            cblas_cdotu_sub(l, (float *)PyArray_BYTES(ap1), ap1s,
-                            (float *)PyArray_BYTES(ap2), ap2s, (float *)PyArray_BYTES(ret));
+        /* Dot product between two vectors */
+        if (_blas_dot(typenum, l, &ap1, &ap2, PyArray_BYTES(ret)) < 0) {
+            goto fail;
         }
-        NPY_END_ALLOW_THREADS;
     }
     else if (ap1shape == _matrix && ap2shape != _matrix) {
-        /* Matrix vector multiplication -- Level 2 BLAS */
-        /* lda must be MAX(M,1) */
-        enum CBLAS_ORDER Order;
-        int ap2s;
-
-        if (!PyArray_ISONESEGMENT(ap1)) {
-            PyObject *new;
-            new = PyArray_Copy(ap1);
-            Py_DECREF(ap1);
-            ap1 = (PyArrayObject *)new;
-            if (new == NULL) {
-                goto fail;
-            }
-        }
-        NPY_BEGIN_ALLOW_THREADS
-        if (PyArray_ISCONTIGUOUS(ap1)) {
-            Order = CblasRowMajor;
-            lda = (PyArray_DIM(ap1, 1) > 1 ? PyArray_DIM(ap1, 1) : 1);
-        }
-        else {
-            Order = CblasColMajor;
-            lda = (PyArray_DIM(ap1, 0) > 1 ? PyArray_DIM(ap1, 0) : 1);
-        }
-        ap2s = PyArray_STRIDE(ap2, 0) / PyArray_ITEMSIZE(ap2);
-        if (typenum == PyArray_DOUBLE) {
-            cblas_dgemv(Order, CblasNoTrans,
-                        PyArray_DIM(ap1, 0), PyArray_DIM(ap1, 1),
-                        1.0, (double *)PyArray_BYTES(ap1), lda,
-                        (double *)PyArray_BYTES(ap2), ap2s, 0.0, (double *)PyArray_BYTES(ret), 1);
-        }
-        else if (typenum == PyArray_FLOAT) {
-            cblas_sgemv(Order, CblasNoTrans,
-                        PyArray_DIM(ap1, 0), PyArray_DIM(ap1, 1),
-                        1.0, (float *)PyArray_BYTES(ap1), lda,
-                        (float *)PyArray_BYTES(ap2), ap2s, 0.0, (float *)PyArray_BYTES(ret), 1);
-        }
-        else if (typenum == PyArray_CDOUBLE) {
-            cblas_zgemv(Order,
-                        CblasNoTrans,  PyArray_DIM(ap1, 0), PyArray_DIM(ap1, 1),
-                        oneD, (double *)PyArray_BYTES(ap1), lda,
-                        (double *)PyArray_BYTES(ap2), ap2s, zeroD,
-                        (double *)PyArray_BYTES(ret), 1);
-        }
-        else if (typenum == PyArray_CFLOAT) {
-            cblas_cgemv(Order,
-                        CblasNoTrans,  PyArray_DIM(ap1, 0), PyArray_DIM(ap1, 1),
-                        oneF, (float *)PyArray_BYTES(ap1), lda,
-                        (float *)PyArray_BYTES(ap2), ap2s, zeroF,
-                        (float *)PyArray_BYTES(ret), 1);
+        /* Matrix vector multiplication */
+        if (_blas_gemv(typenum, &ap1, 0, &ap2, PyArray_BYTES(ret)) < 0) {
+            goto fail;
         }
-        NPY_END_ALLOW_THREADS;
     }
     else if (ap1shape != _matrix && ap2shape == _matrix) {
-        /* Vector matrix multiplication -- Level 2 BLAS */
-        enum CBLAS_ORDER Order;
-        int ap1s;
-
-        if (!PyArray_ISONESEGMENT(ap2)) {
-            PyObject *new;
-            new = PyArray_Copy(ap2);
-            Py_DECREF(ap2);
-            ap2 = (PyArrayObject *)new;
-            if (new == NULL) {
-                goto fail;
-            }
-        }
-        NPY_BEGIN_ALLOW_THREADS
-        if (PyArray_ISCONTIGUOUS(ap2)) {
-            Order = CblasRowMajor;
-            lda = (PyArray_DIM(ap2, 1) > 1 ? PyArray_DIM(ap2, 1) : 1);
-        }
-        else {
-            Order = CblasColMajor;
-            lda = (PyArray_DIM(ap2, 0) > 1 ? PyArray_DIM(ap2, 0) : 1);
-        }
-        if (ap1shape == _row) {
-            ap1s = PyArray_STRIDE(ap1, 1) / PyArray_ITEMSIZE(ap1);
-        }
-        else {
-            ap1s = PyArray_STRIDE(ap1, 0) / PyArray_ITEMSIZE(ap1);
-        }
-        if (typenum == PyArray_DOUBLE) {
-            cblas_dgemv(Order,
-                        CblasTrans,  PyArray_DIM(ap2, 0), PyArray_DIM(ap2, 1),
-                        1.0, (double *)PyArray_BYTES(ap2), lda,
-                        (double *)PyArray_BYTES(ap1), ap1s, 0.0, (double *)PyArray_BYTES(ret), 1);
-        }
-        else if (typenum == PyArray_FLOAT) {
-            cblas_sgemv(Order,
-                        CblasTrans,  PyArray_DIM(ap2, 0), PyArray_DIM(ap2, 1),
-                        1.0, (float *)PyArray_BYTES(ap2), lda,
-                        (float *)PyArray_BYTES(ap1), ap1s, 0.0, (float *)PyArray_BYTES(ret), 1);
-        }
-        else if (typenum == PyArray_CDOUBLE) {
-            cblas_zgemv(Order,
-                        CblasTrans,  PyArray_DIM(ap2, 0), PyArray_DIM(ap2, 1),
-                        oneD, (double *)PyArray_BYTES(ap2), lda,
-                        (double *)PyArray_BYTES(ap1), ap1s, zeroD, (double *)PyArray_BYTES(ret), 1);
-        }
-        else if (typenum == PyArray_CFLOAT) {
-            cblas_cgemv(Order,
-                        CblasTrans,  PyArray_DIM(ap2, 0), PyArray_DIM(ap2, 1),
-                        oneF, (float *)PyArray_BYTES(ap2), lda,
-                        (float *)PyArray_BYTES(ap1), ap1s, zeroF, (float *)PyArray_BYTES(ret), 1);
+        /* Vector matrix multiplication */
+        if (_blas_gemv(typenum, &ap2, 1, &ap1, PyArray_BYTES(ret)) < 0) {
+            goto fail;
         }
-        NPY_END_ALLOW_THREADS;
     }
     else {
         /*
          * (PyArray_NDIM(ap1) == 2 && PyArray_NDIM(ap2) == 2)
-         * Matrix matrix multiplication -- Level 3 BLAS
-         *  L x M  multiplied by M x N
-         */
-        enum CBLAS_ORDER Order;
-        enum CBLAS_TRANSPOSE Trans1, Trans2;
-        int M, N, L;
-
-        /* Optimization possible: */
-        /*
-         * We may be able to handle single-segment arrays here
-         * using appropriate values of Order, Trans1, and Trans2.
+         * Matrix matrix multiplication
          */
-
-        if (!PyArray_ISCONTIGUOUS(ap2)) {
-            PyObject *new = PyArray_Copy(ap2);
-
-            Py_DECREF(ap2);
-            ap2 = (PyArrayObject *)new;
-            if (new == NULL) {
-                goto fail;
-            }
-        }
-        if (!PyArray_ISCONTIGUOUS(ap1)) {
-            PyObject *new = PyArray_Copy(ap1);
-
-            Py_DECREF(ap1);
-            ap1 = (PyArrayObject *)new;
-            if (new == NULL) {
-                goto fail;
-            }
-        }
-
-        NPY_BEGIN_ALLOW_THREADS;
-
-        Order = CblasRowMajor;
-        Trans1 = CblasNoTrans;
-        Trans2 = CblasNoTrans;
-        L = PyArray_DIM(ap1, 0);
-        N = PyArray_DIM(ap2, 1);
-        M = PyArray_DIM(ap2, 0);
-        lda = (PyArray_DIM(ap1, 1) > 1 ? PyArray_DIM(ap1, 1) : 1);
-        ldb = (PyArray_DIM(ap2, 1) > 1 ? PyArray_DIM(ap2, 1) : 1);
-        ldc = (PyArray_DIM(ret, 1) > 1 ? PyArray_DIM(ret, 1) : 1);
-        if (typenum == PyArray_DOUBLE) {
-            cblas_dgemm(Order, Trans1, Trans2,
-                        L, N, M,
-                        1.0, (double *)PyArray_BYTES(ap1), lda,
-                        (double *)PyArray_BYTES(ap2), ldb,
-                        0.0, (double *)PyArray_BYTES(ret), ldc);
-        }
-        else if (typenum == PyArray_FLOAT) {
-            cblas_sgemm(Order, Trans1, Trans2,
-                        L, N, M,
-                        1.0, (float *)PyArray_BYTES(ap1), lda,
-                        (float *)PyArray_BYTES(ap2), ldb,
-                        0.0, (float *)PyArray_BYTES(ret), ldc);
-        }
-        else if (typenum == PyArray_CDOUBLE) {
-            cblas_zgemm(Order, Trans1, Trans2,
-                        L, N, M,
-                        oneD, (double *)PyArray_BYTES(ap1), lda,
-                        (double *)PyArray_BYTES(ap2), ldb,
-                        zeroD, (double *)PyArray_BYTES(ret), ldc);
-        }
-        else if (typenum == PyArray_CFLOAT) {
-            cblas_cgemm(Order, Trans1, Trans2,
-                        L, N, M,
-                        oneF, (float *)PyArray_BYTES(ap1), lda,
-                        (float *)PyArray_BYTES(ap2), ldb,
-                        zeroF, (float *)PyArray_BYTES(ret), ldc);
+        if (_blas_gemm(typenum, &ap1, 0, &ap2, 0, ret) < 0) {
+            goto fail;
         }
-        NPY_END_ALLOW_THREADS;
     }
 
 
     Py_DECREF(ap1);
     Py_DECREF(ap2);
-    return PyArray_Return(ret);
+    return _product_return(ret, out);
 
  fail:
     Py_XDECREF(ap1);
@@ -811,7 +976,7 @@ dotblas_matrixproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
 
 
 /*
- * innerproduct(a,b)
+ * innerproduct(a,b,out=None)
  *
  * Returns the inner product of a and b for arrays of
  * floating point types. Like the generic NumPy equivalent the product
@@ -820,21 +985,22 @@ dotblas_matrixproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
  */
 
 static PyObject *
-dotblas_innerproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
+dotblas_innerproduct(PyObject *NPY_UNUSED(dummy), PyObject *args,
+                     PyObject *kwds)
 {
     PyObject *op1, *op2;
-    PyArrayObject *ap1, *ap2, *ret;
-    int j, l, lda, ldb, ldc;
+    PyArrayObject *ap1 = NULL, *ap2 = NULL, *ret = NULL, *out = NULL;
+    int j, l;
     int typenum, nd;
     npy_intp dimensions[NPY_MAXDIMS];
-    static const float oneF[2] = {1.0, 0.0};
-    static const float zeroF[2] = {0.0, 0.0};
-    static const double oneD[2] = {1.0, 0.0};
-    static const double zeroD[2] = {0.0, 0.0};
-    PyTypeObject *subtype;
-    double prior1, prior2;
+    PyArray_Descr *dtype;
+    static char *kwlist[] = {"a", "b", "out", NULL};
 
-    if (!PyArg_ParseTuple(args, "OO", &op1, &op2)) return NULL;
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "OO|O&", kwlist,
+                                     &op1, &op2,
+                                     PyArray_OutputConverter, &out)) {
+        return NULL;
+    }
 
     /*
      * Inner product using the BLAS.  The product sum is taken along the last
@@ -849,16 +1015,31 @@ dotblas_innerproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
     /* This function doesn't handle other types */
     if ((typenum != PyArray_DOUBLE && typenum != PyArray_CDOUBLE &&
          typenum != PyArray_FLOAT && typenum != PyArray_CFLOAT)) {
-            return PyArray_Return((PyArrayObject *)PyArray_InnerProduct(op1, op2));
+        if (out != NULL) {
+            return PyArray_InnerProduct2(op1, op2, out);
+        }
+        return PyArray_Return((PyArrayObject *)PyArray_InnerProduct(op1, op2));
     }
 
-    ret = NULL;
-    ap1 = (PyArrayObject *)PyArray_ContiguousFromObject(op1, typenum, 0, 0);
-    if (ap1 == NULL) return NULL;
-    ap2 = (PyArrayObject *)PyArray_ContiguousFromObject(op2, typenum, 0, 0);
-    if (ap2 == NULL) goto fail;
+    dtype = PyArray_DescrFromType(typenum);
+    if (dtype == NULL) {
+        return NULL;
+    }
+    Py_INCREF(dtype);
+    ap1 = (PyArrayObject *)PyArray_FromAny(op1, dtype, 0, 0, NPY_ALIGNED, NULL);
+    if (ap1 == NULL) {
+        Py_DECREF(dtype);
+        return NULL;
+    }
+    ap2 = (PyArrayObject *)PyArray_FromAny(op2, dtype, 0, 0, NPY_ALIGNED, NULL);
+    if (ap2 == NULL) {
+        Py_DECREF(ap1);
+        return NULL;
+    }
 
     if ((PyArray_NDIM(ap1) > 2) || (PyArray_NDIM(ap2) > 2)) {
+        PyObject *result;
+
         /* This function doesn't handle dimensions greater than 2 -- other
            than to ensure the dot function is altered
         */
@@ -870,11 +1051,18 @@ dotblas_innerproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
             Py_DECREF(tmp1);
             Py_DECREF(tmp2);
         }
-        ret = (PyArrayObject *)PyArray_InnerProduct((PyObject *)ap1,
-                                                    (PyObject *)ap2);
+        if (out != NULL) {
+            result = PyArray_InnerProduct2((PyObject *)ap1,
+                                           (PyObject *)ap2, out);
+        }
+        else {
+            result = PyArray_Return((PyArrayObject *)
+                                    PyArray_InnerProduct((PyObject *)ap1,
+                                                         (PyObject *)ap2));
+        }
         Py_DECREF(ap1);
         Py_DECREF(ap2);
-        return PyArray_Return(ret);
+        return result;
     }
 
     if (PyArray_NDIM(ap1) == 0 || PyArray_NDIM(ap2) == 0) {
@@ -884,6 +1072,11 @@ dotblas_innerproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
             ap1 = ap2;
             ap2 = t;
         }
+        /* The Level 1 BLAS code below runs through ap1 in one go */
+        if ((!PyArray_ISCONTIGUOUS(ap1) || _bad_strides(ap1)) &&
+            _blas_copy(&ap1) < 0) {
+            goto fail;
+        }
         for (l = 1, j = 0; j < PyArray_NDIM(ap1); j++) {
             dimensions[j] = PyArray_DIM(ap1, j);
             l *= dimensions[j];
@@ -908,22 +1101,22 @@ dotblas_innerproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
         }
     }
 
-    /* Choose which subtype to return */
-    prior2 = PyArray_GetPriority((PyObject *)ap2, 0.0);
-    prior1 = PyArray_GetPriority((PyObject *)ap1, 0.0);
-    subtype = (prior2 > prior1 ? Py_TYPE(ap2) : Py_TYPE(ap1));
-
-    ret = (PyArrayObject *)PyArray_New(subtype, nd, dimensions,
-                                       typenum, NULL, NULL, 0, 0,
-                                       (PyObject *)\
-                                       (prior2 > prior1 ? ap2 : ap1));
-
-    if (ret == NULL) goto fail;
-    NPY_BEGIN_ALLOW_THREADS
-    memset(PyArray_BYTES(ret), 0, PyArray_NBYTES(ret));
+    ret = new_array_for_sum(ap1, ap2, out, nd, dimensions, typenum);
+    if (ret == NULL) {
+        goto fail;
+    }
+    if (PyArray_NDIM(ap2) == 0 || PyArray_SIZE(ret) == 0 || l == 0) {
+        memset(PyArray_BYTES(ret), 0, PyArray_NBYTES(ret));
+        if (PyArray_SIZE(ret) == 0 || l == 0) {
+            Py_DECREF(ap1);
+            Py_DECREF(ap2);
+            return _product_return(ret, out);
+        }
+    }
 
     if (PyArray_NDIM(ap2) == 0) {
         /* Multiplication by a scalar -- Level 1 BLAS */
+        NPY_BEGIN_ALLOW_THREADS
         if (typenum == PyArray_DOUBLE) {
             cblas_daxpy(l, *((double *)PyArray_BYTES(ap2)), (double *)PyArray_BYTES(ap1), 1,
                         (double *)PyArray_BYTES(ret), 1);
@@ -940,122 +1133,35 @@ dotblas_innerproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
             cblas_caxpy(l, (float *)PyArray_BYTES(ap2), (float *)PyArray_BYTES(ap1), 1,
                         (float *)PyArray_BYTES(ret), 1);
         }
+        NPY_END_ALLOW_THREADS
     }
     else if (PyArray_NDIM(ap1) == 1 && PyArray_NDIM(ap2) == 1) {
-        /* Dot product between two vectors -- Level 1 BLAS */
-        if (typenum == PyArray_DOUBLE) {
-            double result = cblas_ddot(l, (double *)PyArray_BYTES(ap1), 1,
-                                       (double *)PyArray_BYTES(ap2), 1);
-            *((double *)PyArray_BYTES(ret)) = result;
-        }
-        else if (typenum == PyArray_CDOUBLE) {
-            cblas_zdotu_sub(l, (double *)PyArray_BYTES(ap1), 1,
-                            (double *)PyArray_BYTES(ap2), 1, (double *)PyArray_BYTES(ret));
-        }
-        else if (typenum == PyArray_FLOAT) {
-            float result = cblas_sdot(l, (float *)PyArray_BYTES(ap1), 1,
-                                      (float *)PyArray_BYTES(ap2), 1);
-            *((float *)PyArray_BYTES(ret)) = result;
-        }
-        else if (typenum == PyArray_CFLOAT) {
-            cblas_cdotu_sub(l, (float *)PyArray_BYTES(ap1), 1,
-                            (float *)PyArray_BYTES(ap2), 1, (float *)PyArray_BYTES(ret));
+        /* Dot product between two vectors */
+        if (_blas_dot(typenum, l, &ap1, &ap2, PyArray_BYTES(ret)) < 0) {
+            goto fail;
         }
     }
     else if (PyArray_NDIM(ap1) == 2 && PyArray_NDIM(ap2) == 1) {
-        /* Matrix-vector multiplication -- Level 2 BLAS */
-        lda = (PyArray_DIM(ap1, 1) > 1 ? PyArray_DIM(ap1, 1) : 1);
-        if (typenum == PyArray_DOUBLE) {
-            cblas_dgemv(CblasRowMajor,
-                        CblasNoTrans,  PyArray_DIM(ap1, 0), PyArray_DIM(ap1, 1),
-                        1.0, (double *)PyArray_BYTES(ap1), lda,
-                        (double *)PyArray_BYTES(ap2), 1, 0.0, (double *)PyArray_BYTES(ret), 1);
-        }
-        else if (typenum == PyArray_CDOUBLE) {
-            cblas_zgemv(CblasRowMajor,
-                        CblasNoTrans,  PyArray_DIM(ap1, 0), PyArray_DIM(ap1, 1),
-                        oneD, (double *)PyArray_BYTES(ap1), lda,
-                        (double *)PyArray_BYTES(ap2), 1, zeroD, (double *)PyArray_BYTES(ret), 1);
-        }
-        else if (typenum == PyArray_FLOAT) {
-            cblas_sgemv(CblasRowMajor,
-                        CblasNoTrans,  PyArray_DIM(ap1, 0), PyArray_DIM(ap1, 1),
-                        1.0, (float *)PyArray_BYTES(ap1), lda,
-                        (float *)PyArray_BYTES(ap2), 1, 0.0, (float *)PyArray_BYTES(ret), 1);
-        }
-        else if (typenum == PyArray_CFLOAT) {
-            cblas_cgemv(CblasRowMajor,
-                        CblasNoTrans,  PyArray_DIM(ap1, 0), PyArray_DIM(ap1, 1),
-                        oneF, (float *)PyArray_BYTES(ap1), lda,
-                        (float *)PyArray_BYTES(ap2), 1, zeroF, (float *)PyArray_BYTES(ret), 1);
+        /* Matrix-vector multiplication */
+        if (_blas_gemv(typenum, &ap1, 0, &ap2, PyArray_BYTES(ret)) < 0) {
+            goto fail;
         }
     }
     else if (PyArray_NDIM(ap1) == 1 && PyArray_NDIM(ap2) == 2) {
-        /* Vector matrix multiplication -- Level 2 BLAS */
-        lda = (PyArray_DIM(ap2, 1) > 1 ? PyArray_DIM(ap2, 1) : 1);
-        if (typenum == PyArray_DOUBLE) {
-            cblas_dgemv(CblasRowMajor,
-                        CblasNoTrans,  PyArray_DIM(ap2, 0), PyArray_DIM(ap2, 1),
-                        1.0, (double *)PyArray_BYTES(ap2), lda,
-                        (double *)PyArray_BYTES(ap1), 1, 0.0, (double *)PyArray_BYTES(ret), 1);
-        }
-        else if (typenum == PyArray_CDOUBLE) {
-            cblas_zgemv(CblasRowMajor,
-                        CblasNoTrans,  PyArray_DIM(ap2, 0), PyArray_DIM(ap2, 1),
-                        oneD, (double *)PyArray_BYTES(ap2), lda,
-                        (double *)PyArray_BYTES(ap1), 1, zeroD, (double *)PyArray_BYTES(ret), 1);
-        }
-        else if (typenum == PyArray_FLOAT) {
-            cblas_sgemv(CblasRowMajor,
-                        CblasNoTrans,  PyArray_DIM(ap2, 0), PyArray_DIM(ap2, 1),
-                        1.0, (float *)PyArray_BYTES(ap2), lda,
-                        (float *)PyArray_BYTES(ap1), 1, 0.0, (float *)PyArray_BYTES(ret), 1);
-        }
-        else if (typenum == PyArray_CFLOAT) {
-            cblas_cgemv(CblasRowMajor,
-                        CblasNoTrans,  PyArray_DIM(ap2, 0), PyArray_DIM(ap2, 1),
-                        oneF, (float *)PyArray_BYTES(ap2), lda,
-                        (float *)PyArray_BYTES(ap1), 1, zeroF, (float *)PyArray_BYTES(ret), 1);
+        /* Vector matrix multiplication */
+        if (_blas_gemv(typenum, &ap2, 0, &ap1, PyArray_BYTES(ret)) < 0) {
+            goto fail;
         }
     }
     else { /* (PyArray_NDIM(ap1) == 2 && PyArray_NDIM(ap2) == 2) */
-        /* Matrix matrix multiplication -- Level 3 BLAS */
-        lda = (PyArray_DIM(ap1, 1) > 1 ? PyArray_DIM(ap1, 1) : 1);
-        ldb = (PyArray_DIM(ap2, 1) > 1 ? PyArray_DIM(ap2, 1) : 1);
-        ldc = (PyArray_DIM(ret, 1) > 1 ? PyArray_DIM(ret, 1) : 1);
-        if (typenum == PyArray_DOUBLE) {
-            cblas_dgemm(CblasRowMajor, CblasNoTrans, CblasTrans,
-                        PyArray_DIM(ap1, 0), PyArray_DIM(ap2, 0), PyArray_DIM(ap1, 1),
-                        1.0, (double *)PyArray_BYTES(ap1), lda,
-                        (double *)PyArray_BYTES(ap2), ldb,
-                        0.0, (double *)PyArray_BYTES(ret), ldc);
-        }
-        else if (typenum == PyArray_FLOAT) {
-            cblas_sgemm(CblasRowMajor, CblasNoTrans, CblasTrans,
-                        PyArray_DIM(ap1, 0), PyArray_DIM(ap2, 0), PyArray_DIM(ap1, 1),
-                        1.0, (float *)PyArray_BYTES(ap1), lda,
-                        (float *)PyArray_BYTES(ap2), ldb,
-                        0.0, (float *)PyArray_BYTES(ret), ldc);
-        }
-        else if (typenum == PyArray_CDOUBLE) {
-            cblas_zgemm(CblasRowMajor, CblasNoTrans, CblasTrans,
-                        PyArray_DIM(ap1, 0), PyArray_DIM(ap2, 0), PyArray_DIM(ap1, 1),
-                        oneD, (double *)PyArray_BYTES(ap1), lda,
-                        (double *)PyArray_BYTES(ap2), ldb,
-                        zeroD, (double *)PyArray_BYTES(ret), ldc);
-        }
-        else if (typenum == PyArray_CFLOAT) {
-            cblas_cgemm(CblasRowMajor, CblasNoTrans, CblasTrans,
-                        PyArray_DIM(ap1, 0), PyArray_DIM(ap2, 0), PyArray_DIM(ap1, 1),
-                        oneF, (float *)PyArray_BYTES(ap1), lda,
-                        (float *)PyArray_BYTES(ap2), ldb,
-                        zeroF, (float *)PyArray_BYTES(ret), ldc);
+        /* Matrix matrix multiplication, by the transpose of ap2 */
+        if (_blas_gemm(typenum, &ap1, 0, &ap2, 1, ret) < 0) {
+            goto fail;
         }
     }
-    NPY_END_ALLOW_THREADS
     Py_DECREF(ap1);
     Py_DECREF(ap2);
-    return PyArray_Return(ret);
+    return _product_return(ret, out);
 
  fail:
     Py_XDECREF(ap1);
@@ -1065,6 +1171,7 @@ dotblas_innerproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
 }
 
 
+
 /*
  * vdot(a,b)
  *
@@ -1171,8 +1278,10 @@ static PyObject *dotblas_vdot(PyObject *NPY_UNUSED(dummy), PyObject *args) {
 }
 
 static struct PyMethodDef dotblas_module_methods[] = {
-    {"dot",  (PyCFunction)dotblas_matrixproduct, 1, NULL},
-    {"inner",   (PyCFunction)dotblas_innerproduct,  1, NULL},
+    {"dot",  (PyCFunction)dotblas_matrixproduct,
+        METH_VARARGS | METH_KEYWORDS, NULL},
+    {"inner",   (PyCFunction)dotblas_innerproduct,
+        METH_VARARGS | METH_KEYWORDS, NULL},
     {"vdot", (PyCFunction)dotblas_vdot, 1, NULL},
     {"alterdot", (PyCFunction)dotblas_alterdot, 1, NULL},
     {"restoredot", (PyCFunction)dotblas_restoredot, 1, NULL},
@@ -251,6 +251,8 @@ multiarray_funcs_api = {
     'PyArray_TimedeltaToTimedeltaStruct':   218,
     'PyArray_DatetimeStructToDatetime':     219,
     'PyArray_TimedeltaStructToTimedelta':   220,
+    'PyArray_MatrixProduct2':               221,
+    'PyArray_InnerProduct2':                222,
 }
 
 ufunc_types_api = {
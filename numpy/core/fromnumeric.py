@@ -5,7 +5,8 @@ __docformat__ = "restructuredtext en"
 
 # functions that are now methods
 __all__ = ['take', 'reshape', 'choose', 'repeat', 'put',
-           'swapaxes', 'transpose', 'sort', 'argsort', 'argmax', 'argmin',
+           'swapaxes', 'transpose', 'sort', 'argsort', 'partition',
+           'argpartition', 'argmax', 'argmin',
            'searchsorted', 'alen',
            'resize', 'diagonal', 'trace', 'ravel', 'nonzero', 'shape',
            'compress', 'clip', 'sum', 'product', 'prod', 'sometrue', 'alltrue',
@@ -499,7 +500,7 @@ def sort(a, axis=-1, kind='quicksort', order=None):
     axis : int or None, optional
         Axis along which to sort. If None, the array is flattened before
         sorting. The default is -1, which sorts along the last axis.
-    kind : {'quicksort', 'mergesort', 'heapsort'}, optional
+    kind : {'quicksort', 'mergesort', 'heapsort', 'radix', 'timsort'}, optional
         Sorting algorithm. Default is 'quicksort'.
     order : list, optional
         When `a` is a structured array, this argument specifies which fields
@@ -523,8 +524,7 @@ def sort(a, axis=-1, kind='quicksort', order=None):
     The various sorting algorithms are characterized by their average speed,
     worst case performance, work space size, and whether they are stable. A
     stable sort keeps items with the same key in the same relative
-    order. The three available algorithms have the following
-    properties:
+    order. The available algorithms have the following properties:
 
     =========== ======= ============= ============ =======
        kind      speed   worst case    work space  stable
@@ -532,8 +532,17 @@ def sort(a, axis=-1, kind='quicksort', order=None):
     'quicksort'    1     O(n^2)            0          no
     'mergesort'    2     O(n*log(n))      ~n/2        yes
     'heapsort'     3     O(n*log(n))       0          no
+    'radix'        1     O(n)              n          yes
+    'timsort'      2     O(n*log(n))      ~n/2        yes
     =========== ======= ============= ============ =======
 
+    'radix' sorts on the bytes of the values and is only implemented for
+    the integer, bool and datetime types; it is fastest for large arrays
+    of small integers.  'timsort' takes advantage of runs of data which
+    are already sorted and is close to O(n) for nearly sorted data.  For
+    the types where one of these is not implemented, the stable
+    'mergesort' is used instead.
+
     All the sort algorithms make temporary copies of the data when
     sorting along any but the last axis.  Consequently, sorting along
     the last axis is faster and uses less space than sorting along
@@ -611,7 +620,7 @@ def argsort(a, axis=-1, kind='quicksort', order=None):
     axis : int or None, optional
         Axis along which to sort.  The default is -1 (the last axis). If None,
         the flattened array is used.
-    kind : {'quicksort', 'mergesort', 'heapsort'}, optional
+    kind : {'quicksort', 'mergesort', 'heapsort', 'radix', 'timsort'}, optional
         Sorting algorithm.
     order : list, optional
         When `a` is an array with fields defined, this argument specifies
@@ -681,6 +690,130 @@ def argsort(a, axis=-1, kind='quicksort', order=None):
     return argsort(axis, kind, order)
 
 
+def partition(a, kth, axis=-1, kind='introselect', order=None):
+    """
+    Return a partitioned copy of an array.
+
+    The element in the `kth` position of the copy is the one which would
+    be there if the array were sorted.  All elements before it are smaller
+    than or equal to it and all elements after it are larger than or equal
+    to it.  The order of the elements within the two parts is undefined.
+
+    Parameters
+    ----------
+    a : array_like
+        Array to be partitioned.
+    kth : int or sequence of ints
+        Index of the element to put in its sorted position.  With a
+        sequence, all the elements at those positions are put in their
+        sorted positions at once.  Negative indices count from the end.
+    axis : int or None, optional
+        Axis along which to partition.  If None, the array is flattened
+        first.  The default is -1, the last axis.
+    kind : {'introselect'}, optional
+        Selection algorithm.  Default is 'introselect'.
+    order : list, optional
+        When `a` is a structured array, this argument specifies which fields
+        to compare first, second, and so on.  This list does not need to
+        include all of the fields.
+
+    Returns
+    -------
+    partitioned_array : ndarray
+        Array of the same type and shape as `a`.
+
+    See Also
+    --------
+    ndarray.partition : Method to partition an array in-place.
+    argpartition : Indirect partition.
+    sort : Full sorting.
+
+    Notes
+    -----
+    'introselect' takes O(n) time for each position in `kth`, in the
+    average and the worst case, and needs no work space.  It is much
+    faster than a full sort when only a few order statistics are needed,
+    such as the median or the k smallest elements.  Nans are placed as
+    they would be by `sort`, at the end.
+
+    Examples
+    --------
+    >>> a = np.array([3, 4, 2, 1])
+    >>> np.partition(a, 3)
+    array([2, 1, 3, 4])
+
+    >>> np.partition(a, (1, 3))
+    array([1, 2, 3, 4])
+
+    """
+    if axis is None:
+        a = asanyarray(a).flatten()
+        axis = 0
+    else:
+        a = asanyarray(a).copy()
+    a.partition(kth, axis=axis, kind=kind, order=order)
+    return a
+
+
+def argpartition(a, kth, axis=-1, kind='introselect', order=None):
+    """
+    Returns the indices that would partition an array.
+
+    Performs an indirect partition along the given axis, returning the
+    indices of the data in partitioned order: ``a[index_array]`` has the
+    element which would be in the `kth` position of the sorted array in
+    that position, only smaller or equal elements before it and only
+    larger or equal elements after it.
+
+    Parameters
+    ----------
+    a : array_like
+        Array to partition.
+    kth : int or sequence of ints
+        Index of the element to put in its sorted position.  With a
+        sequence, all the elements at those positions are put in their
+        sorted positions at once.  Negative indices count from the end.
+    axis : int or None, optional
+        Axis along which to partition.  The default is -1 (the last axis).
+        If None, the flattened array is used.
+    kind : {'introselect'}, optional
+        Selection algorithm.  Default is 'introselect'.
+    order : list, optional
+        When `a` is an array with fields defined, this argument specifies
+        which fields to compare first, second, etc.  Not all fields need be
+        specified.
+
+    Returns
+    -------
+    index_array : ndarray, int
+        Array of indices that partition `a` along the specified axis.
+
+    See Also
+    --------
+    partition : Describes the algorithm used.
+    ndarray.partition : Inplace partition.
+    argsort : Full indirect sort.
+
+    Examples
+    --------
+    >>> x = np.array([3, 4, 2, 1])
+    >>> x[np.argpartition(x, 3)]
+    array([2, 1, 3, 4])
+
+    The three smallest elements, in sorted order:
+
+    >>> i = np.argpartition(x, 2)[:3]
+    >>> x[i[np.argsort(x[i])]]
+    array([1, 2, 3])
+
+    """
+    try:
+        argpartition = a.argpartition
+    except AttributeError:
+        return _wrapit(a, 'argpartition', kth, axis, kind, order)
+    return argpartition(kth, axis, kind, order)
+
+
 def argmax(a, axis=None):
     """
     Indices of the maximum values along an axis.
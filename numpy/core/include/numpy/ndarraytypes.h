@@ -64,6 +64,8 @@ typedef NpyArray_FastTakeFunc PyArray_FastTakeFunc;
 typedef NpyArray_FastPutmaskFunc PyArray_FastPutmaskFunc;
 typedef NpyArray_SortFunc PyArray_SortFunc;
 typedef NpyArray_ArgSortFunc PyArray_ArgSortFunc;
+typedef NpyArray_PartitionFunc PyArray_PartitionFunc;
+typedef NpyArray_ArgPartitionFunc PyArray_ArgPartitionFunc;
 typedef NpyArray_CompareFunc PyArray_CompareFunc;
 typedef struct NpyArray_CastFuncsItem PyArray_CastFuncsItem;
 typedef NpyArray_GetItemFunc PyArray_GetItemFunc;
@@ -124,8 +124,13 @@
 #define PyArray_QUICKSORT   NPY_QUICKSORT
 #define PyArray_HEAPSORT    NPY_HEAPSORT
 #define PyArray_MERGESORT   NPY_MERGESORT
+#define PyArray_RADIXSORT   NPY_RADIXSORT
+#define PyArray_TIMSORT     NPY_TIMSORT
 #define PyArray_SORTKIND    NPY_SORTKIND
 #define PyArray_NSORTS      NPY_NSORTS
+#define PyArray_INTROSELECT NPY_INTROSELECT
+#define PyArray_SELECTKIND  NPY_SELECTKIND
+#define PyArray_NSELECTS    NPY_NSELECTS
 
 #define PyArray_NOSCALAR       NPY_NOSCALAR
 #define PyArray_BOOL_SCALAR    NPY_BOOL_SCALAR
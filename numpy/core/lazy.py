@@ -0,0 +1,349 @@
+__all__ = ['lazy']
+
+import numeric as _nx
+from numeric import asanyarray, empty
+import umath as um
+
+def _broadcast_shape(shapes):
+    """Return the shape that `shapes` broadcast to."""
+    nd = max([len(s) for s in shapes] + [0])
+    result = [1]*nd
+    for s in shapes:
+        off = nd - len(s)
+        for j, n in enumerate(s):
+            m = result[off+j]
+            if m == 1:
+                result[off+j] = n
+            elif n != 1 and n != m:
+                raise ValueError("shape mismatch: objects cannot be "
+                                 "broadcast to a single shape")
+    return tuple(result)
+
+def _blocks(shape, bufsize):
+    """
+    Split `shape` into blocks of at most `bufsize` elements.
+
+    Yields index tuples covering an array of the given shape in C order.
+    The trailing axes which fit in `bufsize` are taken whole, the next one
+    is split and the leading ones are iterated over one index at a time.
+    """
+    nd = len(shape)
+    if nd == 0:
+        yield ()
+        return
+    inner = 1
+    k = nd - 1
+    while k > 0 and inner*shape[k] <= bufsize:
+        inner *= shape[k]
+        k -= 1
+    step = max(1, bufsize // inner)
+    rest = (slice(None),)*(nd - k - 1)
+    outer = [0]*k
+    while True:
+        for start in range(0, shape[k], step):
+            yield tuple(outer) + (slice(start, start + step),) + rest
+        j = k - 1
+        while j >= 0:
+            outer[j] += 1
+            if outer[j] < shape[j]:
+                break
+            outer[j] = 0
+            j -= 1
+        if j < 0:
+            return
+
+def _leaf_index(leafshape, shape, index):
+    """Translate a block `index` of `shape` to an operand of `leafshape`."""
+    off = len(shape) - len(leafshape)
+    result = []
+    for j, n in enumerate(leafshape):
+        i = index[off+j]
+        if n == 1 and shape[off+j] != 1:
+            if isinstance(i, slice):
+                i = slice(None)
+            else:
+                i = 0
+        result.append(i)
+    return tuple(result)
+
+
+class lazy(object):
+    """
+    lazy(obj) or lazy(ufunc, *args)
+
+    Deferred evaluation of an expression built from ufuncs.
+
+    Arithmetic on a `lazy` object does not compute anything; it records
+    the ufunc calls in a graph.  When `evaluate` is called the whole
+    expression is computed in blocks of `getbufsize` elements: every
+    intermediate result lives in a buffer of one block, which is reused
+    for the following blocks, so only the final output is allocated at
+    full size.  This avoids the full size temporary created by each
+    operator of an expression such as ``a*b + c*d - e``.
+
+    Parameters
+    ----------
+    obj : array_like or lazy
+        An operand of the expression.  Arrays are referenced, not copied,
+        so changes made to them before `evaluate` is called are seen by
+        the result.
+    ufunc : ufunc
+        A ufunc with a single output, applied lazily to `args`.
+    args : array_like or lazy
+        The inputs of `ufunc`.
+
+    Notes
+    -----
+    The result is the same as evaluating the expression eagerly, with the
+    usual type promotion and broadcasting rules, except that floating
+    point errors are reported once per block.  Subclasses of ndarray
+    among the operands are treated as base class arrays.
+
+    `lazy` objects can be combined with arrays, scalars and other `lazy`
+    objects using the arithmetic, bitwise and comparison operators.  Use
+    ``lazy(ufunc, ...)`` for other ufuncs.
+
+    Examples
+    --------
+    >>> a = np.arange(5.)
+    >>> b = np.ones(5)
+    >>> e = np.lazy(a)*b + np.lazy(np.sqrt, a)
+    >>> e.shape
+    (5,)
+    >>> e.evaluate()
+    array([ 0.        ,  2.        ,  3.41421356,  4.73205081,  6.        ])
+
+    """
+    __array_priority__ = 20.0
+
+    def __init__(self, obj, *args):
+        if isinstance(obj, _nx.ufunc):
+            if obj.nout != 1:
+                raise TypeError("only ufuncs with a single output can be "
+                                "evaluated lazily")
+            if len(args) != obj.nin:
+                raise TypeError("%s takes %d arguments, %d given" %
+                                (obj.__name__, obj.nin, len(args)))
+            self._ufunc = obj
+            self._args = tuple([_operand(x) for x in args])
+        elif args:
+            raise TypeError("lazy() takes a single operand unless the "
+                            "first argument is a ufunc")
+        elif isinstance(obj, lazy):
+            self._ufunc = obj._ufunc
+            self._args = obj._args
+        else:
+            if not _nx.isscalar(obj):
+                obj = asanyarray(obj)
+            self._ufunc = None
+            self._args = (obj,)
+        self._probe = None
+
+    def _leaf(self):
+        return self._args[0]
+
+    def _nodes(self):
+        """Return the ufunc nodes of the graph, inputs before users."""
+        order = []
+        state = {}
+        stack = [self]
+        while stack:
+            node = stack[-1]
+            if node._ufunc is None or state.get(id(node)) == 2:
+                stack.pop()
+            elif id(node) not in state:
+                state[id(node)] = 1
+                for x in reversed(node._args):
+                    if id(x) not in state:
+                        stack.append(x)
+            else:
+                state[id(node)] = 2
+                order.append(node)
+                stack.pop()
+        return order
+
+    def _leaves(self):
+        leaves = {}
+        if self._ufunc is None:
+            leaves[id(self)] = self
+        for node in self._nodes():
+            for x in node._args:
+                if x._ufunc is None:
+                    leaves[id(x)] = x
+        return leaves.values()
+
+    def _value(self):
+        """
+        Evaluate the graph on empty arrays.  This checks that the ufuncs
+        accept their inputs and gives the type of every result.
+        """
+        if self._probe is None:
+            values = {}
+            for x in self._leaves():
+                leaf = x._leaf()
+                if _nx.ndim(leaf) > 0:
+                    leaf = empty(0, dtype=leaf.dtype)
+                values[id(x)] = leaf
+            for node in self._nodes():
+                if node._probe is None:
+                    args = [values[id(x)] for x in node._args]
+                    node._probe = node._ufunc(*args)
+                values[id(node)] = node._probe
+            self._probe = values[id(self)]
+        return self._probe
+
+    def shape(self):
+        shapes = [_nx.shape(x._leaf()) for x in self._leaves()]
+        return _broadcast_shape(shapes)
+    shape = property(shape, doc="Shape of the result.")
+
+    def ndim(self):
+        return len(self.shape)
+    ndim = property(ndim, doc="Number of dimensions of the result.")
+
+    def dtype(self):
+        return _nx.asarray(self._value()).dtype
+    dtype = property(dtype, doc="Data-type of the result.")
+
+    def evaluate(self, out=None):
+        """
+        Compute the expression.
+
+        Parameters
+        ----------
+        out : ndarray, optional
+            Array of the shape of the result to store it in.  The values
+            are cast to its type by the last ufunc of the expression.
+
+        Returns
+        -------
+        out : ndarray
+            The result of the expression.
+
+        """
+        shape = self.shape
+        if out is None:
+            out = empty(shape, dtype=self.dtype)
+        elif out.shape != shape:
+            raise ValueError("output array has the wrong shape")
+        if self._ufunc is None:
+            out[...] = self._leaf()
+            return out
+        if out.size == 0:
+            return out
+
+        # Give every intermediate result a buffer of one block, reusing
+        # the buffers of results which are no longer needed.
+        bufsize = _nx.getbufsize()
+        nodes = self._nodes()
+        users = {}
+        for node in nodes:
+            for x in node._args:
+                users[id(x)] = users.get(id(x), 0) + 1
+        buffers = []
+        free = {}
+        assigned = {}
+        for node in nodes[:-1]:
+            dt = node.dtype
+            if free.get(dt):
+                assigned[id(node)] = free[dt].pop()
+            else:
+                assigned[id(node)] = len(buffers)
+                buffers.append(empty(bufsize, dtype=dt))
+            for x in node._args:
+                if x._ufunc is not None:
+                    users[id(x)] -= 1
+                    if users[id(x)] == 0:
+                        i = assigned[id(x)]
+                        free.setdefault(buffers[i].dtype, []).append(i)
+
+        leaves = self._leaves()
+        for index in _blocks(shape, bufsize):
+            values = {}
+            for x in leaves:
+                leaf = x._leaf()
+                if _nx.ndim(leaf) > 0:
+                    leaf = leaf[_leaf_index(leaf.shape, shape, index)]
+                values[id(x)] = leaf
+            for node in nodes[:-1]:
+                args = [values[id(x)] for x in node._args]
+                bshape = _broadcast_shape([_nx.shape(x) for x in args])
+                n = 1
+                for m in bshape:
+                    n *= m
+                result = buffers[assigned[id(node)]][:n].reshape(bshape)
+                values[id(node)] = node._ufunc(*(args + [result]))
+            args = [values[id(x)] for x in self._args]
+            self._ufunc(*(args + [out[index or Ellipsis]]))
+        return out
+
+    def __repr__(self):
+        if self._ufunc is None:
+            leaf = self._leaf()
+            if _nx.ndim(leaf) == 0:
+                return repr(leaf)
+            return "<%s array %s>" % (leaf.dtype, leaf.shape)
+        args = [repr(x) for x in self._args]
+        return "%s(%s)" % (self._ufunc.__name__, ", ".join(args))
+
+    def _binary(ufunc, reflected=False):
+        if reflected:
+            def method(self, other):
+                return lazy(ufunc, other, self)
+        else:
+            def method(self, other):
+                return lazy(ufunc, self, other)
+        return method
+
+    __add__ = _binary(um.add)
+    __radd__ = _binary(um.add, True)
+    __sub__ = _binary(um.subtract)
+    __rsub__ = _binary(um.subtract, True)
+    __mul__ = _binary(um.multiply)
+    __rmul__ = _binary(um.multiply, True)
+    __div__ = _binary(um.divide)
+    __rdiv__ = _binary(um.divide, True)
+    __truediv__ = _binary(um.true_divide)
+    __rtruediv__ = _binary(um.true_divide, True)
+    __floordiv__ = _binary(um.floor_divide)
+    __rfloordiv__ = _binary(um.floor_divide, True)
+    __mod__ = _binary(um.remainder)
+    __rmod__ = _binary(um.remainder, True)
+    __pow__ = _binary(um.power)
+    __rpow__ = _binary(um.power, True)
+    __and__ = _binary(um.bitwise_and)
+    __rand__ = _binary(um.bitwise_and, True)
+    __or__ = _binary(um.bitwise_or)
+    __ror__ = _binary(um.bitwise_or, True)
+    __xor__ = _binary(um.bitwise_xor)
+    __rxor__ = _binary(um.bitwise_xor, True)
+    __lshift__ = _binary(um.left_shift)
+    __rlshift__ = _binary(um.left_shift, True)
+    __rshift__ = _binary(um.right_shift)
+    __rrshift__ = _binary(um.right_shift, True)
+    __lt__ = _binary(um.less)
+    __le__ = _binary(um.less_equal)
+    __eq__ = _binary(um.equal)
+    __ne__ = _binary(um.not_equal)
+    __gt__ = _binary(um.greater)
+    __ge__ = _binary(um.greater_equal)
+    del _binary
+
+    __hash__ = None
+
+    def __neg__(self):
+        return lazy(um.negative, self)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return lazy(um.absolute, self)
+
+    def __invert__(self):
+        return lazy(um.invert, self)
+
+def _operand(x):
+    if isinstance(x, lazy):
+        return x
+    return lazy(x)
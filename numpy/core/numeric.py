@@ -20,6 +20,10 @@ __all__ = ['newaxis', 'ndarray', 'flatiter', 'ufunc',
            'load', 'loads', 'isscalar', 'binary_repr', 'base_repr',
            'ones', 'identity', 'allclose', 'compare_chararrays', 'putmask',
            'seterr', 'geterr', 'setbufsize', 'getbufsize',
+           'setnumthreads', 'getnumthreads',
+           'setthreadthreshold', 'getthreadthreshold',
+           'setpairwise', 'getpairwise',
+           'setdatamem', 'getdatamem', 'datamemstats',
            'seterrcall', 'geterrcall', 'errstate', 'flatnonzero',
            'Inf', 'inf', 'infty', 'Infinity',
            'nan', 'NaN', 'False_', 'True_', 'bitwise_not',
@@ -32,6 +36,7 @@ if sys.platform == 'cli':
 set_numeric_ops can_cast
 array2string get_printoptions set_printoptions
 set_string_function compare_chararrays
+setdatamem getdatamem datamemstats
 bitwise_not CLIP RAISE WRAP MAXDIMS BUFSIZE ALLOW_THREADS
              '''.split():
         __all__.remove(n)
@@ -900,7 +905,7 @@ except ImportError:
     def restoredot():
         pass
 
-def tensordot(a, b, axes=2):
+def tensordot(a, b, axes=2, out=None):
     """
     Compute tensor dot product along specified axes for arrays >= 1-D.
 
@@ -927,6 +932,10 @@ def tensordot(a, b, axes=2):
       Axes to be summed over, first sequence applying to ``a``, second
       to ``b``.
 
+    out : ndarray, optional
+        C-contiguous array of the type and shape of the result to store
+        it in.  It is returned.
+
     See Also
     --------
     numpy.dot
@@ -1071,10 +1080,26 @@ def tensordot(a, b, axes=2):
     newshape_b = (N2, -1)
     oldb = [bs[axis] for axis in notin]
 
+    # These are views unless the axes to sum over cannot be flattened;
+    # dot handles transposed and strided operands itself.
     at = a.transpose(newaxes_a).reshape(newshape_a)
     bt = b.transpose(newaxes_b).reshape(newshape_b)
-    res = dot(at, bt)
-    return res.reshape(olda + oldb)
+    if out is None:
+        res = dot(at, bt)
+        return res.reshape(olda + oldb)
+    if not isinstance(out, ndarray):
+        raise TypeError("out must be an ndarray")
+    if out.shape != tuple(olda + oldb):
+        raise ValueError, "output array has wrong dimensions"
+    # dot makes the same check, but the reshaped view below needs it first
+    flags = out.flags
+    if not (flags.c_contiguous and flags.aligned and flags.writeable):
+        raise ValueError("output array is not acceptable (must have the "
+                         "right type, nr dimensions, and be a C-Array)")
+    res = out.view()
+    res.shape = (at.shape[0], bt.shape[1])
+    dot(at, bt, out=res)
+    return out
 
 def roll(a, shift, axis=None):
     """
@@ -2217,6 +2242,187 @@ def getbufsize():
     """
     return umath.geterrobj()[0]
 
+def setnumthreads(n):
+    """
+    Set the number of threads used to evaluate large ufunc loops.
+
+    Loops over at least `getthreadthreshold` elements are split into
+    contiguous pieces which are evaluated in parallel.  Loops over object
+    arrays always run in the calling thread.  The initial value is taken
+    from the ``NPY_NUM_THREADS`` environment variable and defaults to 1,
+    which disables threading.
+
+    Parameters
+    ----------
+    n : int
+        Number of threads, including the calling thread.
+
+    Returns
+    -------
+    old : int
+        The previous number of threads.
+
+    See Also
+    --------
+    getnumthreads, setthreadthreshold
+
+    """
+    return umath.setnumthreads(n)
+
+def getnumthreads():
+    """Return the number of threads used to evaluate large ufunc loops.
+    """
+    return umath.getnumthreads()
+
+def setthreadthreshold(size):
+    """
+    Set the number of elements below which ufunc loops are not threaded.
+
+    Parameters
+    ----------
+    size : int
+        Minimum number of elements a loop must have to be split between
+        threads.
+
+    Returns
+    -------
+    old : int
+        The previous threshold.
+
+    """
+    return umath.setthreadthreshold(size)
+
+def getthreadthreshold():
+    """Return the number of elements below which ufunc loops are not threaded.
+    """
+    return umath.getthreadthreshold()
+
+def setpairwise(flag):
+    """
+    Set whether reductions use a pairwise order of evaluation.
+
+    When set, the ``reduce`` method of associative ufuncs (`add`,
+    `multiply`, `maximum`, `logical_and`, ...) combines the elements of
+    each row as a balanced tree of blocks instead of from left to right.
+    Pairwise summation is more accurate than the naive order, and the
+    result is the same for any number of threads (see `setnumthreads`).
+    Without it, reductions split between threads may give slightly
+    different floating point results for different thread counts.
+
+    Parameters
+    ----------
+    flag : bool
+        True to use the pairwise order.
+
+    Returns
+    -------
+    old : bool
+        The previous setting.
+
+    See Also
+    --------
+    getpairwise, setnumthreads
+
+    Examples
+    --------
+    >>> old = np.setpairwise(True)
+    >>> np.add.reduce(np.ones(1000))
+    1000.0
+    >>> np.setpairwise(old)
+    True
+
+    """
+    return umath.setpairwise(flag)
+
+def getpairwise():
+    """Return whether reductions use a pairwise order of evaluation.
+    """
+    return umath.getpairwise()
+
+def setdatamem(alignment=None, poolsize=None, hugepages=None):
+    """
+    Set how memory for array data is allocated.
+
+    Array data is allocated in blocks aligned to `alignment` bytes.
+    Blocks of up to 1 MB are rounded up to one of a set of size classes
+    and, when they are freed, kept for reuse by later allocations of the
+    same class, up to a total of `poolsize` bytes.  Arguments which are
+    not given are left unchanged.  The initial values can be set with the
+    ``NPY_DATAMEM_ALIGNMENT``, ``NPY_DATAMEM_POOLSIZE`` and
+    ``NPY_DATAMEM_HUGEPAGES`` environment variables.
+
+    Parameters
+    ----------
+    alignment : int, optional
+        Alignment of new blocks in bytes, a power of two no larger than
+        4096.  The default is 64, the size of a cache line.
+    poolsize : int, optional
+        Maximum number of bytes kept for reuse.  0 disables reuse and
+        releases the blocks currently kept.
+    hugepages : int, optional
+        Size in bytes from which blocks are mapped separately and marked
+        for transparent huge pages, where the platform supports it.  0,
+        the default, disables huge pages.
+
+    Returns
+    -------
+    old : dict
+        The previous settings.
+
+    See Also
+    --------
+    getdatamem, datamemstats
+
+    Examples
+    --------
+    >>> old = np.setdatamem(alignment=128)
+    >>> np.getdatamem()['alignment']
+    128
+    >>> np.setdatamem(**old)['alignment']
+    128
+
+    """
+    def _value(x):
+        if x is None:
+            return -1
+        if x < 0:
+            raise ValueError("memory settings cannot be negative")
+        return x
+    old = multiarray.setdatamem(_value(alignment), _value(poolsize),
+                                _value(hugepages))
+    return dict(zip(['alignment', 'poolsize', 'hugepages'], old))
+
+def getdatamem():
+    """Return the settings used to allocate array data, see `setdatamem`.
+    """
+    old = multiarray.setdatamem(-1, -1, -1)
+    return dict(zip(['alignment', 'poolsize', 'hugepages'], old))
+
+def datamemstats():
+    """
+    Return statistics on the memory allocated for array data.
+
+    Returns
+    -------
+    stats : dict
+        The keys are
+
+        - 'nalloc', 'nfree': number of blocks allocated and freed.
+        - 'pool_hits': allocations which reused a kept block.
+        - 'pool_misses': allocations of a size which can be kept, but
+          which found no block to reuse.
+        - 'nhuge': number of blocks mapped with huge pages.
+        - 'inuse': number of bytes currently allocated.
+        - 'peak': largest value reached by 'inuse'.
+        - 'cached': number of bytes kept for reuse.
+
+    See Also
+    --------
+    setdatamem
+
+    """
+    return multiarray.datamemstats()
+
 def seterrcall(func):
     """
     Set the floating-point error callback function or log object.
@@ -306,6 +306,12 @@ PyArray_SortkindConverter(PyObject *obj, NPY_SORTKIND *sortkind)
     else if (str[0] == 'm' || str[0] == 'M') {
         *sortkind = PyArray_MERGESORT;
     }
+    else if (str[0] == 'r' || str[0] == 'R') {
+        *sortkind = PyArray_RADIXSORT;
+    }
+    else if (str[0] == 't' || str[0] == 'T') {
+        *sortkind = PyArray_TIMSORT;
+    }
     else {
         PyErr_Format(PyExc_ValueError,
                      "%s is an unrecognized kind of sort",
@@ -317,6 +323,36 @@ PyArray_SortkindConverter(PyObject *obj, NPY_SORTKIND *sortkind)
     return PY_SUCCEED;
 }
 
+/*
+ * Convert object to partition kind
+ */
+NPY_NO_EXPORT int
+PyArray_SelectkindConverter(PyObject *obj, NPY_SELECTKIND *selectkind)
+{
+    char *str;
+    PyObject *tmp = NULL;
+
+    if (PyUnicode_Check(obj)) {
+        obj = tmp = PyUnicode_AsASCIIString(obj);
+    }
+
+    *selectkind = NPY_INTROSELECT;
+    str = PyBytes_AsString(obj);
+    if (!str) {
+        Py_XDECREF(tmp);
+        return PY_FAIL;
+    }
+    if (strcmp(str, "introselect") != 0) {
+        PyErr_Format(PyExc_ValueError,
+                     "%s is an unrecognized kind of partition",
+                     str);
+        Py_XDECREF(tmp);
+        return PY_FAIL;
+    }
+    Py_XDECREF(tmp);
+    return PY_SUCCEED;
+}
+
 /*NUMPY_API
  * Convert object to searchsorted side
  */
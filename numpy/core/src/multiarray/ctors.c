@@ -2311,7 +2311,7 @@ PyArray_FromIterUnwrap(PyObject *obj, NpyArray_Descr *dtype, intp count)
             */
             elcount = (i >> 1) + (i < 4 ? 4 : 2) + i;
             if (elcount <= NPY_MAX_INTP/elsize) {
-                new_data = PyDataMem_RENEW(PyArray_BYTES(ret),
+                new_data = NpyDataMem_RENEW(PyArray_BYTES(ret),
                                            elcount * elsize);
             }
             else {
@@ -2348,7 +2348,7 @@ PyArray_FromIterUnwrap(PyObject *obj, NpyArray_Descr *dtype, intp count)
     if (i == 0) {
         i = 1;
     }
-    new_data = PyDataMem_RENEW(PyArray_BYTES(ret), i * elsize);
+    new_data = NpyDataMem_RENEW(PyArray_BYTES(ret), i * elsize);
     if (new_data == NULL) {
         PyErr_SetString(PyExc_MemoryError, "cannot allocate array memory");
         goto done;
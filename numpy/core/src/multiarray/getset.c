@@ -259,7 +259,7 @@ array_data_set(PyArrayObject *self, PyObject *op)
     }
     if (PyArray_FLAGS(self) & OWNDATA) {
         PyArray_XDECREF(self);
-        PyDataMem_FREE(PyArray_BYTES(self));
+        NpyDataMem_FREE(PyArray_BYTES(self));
     }
     if (PyArray_BASE_ARRAY(self)) {
         if (PyArray_FLAGS(self) & UPDATEIFCOPY) {
@@ -20,6 +20,7 @@
 #include "descriptor.h"
 #include "arrayobject.h"
 
+#include "conversion_utils.h"
 #include "methods.h"
 
 
@@ -970,6 +971,48 @@ array_choose(PyArrayObject *self, PyObject *args, PyObject *kwds)
     return _ARET(PyArray_Choose(self, choices, out, clipmode));
 }
 
+/*
+ * Replaces the descriptor of self by one with the fields in the given
+ * order, for sorting structured arrays.  Returns the original descriptor,
+ * to be put back with _restore_order, or NULL on error.
+ */
+static NpyArray_Descr *
+_apply_order(PyArrayObject *self, PyObject *order)
+{
+    NpyArray_Descr *newd, *saved;
+    PyObject *new_name;
+    PyObject *_numpy_internal;
+
+    saved = PyArray_DESCR(self);
+    if (saved->names == NULL) {
+        PyErr_SetString(PyExc_ValueError, "Cannot specify " \
+                        "order when the array has no fields.");
+        return NULL;
+    }
+    _numpy_internal = PyImport_ImportModule("numpy.core._internal");
+    if (_numpy_internal == NULL) {
+        return NULL;
+    }
+    new_name = PyObject_CallMethod(_numpy_internal, "_newnames",
+                                   "OO", Npy_INTERFACE(saved), order);
+    Py_DECREF(_numpy_internal);
+    if (new_name == NULL) {
+        return NULL;
+    }
+    newd = NpyArray_DescrNew(saved);
+    NpyArray_DescrSetNames(newd, arraydescr_seq_to_nameslist(new_name));
+    PyArray_DESCR(self) = newd;
+    Py_DECREF(new_name);
+    return saved;
+}
+
+static void
+_restore_order(PyArrayObject *self, NpyArray_Descr *saved)
+{
+    Npy_XDECREF(PyArray_DESCR(self));
+    PyArray_DESCR(self) = saved;
+}
+
 static PyObject *
 array_sort(PyArrayObject *self, PyObject *args, PyObject *kwds)
 {
@@ -977,7 +1020,7 @@ array_sort(PyArrayObject *self, PyObject *args, PyObject *kwds)
     int val;
     PyArray_SORTKIND which = PyArray_QUICKSORT;
     PyObject *order = NULL;
-    PyArray_Descr *saved = NULL;
+    NpyArray_Descr *saved = NULL;
     static char *kwlist[] = {"axis", "kind", "order", NULL};
 
     if (!PyArg_ParseTupleAndKeywords(args, kwds, "|iO&O", kwlist, &axis,
@@ -989,37 +1032,15 @@ array_sort(PyArrayObject *self, PyObject *args, PyObject *kwds)
         order = NULL;
     }
     if (order != NULL) {
-        NpyArray_Descr *newd;
-        PyObject *new_name;
-        PyObject *_numpy_internal;
-        saved = PyArray_Descr_WRAP(PyArray_DESCR(self));
-        if (saved->descr->names == NULL) {
-            PyErr_SetString(PyExc_ValueError, "Cannot specify " \
-                            "order when the array has no fields.");
-            return NULL;
-        }
-        _numpy_internal = PyImport_ImportModule("numpy.core._internal");
-        if (_numpy_internal == NULL) {
-            return NULL;
-        }
-        new_name = PyObject_CallMethod(_numpy_internal, "_newnames",
-                                       "OO", saved, order);
-        Py_DECREF(_numpy_internal);
-        if (new_name == NULL) {
+        saved = _apply_order(self, order);
+        if (saved == NULL) {
             return NULL;
         }
-        
-        /* Notice, switching from PyArrayDescr to NpyArrayDescr usage */
-        newd = NpyArray_DescrNew(saved->descr);
-        NpyArray_DescrSetNames(newd, arraydescr_seq_to_nameslist(new_name));
-        PyArray_DESCR(self) = newd;
-        Py_DECREF(new_name);
     }
 
     val = PyArray_Sort(self, axis, which);
     if (order != NULL) {
-        Npy_XDECREF(PyArray_DESCR(self));
-        PyArray_DESCR(self) = saved->descr;
+        _restore_order(self, saved);
     }
     if (val < 0) {
         return NULL;
@@ -1034,7 +1055,7 @@ array_argsort(PyArrayObject *self, PyObject *args, PyObject *kwds)
     int axis = -1;
     PyArray_SORTKIND which = PyArray_QUICKSORT;
     PyObject *order = NULL, *res;
-    NpyArray_Descr *newd, *saved=NULL;
+    NpyArray_Descr *saved = NULL;
     static char *kwlist[] = {"axis", "kind", "order", NULL};
 
     if (!PyArg_ParseTupleAndKeywords(args, kwds, "|O&O&O", kwlist,
@@ -1047,41 +1068,107 @@ array_argsort(PyArrayObject *self, PyObject *args, PyObject *kwds)
         order = NULL;
     }
     if (order != NULL) {
-        PyObject *new_name;
-        PyObject *_numpy_internal;
-        char** new_names;
-        int result;
-        saved = PyArray_DESCR(self);
-        if (saved->names == NULL) {
-            PyErr_SetString(PyExc_ValueError, "Cannot specify " \
-                            "order when the array has no fields.");
+        saved = _apply_order(self, order);
+        if (saved == NULL) {
             return NULL;
         }
-        _numpy_internal = PyImport_ImportModule("numpy.core._internal");
-        if (_numpy_internal == NULL) {
+    }
+
+    res = PyArray_ArgSort(self, axis, which);
+    if (order != NULL) {
+        _restore_order(self, saved);
+    }
+    return _ARET(res);
+}
+
+static PyObject *
+array_partition(PyArrayObject *self, PyObject *args, PyObject *kwds)
+{
+    int axis = -1;
+    int val;
+    NPY_SELECTKIND which = NPY_INTROSELECT;
+    PyObject *kthobj, *order = NULL;
+    PyArrayObject *ktharray;
+    NpyArray_Descr *saved = NULL;
+    static char *kwlist[] = {"kth", "axis", "kind", "order", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|iO&O", kwlist, &kthobj,
+                                     &axis,
+                                     PyArray_SelectkindConverter, &which,
+                                     &order)) {
+        return NULL;
+    }
+    ktharray = (PyArrayObject *)PyArray_FromAny(kthobj,
+                                    PyArray_DescrFromType(PyArray_INTP),
+                                    0, 1, NPY_DEFAULT, NULL);
+    if (ktharray == NULL) {
+        return NULL;
+    }
+    if (order == Py_None) {
+        order = NULL;
+    }
+    if (order != NULL) {
+        saved = _apply_order(self, order);
+        if (saved == NULL) {
+            Py_DECREF(ktharray);
             return NULL;
         }
-        new_name = PyObject_CallMethod(_numpy_internal, "_newnames",
-                                       "OO", Npy_INTERFACE(saved), order);
-        Py_DECREF(_numpy_internal);
-        if (new_name == NULL) {
+    }
+
+    val = NpyArray_Partition(PyArray_ARRAY(self), PyArray_ARRAY(ktharray),
+                             axis, which);
+    Py_DECREF(ktharray);
+    if (order != NULL) {
+        _restore_order(self, saved);
+    }
+    if (val < 0) {
+        return NULL;
+    }
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+static PyObject *
+array_argpartition(PyArrayObject *self, PyObject *args, PyObject *kwds)
+{
+    int axis = -1;
+    NPY_SELECTKIND which = NPY_INTROSELECT;
+    PyObject *kthobj, *order = NULL;
+    PyArrayObject *ktharray;
+    NpyArray_Descr *saved = NULL;
+    NpyArray *res;
+    static char *kwlist[] = {"kth", "axis", "kind", "order", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|O&O&O", kwlist, &kthobj,
+                                     PyArray_AxisConverter, &axis,
+                                     PyArray_SelectkindConverter, &which,
+                                     &order)) {
+        return NULL;
+    }
+    ktharray = (PyArrayObject *)PyArray_FromAny(kthobj,
+                                    PyArray_DescrFromType(PyArray_INTP),
+                                    0, 1, NPY_DEFAULT, NULL);
+    if (ktharray == NULL) {
+        return NULL;
+    }
+    if (order == Py_None) {
+        order = NULL;
+    }
+    if (order != NULL) {
+        saved = _apply_order(self, order);
+        if (saved == NULL) {
+            Py_DECREF(ktharray);
             return NULL;
         }
-        newd = NpyArray_DescrNew(saved);
-        new_names = arraydescr_seq_to_nameslist(new_name);
-        result = NpyArray_DescrReplaceNames(newd, new_names);
-        /* The replace should not fail. */
-        assert(result != 0);
-        PyArray_DESCR(self) = newd;
-        Py_DECREF(new_name);
     }
 
-    res = PyArray_ArgSort(self, axis, which);
+    res = NpyArray_ArgPartition(PyArray_ARRAY(self), PyArray_ARRAY(ktharray),
+                                axis, which);
+    Py_DECREF(ktharray);
     if (order != NULL) {
-        Npy_XDECREF(PyArray_DESCR(self));
-        PyArray_DESCR(self) = saved;
+        _restore_order(self, saved);
     }
-    return _ARET(res);
+    RETURN_PYARRAY(res);
 }
 
 static PyObject *
@@ -1394,7 +1481,7 @@ array_setstate(PyArrayObject *self, PyObject *args)
 
     if ((PyArray_FLAGS(self) & OWNDATA)) {
         if (PyArray_BYTES(self) != NULL) {
-            PyDataMem_FREE(PyArray_BYTES(self));
+            NpyDataMem_FREE(PyArray_BYTES(self));
         }
         PyArray_FLAGS(self) &= ~OWNDATA;
     }
@@ -1429,7 +1516,7 @@ array_setstate(PyArrayObject *self, PyObject *args)
         PyArray_BYTES(self) = datastr;
         if (!_IsAligned(self) || swap) {
             intp num = PyArray_NBYTES(self);
-            PyArray_BYTES(self) = PyDataMem_NEW(num);
+            PyArray_BYTES(self) = NpyDataMem_NEW(num);
             if (PyArray_BYTES(self) == NULL) {
                 PyArray_NDIM(self) = 0;
                 PyDimMem_FREE(PyArray_DIMS(self));
@@ -1472,10 +1559,10 @@ array_setstate(PyArrayObject *self, PyObject *args)
         }
     }
     else {
-        PyArray_BYTES(self) = PyDataMem_NEW(PyArray_NBYTES(self));
+        PyArray_BYTES(self) = NpyDataMem_NEW(PyArray_NBYTES(self));
         if (PyArray_BYTES(self) == NULL) {
             PyArray_NDIM(self) = 0;
-            PyArray_BYTES(self) = PyDataMem_NEW(PyArray_ITEMSIZE(self));
+            PyArray_BYTES(self) = NpyDataMem_NEW(PyArray_ITEMSIZE(self));
             if (PyArray_DIMS(self)) {
                 PyDimMem_FREE(PyArray_DIMS(self));
             }
@@ -1761,10 +1848,11 @@ array_cumprod(PyArrayObject *self, PyObject *args, PyObject *kwds)
 static PyObject *
 array_dot(PyArrayObject *self, PyObject *args, PyObject *kwds)
 {
-    PyObject *b;
+    PyObject *b, *out = Py_None;
     static PyObject *numpycore = NULL;
+    static char *kwlist[] = {"b", "out", NULL};
 
-    if (!PyArg_ParseTuple(args, "O", &b)) {
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|O", kwlist, &b, &out)) {
         return NULL;
     }
 
@@ -1777,7 +1865,10 @@ array_dot(PyArrayObject *self, PyObject *args, PyObject *kwds)
         }
     }
 
-    return PyObject_CallMethod(numpycore, "dot", "OO", self, b);
+    if (out == Py_None) {
+        return PyObject_CallMethod(numpycore, "dot", "OO", self, b);
+    }
+    return PyObject_CallMethod(numpycore, "dot", "OOO", self, b, out);
 }
 
 
@@ -2147,6 +2238,9 @@ NPY_NO_EXPORT PyMethodDef array_methods[] = {
     {"argmin",
         (PyCFunction)array_argmin,
         METH_VARARGS | METH_KEYWORDS, NULL},
+    {"argpartition",
+        (PyCFunction)array_argpartition,
+        METH_VARARGS | METH_KEYWORDS, NULL},
     {"argsort",
         (PyCFunction)array_argsort,
         METH_VARARGS | METH_KEYWORDS, NULL},
@@ -2185,7 +2279,7 @@ NPY_NO_EXPORT PyMethodDef array_methods[] = {
         METH_VARARGS | METH_KEYWORDS, NULL},
     {"dot",
         (PyCFunction)array_dot,
-        METH_VARARGS, NULL},
+        METH_VARARGS | METH_KEYWORDS, NULL},
     {"fill",
         (PyCFunction)array_fill,
         METH_VARARGS, NULL},
@@ -2216,6 +2310,9 @@ NPY_NO_EXPORT PyMethodDef array_methods[] = {
     {"nonzero",
         (PyCFunction)array_nonzero,
         METH_VARARGS, NULL},
+    {"partition",
+        (PyCFunction)array_partition,
+        METH_VARARGS | METH_KEYWORDS, NULL},
     {"prod",
         (PyCFunction)array_prod,
         METH_VARARGS | METH_KEYWORDS, NULL},
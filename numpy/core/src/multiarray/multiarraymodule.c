@@ -431,59 +431,85 @@ PyArray_CanCoerceScalar(int thistype, int neededtype,
 
 /* Could perhaps be redone to not make contiguous arrays */
 
-/*NUMPY_API
- * Numeric.innerproduct(a,v)
+/*
+ * Converts op1 and op2 to arrays of their common type for inner or dot.
+ * Returns 1 and stores the product to *ret if one of them is a scalar,
+ * 0 if they are converted and -1 on error.
  */
-NPY_NO_EXPORT PyObject *
-PyArray_InnerProduct(PyObject *op1, PyObject *op2)
+static int
+_product_operands(PyObject *op1, PyObject *op2, PyArrayObject *out,
+                  PyArrayObject **ap1, PyArrayObject **ap2, int *typenum,
+                  PyObject **ret)
 {
-    /* TODO: wrap return value. */
-    PyArrayObject *ap1, *ap2, *ret;
-    NpyArray *prod = NULL;
-    int typenum;
     PyArray_Descr *typec;
 
-    typenum = PyArray_ObjectType(op1, 0);
-    typenum = PyArray_ObjectType(op2, typenum);
+    *typenum = PyArray_ObjectType(op1, 0);
+    *typenum = PyArray_ObjectType(op2, *typenum);
 
-    typec = PyArray_DescrFromType(typenum);
+    typec = PyArray_DescrFromType(*typenum);
     Py_INCREF(typec);
-    ap1 = (PyArrayObject *)PyArray_FromAny(op1, typec, 0, 0, ALIGNED, NULL);
-    if (ap1 == NULL) {
+    *ap1 = (PyArrayObject *)PyArray_FromAny(op1, typec, 0, 0, ALIGNED, NULL);
+    if (*ap1 == NULL) {
         Py_DECREF(typec);
-        return NULL;
+        return -1;
     }
-    ap2 = (PyArrayObject *)PyArray_FromAny(op2, typec, 0, 0, ALIGNED, NULL);
-    if (ap2 == NULL) {
-        goto fail;
+    *ap2 = (PyArrayObject *)PyArray_FromAny(op2, typec, 0, 0, ALIGNED, NULL);
+    if (*ap2 == NULL) {
+        Py_DECREF(*ap1);
+        return -1;
     }
-    if (PyArray_NDIM(ap1) == 0 || PyArray_NDIM(ap2) == 0) {
-        ret = (PyArray_NDIM(ap1) == 0 ? ap1 : ap2);
-        ret = (PyArrayObject *)Py_TYPE(ret)->tp_as_number->nb_multiply(
-                                            (PyObject *)ap1, (PyObject *)ap2);
-        Py_DECREF(ap1);
-        Py_DECREF(ap2);
-        return (PyObject *)ret;
+    if (PyArray_NDIM(*ap1) == 0 || PyArray_NDIM(*ap2) == 0) {
+        if (out != NULL) {
+            *ret = PyObject_CallFunction(
+                        PyArray_GetNumericOp(npy_op_multiply), "OOO",
+                        *ap1, *ap2, out);
+        }
+        else {
+            PyArrayObject *s = (PyArray_NDIM(*ap1) == 0 ? *ap1 : *ap2);
+
+            *ret = Py_TYPE(s)->tp_as_number->nb_multiply(
+                                        (PyObject *)*ap1, (PyObject *)*ap2);
+        }
+        Py_DECREF(*ap1);
+        Py_DECREF(*ap2);
+        return (*ret == NULL) ? -1 : 1;
     }
+    return 0;
+}
 
-    prod = NpyArray_InnerProduct(PyArray_ARRAY(ap1), 
-                                 PyArray_ARRAY(ap2), typenum);
+/*NUMPY_API
+ * Numeric.innerproduct(a,v)
+ */
+NPY_NO_EXPORT PyObject *
+PyArray_InnerProduct(PyObject *op1, PyObject *op2)
+{
+    return PyArray_InnerProduct2(op1, op2, NULL);
+}
 
-    Py_DECREF(ap1);
-    Py_DECREF(ap2);
 
-    /* Get the interface object and move the reference. */
-    ret = Npy_INTERFACE(prod);
-    Py_INCREF(ret);
-    Npy_DECREF(prod);
+/*NUMPY_API
+ * Numeric.innerproduct(a,v) into out, if it is not NULL
+ */
+NPY_NO_EXPORT PyObject *
+PyArray_InnerProduct2(PyObject *op1, PyObject *op2, PyArrayObject *out)
+{
+    PyArrayObject *ap1, *ap2, *ret;
+    PyObject *scalar;
+    int typenum;
 
+    switch (_product_operands(op1, op2, out, &ap1, &ap2, &typenum, &scalar)) {
+    case -1:
+        return NULL;
+    case 1:
+        return scalar;
+    }
+    ASSIGN_TO_PYARRAY(ret,
+                      NpyArray_InnerProduct2(PyArray_ARRAY(ap1),
+                                             PyArray_ARRAY(ap2), typenum,
+                                             out ? PyArray_ARRAY(out) : NULL));
+    Py_DECREF(ap1);
+    Py_DECREF(ap2);
     return (PyObject *)ret;
-
- fail:
-    Py_XDECREF(ap1);
-    Py_XDECREF(ap2);
-    Npy_XDECREF(prod);
-    return NULL;
 }
 
 
@@ -494,44 +520,33 @@ PyArray_InnerProduct(PyObject *op1, PyObject *op2)
 NPY_NO_EXPORT PyObject *
 PyArray_MatrixProduct(PyObject *op1, PyObject *op2)
 {
-    PyArrayObject *ap1, *ap2, *ret = NULL;
+    return PyArray_MatrixProduct2(op1, op2, NULL);
+}
+
+
+/*NUMPY_API
+ * Numeric.matrixproduct(a,v) into out, if it is not NULL
+ */
+NPY_NO_EXPORT PyObject *
+PyArray_MatrixProduct2(PyObject *op1, PyObject *op2, PyArrayObject *out)
+{
+    PyArrayObject *ap1, *ap2, *ret;
+    PyObject *scalar;
     int typenum;
-    PyArray_Descr *typec;
 
-    typenum = PyArray_ObjectType(op1, 0);
-    typenum = PyArray_ObjectType(op2, typenum);
-    typec = PyArray_DescrFromType(typenum);
-    Py_INCREF(typec);
-    ap1 = (PyArrayObject *)PyArray_FromAny(op1, typec, 0, 0, ALIGNED, NULL);
-    if (ap1 == NULL) {
-        Py_DECREF(typec);
+    switch (_product_operands(op1, op2, out, &ap1, &ap2, &typenum, &scalar)) {
+    case -1:
         return NULL;
+    case 1:
+        return scalar;
     }
-    ap2 = (PyArrayObject *)PyArray_FromAny(op2, typec, 0, 0, ALIGNED, NULL);
-    if (ap2 == NULL) {
-        goto fail;
-    }
-    if (PyArray_NDIM(ap1) == 0 || PyArray_NDIM(ap2) == 0) {
-        ret = (PyArray_NDIM(ap1) == 0 ? ap1 : ap2);
-        ret = (PyArrayObject *)Py_TYPE(ret)->tp_as_number->nb_multiply(
-                                        (PyObject *)ap1, (PyObject *)ap2);
-        Py_DECREF(ap1);
-        Py_DECREF(ap2);
-        return (PyObject *)ret;
-    }
-
     ASSIGN_TO_PYARRAY(ret,
-                      NpyArray_MatrixProduct(PyArray_ARRAY(ap1),
-                                             PyArray_ARRAY(ap2), typenum));
+                      NpyArray_MatrixProduct2(PyArray_ARRAY(ap1),
+                                              PyArray_ARRAY(ap2), typenum,
+                                              out ? PyArray_ARRAY(out) : NULL));
     Py_DECREF(ap1);
     Py_DECREF(ap2);
     return (PyObject *)ret;
-
- fail:
-    Py_XDECREF(ap1);
-    Py_XDECREF(ap2);
-    Py_XDECREF(ret);
-    return NULL;
 }
 
 
@@ -1175,24 +1190,37 @@ array_concatenate(PyObject *NPY_UNUSED(dummy), PyObject *args, PyObject *kwds)
 }
 
 static PyObject *
-array_innerproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
+array_innerproduct(PyObject *NPY_UNUSED(dummy), PyObject *args, PyObject *kwds)
 {
     PyObject *b0, *a0;
+    PyArrayObject *out = NULL;
+    static char *kwlist[] = {"a", "b", "out", NULL};
 
-    if (!PyArg_ParseTuple(args, "OO", &a0, &b0)) {
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "OO|O&", kwlist, &a0, &b0,
+                PyArray_OutputConverter, &out)) {
         return NULL;
     }
+    if (out != NULL) {
+        return PyArray_InnerProduct2(a0, b0, out);
+    }
     return _ARET(PyArray_InnerProduct(a0, b0));
 }
 
 static PyObject *
-array_matrixproduct(PyObject *NPY_UNUSED(dummy), PyObject *args)
+array_matrixproduct(PyObject *NPY_UNUSED(dummy), PyObject *args,
+                    PyObject *kwds)
 {
     PyObject *v, *a;
+    PyArrayObject *out = NULL;
+    static char *kwlist[] = {"a", "b", "out", NULL};
 
-    if (!PyArg_ParseTuple(args, "OO", &a, &v)) {
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "OO|O&", kwlist, &a, &v,
+                PyArray_OutputConverter, &out)) {
         return NULL;
     }
+    if (out != NULL) {
+        return PyArray_MatrixProduct2(a, v, out);
+    }
     return _ARET(PyArray_MatrixProduct(a, v));
 }
 
@@ -2019,6 +2047,59 @@ _PyArray_GetSigintBuf(void)
 #endif
 
 
+static PyObject *
+array_setdatamem(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    Py_ssize_t alignment, poolsize, hugepages;
+    npy_intp old[3];
+
+    if (!PyArg_ParseTuple(args, "nnn", &alignment, &poolsize, &hugepages)) {
+        return NULL;
+    }
+    if (alignment >= 0 && (alignment < 1 ||
+                           alignment > NPY_DATAMEM_MAX_ALIGNMENT ||
+                           (alignment & (alignment - 1)) != 0)) {
+        PyErr_Format(PyExc_ValueError,
+                     "alignment must be a power of two no larger than %d",
+                     NPY_DATAMEM_MAX_ALIGNMENT);
+        return NULL;
+    }
+    old[0] = NpyDataMem_GetAlignment();
+    old[1] = NpyDataMem_GetPoolSize();
+    old[2] = NpyDataMem_GetHugePageThreshold();
+    if (alignment >= 0) {
+        NpyDataMem_SetAlignment(alignment);
+    }
+    if (poolsize >= 0) {
+        NpyDataMem_SetPoolSize(poolsize);
+    }
+    if (hugepages >= 0) {
+        NpyDataMem_SetHugePageThreshold(hugepages);
+    }
+    return Py_BuildValue("nnn", (Py_ssize_t)old[0], (Py_ssize_t)old[1],
+                         (Py_ssize_t)old[2]);
+}
+
+static PyObject *
+array_datamemstats(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    NpyDataMem_Stats stats;
+
+    if (!PyArg_ParseTuple(args, "")) {
+        return NULL;
+    }
+    NpyDataMem_GetStats(&stats);
+    return Py_BuildValue("{s:n,s:n,s:n,s:n,s:n,s:n,s:n,s:n}",
+                         "nalloc", (Py_ssize_t)stats.nalloc,
+                         "nfree", (Py_ssize_t)stats.nfree,
+                         "pool_hits", (Py_ssize_t)stats.pool_hits,
+                         "pool_misses", (Py_ssize_t)stats.pool_misses,
+                         "nhuge", (Py_ssize_t)stats.nhuge,
+                         "inuse", (Py_ssize_t)stats.inuse,
+                         "peak", (Py_ssize_t)stats.peak,
+                         "cached", (Py_ssize_t)stats.cached);
+}
+
 static PyObject *
 test_interrupt(PyObject *NPY_UNUSED(self), PyObject *args)
 {
@@ -2102,10 +2183,10 @@ static struct PyMethodDef array_module_methods[] = {
         METH_VARARGS|METH_KEYWORDS, NULL},
     {"inner",
         (PyCFunction)array_innerproduct,
-        METH_VARARGS, NULL},
+        METH_VARARGS | METH_KEYWORDS, NULL},
     {"dot",
         (PyCFunction)array_matrixproduct,
-        METH_VARARGS, NULL},
+        METH_VARARGS | METH_KEYWORDS, NULL},
     {"_fastCopyAndTranspose",
         (PyCFunction)array_fastCopyAndTranspose,
         METH_VARARGS, NULL},
@@ -2147,6 +2228,12 @@ static struct PyMethodDef array_module_methods[] = {
     {"test_interrupt",
         (PyCFunction)test_interrupt,
         METH_VARARGS, NULL},
+    {"setdatamem",
+        (PyCFunction)array_setdatamem,
+        METH_VARARGS, NULL},
+    {"datamemstats",
+        (PyCFunction)array_datamemstats,
+        METH_VARARGS, NULL},
     {NULL, NULL, 0, NULL}                /* sentinel */
 };
 
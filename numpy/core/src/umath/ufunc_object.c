@@ -40,6 +40,7 @@
 #include "npy_iterators.h"
 #include <npy_dict.h>
 #include <npy_ufunc_object.h>
+#include <npy_threads.h>
 
 #include "numpy/noprefix.h"
 #include "numpy/arrayobject.h"
@@ -1362,6 +1363,82 @@ ufunc_seterr(PyObject *NPY_UNUSED(dummy), PyObject *args)
 }
 
 
+NPY_NO_EXPORT PyObject *
+ufunc_setnumthreads(PyObject *NPY_UNUSED(dummy), PyObject *args)
+{
+    int nthreads;
+
+    if (!PyArg_ParseTuple(args, "i", &nthreads)) {
+        return NULL;
+    }
+    if (nthreads < 1) {
+        PyErr_SetString(PyExc_ValueError,
+                        "number of threads must be at least 1");
+        return NULL;
+    }
+    return PyInt_FromLong(NpyThreads_SetNumThreads(nthreads));
+}
+
+NPY_NO_EXPORT PyObject *
+ufunc_getnumthreads(PyObject *NPY_UNUSED(dummy), PyObject *args)
+{
+    if (!PyArg_ParseTuple(args, "")) {
+        return NULL;
+    }
+    return PyInt_FromLong(NpyThreads_GetNumThreads());
+}
+
+NPY_NO_EXPORT PyObject *
+ufunc_setthreadthreshold(PyObject *NPY_UNUSED(dummy), PyObject *args)
+{
+    Py_ssize_t threshold;
+
+    if (!PyArg_ParseTuple(args, "n", &threshold)) {
+        return NULL;
+    }
+    if (threshold < 1) {
+        PyErr_SetString(PyExc_ValueError,
+                        "thread threshold must be at least 1");
+        return NULL;
+    }
+    return PyInt_FromSsize_t(NpyThreads_SetThreshold(threshold));
+}
+
+NPY_NO_EXPORT PyObject *
+ufunc_getthreadthreshold(PyObject *NPY_UNUSED(dummy), PyObject *args)
+{
+    if (!PyArg_ParseTuple(args, "")) {
+        return NULL;
+    }
+    return PyInt_FromSsize_t(NpyThreads_GetThreshold());
+}
+
+NPY_NO_EXPORT PyObject *
+ufunc_setpairwise(PyObject *NPY_UNUSED(dummy), PyObject *args)
+{
+    PyObject *flag;
+    int pairwise;
+
+    if (!PyArg_ParseTuple(args, "O", &flag)) {
+        return NULL;
+    }
+    pairwise = PyObject_IsTrue(flag);
+    if (pairwise < 0) {
+        return NULL;
+    }
+    return PyBool_FromLong(NpyUFunc_SetPairwise(pairwise));
+}
+
+NPY_NO_EXPORT PyObject *
+ufunc_getpairwise(PyObject *NPY_UNUSED(dummy), PyObject *args)
+{
+    if (!PyArg_ParseTuple(args, "")) {
+        return NULL;
+    }
+    return PyBool_FromLong(NpyUFunc_GetPairwise());
+}
+
+
 int
 NpyUFunc_ReplaceLoopBySignature(NpyUFuncObject *func,
                                NpyUFuncGenericFunction newfunc,
@@ -1385,6 +1462,7 @@ NpyUFunc_ReplaceLoopBySignature(NpyUFuncObject *func,
             *oldfunc = func->functions[i];
         }
         func->functions[i] = newfunc;
+        NpyUFunc_ClearLoopCache(func);
         res = 0;
         break;
     }
@@ -1826,6 +1904,19 @@ ufunc_get_signature(PyUFuncObject *self)
     return PyUString_FromString(PyUFunc_UFUNC(self)->core_signature);
 }
 
+static PyObject *
+ufunc_get_cacheinfo(PyUFuncObject *self)
+{
+    NpyUFuncObject *ufunc = PyUFunc_UFUNC(self);
+    long size = 0;
+
+    if (ufunc->loopcache != NULL) {
+        size = NpyDict_Size(ufunc->loopcache);
+    }
+    return Py_BuildValue("nnl", (Py_ssize_t)ufunc->cache_hits,
+                         (Py_ssize_t)ufunc->cache_misses, size);
+}
+
 #undef _typecharfromnum
 
 /*
@@ -1860,6 +1951,9 @@ static PyGetSetDef ufunc_getset[] = {
     {"signature",
         (getter)ufunc_get_signature,
         NULL, NULL, NULL},
+    {"cacheinfo",
+        (getter)ufunc_get_cacheinfo,
+        NULL, NULL, NULL},
     {NULL, NULL, NULL, NULL, NULL},  /* Sentinel */
 };
 
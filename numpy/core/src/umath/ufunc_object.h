@@ -7,4 +7,22 @@ ufunc_geterr(PyObject *NPY_UNUSED(dummy), PyObject *args);
 NPY_NO_EXPORT PyObject *
 ufunc_seterr(PyObject *NPY_UNUSED(dummy), PyObject *args);
 
+NPY_NO_EXPORT PyObject *
+ufunc_setnumthreads(PyObject *NPY_UNUSED(dummy), PyObject *args);
+
+NPY_NO_EXPORT PyObject *
+ufunc_getnumthreads(PyObject *NPY_UNUSED(dummy), PyObject *args);
+
+NPY_NO_EXPORT PyObject *
+ufunc_setthreadthreshold(PyObject *NPY_UNUSED(dummy), PyObject *args);
+
+NPY_NO_EXPORT PyObject *
+ufunc_getthreadthreshold(PyObject *NPY_UNUSED(dummy), PyObject *args);
+
+NPY_NO_EXPORT PyObject *
+ufunc_setpairwise(PyObject *NPY_UNUSED(dummy), PyObject *args);
+
+NPY_NO_EXPORT PyObject *
+ufunc_getpairwise(PyObject *NPY_UNUSED(dummy), PyObject *args);
+
 #endif
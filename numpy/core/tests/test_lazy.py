@@ -0,0 +1,85 @@
+import numpy as np
+from numpy import lazy
+from numpy.testing import *
+
+class TestLazy(TestCase):
+    def setUp(self):
+        self.bufsize = np.getbufsize()
+        np.setbufsize(16)
+
+    def tearDown(self):
+        np.setbufsize(self.bufsize)
+
+    def test_expression(self):
+        a, b, c, d, e = [np.arange(100.) + i for i in range(5)]
+        x = lazy(a)*b + lazy(c)*d - e
+        assert_equal(x.shape, (100,))
+        assert_equal(x.dtype, np.float64)
+        assert_array_equal(x.evaluate(), a*b + c*d - e)
+
+    def test_broadcast(self):
+        a = np.arange(30.).reshape(5, 6)
+        b = np.arange(5.).reshape(5, 1)
+        c = np.arange(6.)
+        x = (lazy(a) - b)*c + 2
+        assert_equal(x.shape, (5, 6))
+        assert_array_equal(x.evaluate(), (a - b)*c + 2)
+        a = np.arange(120).reshape(2, 3, 4, 5)
+        x = lazy(a)*a[0, :, :1] + 1
+        assert_array_equal(x.evaluate(), a*a[0, :, :1] + 1)
+
+    def test_broadcast_error(self):
+        x = lazy(np.ones(3)) + np.ones(4)
+        self.assertRaises(ValueError, lambda: x.shape)
+        self.assertRaises(ValueError, x.evaluate)
+
+    def test_reflected(self):
+        a = np.arange(1., 40.)
+        assert_array_equal((2 - lazy(a)).evaluate(), 2 - a)
+        assert_array_equal((a / lazy(a + 1)).evaluate(), a / (a + 1))
+        assert_array_equal((a * lazy(a)).evaluate(), a * a)
+        assert_array_equal((-lazy(a) < -a).evaluate(), np.zeros(39, bool))
+
+    def test_shared(self):
+        a = np.arange(50.)
+        t = lazy(a)*a
+        x = np.sqrt(0) + t + lazy(np.sqrt, t)*t
+        assert_array_equal(x.evaluate(), a*a + np.sqrt(a*a)*a*a)
+
+    def test_types(self):
+        a = np.arange(40, dtype=np.int8)
+        b = np.arange(40, dtype=np.float32)
+        x = lazy(a)*2 + (lazy(a) > 3)
+        assert_equal(x.dtype, np.int8)
+        assert_array_equal(x.evaluate(), a*2 + (a > 3))
+        x = lazy(a)*b + 1.5
+        assert_equal(x.dtype, np.float32)
+        assert_array_equal(x.evaluate(), a*b + 1.5)
+
+    def test_scalar(self):
+        x = lazy(np.add, 1, lazy(np.float64(2))*3)
+        assert_equal(x.shape, ())
+        assert_equal(x.evaluate(), 7)
+
+    def test_out(self):
+        a = np.arange(30.)
+        out = np.zeros(30, dtype=np.int32)
+        res = (lazy(a)*3).evaluate(out)
+        assert_(res is out)
+        assert_array_equal(out, a*3)
+        self.assertRaises(ValueError, (lazy(a)*3).evaluate, np.zeros(3))
+
+    def test_deferred(self):
+        a = np.zeros(20)
+        x = lazy(a) + 1
+        a[...] = 2
+        assert_array_equal(x.evaluate(), np.ones(20)*3)
+
+    def test_errors(self):
+        self.assertRaises(TypeError, lazy, np.modf, np.ones(3))
+        self.assertRaises(TypeError, lazy, np.add, np.ones(3))
+        self.assertRaises(TypeError, lazy, np.ones(3), np.ones(3))
+
+
+if __name__ == "__main__":
+    run_module_suite()
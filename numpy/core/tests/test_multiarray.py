@@ -311,7 +311,7 @@ class TestMethods(TestCase):
         # sort for small arrays.
         a = np.arange(100)
         b = a[::-1].copy()
-        for kind in ['q','m','h'] :
+        for kind in ['q','m','h','r','t'] :
             msg = "scalar sort, kind=%s" % kind
             c = a.copy();
             c.sort(kind=kind)
@@ -324,7 +324,7 @@ class TestMethods(TestCase):
         # but the compare function differs.
         ai = a*1j + 1
         bi = b*1j + 1
-        for kind in ['q','m','h'] :
+        for kind in ['q','m','h','r','t'] :
             msg = "complex sort, real part == 1, kind=%s" % kind
             c = ai.copy();
             c.sort(kind=kind)
@@ -334,7 +334,7 @@ class TestMethods(TestCase):
             assert_equal(c, ai, msg)
         ai = a + 1j
         bi = b + 1j
-        for kind in ['q','m','h'] :
+        for kind in ['q','m','h','r','t'] :
             msg = "complex sort, imag part == 1, kind=%s" % kind
             c = ai.copy();
             c.sort(kind=kind)
@@ -426,7 +426,7 @@ class TestMethods(TestCase):
         for k, t in enumerate( types ):
             a = np.arange( 100, dtype=t )
             b = a[::-1].copy()
-            for kind in ['q','m','h'] :
+            for kind in ['q','m','h','r','t'] :
                 msg = "scalar sort, kind=%s" % kind
                 c = a.copy();
                 c.sort(kind=kind)
@@ -500,7 +500,7 @@ class TestMethods(TestCase):
         # sort for small arrays.
         a = np.arange(100)
         b = a[::-1].copy()
-        for kind in ['q','m','h'] :
+        for kind in ['q','m','h','r','t'] :
             msg = "scalar argsort, kind=%s" % kind
             assert_equal(a.copy().argsort(kind=kind), a, msg)
             assert_equal(b.copy().argsort(kind=kind), b, msg)
@@ -509,13 +509,13 @@ class TestMethods(TestCase):
         # but the compare fuction differs.
         ai = a*1j + 1
         bi = b*1j + 1
-        for kind in ['q','m','h'] :
+        for kind in ['q','m','h','r','t'] :
             msg = "complex argsort, kind=%s" % kind
             assert_equal(ai.copy().argsort(kind=kind), a, msg)
             assert_equal(bi.copy().argsort(kind=kind), b, msg)
         ai = a + 1j
         bi = b + 1j
-        for kind in ['q','m','h'] :
+        for kind in ['q','m','h','r','t'] :
             msg = "complex argsort, kind=%s" % kind
             assert_equal(ai.copy().argsort(kind=kind), a, msg)
             assert_equal(bi.copy().argsort(kind=kind), b, msg)
@@ -570,6 +570,85 @@ class TestMethods(TestCase):
         a = np.array(['aaaaaaaaa' for i in range(100)], dtype=np.unicode)
         assert_equal(a.argsort(kind='m'), r)
 
+    def test_sort_stable_kinds(self):
+        # the radix sort and the timsort are stable, so they must give
+        # the same result as the merge sort.
+        rng = np.random.RandomState(3)
+        a = rng.randint(-1000, 1000, size=1000)
+        runs = np.concatenate([np.arange(300), np.arange(400, 100, -1),
+                               rng.randint(0, 10, size=200), [5]*50])
+        for dt in [np.bool_, np.int8, np.uint8, np.int16, np.uint32,
+                   np.int64, np.uint64, 'M8[s]', 'm8[s]', np.float64,
+                   np.complex64, 'S4']:
+            for x in [a, runs]:
+                x = x.astype(dt)
+                for kind in ['radix', 'timsort']:
+                    msg = "%s, kind=%s" % (x.dtype, kind)
+                    assert_equal(np.sort(x, kind=kind),
+                                 np.sort(x, kind='mergesort'), msg)
+                    assert_equal(x.argsort(kind=kind),
+                                 x.argsort(kind='mergesort'), msg)
+        x = np.array([np.nan, 1, -np.inf, np.nan, 0]*20)
+        assert_equal(np.sort(x, kind='t'), np.sort(x, kind='m'))
+        assert_equal(x.argsort(kind='t'), x.argsort(kind='m'))
+
+    def check_partition(self, p, s, kth, axis=-1):
+        p = np.rollaxis(p, axis)
+        s = np.rollaxis(s, axis)
+        for k in kth:
+            assert_equal(p[k], s[k])
+            assert_(np.all(p[:k] <= p[k]))
+            assert_(np.all(p[k+1:] >= p[k]))
+
+    def test_partition(self):
+        rng = np.random.RandomState(4)
+        for dt in [np.bool_, np.int8, np.uint16, np.int32, np.int64,
+                   np.float32, np.float64, np.longdouble, 'M8[s]']:
+            for n in [1, 2, 3, 10, 1001]:
+                a = rng.randint(0, 50, size=n).astype(dt)
+                s = np.sort(a)
+                for kth in [[0], [n-1], [n//2], [0, n//3, n-1]]:
+                    b = a.copy()
+                    b.partition(kth)
+                    self.check_partition(b, s, kth)
+                    self.check_partition(np.partition(a, kth), s, kth)
+                    i = a.argpartition(kth)
+                    self.check_partition(a[i], s, kth)
+        a = np.array([np.nan, 3, -np.inf, 1, np.nan, 2])
+        assert_equal(np.partition(a, [2, 4])[[2, 4]], [2, np.nan])
+        assert_equal(np.partition(a, -3)[-3], 3)
+        a = rng.rand(10, 11, 12)
+        for axis in [0, 1, 2, None]:
+            if axis is None:
+                s = np.sort(a.ravel())
+                p = np.partition(a, [1, 5], axis=None)
+                i = np.argpartition(a, [1, 5], axis=None)
+                self.check_partition(p, s, [1, 5])
+                self.check_partition(a.ravel()[i], s, [1, 5])
+            else:
+                s = np.sort(a, axis=axis)
+                p = np.partition(a, [1, 5], axis=axis)
+                self.check_partition(p, s, [1, 5], axis)
+
+    def test_partition_generic(self):
+        a = np.array([3, 1, 5, 2, 4, 0]*5, dtype=object)
+        assert_equal(np.partition(a, 10)[10], 2)
+        assert_equal(a[a.argpartition(10)][10], 2)
+        a = np.array(['d', 'b', 'a', 'c'])
+        assert_equal(np.partition(a, [1, 2])[[1, 2]], ['b', 'c'])
+        r = np.array([(2, 1), (1, 3), (1, 2)], dtype=[('x', 'i4'), ('y', 'i4')])
+        assert_equal(np.partition(r, 0, order='y')[0], r[0])
+        assert_(r.argpartition(0, order='x')[0] in [1, 2])
+
+    def test_partition_errors(self):
+        a = np.arange(5)
+        assert_raises(ValueError, a.partition, 5)
+        assert_raises(ValueError, a.partition, -6)
+        assert_raises(ValueError, a.partition, [[1]])
+        assert_raises(ValueError, a.partition, 1, kind='quicksort')
+        assert_raises(ValueError, np.argpartition, a, 1, axis=1)
+        assert_raises(ValueError, np.array(1).partition, 0)
+
     def test_searchsorted(self):
         # test for floats and complex containing nans. The logic is the
         # same for all float types so only test double types for now.
@@ -619,6 +698,70 @@ class TestMethods(TestCase):
         assert_equal(np.dot(a, b), a.dot(b))
         assert_equal(np.dot(np.dot(a, b), c), a.dot(b).dot(c))
 
+class TestThreadedSort(TestCase):
+    def setUp(self):
+        self.nthreads = np.setnumthreads(4)
+        self.threshold = np.setthreadthreshold(10)
+
+    def tearDown(self):
+        np.setnumthreads(self.nthreads)
+        np.setthreadthreshold(self.threshold)
+
+    def serial(self, func, *args, **kw):
+        np.setnumthreads(1)
+        try:
+            return func(*args, **kw)
+        finally:
+            np.setnumthreads(4)
+
+    def test_1d(self):
+        rng = np.random.RandomState(1)
+        for dt in [np.float64, np.int16, np.complex64, 'S3', 'U3']:
+            for n in [2, 5, 37, 1001]:
+                a = (rng.rand(n)*20).astype(dt)
+                if dt == np.float64:
+                    a[::7] = np.nan
+                for kind in ['q', 'm', 'h']:
+                    s = np.sort(a, kind=kind)
+                    assert_equal(s.tostring(),
+                                 self.serial(np.sort, a, kind=kind).tostring())
+                    assert_equal(a[a.argsort(kind=kind)].tostring(),
+                                 s.tostring())
+                assert_equal(a.argsort(kind='m'),
+                             self.serial(a.argsort, kind='m'))
+
+    def test_rows(self):
+        a = np.random.RandomState(2).randint(0, 10, size=(6, 101))
+        for axis in [0, 1]:
+            assert_equal(np.sort(a, axis=axis),
+                         self.serial(np.sort, a, axis=axis))
+            assert_equal(a.argsort(axis=axis, kind='m'),
+                         self.serial(a.argsort, axis=axis, kind='m'))
+        b = a.astype('>f8')[:, ::2]
+        assert_equal(np.sort(b, axis=1), self.serial(np.sort, b, axis=1))
+        assert_equal(b.argsort(axis=1, kind='m'),
+                     self.serial(b.argsort, axis=1, kind='m'))
+        b = b[0]
+        assert_equal(np.sort(b), self.serial(np.sort, b))
+        assert_equal(b.argsort(kind='m'), self.serial(b.argsort, kind='m'))
+
+    def test_generic(self):
+        a = np.array([3, 1, 2, 5, 4]*10, dtype=object)
+        assert_equal(np.sort(a), np.sort(a.astype(int)))
+        assert_equal(a[a.argsort()], np.sort(a))
+        r = np.array([(2, 1), (1, 3), (1, 2)], dtype='i4,i4')
+        assert_equal(np.sort(r), r[[2, 1, 0]])
+        assert_equal(r.argsort(), [2, 1, 0])
+
+    def test_partition(self):
+        a = np.random.RandomState(5).rand(6, 1001)
+        for axis in [0, 1]:
+            assert_equal(np.partition(a, [1, 3], axis=axis),
+                         self.serial(np.partition, a, [1, 3], axis=axis))
+            assert_equal(a.argpartition(2, axis=axis),
+                         self.serial(a.argpartition, 2, axis=axis))
+
+
 class TestSubscripting(TestCase):
     def test_test_zero_rank(self):
         x = array([1,2,3])
@@ -134,6 +134,134 @@ class TestDot(TestCase):
         assert_equal(zeros[1].array, zeros_test[1].array)
 
 
+class TestBlockedDot(TestCase):
+    """Products large enough for the blocked matrix multiplication."""
+    def setUp(self):
+        self.rng = np.random.RandomState(3)
+
+    def operands(self, dt, *shapes):
+        ops = [self.rng.randn(*s) for s in shapes]
+        if issubclass(dt, complexfloating):
+            ops = [x + 1j*self.rng.randn(*x.shape) for x in ops]
+        return [x.astype(dt) for x in ops]
+
+    def check(self, a, b, decimal):
+        # clongdouble still goes through the dot function of the type
+        ref = dot_(a.astype(clongdouble), b.astype(clongdouble))
+        c = dot_(a, b)
+        assert_equal(c.dtype, a.dtype)
+        assert_almost_equal(c, ref, decimal=decimal)
+
+    def test_types(self):
+        for dt, decimal in [(float32, 3), (float64, 10),
+                            (complex64, 3), (complex128, 10)]:
+            for sa, sb in [((37, 53), (53, 41)), ((65, 300), (300, 1030)),
+                           ((3, 4, 50), (50, 20)), ((2, 50, 30), (4, 30, 9)),
+                           ((1000, 5), (5, 6))]:
+                a, b = self.operands(dt, sa, sb)
+                self.check(a, b, decimal)
+                self.check(a[..., ::-1], b[::-1], decimal)
+                self.check(a.T.copy().T, b[..., ::2], decimal)
+
+    def test_vector(self):
+        a, b = self.operands(float64, (200, 30), (30,))
+        assert_almost_equal(dot_(a, b), (a*b).sum(axis=-1), decimal=10)
+        assert_almost_equal(dot_(b, a.T), (a*b).sum(axis=-1), decimal=10)
+
+    def test_inner(self):
+        a, b = self.operands(complex128, (3, 40, 50), (60, 50))
+        assert_almost_equal(inner(a, b), dot_(a, b.T), decimal=10)
+        assert_almost_equal(inner(b, a[1]), dot_(b, a[1].T), decimal=10)
+
+    def test_empty(self):
+        assert_equal(dot_(zeros((200, 0)), zeros((0, 300))),
+                     zeros((200, 300)))
+
+    def test_threads(self):
+        nthreads = np.setnumthreads(4)
+        threshold = np.setthreadthreshold(10)
+        try:
+            a, b = self.operands(float64, (301, 70), (70, 90))
+            c = dot_(a, b)
+            assert_equal(dot_(b.T, a.T), c.T)
+            np.setnumthreads(1)
+            assert_equal(dot_(a, b), c)
+        finally:
+            np.setnumthreads(nthreads)
+            np.setthreadthreshold(threshold)
+
+
+class TestDotOut(TestCase):
+    def setUp(self):
+        self.a = rand(4, 3)
+        self.b = rand(3, 5)
+
+    def test_dot(self):
+        for a in [self.a, self.a.T.copy().T, self.a[::-1], self.a[:, ::-1]]:
+            for b in [self.b, self.b.T.copy().T, self.b[::-1], self.b[:, 0]]:
+                c = dot_(a, b)
+                out = zeros(c.shape)
+                assert dot(a, b, out=out) is out
+                assert_almost_equal(out, c)
+                out = zeros(c.shape)
+                assert dot(a, b, out) is out
+                assert_almost_equal(out, c)
+                out = zeros(c.shape)
+                assert a.dot(b, out=out) is out
+                assert_almost_equal(out, c)
+
+    def test_inner(self):
+        for b in [self.b.T, self.b.T.copy(), self.b[:, ::-1].T, self.b[:, 0]]:
+            c = dot_(self.a, b.T)
+            out = zeros(c.shape)
+            assert inner(self.a, b, out=out) is out
+            assert_almost_equal(out, c)
+        out = zeros((4, 0))
+        assert inner(zeros((4, 0)), zeros((0, 0)), out=out) is out
+
+    def test_tensordot(self):
+        a, b = rand(2, 3, 4), rand(4, 3, 5)
+        c = tensordot(a, b, ([1, 2], [1, 0]))
+        out = zeros((2, 5))
+        assert tensordot(a, b, ([1, 2], [1, 0]), out=out) is out
+        assert_almost_equal(out, c)
+        assert_raises(ValueError, tensordot, a, b, ([1, 2], [1, 0]),
+                      zeros((5, 2)))
+        assert_raises(TypeError, tensordot, a, b, ([1, 2], [1, 0]),
+                      [[0.] * 5] * 2)
+
+    def test_types(self):
+        for t in ['f', 'd', 'F', 'D', 'l', 'O']:
+            a, b = self.a.astype(t), self.b.astype(t)
+            out = zeros((4, 5), t)
+            assert dot(a, b, out=out) is out
+            assert_almost_equal(out, dot_(a, b), decimal=5)
+
+    def test_scalar(self):
+        out = zeros((4, 3))
+        assert dot(self.a, 2., out=out) is out
+        assert_almost_equal(out, 2*self.a)
+
+    def test_overlap(self):
+        a = rand(4, 4)
+        c = dot_(a, a)
+        out = a.copy()
+        assert dot(out, out, out=out) is out
+        assert_almost_equal(out, c)
+        out = a.copy()
+        assert inner(out, a, out=out) is out
+        assert_almost_equal(out, dot_(a, a.T))
+
+    def test_bad_out(self):
+        for out in [zeros((4, 5), 'f'), zeros((4, 5, 1)), zeros((5, 4)),
+                    zeros((4, 10))[:, ::2], zeros((5, 4)).T]:
+            assert_raises(ValueError, dot, self.a, self.b, out)
+        assert_raises(TypeError, dot, self.a, self.b, [0])
+        a, b = rand(2, 3, 4), rand(4, 3, 5)
+        for out in [zeros((2, 10))[:, ::2], zeros((5, 2)).T]:
+            assert_raises(ValueError, tensordot, a, b, ([1, 2], [1, 0]), out)
+
+
 class TestResize(TestCase):
     def test_copies(self):
         A = array([[1,2],[3,4]])
@@ -251,6 +379,50 @@ class TestSeterr(TestCase):
             seterr(**err)
 
 
+class TestDataMem(TestCase):
+    def setUp(self):
+        self.old = setdatamem()
+
+    def tearDown(self):
+        setdatamem(**self.old)
+
+    def test_set(self):
+        old = setdatamem(alignment=256)
+        self.assertTrue(old == self.old)
+        self.assertTrue(getdatamem()['alignment'] == 256)
+        for n in [1, 10, 1000, 300000]:
+            a = ones(n)
+            self.assertTrue(a.ctypes.data % 256 == 0)
+            assert_equal(a.sum(), n)
+        self.assertRaises(ValueError, setdatamem, alignment=3)
+        self.assertRaises(ValueError, setdatamem, poolsize=-1)
+
+    def test_pool(self):
+        setdatamem(poolsize=1 << 20)
+        a = empty(100)
+        del a
+        stats = datamemstats()
+        a = empty(100)
+        new = datamemstats()
+        self.assertTrue(new['pool_hits'] == stats['pool_hits'] + 1)
+        self.assertTrue(new['inuse'] >= stats['inuse'] + a.nbytes)
+        setdatamem(poolsize=0)
+        self.assertTrue(datamemstats()['cached'] == 0)
+
+    def test_hugepages(self):
+        setdatamem(hugepages=1 << 21)
+        a = arange(1 << 19)
+        self.assertTrue(a[-1] == (1 << 19) - 1)
+        a.resize(1 << 20)
+        self.assertTrue(a[(1 << 19) - 1] == (1 << 19) - 1)
+        self.assertTrue(a[-1] == 0)
+
+    def test_realloc(self):
+        a = fromiter(xrange(100000), float)
+        assert_array_equal(a, arange(100000.))
+        self.assertTrue(a.ctypes.data % getdatamem()['alignment'] == 0)
+
+
 class TestFromiter(TestCase):
     def makegen(self):
         for x in xrange(24):
@@ -563,5 +563,138 @@ class TestUfunc(TestCase):
 
         assert_equal(ref, True, err_msg="reference check")
 
+class TestLoopCache(TestCase):
+    def test_cacheinfo(self):
+        a = np.arange(3.)
+        np.subtract(a, a)
+        hits, misses, size = np.subtract.cacheinfo
+        assert_(size > 0)
+        np.subtract(a, a)
+        np.subtract(a, a)
+        assert_equal(np.subtract.cacheinfo, (hits + 2, misses, size))
+
+    def test_cached_types(self):
+        # the scalar kind is part of the key
+        b = np.arange(3, dtype=np.int8)
+        for i in range(2):
+            assert_equal(np.add(b, 2).dtype, np.int8)
+            assert_equal(np.add(b, 2.5).dtype, np.float64)
+            assert_equal(np.add(b, b.astype(np.int16)).dtype, np.int16)
+            assert_equal(np.add.reduce(b).dtype, np.int_)
+            assert_equal(np.add.reduce(b, dtype=np.int8).dtype, np.int8)
+
+class TestThreadedLoops(TestCase):
+    def setUp(self):
+        self.nthreads = np.setnumthreads(4)
+        self.threshold = np.setthreadthreshold(10)
+
+    def tearDown(self):
+        np.setnumthreads(self.nthreads)
+        np.setthreadthreshold(self.threshold)
+
+    def check(self, func, *args):
+        res = func(*args)
+        np.setnumthreads(1)
+        try:
+            tgt = func(*args)
+        finally:
+            np.setnumthreads(4)
+        assert_array_equal(res, tgt)
+
+    def test_settings(self):
+        assert_equal(np.getnumthreads(), 4)
+        assert_equal(np.getthreadthreshold(), 10)
+        assert_raises(ValueError, np.setnumthreads, 0)
+        assert_raises(ValueError, np.setthreadthreshold, 0)
+
+    def test_contiguous(self):
+        a = np.arange(1001.)
+        self.check(np.add, a, a)
+        self.check(np.sin, a)
+
+    def test_strided(self):
+        a = np.arange(3006.).reshape(3, 1002)
+        self.check(np.add, a[:, ::2], a[:, 1::2])
+        self.check(np.multiply, a[0, ::3], a[1, 1::3])
+        self.check(np.sin, a.T)
+
+    def test_buffered(self):
+        a = np.arange(1001.)
+        self.check(np.add, a.astype('>f8'), np.float32(2))
+        self.check(np.add, np.arange(1001, dtype=np.int16), a)
+        self.check(np.multiply, a.reshape(7, 143).astype('>f4')[:, ::2], 3.5)
+
+    def test_generalized(self):
+        a = np.arange(3000.).reshape(1000, 3)
+        self.check(umt.inner1d, a, a)
+
+    def check_close(self, func, *args):
+        res = func(*args)
+        np.setnumthreads(1)
+        try:
+            tgt = func(*args)
+        finally:
+            np.setnumthreads(4)
+        assert_array_almost_equal(res, tgt)
+
+    def test_reduce(self):
+        a = np.arange(1, 2001, dtype=float)
+        m = a.reshape(5, 400)
+        self.check(np.add.reduce, np.arange(2000))
+        self.check(np.add.reduce, np.arange(2000, dtype=np.int16))
+        self.check(np.maximum.reduce, a[::-3])
+        self.check(np.subtract.reduce, m, 1)
+        self.check(np.add.reduce, m, 0)
+        self.check_close(np.add.reduce, a)
+        self.check_close(np.add.reduce, a.astype('>f8'))
+        self.check_close(np.multiply.reduce, m / 400., 1)
+
+    def test_accumulate(self):
+        a = np.arange(1, 2001, dtype=float)
+        self.check(np.add.accumulate, np.arange(2000))
+        self.check(np.bitwise_xor.accumulate, np.arange(2000, dtype=np.int8))
+        self.check(np.add.accumulate, a.reshape(5, 400), 1)
+        self.check_close(np.add.accumulate, a)
+        self.check_close(np.multiply.accumulate, np.ones(2000) * 1.0001)
+
+    def test_reduceat(self):
+        a = np.arange(2000.).reshape(2, 1000)
+        self.check(np.add.reduceat, a, [0, 10, 10, 500, 999], 1)
+        self.check(np.add.reduceat, a.astype(np.int32), [0, 7, 999], 1)
+        self.check(np.minimum.reduceat, a.T, [0, 500], 0)
+
+    def test_pairwise(self):
+        old = np.setpairwise(True)
+        try:
+            assert_(np.getpairwise())
+            x = np.random.rand(10001)
+            res = np.add.reduce(x)
+            for n in [1, 2, 3, 7]:
+                np.setnumthreads(n)
+                assert_equal(np.add.reduce(x), res)
+            assert_almost_equal(res, np.add.reduce(x.astype(np.longdouble)))
+            assert_equal(np.add.reduce(np.ones((3, 1000)), 1), [1000.] * 3)
+        finally:
+            np.setpairwise(old)
+
+    def test_fperr(self):
+        a = np.ones(1000)
+        b = np.ones(1000)
+        b[-1] = 0
+        olderr = np.seterr(divide='raise')
+        try:
+            assert_raises(FloatingPointError, np.divide, a, b)
+            assert_raises(FloatingPointError, np.divide, a[::2], b[1::2])
+        finally:
+            np.seterr(**olderr)
+        olderr = np.seterr(over='raise')
+        try:
+            a = np.ones(1000) * 1e300
+            assert_raises(FloatingPointError, np.multiply.reduce, a)
+            assert_raises(FloatingPointError, np.multiply.accumulate, a)
+        finally:
+            np.seterr(**olderr)
+
+
 if __name__ == "__main__":
     run_module_suite()
@@ -3,20 +3,20 @@ Discrete Fourier Transforms
 
 Routines in this module:
 
-fft(a, n=None, axis=-1)
-ifft(a, n=None, axis=-1)
-rfft(a, n=None, axis=-1)
-irfft(a, n=None, axis=-1)
-hfft(a, n=None, axis=-1)
-ihfft(a, n=None, axis=-1)
-fftn(a, s=None, axes=None)
-ifftn(a, s=None, axes=None)
-rfftn(a, s=None, axes=None)
-irfftn(a, s=None, axes=None)
-fft2(a, s=None, axes=(-2,-1))
-ifft2(a, s=None, axes=(-2, -1))
-rfft2(a, s=None, axes=(-2,-1))
-irfft2(a, s=None, axes=(-2, -1))
+fft(a, n=None, axis=-1, threads=None)
+ifft(a, n=None, axis=-1, threads=None)
+rfft(a, n=None, axis=-1, threads=None)
+irfft(a, n=None, axis=-1, threads=None)
+hfft(a, n=None, axis=-1, threads=None)
+ihfft(a, n=None, axis=-1, threads=None)
+fftn(a, s=None, axes=None, threads=None)
+ifftn(a, s=None, axes=None, threads=None)
+rfftn(a, s=None, axes=None, threads=None)
+irfftn(a, s=None, axes=None, threads=None)
+fft2(a, s=None, axes=(-2,-1), threads=None)
+ifft2(a, s=None, axes=(-2, -1), threads=None)
+rfft2(a, s=None, axes=(-2,-1), threads=None)
+irfft2(a, s=None, axes=(-2, -1), threads=None)
 
 i = inverse transform
 r = transform of purely real data
@@ -35,28 +35,126 @@ __all__ = ['fft','ifft', 'rfft', 'irfft', 'hfft', 'ihfft', 'rfftn',
            'refft', 'irefft','refftn','irefftn', 'refft2', 'irefft2']
 
 from numpy.core import asarray, zeros, swapaxes, shape, conjugate, \
-     take
+     take, array, concatenate, empty
 import fftpack_lite as fftpack
 
-_fft_cache = {}
-_real_fft_cache = {}
+try:
+    import threading
+except ImportError:
+    import dummy_threading as threading
 
-def _raw_fft(a, n=None, axis=-1, init_function=fftpack.cffti,
-             work_function=fftpack.cfftf, fft_cache = _fft_cache ):
-    a = asarray(a)
-
-    if n is None:
-        n = a.shape[axis]
 
-    if n < 1:
-        raise ValueError("Invalid number of FFT data points (%d) specified." % n)
+class _FFTCache(object):
+    """
+    Cache of the work arrays of the transforms of each size.
 
-    try:
-        wsave = fft_cache[n]
-    except(KeyError):
+    The least recently used work arrays are dropped when there are more
+    than `max_size` of them or when together they take more than
+    `max_bytes`, although the last one is always kept.  The cache may be
+    used from several threads.
+    """
+    def __init__(self, max_size=32, max_bytes=64 * 1024 * 1024):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self._dict = {}
+        self._order = []
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, n, init_function):
+        """
+        Return the work array for size `n`, making it with `init_function`
+        if it is not in the cache.
+        """
+        self._lock.acquire()
+        try:
+            try:
+                wsave = self._dict[n]
+            except KeyError:
+                pass
+            else:
+                self._order.remove(n)
+                self._order.append(n)
+                return wsave
+        finally:
+            self._lock.release()
+        # Other threads can use the cache while the array is made
         wsave = init_function(n)
-        fft_cache[n] = wsave
+        self._lock.acquire()
+        try:
+            if n not in self._dict:
+                self._dict[n] = wsave
+                self._order.append(n)
+                self._nbytes += wsave.nbytes
+                self._prune()
+            return self._dict[n]
+        finally:
+            self._lock.release()
+
+    def _prune(self):
+        while len(self._order) > 1 and (len(self._order) > self.max_size or
+                                        self._nbytes > self.max_bytes):
+            wsave = self._dict.pop(self._order.pop(0))
+            self._nbytes -= wsave.nbytes
+
+    def clear(self):
+        self._lock.acquire()
+        try:
+            self._dict.clear()
+            self._order = []
+            self._nbytes = 0
+        finally:
+            self._lock.release()
+
+    def __contains__(self, n):
+        return n in self._dict
+
+    def __len__(self):
+        return len(self._dict)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+
+_fft_cache = _FFTCache()
+_real_fft_cache = _FFTCache()
+_chirp_cache = _FFTCache()
+
+# Lengths with a larger prime factor than this are transformed with
+# Bluestein's algorithm, which is faster than FFTPACK for them.
+_BLUESTEIN_FACTOR = 100
+
+def _largest_factor(n):
+    """
+    Return the largest prime factor of `n`, or 1 if `n` is 1.
+    """
+    factor = 1
+    p = 2
+    while p * p <= n:
+        while n % p == 0:
+            n //= p
+            factor = p
+        p += 1 + (p > 2)
+    if n > 1:
+        factor = n
+    return factor
+
+def _bluestein(n):
+    return n > _BLUESTEIN_FACTOR and _largest_factor(n) > _BLUESTEIN_FACTOR
+
+def _cfft_plan(n):
+    """
+    Return the work array of the complex transforms of `n` points.
+    """
+    if _bluestein(n):
+        return _chirp_cache.get(n, fftpack.cffti_chirp)
+    return _fft_cache.get(n, fftpack.cffti)
 
+def _resize_axis(a, n, axis):
+    """
+    Crop `a`, or pad it with zeros, to the length `n` along `axis`.
+    """
     if a.shape[axis] != n:
         s = list(a.shape)
         if s[axis] > n:
@@ -70,16 +168,158 @@ def _raw_fft(a, n=None, axis=-1, init_function=fftpack.cffti,
             z = zeros(s, a.dtype.char)
             z[index] = a
             a = z
+    return a
+
+def _raw_fft(a, n=None, axis=-1, init_function=fftpack.cffti,
+             work_function=fftpack.cfftf, fft_cache = _fft_cache,
+             threads=None):
+    a = asarray(a)
+
+    if n is None:
+        n = a.shape[axis]
+
+    if n < 1:
+        raise ValueError("Invalid number of FFT data points (%d) specified." % n)
+
+    wsave = fft_cache.get(n, init_function)
+    a = _resize_axis(a, n, axis)
 
     if axis != -1:
         a = swapaxes(a, axis, -1)
-    r = work_function(a, wsave)
+    r = work_function(a, wsave, _threads(threads))
     if axis != -1:
         r = swapaxes(r, axis, -1)
     return r
 
 
-def fft(a, n=None, axis=-1):
+def _threads(threads):
+    """
+    The number of threads to pass to fftpack_lite, 0 for the default.
+    """
+    if threads is None:
+        return 0
+    if threads < 1:
+        raise ValueError("Invalid number of threads (%d) specified." % threads)
+    return threads
+
+
+def _normalize_axes(axes, ndim):
+    axes = [axis + ndim * (axis < 0) for axis in axes]
+    for axis in axes:
+        if not 0 <= axis < ndim:
+            raise IndexError("axis %d out of range" % axis)
+    return axes
+
+
+def _crop_index(a, s, axes):
+    """
+    Return the index of the part of `a` kept when it is cropped or padded
+    to the lengths `s` along `axes`, and the shape it is resized to.
+    """
+    newshape = list(a.shape)
+    index = [slice(None)] * len(newshape)
+    for n, axis in zip(s, axes):
+        if n < 1:
+            raise ValueError("Invalid number of FFT data points (%d) "
+                             "specified." % n)
+        index[axis] = slice(0, min(n, newshape[axis]))
+        newshape[axis] = n
+    return tuple(index), newshape
+
+
+def _resized_copy(a, s, axes, dtype):
+    """
+    Return a copy of `a` cropped or padded with zeros to the lengths `s`
+    along `axes`.
+    """
+    index, newshape = _crop_index(a, s, axes)
+    if newshape == list(a.shape):
+        return array(a, dtype=dtype)
+    r = zeros(newshape, dtype)
+    r[index] = a[index]
+    return r
+
+
+def _raw_cfftn(a, s, axes, backward=False, threads=None):
+    """
+    Transform `a`, cropped or padded with zeros to the lengths `s`, along
+    each of `axes` in turn.  The transforms are done in place on a single
+    complex copy of `a`, with all the lines along an axis in one call.
+    """
+    r = _resized_copy(asarray(a), s, axes, complex)
+    wsaves = [_cfft_plan(n) for n in s]
+    fftpack.cfftn(r, axes, wsaves, backward, _threads(threads))
+    if backward:
+        r /= float(_product(s))
+    return r
+
+
+def _product(s):
+    return reduce(lambda x, y: x * y, s, 1)
+
+
+def _raw_rfftn(a, s, axes, threads=None):
+    """
+    Transform the real `a`, cropped or padded with zeros to the lengths `s`,
+    along the last of `axes` and then along the others.  The real transforms
+    write their halves of the spectra into the result, in which the complex
+    transforms are done in place.
+    """
+    a = asarray(a, dtype=float)
+    if not a.flags.aligned:
+        a = a.copy()
+    n, axis = s[-1], axes[-1]
+    if _bluestein(n):
+        # The first half of the complex transform, which handles any length
+        r = _raw_cfftn(a, s, axes, threads=threads)
+        return array(_resize_axis(r, n//2 + 1, axis))
+    index, newshape = _crop_index(a, s, axes)
+    index = index[:axis] + (slice(None),) + index[axis+1:]
+    newshape[axis] = n//2 + 1
+    if [newshape[i] for i in axes[:-1]] == [a.shape[i] for i in axes[:-1]]:
+        r = empty(newshape, complex)
+    else:
+        r = zeros(newshape, complex)
+    fftpack.rfft_lines(a[index], r[index], axis,
+                       _real_fft_cache.get(n, fftpack.rffti), False, 1.0,
+                       _threads(threads))
+    if len(axes) > 1:
+        fftpack.cfftn(r, axes[:-1], [_cfft_plan(m) for m in s[:-1]], False,
+                      _threads(threads))
+    return r
+
+
+def _raw_irfftn(a, s, axes, threads=None):
+    """
+    The inverse of _raw_rfftn: complex transforms along all but the last of
+    `axes`, done in place on a copy of `a`, and real transforms along the
+    last one which write into the result.
+    """
+    n, axis = s[-1], axes[-1]
+    if n < 1:
+        raise ValueError("Invalid number of FFT data points (%d) specified." % n)
+    c = _resized_copy(asarray(a), list(s[:-1]) + [n//2 + 1], axes, complex)
+    if len(axes) > 1:
+        fftpack.cfftn(c, axes[:-1], [_cfft_plan(m) for m in s[:-1]], True,
+                      _threads(threads))
+    if _bluestein(n):
+        # The complex transform of the whole Hermitian spectrum
+        index = [slice(None)] * len(c.shape)
+        index[axis] = slice(n - n//2 - 1, 0, -1)
+        c = concatenate((c, conjugate(c[tuple(index)])), axis)
+        fftpack.cfftn(c, [axis], [_cfft_plan(n)], True, _threads(threads))
+        c = array(c.real)
+        c /= float(_product(s))
+        return c
+    newshape = list(c.shape)
+    newshape[axis] = n
+    r = empty(newshape, float)
+    fftpack.rfft_lines(r, c, axis, _real_fft_cache.get(n, fftpack.rffti),
+                       True, 1.0 / _product(s), _threads(threads))
+    return r
+
+
+def fft(a, n=None, axis=-1, threads=None):
     """
     Compute the one-dimensional discrete Fourier Transform.
 
@@ -99,6 +339,10 @@ def fft(a, n=None, axis=-1):
     axis : int, optional
         Axis over which to compute the FFT.  If not given, the last axis is
         used.
+    threads : int, optional
+        Number of threads to compute the transforms with, at most the number
+        set with `numpy.setnumthreads`.  By default as many are used as for
+        ufuncs on arrays of the same size.
 
     Returns
     -------
@@ -125,7 +369,11 @@ def fft(a, n=None, axis=-1):
     FFT (Fast Fourier Transform) refers to a way the discrete Fourier
     Transform (DFT) can be calculated efficiently, by using symmetries in the
     calculated terms.  The symmetry is highest when `n` is a power of 2, and
-    the transform is therefore most efficient for these sizes.
+    the transform is therefore most efficient for these sizes.  Lengths
+    with prime factors larger than 100 are transformed with Bluestein's
+    algorithm [B]_ instead, which takes a few transforms of a power of 2
+    at least ``2*n - 1``.  `next_fast_len` gives lengths to pad the input
+    to for the fastest transforms.
 
     The DFT is defined, with the conventions used in this implementation, in
     the documentation for the `numpy.fft` module.
@@ -135,6 +383,9 @@ def fft(a, n=None, axis=-1):
     .. [CT] Cooley, James W., and John W. Tukey, 1965, "An algorithm for the
             machine calculation of complex Fourier series," *Math. Comput.*
             19: 297-301.
+    .. [B] Bluestein, Leo I., 1970, "A linear filtering approach to the
+           computation of discrete Fourier transform," *IEEE Transactions
+           on Audio and Electroacoustics* 18: 451-455.
 
     Examples
     --------
@@ -162,10 +413,13 @@ def fft(a, n=None, axis=-1):
 
     """
 
-    return _raw_fft(a, n, axis, fftpack.cffti, fftpack.cfftf, _fft_cache)
+    a = asarray(a)
+    if n is None:
+        n = a.shape[axis]
+    return _raw_cfftn(a, [n], [axis], threads=threads)
 
 
-def ifft(a, n=None, axis=-1):
+def ifft(a, n=None, axis=-1, threads=None):
     """
     Compute the one-dimensional inverse discrete Fourier Transform.
 
@@ -194,6 +448,10 @@ def ifft(a, n=None, axis=-1):
     axis : int, optional
         Axis over which to compute the inverse DFT.  If not given, the last
         axis is used.
+    threads : int, optional
+        Number of threads to compute the transforms with, at most the number
+        set with `numpy.setnumthreads`.  By default as many are used as for
+        ufuncs on arrays of the same size.
 
     Returns
     -------
@@ -240,13 +498,13 @@ def ifft(a, n=None, axis=-1):
 
     """
 
-    a = asarray(a).astype(complex)
+    a = asarray(a)
     if n is None:
         n = shape(a)[axis]
-    return _raw_fft(a, n, axis, fftpack.cffti, fftpack.cfftb, _fft_cache) / n
+    return _raw_cfftn(a, [n], [axis], backward=True, threads=threads)
 
 
-def rfft(a, n=None, axis=-1):
+def rfft(a, n=None, axis=-1, threads=None):
     """
     Compute the one-dimensional discrete Fourier Transform for real input.
 
@@ -266,6 +524,10 @@ def rfft(a, n=None, axis=-1):
     axis : int, optional
         Axis over which to compute the FFT. If not given, the last axis is
         used.
+    threads : int, optional
+        Number of threads to compute the transforms with, at most the number
+        set with `numpy.setnumthreads`.  By default as many are used as for
+        ufuncs on arrays of the same size.
 
     Returns
     -------
@@ -319,11 +581,13 @@ def rfft(a, n=None, axis=-1):
 
     """
 
-    a = asarray(a).astype(float)
-    return _raw_fft(a, n, axis, fftpack.rffti, fftpack.rfftf, _real_fft_cache)
+    a = asarray(a)
+    if n is None:
+        n = a.shape[axis]
+    return _raw_rfftn(a, [n], _normalize_axes([axis], len(a.shape)), threads)
 
 
-def irfft(a, n=None, axis=-1):
+def irfft(a, n=None, axis=-1, threads=None):
     """
     Compute the inverse of the n-point DFT for real input.
 
@@ -350,6 +614,10 @@ def irfft(a, n=None, axis=-1):
         the length of the input (along the axis specified by `axis`).
     axis : int, optional
         Axis over which to compute the inverse FFT.
+    threads : int, optional
+        Number of threads to compute the transforms with, at most the number
+        set with `numpy.setnumthreads`.  By default as many are used as for
+        ufuncs on arrays of the same size.
 
     Returns
     -------
@@ -400,14 +668,13 @@ def irfft(a, n=None, axis=-1):
 
     """
 
-    a = asarray(a).astype(complex)
+    a = asarray(a)
     if n is None:
         n = (shape(a)[axis] - 1) * 2
-    return _raw_fft(a, n, axis, fftpack.rffti, fftpack.rfftb,
-                    _real_fft_cache) / n
+    return _raw_irfftn(a, [n], _normalize_axes([axis], len(a.shape)), threads)
 
 
-def hfft(a, n=None, axis=-1):
+def hfft(a, n=None, axis=-1, threads=None):
     """
     Compute the FFT of a signal whose spectrum has Hermitian symmetry.
 
@@ -420,6 +687,10 @@ def hfft(a, n=None, axis=-1):
     axis : int, optional
         The axis over which to compute the FFT, assuming Hermitian symmetry
         of the spectrum. Default is the last axis.
+    threads : int, optional
+        Number of threads to compute the transforms with, at most the number
+        set with `numpy.setnumthreads`.  By default as many are used as for
+        ufuncs on arrays of the same size.
 
     Returns
     -------
@@ -455,10 +726,10 @@ def hfft(a, n=None, axis=-1):
     a = asarray(a).astype(complex)
     if n is None:
         n = (shape(a)[axis] - 1) * 2
-    return irfft(conjugate(a), n, axis) * n
+    return irfft(conjugate(a), n, axis, threads) * n
 
 
-def ihfft(a, n=None, axis=-1):
+def ihfft(a, n=None, axis=-1, threads=None):
     """
     Compute the inverse FFT of a signal whose spectrum has Hermitian symmetry.
 
@@ -471,6 +742,10 @@ def ihfft(a, n=None, axis=-1):
     axis : int, optional
         Axis over which to compute the inverse FFT, assuming Hermitian
         symmetry of the spectrum. Default is the last axis.
+    threads : int, optional
+        Number of threads to compute the transforms with, at most the number
+        set with `numpy.setnumthreads`.  By default as many are used as for
+        ufuncs on arrays of the same size.
 
     Returns
     -------
@@ -494,7 +769,7 @@ def ihfft(a, n=None, axis=-1):
     a = asarray(a).astype(float)
     if n is None:
         n = shape(a)[axis]
-    return conjugate(rfft(a, n, axis))/n
+    return conjugate(rfft(a, n, axis, threads))/n
 
 
 def _cook_nd_args(a, s=None, axes=None, invreal=0):
@@ -512,21 +787,27 @@ def _cook_nd_args(a, s=None, axes=None, invreal=0):
     if len(s) != len(axes):
         raise ValueError, "Shape and axes have different lengths."
     if invreal and shapeless:
-        s[axes[-1]] = (s[axes[-1]] - 1) * 2
+        s[-1] = (s[-1] - 1) * 2
     return s, axes
 
 
-def _raw_fftnd(a, s=None, axes=None, function=fft):
+def _raw_fftnd(a, s=None, axes=None, function=fft, threads=None):
     a = asarray(a)
     s, axes = _cook_nd_args(a, s, axes)
+    if function in (fft, ifft):
+        axes = _normalize_axes(axes, len(a.shape))
+        if len(set(axes)) == len(axes):
+            # All the axes at once, last one first as below
+            return _raw_cfftn(a, s[::-1], axes[::-1], function is ifft,
+                              threads)
     itl = range(len(axes))
     itl.reverse()
     for ii in itl:
-        a = function(a, n=s[ii], axis=axes[ii])
+        a = function(a, n=s[ii], axis=axes[ii], threads=threads)
     return a
 
 
-def fftn(a, s=None, axes=None):
+def fftn(a, s=None, axes=None, threads=None):
     """
     Compute the N-dimensional discrete Fourier Transform.
 
@@ -551,6 +832,10 @@ def fftn(a, s=None, axes=None):
         axes are used, or all axes if `s` is also not specified.
         Repeated indices in `axes` means that the transform over that axis is
         performed multiple times.
+    threads : int, optional
+        Number of threads to compute the transforms with, at most the number
+        set with `numpy.setnumthreads`.  By default as many are used as for
+        ufuncs on arrays of the same size.
 
     Returns
     -------
@@ -616,9 +901,9 @@ def fftn(a, s=None, axes=None):
 
     """
 
-    return _raw_fftnd(a,s,axes,fft)
+    return _raw_fftnd(a, s, axes, fft, threads)
 
-def ifftn(a, s=None, axes=None):
+def ifftn(a, s=None, axes=None, threads=None):
     """
     Compute the N-dimensional inverse discrete Fourier Transform.
 
@@ -652,6 +937,10 @@ def ifftn(a, s=None, axes=None):
         axes are used, or all axes if `s` is also not specified.
         Repeated indices in `axes` means that the inverse transform over that
         axis is performed multiple times.
+    threads : int, optional
+        Number of threads to compute the transforms with, at most the number
+        set with `numpy.setnumthreads`.  By default as many are used as for
+        ufuncs on arrays of the same size.
 
     Returns
     -------
@@ -708,10 +997,10 @@ def ifftn(a, s=None, axes=None):
 
     """
 
-    return _raw_fftnd(a, s, axes, ifft)
+    return _raw_fftnd(a, s, axes, ifft, threads)
 
 
-def fft2(a, s=None, axes=(-2,-1)):
+def fft2(a, s=None, axes=(-2,-1), threads=None):
     """
     Compute the 2-dimensional discrete Fourier Transform
 
@@ -737,6 +1026,10 @@ def fft2(a, s=None, axes=(-2,-1)):
         axes are used.  A repeated index in `axes` means the transform over
         that axis is performed multiple times.  A one-element sequence means
         that a one-dimensional FFT is performed.
+    threads : int, optional
+        Number of threads to compute the transforms with, at most the number
+        set with `numpy.setnumthreads`.  By default as many are used as for
+        ufuncs on arrays of the same size.
 
     Returns
     -------
@@ -789,10 +1082,10 @@ def fft2(a, s=None, axes=(-2,-1)):
 
     """
 
-    return _raw_fftnd(a,s,axes,fft)
+    return _raw_fftnd(a, s, axes, fft, threads)
 
 
-def ifft2(a, s=None, axes=(-2,-1)):
+def ifft2(a, s=None, axes=(-2,-1), threads=None):
     """
     Compute the 2-dimensional inverse discrete Fourier Transform.
 
@@ -825,6 +1118,10 @@ def ifft2(a, s=None, axes=(-2,-1)):
         axes are used.  A repeated index in `axes` means the transform over
         that axis is performed multiple times.  A one-element sequence means
         that a one-dimensional FFT is performed.
+    threads : int, optional
+        Number of threads to compute the transforms with, at most the number
+        set with `numpy.setnumthreads`.  By default as many are used as for
+        ufuncs on arrays of the same size.
 
     Returns
     -------
@@ -872,10 +1169,10 @@ def ifft2(a, s=None, axes=(-2,-1)):
 
     """
 
-    return _raw_fftnd(a, s, axes, ifft)
+    return _raw_fftnd(a, s, axes, ifft, threads)
 
 
-def rfftn(a, s=None, axes=None):
+def rfftn(a, s=None, axes=None, threads=None):
     """
     Compute the N-dimensional discrete Fourier Transform for real input.
 
@@ -901,6 +1198,10 @@ def rfftn(a, s=None, axes=None):
     axes : sequence of ints, optional
         Axes over which to compute the FFT.  If not given, the last ``len(s)``
         axes are used, or all axes if `s` is also not specified.
+    threads : int, optional
+        Number of threads to compute the transforms with, at most the number
+        set with `numpy.setnumthreads`.  By default as many are used as for
+        ufuncs on arrays of the same size.
 
     Returns
     -------
@@ -955,14 +1256,17 @@ def rfftn(a, s=None, axes=None):
 
     """
 
-    a = asarray(a).astype(float)
+    a = asarray(a)
     s, axes = _cook_nd_args(a, s, axes)
-    a = rfft(a, s[-1], axes[-1])
+    axes = _normalize_axes(axes, len(a.shape))
+    if len(set(axes)) == len(axes):
+        return _raw_rfftn(a, s, axes, threads)
+    a = rfft(a, s[-1], axes[-1], threads)
     for ii in range(len(axes)-1):
-        a = fft(a, s[ii], axes[ii])
+        a = fft(a, s[ii], axes[ii], threads)
     return a
 
-def rfft2(a, s=None, axes=(-2,-1)):
+def rfft2(a, s=None, axes=(-2,-1), threads=None):
     """
     Compute the 2-dimensional FFT of a real array.
 
@@ -974,6 +1278,10 @@ def rfft2(a, s=None, axes=(-2,-1)):
         Shape of the FFT.
     axes : sequence of ints, optional
         Axes over which to compute the FFT.
+    threads : int, optional
+        Number of threads to compute the transforms with, at most the number
+        set with `numpy.setnumthreads`.  By default as many are used as for
+        ufuncs on arrays of the same size.
 
     Returns
     -------
@@ -992,9 +1300,9 @@ def rfft2(a, s=None, axes=(-2,-1)):
 
     """
 
-    return rfftn(a, s, axes)
+    return rfftn(a, s, axes, threads)
 
-def irfftn(a, s=None, axes=None):
+def irfftn(a, s=None, axes=None, threads=None):
     """
     Compute the inverse of the N-dimensional FFT of real input.
 
@@ -1027,6 +1335,10 @@ def irfftn(a, s=None, axes=None):
         `len(s)` axes are used, or all axes if `s` is also not specified.
         Repeated indices in `axes` means that the inverse transform over that
         axis is performed multiple times.
+    threads : int, optional
+        Number of threads to compute the transforms with, at most the number
+        set with `numpy.setnumthreads`.  By default as many are used as for
+        ufuncs on arrays of the same size.
 
     Returns
     -------
@@ -1076,14 +1388,17 @@ def irfftn(a, s=None, axes=None):
 
     """
 
-    a = asarray(a).astype(complex)
+    a = asarray(a)
     s, axes = _cook_nd_args(a, s, axes, invreal=1)
+    axes = _normalize_axes(axes, len(a.shape))
+    if len(set(axes)) == len(axes):
+        return _raw_irfftn(a, s, axes, threads)
     for ii in range(len(axes)-1):
-        a = ifft(a, s[ii], axes[ii])
-    a = irfft(a, s[-1], axes[-1])
+        a = ifft(a, s[ii], axes[ii], threads)
+    a = irfft(a, s[-1], axes[-1], threads)
     return a
 
-def irfft2(a, s=None, axes=(-2,-1)):
+def irfft2(a, s=None, axes=(-2,-1), threads=None):
     """
     Compute the 2-dimensional inverse FFT of a real array.
 
@@ -1096,6 +1411,10 @@ def irfft2(a, s=None, axes=(-2,-1)):
     axes : sequence of ints, optional
         The axes over which to compute the inverse fft.
         Default is the last two axes.
+    threads : int, optional
+        Number of threads to compute the transforms with, at most the number
+        set with `numpy.setnumthreads`.  By default as many are used as for
+        ufuncs on arrays of the same size.
 
     Returns
     -------
@@ -1113,7 +1432,7 @@ def irfft2(a, s=None, axes=(-2,-1)):
 
     """
 
-    return irfftn(a, s, axes)
+    return irfftn(a, s, axes, threads)
 
 # Deprecated names
 from numpy import deprecate
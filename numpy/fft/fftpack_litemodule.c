@@ -5,9 +5,37 @@
 #include "fftpack.h"
 #include "Python.h"
 #include "numpy/arrayobject.h"
+#include <npy_threads.h>
+#include <npy_math.h>
 
 static PyObject *ErrorObject;
 
+
+/*
+ * The number of pieces to split `nlines` transforms of `n` points into,
+ * to run them in the thread pool.  At most `threads` pieces are used, or
+ * as many as the pool decides for the whole work if `threads` is 0.
+ */
+static int
+fft_nchunks(int threads, npy_intp nlines, npy_intp n)
+{
+    int nchunks, nthreads = NpyThreads_GetNumThreads();
+
+    if (threads <= 0) {
+        nchunks = NpyThreads_NumChunks(nlines*n);
+    }
+    else {
+        nchunks = threads;
+    }
+    if (nchunks > nthreads) {
+        nchunks = nthreads;
+    }
+    if (nchunks > nlines) {
+        nchunks = (int)nlines;
+    }
+    return nchunks > 1 ? nchunks : 1;
+}
+
 /* ----------------------------------------------------- */
 
 static char fftpack_cfftf__doc__[] = "";
@@ -139,6 +167,72 @@ fftpack_cffti(PyObject *NPY_UNUSED(self), PyObject *args)
     return (PyObject *)op;
 }
 
+/*
+ * The rows of a real transform run in the thread pool.  Each piece of the
+ * rows uses its own copy of the work array, whose first part is scratch
+ * space.
+ */
+typedef struct {
+    double *data;
+    double *ret;
+    double *wsave;
+    int npts;
+    int failed;
+} rfft_par;
+
+static void
+rfftf_chunk(void *data, npy_intp start, npy_intp end, int NPY_UNUSED(chunk))
+{
+    rfft_par *par = (rfft_par *)data;
+    int npts = par->npts, rstep = (npts/2 + 1)*2;
+    double *work, *dptr, *rptr;
+    npy_intp i;
+
+    work = (double *)malloc((2*npts + 15)*sizeof(double));
+    if (work == NULL) {
+        par->failed = 1;
+        return;
+    }
+    memcpy(work, par->wsave, (2*npts + 15)*sizeof(double));
+    rptr = par->ret + start*rstep;
+    dptr = par->data + start*npts;
+    for (i = start; i < end; i++) {
+        memcpy((char *)(rptr+1), dptr, npts*sizeof(double));
+        rfftf(npts, rptr+1, work);
+        rptr[0] = rptr[1];
+        rptr[1] = 0.0;
+        rptr += rstep;
+        dptr += npts;
+    }
+    free(work);
+}
+
+static void
+rfftb_chunk(void *data, npy_intp start, npy_intp end, int NPY_UNUSED(chunk))
+{
+    rfft_par *par = (rfft_par *)data;
+    int npts = par->npts;
+    double *work, *dptr, *rptr;
+    npy_intp i;
+
+    work = (double *)malloc((2*npts + 15)*sizeof(double));
+    if (work == NULL) {
+        par->failed = 1;
+        return;
+    }
+    memcpy(work, par->wsave, (2*npts + 15)*sizeof(double));
+    rptr = par->ret + start*npts;
+    dptr = par->data + start*npts*2;
+    for (i = start; i < end; i++) {
+        memcpy((char *)(rptr + 1), (dptr + 2), (npts - 1)*sizeof(double));
+        rptr[0] = dptr[0];
+        rfftb(npts, rptr, work);
+        rptr += npts;
+        dptr += npts*2;
+    }
+    free(work);
+}
+
 static char fftpack_rfftf__doc__[] ="";
 
 PyObject *
@@ -147,11 +241,12 @@ fftpack_rfftf(PyObject *NPY_UNUSED(self), PyObject *args)
     PyObject *op1, *op2;
     PyArrayObject *data, *ret;
     PyArray_Descr *descr;
-    double *wsave, *dptr, *rptr;
-    npy_intp nsave;
-    int npts, nrepeats, i, rstep;
+    double *wsave;
+    npy_intp nsave, nrepeats;
+    int npts, threads = 0;
+    rfft_par par;
 
-    if(!PyArg_ParseTuple(args, "OO", &op1, &op2)) {
+    if(!PyArg_ParseTuple(args, "OO|i", &op1, &op2, &threads)) {
         return NULL;
     }
     data = (PyArrayObject *)PyArray_ContiguousFromObject(op1,
@@ -164,7 +259,6 @@ fftpack_rfftf(PyObject *NPY_UNUSED(self), PyObject *args)
     ret = (PyArrayObject *)PyArray_Zeros(PyArray_NDIM(data), PyArray_DIMS(data),
             PyArray_DescrFromType(PyArray_CDOUBLE), 0);
     PyArray_DIM(data, PyArray_NDIM(data) - 1) = npts;
-    rstep = (PyArray_DIM(ret, PyArray_NDIM(ret) - 1))*2;
 
     descr = PyArray_DescrFromType(PyArray_DOUBLE);
     if (PyArray_AsCArray(&op2, (void *)&wsave, &nsave, 1, descr) == -1) {
@@ -179,20 +273,19 @@ fftpack_rfftf(PyObject *NPY_UNUSED(self), PyObject *args)
     }
 
     nrepeats = PyArray_SIZE(data)/npts;
-    rptr = (double *)PyArray_BYTES(ret);
-    dptr = (double *)PyArray_BYTES(data);
-
-
-    NPY_SIGINT_ON;
-    for (i = 0; i < nrepeats; i++) {
-        memcpy((char *)(rptr+1), dptr, npts*sizeof(double));
-        rfftf(npts, rptr+1, wsave);
-        rptr[0] = rptr[1];
-        rptr[1] = 0.0;
-        rptr += rstep;
-        dptr += npts;
+    par.data = (double *)PyArray_BYTES(data);
+    par.ret = (double *)PyArray_BYTES(ret);
+    par.wsave = wsave;
+    par.npts = npts;
+    par.failed = 0;
+    Py_BEGIN_ALLOW_THREADS;
+    NpyThreads_Run(rfftf_chunk, &par, nrepeats,
+                   fft_nchunks(threads, nrepeats, npts));
+    Py_END_ALLOW_THREADS;
+    if (par.failed) {
+        PyErr_NoMemory();
+        goto fail;
     }
-    NPY_SIGINT_OFF;
     PyArray_Free(op2, (char *)wsave);
     Py_DECREF(data);
     return (PyObject *)ret;
@@ -213,11 +306,12 @@ fftpack_rfftb(PyObject *NPY_UNUSED(self), PyObject *args)
     PyObject *op1, *op2;
     PyArrayObject *data, *ret;
     PyArray_Descr *descr;
-    double *wsave, *dptr, *rptr;
-    npy_intp nsave;
-    int npts, nrepeats, i;
+    double *wsave;
+    npy_intp nsave, nrepeats;
+    int npts, threads = 0;
+    rfft_par par;
 
-    if(!PyArg_ParseTuple(args, "OO", &op1, &op2)) {
+    if(!PyArg_ParseTuple(args, "OO|i", &op1, &op2, &threads)) {
         return NULL;
     }
     data = (PyArrayObject *)PyArray_ContiguousFromObject(op1,
@@ -242,18 +336,19 @@ fftpack_rfftb(PyObject *NPY_UNUSED(self), PyObject *args)
     }
 
     nrepeats = PyArray_SIZE(ret)/npts;
-    rptr = (double *)PyArray_BYTES(ret);
-    dptr = (double *)PyArray_BYTES(data);
-
-    NPY_SIGINT_ON;
-    for (i = 0; i < nrepeats; i++) {
-        memcpy((char *)(rptr + 1), (dptr + 2), (npts - 1)*sizeof(double));
-        rptr[0] = dptr[0];
-        rfftb(npts, rptr, wsave);
-        rptr += npts;
-        dptr += npts*2;
+    par.data = (double *)PyArray_BYTES(data);
+    par.ret = (double *)PyArray_BYTES(ret);
+    par.wsave = wsave;
+    par.npts = npts;
+    par.failed = 0;
+    Py_BEGIN_ALLOW_THREADS;
+    NpyThreads_Run(rfftb_chunk, &par, nrepeats,
+                   fft_nchunks(threads, nrepeats, npts));
+    Py_END_ALLOW_THREADS;
+    if (par.failed) {
+        PyErr_NoMemory();
+        goto fail;
     }
-    NPY_SIGINT_OFF;
     PyArray_Free(op2, (char *)wsave);
     Py_DECREF(data);
     return (PyObject *)ret;
@@ -293,6 +388,549 @@ fftpack_rffti(PyObject *NPY_UNUSED(self), PyObject *args)
 }
 
 
+/*
+ * Bluestein's algorithm computes a transform of n points, whatever its
+ * factors, as a convolution with a chirp done by transforms of m points,
+ * the smallest power of two of at least 2*n - 1.  Its work array, made by
+ * cffti_chirp, holds the chirp w[k] = exp(-i*pi*k*k/n) (n complex numbers),
+ * the transform of the filter conj(w) wrapped around to m points (m
+ * complex numbers) and the work array of the transforms of m points.
+ */
+static npy_intp
+chirp_size(npy_intp n)
+{
+    npy_intp m = 1;
+
+    while (m < 2*n - 1) {
+        m *= 2;
+    }
+    return m;
+}
+
+#define CHIRP_WSAVE_SIZE(n, m) (2*(n) + 2*(m) + 4*(m) + 15)
+
+/*
+ * A complex transform of n points, done by FFTPACK if m is 0 and by
+ * Bluestein's algorithm with transforms of m points otherwise.  `work` is
+ * a private copy of the FFTPACK work array for n or m points: its first
+ * part is scratch space, so it cannot be shared with other transforms
+ * running at the same time.  The chirp and filter are only read.
+ */
+typedef struct {
+    npy_intp n;
+    npy_intp m;
+    const double *chirp;
+    const double *filter;
+    double *work;
+} cfft_plan;
+
+/* Transform the n points of `c`, which has room for max(n, m) points */
+static void
+cfft_execute(cfft_plan *plan, double *c, int backward)
+{
+    npy_intp n = plan->n, m = plan->m, k;
+    const double *w = plan->chirp, *b = plan->filter;
+    double sign = backward ? -1.0 : 1.0;
+    double re, im;
+
+    if (m == 0) {
+        if (backward) {
+            cfftb(n, c, plan->work);
+        }
+        else {
+            cfftf(n, c, plan->work);
+        }
+        return;
+    }
+    /* The backward transform uses the conjugate chirp and filter */
+    for (k = 0; k < n; k++) {
+        re = c[2*k]*w[2*k] - c[2*k+1]*w[2*k+1]*sign;
+        im = c[2*k]*w[2*k+1]*sign + c[2*k+1]*w[2*k];
+        c[2*k] = re;
+        c[2*k+1] = im;
+    }
+    memset(c + 2*n, 0, 2*(m - n)*sizeof(double));
+    cfftf(m, c, plan->work);
+    for (k = 0; k < m; k++) {
+        re = c[2*k]*b[2*k] - c[2*k+1]*b[2*k+1]*sign;
+        im = c[2*k]*b[2*k+1]*sign + c[2*k+1]*b[2*k];
+        c[2*k] = re;
+        c[2*k+1] = im;
+    }
+    cfftb(m, c, plan->work);
+    for (k = 0; k < n; k++) {
+        re = (c[2*k]*w[2*k] - c[2*k+1]*w[2*k+1]*sign)/m;
+        im = (c[2*k]*w[2*k+1]*sign + c[2*k+1]*w[2*k])/m;
+        c[2*k] = re;
+        c[2*k+1] = im;
+    }
+}
+
+/*
+ * Transform the lines [start, stop) along `axis` of the complex array
+ * `data` in place.  Lines that are not contiguous, or that need more room
+ * for Bluestein's algorithm, are copied through `buf`.
+ */
+static void
+cfft_lines(char *data, int nd, npy_intp *dims, npy_intp *strides, int axis,
+           npy_intp start, npy_intp stop, double *buf, cfft_plan *plan,
+           int backward)
+{
+    npy_intp coord[NPY_MAXDIMS];
+    npy_intp n = dims[axis], step = strides[axis];
+    npy_intp line, j, rest;
+    char *ptr;
+    int i;
+
+    /* The coordinates of the first line, along the other axes */
+    rest = start;
+    for (i = nd - 1; i >= 0; i--) {
+        coord[i] = 0;
+        if (i != axis) {
+            coord[i] = rest % dims[i];
+            rest /= dims[i];
+        }
+    }
+    for (line = start; line < stop; line++) {
+        ptr = data;
+        for (i = 0; i < nd; i++) {
+            ptr += coord[i]*strides[i];
+        }
+        if (step == 2*sizeof(double) && plan->m == 0) {
+            cfft_execute(plan, (double *)ptr, backward);
+        }
+        else {
+            for (j = 0; j < n; j++) {
+                memcpy(buf + 2*j, ptr + j*step, 2*sizeof(double));
+            }
+            cfft_execute(plan, buf, backward);
+            for (j = 0; j < n; j++) {
+                memcpy(ptr + j*step, buf + 2*j, 2*sizeof(double));
+            }
+        }
+        /* Next line */
+        for (i = nd - 1; i >= 0; i--) {
+            if (i == axis) {
+                continue;
+            }
+            if (++coord[i] < dims[i]) {
+                break;
+            }
+            coord[i] = 0;
+        }
+    }
+}
+
+static char fftpack_cffti_chirp__doc__[] =
+    "cffti_chirp(n)\n\n"
+    "Make the work array of complex transforms of n points done by\n"
+    "Bluestein's algorithm, for n with large prime factors.";
+
+static PyObject *
+fftpack_cffti_chirp(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyArrayObject *op;
+    npy_intp dim, m, k;
+    double *w, *b, *wsave, angle;
+    long n;
+
+    if (!PyArg_ParseTuple(args, "l", &n)) {
+        return NULL;
+    }
+    if (n < 1) {
+        PyErr_SetString(PyExc_ValueError, "invalid fft size");
+        return NULL;
+    }
+    m = chirp_size(n);
+    dim = CHIRP_WSAVE_SIZE(n, m);
+    op = (PyArrayObject *)PyArray_SimpleNew(1, &dim, PyArray_DOUBLE);
+    if (op == NULL) {
+        return NULL;
+    }
+    w = (double *)PyArray_BYTES(op);
+    b = w + 2*n;
+    wsave = b + 2*m;
+
+    Py_BEGIN_ALLOW_THREADS;
+    for (k = 0; k < n; k++) {
+        /* k*k modulo 2*n keeps the angle accurate for large k */
+        angle = NPY_PI*(double)(((npy_ulonglong)k*k) % (2*n))/n;
+        w[2*k] = cos(angle);
+        w[2*k+1] = -sin(angle);
+    }
+    memset(b, 0, 2*m*sizeof(double));
+    for (k = 0; k < n; k++) {
+        b[2*k] = w[2*k];
+        b[2*k+1] = -w[2*k+1];
+        if (k > 0) {
+            b[2*(m-k)] = w[2*k];
+            b[2*(m-k)+1] = -w[2*k+1];
+        }
+    }
+    cffti(m, wsave);
+    cfftf(m, b, wsave);
+    Py_END_ALLOW_THREADS;
+
+    return (PyObject *)op;
+}
+
+/* The lines along an axis of a complex transform run in the thread pool */
+typedef struct {
+    char *data;
+    int nd;
+    npy_intp *dims;
+    npy_intp *strides;
+    int axis;
+    double *wsave;
+    npy_intp m;
+    int backward;
+    int failed;
+} cfft_par;
+
+static void
+cfft_chunk(void *data, npy_intp start, npy_intp end, int NPY_UNUSED(chunk))
+{
+    cfft_par *par = (cfft_par *)data;
+    npy_intp n = par->dims[par->axis], size;
+    cfft_plan plan;
+    double *buf;
+
+    plan.n = n;
+    plan.m = par->m;
+    size = par->m ? par->m : n;
+    buf = (double *)malloc((6*size + 15)*sizeof(double));
+    if (buf == NULL) {
+        par->failed = 1;
+        return;
+    }
+    plan.work = buf + 2*size;
+    if (par->m) {
+        plan.chirp = par->wsave;
+        plan.filter = par->wsave + 2*n;
+        memcpy(plan.work, par->wsave + 2*n + 2*par->m,
+               (4*par->m + 15)*sizeof(double));
+    }
+    else {
+        plan.chirp = plan.filter = NULL;
+        memcpy(plan.work, par->wsave, (4*n + 15)*sizeof(double));
+    }
+    cfft_lines(par->data, par->nd, par->dims, par->strides, par->axis,
+               start, end, buf, &plan, par->backward);
+    free(buf);
+}
+
+static char fftpack_cfftn__doc__[] =
+    "cfftn(a, axes, wsaves, backward, threads=0)\n\n"
+    "Transform the complex array `a` in place along each of `axes`, in\n"
+    "order, with the work arrays `wsaves` made by cffti or cffti_chirp.\n"
+    "The lines along"
+    " an axis are split between at most `threads` threads, or as many\n"
+    "as the thread pool uses for the size of the transform if it is 0.";
+
+static PyObject *
+fftpack_cfftn(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyObject *axes, *wsaves, *item;
+    PyArrayObject *data, *wsave[NPY_MAXDIMS];
+    npy_intp *dims, nlines;
+    npy_intp m[NPY_MAXDIMS], n;
+    int axis[NPY_MAXDIMS];
+    int nd, naxes, i, backward, threads = 0, failed = 0;
+    cfft_par par;
+
+    if (!PyArg_ParseTuple(args, "O!OOi|i", &PyArray_Type, &data, &axes,
+                          &wsaves, &backward, &threads)) {
+        return NULL;
+    }
+    if (PyArray_TYPE(data) != PyArray_CDOUBLE ||
+            !PyArray_ISBEHAVED(data) || !PyArray_ISNOTSWAPPED(data)) {
+        PyErr_SetString(PyExc_ValueError,
+                        "array must be a writeable complex128 array");
+        return NULL;
+    }
+    nd = PyArray_NDIM(data);
+    dims = PyArray_DIMS(data);
+    naxes = PySequence_Size(axes);
+    if (naxes < 0 || naxes != PySequence_Size(wsaves) || naxes > nd) {
+        PyErr_SetString(PyExc_ValueError,
+                        "axes and work arrays do not match the array");
+        return NULL;
+    }
+    for (i = 0; i < naxes; i++) {
+        wsave[i] = NULL;
+    }
+    for (i = 0; i < naxes; i++) {
+        item = PySequence_GetItem(axes, i);
+        if (item == NULL) {
+            goto fail;
+        }
+        axis[i] = PyInt_AsLong(item);
+        Py_DECREF(item);
+        if (axis[i] == -1 && PyErr_Occurred()) {
+            goto fail;
+        }
+        if (axis[i] < 0) {
+            axis[i] += nd;
+        }
+        if (axis[i] < 0 || axis[i] >= nd) {
+            PyErr_SetString(PyExc_ValueError, "invalid axis");
+            goto fail;
+        }
+        item = PySequence_GetItem(wsaves, i);
+        if (item == NULL) {
+            goto fail;
+        }
+        wsave[i] = (PyArrayObject *)PyArray_ContiguousFromObject(item,
+                PyArray_DOUBLE, 1, 1);
+        Py_DECREF(item);
+        if (wsave[i] == NULL) {
+            goto fail;
+        }
+        /* The size of the work array tells which algorithm made it */
+        n = dims[axis[i]];
+        m[i] = 0;
+        if (PyArray_DIM(wsave[i], 0) != n*4 + 15) {
+            m[i] = chirp_size(n);
+            if (PyArray_DIM(wsave[i], 0) != CHIRP_WSAVE_SIZE(n, m[i])) {
+                PyErr_SetString(ErrorObject,
+                                "invalid work array for fft size");
+                goto fail;
+            }
+        }
+    }
+    if (PyArray_SIZE(data) == 0) {
+        goto finish;
+    }
+
+    par.data = PyArray_BYTES(data);
+    par.nd = nd;
+    par.dims = dims;
+    par.strides = PyArray_STRIDES(data);
+    par.backward = backward;
+    par.failed = 0;
+    Py_BEGIN_ALLOW_THREADS;
+    for (i = 0; i < naxes && !par.failed; i++) {
+        par.axis = axis[i];
+        par.wsave = (double *)PyArray_BYTES(wsave[i]);
+        par.m = m[i];
+        nlines = PyArray_SIZE(data)/dims[axis[i]];
+        NpyThreads_Run(cfft_chunk, &par, nlines,
+                       fft_nchunks(threads, nlines, dims[axis[i]]));
+    }
+    Py_END_ALLOW_THREADS;
+    if (par.failed) {
+        PyErr_NoMemory();
+        goto fail;
+    }
+
+ finish:
+    for (i = 0; i < naxes; i++) {
+        Py_XDECREF(wsave[i]);
+    }
+    if (failed) {
+        return NULL;
+    }
+    Py_INCREF(Py_None);
+    return Py_None;
+
+ fail:
+    failed = 1;
+    goto finish;
+}
+
+
+/*
+ * Real transforms of the lines along an axis of a real array `rdata`, to
+ * or from the lines of a complex array `cdata`.  The two arrays have the
+ * same shape but along the axis, where the complex one has n/2 + 1 points.
+ * The real lines are cropped or padded with zeros to n points when they
+ * are read, and the real results are multiplied by `scale`.
+ */
+typedef struct {
+    char *rdata;
+    npy_intp *rdims;
+    npy_intp *rstrides;
+    char *cdata;
+    npy_intp *cstrides;
+    int nd;
+    int axis;
+    int npts;
+    double *wsave;
+    double scale;
+    int backward;
+    int failed;
+} rfft_lines_par;
+
+static void
+rfft_lines_chunk(void *data, npy_intp start, npy_intp end,
+                 int NPY_UNUSED(chunk))
+{
+    rfft_lines_par *par = (rfft_lines_par *)data;
+    npy_intp coord[NPY_MAXDIMS];
+    npy_intp *dims = par->rdims;
+    npy_intp rlen = dims[par->axis], rstep = par->rstrides[par->axis];
+    npy_intp cstep = par->cstrides[par->axis];
+    npy_intp n = par->npts, m = n/2 + 1, line, j, rest, nread;
+    double *buf, *work;
+    char *rptr, *cptr;
+    int i, nd = par->nd, axis = par->axis;
+
+    buf = (double *)malloc((2*m + 2*n + 15)*sizeof(double));
+    if (buf == NULL) {
+        par->failed = 1;
+        return;
+    }
+    work = buf + 2*m;
+    memcpy(work, par->wsave, (2*n + 15)*sizeof(double));
+    nread = rlen < n ? rlen : n;
+
+    rest = start;
+    for (i = nd - 1; i >= 0; i--) {
+        coord[i] = 0;
+        if (i != axis) {
+            coord[i] = rest % dims[i];
+            rest /= dims[i];
+        }
+    }
+    for (line = start; line < end; line++) {
+        rptr = par->rdata;
+        cptr = par->cdata;
+        for (i = 0; i < nd; i++) {
+            rptr += coord[i]*par->rstrides[i];
+            cptr += coord[i]*par->cstrides[i];
+        }
+        if (!par->backward) {
+            /* The transform is stored from buf[1], as FFTPACK leaves it */
+            for (j = 0; j < nread; j++) {
+                buf[j + 1] = *(double *)(rptr + j*rstep);
+            }
+            for (j = nread; j < n; j++) {
+                buf[j + 1] = 0.0;
+            }
+            rfftf(n, buf + 1, work);
+            buf[0] = buf[1];
+            buf[1] = 0.0;
+            if (n % 2 == 0) {
+                buf[n + 1] = 0.0;
+            }
+            for (j = 0; j < m; j++) {
+                memcpy(cptr + j*cstep, buf + 2*j, 2*sizeof(double));
+            }
+        }
+        else {
+            buf[0] = *(double *)cptr;
+            for (j = 1; j < m; j++) {
+                memcpy(buf + 2*j - 1, cptr + j*cstep, 2*sizeof(double));
+            }
+            rfftb(n, buf, work);
+            for (j = 0; j < rlen; j++) {
+                *(double *)(rptr + j*rstep) = buf[j]*par->scale;
+            }
+        }
+        for (i = nd - 1; i >= 0; i--) {
+            if (i == axis) {
+                continue;
+            }
+            if (++coord[i] < dims[i]) {
+                break;
+            }
+            coord[i] = 0;
+        }
+    }
+    free(buf);
+}
+
+static char fftpack_rfft_lines__doc__[] =
+    "rfft_lines(r, c, axis, wsave, backward, scale=1.0, threads=0)\n\n"
+    "Transform the lines along `axis` of the real array `r` into the\n"
+    "complex array `c` or, if `backward`, those of `c` into `r`, with the\n"
+    "work array `wsave` made by rffti for n points.  The arrays have the\n"
+    "same shape but along `axis`, where `c` has n/2 + 1 points.  Lines of\n"
+    "`r` with another length are cropped or padded with zeros to n points\n"
+    "for forward transforms, and the results of backward transforms are\n"
+    "cropped to them.  Backward results are multiplied by `scale`.";
+
+static PyObject *
+fftpack_rfft_lines(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyArrayObject *rdata, *cdata, *wsave;
+    PyObject *op;
+    rfft_lines_par par;
+    npy_intp nlines, n;
+    int i, axis, backward, threads = 0;
+    double scale = 1.0;
+
+    if (!PyArg_ParseTuple(args, "O!O!iOi|di", &PyArray_Type, &rdata,
+                          &PyArray_Type, &cdata, &axis, &op, &backward,
+                          &scale, &threads)) {
+        return NULL;
+    }
+    if (PyArray_TYPE(rdata) != PyArray_DOUBLE ||
+            PyArray_TYPE(cdata) != PyArray_CDOUBLE ||
+            !PyArray_ISALIGNED(rdata) || !PyArray_ISNOTSWAPPED(rdata) ||
+            !PyArray_ISALIGNED(cdata) || !PyArray_ISNOTSWAPPED(cdata) ||
+            !PyArray_ISWRITEABLE(backward ? rdata : cdata)) {
+        PyErr_SetString(PyExc_ValueError,
+                        "arrays must be float64 and complex128 arrays");
+        return NULL;
+    }
+    par.nd = PyArray_NDIM(rdata);
+    if (axis < 0) {
+        axis += par.nd;
+    }
+    if (axis < 0 || axis >= par.nd || PyArray_NDIM(cdata) != par.nd) {
+        PyErr_SetString(PyExc_ValueError, "invalid axis");
+        return NULL;
+    }
+    wsave = (PyArrayObject *)PyArray_ContiguousFromObject(op,
+            PyArray_DOUBLE, 1, 1);
+    if (wsave == NULL) {
+        return NULL;
+    }
+    n = (PyArray_DIM(wsave, 0) - 15)/2;
+    if (n < 1 || PyArray_DIM(wsave, 0) != 2*n + 15) {
+        PyErr_SetString(ErrorObject, "invalid work array for fft size");
+        goto fail;
+    }
+    for (i = 0; i < par.nd; i++) {
+        if (PyArray_DIM(cdata, i) !=
+                (i == axis ? n/2 + 1 : PyArray_DIM(rdata, i)) ||
+                (backward && i == axis && PyArray_DIM(rdata, i) > n)) {
+            PyErr_SetString(PyExc_ValueError,
+                            "array shapes do not match the fft size");
+            goto fail;
+        }
+    }
+    par.rdata = PyArray_BYTES(rdata);
+    par.rdims = PyArray_DIMS(rdata);
+    par.rstrides = PyArray_STRIDES(rdata);
+    par.cdata = PyArray_BYTES(cdata);
+    par.cstrides = PyArray_STRIDES(cdata);
+    par.axis = axis;
+    par.npts = n;
+    par.wsave = (double *)PyArray_BYTES(wsave);
+    par.scale = scale;
+    par.backward = backward;
+    par.failed = 0;
+    nlines = PyArray_SIZE(cdata)/(n/2 + 1);
+    Py_BEGIN_ALLOW_THREADS;
+    NpyThreads_Run(rfft_lines_chunk, &par, nlines,
+                   fft_nchunks(threads, nlines, n));
+    Py_END_ALLOW_THREADS;
+    if (par.failed) {
+        PyErr_NoMemory();
+        goto fail;
+    }
+    Py_DECREF(wsave);
+    Py_INCREF(Py_None);
+    return Py_None;
+
+ fail:
+    Py_DECREF(wsave);
+    return NULL;
+}
+
+
 /* List of methods defined in the module */
 
 static struct PyMethodDef fftpack_methods[] = {
@@ -302,6 +940,9 @@ static struct PyMethodDef fftpack_methods[] = {
     {"rfftf",   fftpack_rfftf,  1,      fftpack_rfftf__doc__},
     {"rfftb",   fftpack_rfftb,  1,      fftpack_rfftb__doc__},
     {"rffti",   fftpack_rffti,  1,      fftpack_rffti__doc__},
+    {"cfftn",   fftpack_cfftn,  1,      fftpack_cfftn__doc__},
+    {"cffti_chirp", fftpack_cffti_chirp, 1, fftpack_cffti_chirp__doc__},
+    {"rfft_lines", fftpack_rfft_lines, 1, fftpack_rfft_lines__doc__},
     {NULL, NULL, 0, NULL}          /* sentinel */
 };
 
@@ -3,7 +3,7 @@ Discrete Fourier Transforms - helper.py
 """
 # Created by Pearu Peterson, September 2002
 
-__all__ = ['fftshift','ifftshift','fftfreq']
+__all__ = ['fftshift','ifftshift','fftfreq','next_fast_len']
 
 from numpy.core import asarray, concatenate, arange, take, \
     integer, empty
@@ -160,3 +160,46 @@ def fftfreq(n,d=1.0):
     results[N:] = p2
     return results * val
     #return hstack((arange(0,(n-1)/2 + 1), arange(-(n/2),0))) / (n*d)
+
+def next_fast_len(n):
+    """
+    Return the smallest length of at least `n` with no prime factors but
+    2, 3 and 5.
+
+    The transforms of such lengths are the fastest, so padding the input of
+    a transform to this length with zeros is useful when its exact length
+    does not matter, as for convolutions.
+
+    Parameters
+    ----------
+    n : int
+        The minimum length.
+
+    Returns
+    -------
+    out : int
+        The smallest 2, 3, 5-smooth length of at least `n`.
+
+    Examples
+    --------
+    >>> np.fft.next_fast_len(1000003)
+    1012500
+    >>> x = np.fft.fft(np.ones(1000003), np.fft.next_fast_len(1000003))
+
+    """
+    if n < 1:
+        raise ValueError("Invalid length (%d) specified." % n)
+    best = None
+    p5 = 1
+    while best is None or p5 < best:
+        p35 = p5
+        while best is None or p35 < best:
+            # The smallest power of 2 times p35 that is at least n
+            m = p35
+            while m < n:
+                m *= 2
+            if best is None or m < best:
+                best = m
+            p35 *= 3
+        p5 *= 5
+    return best
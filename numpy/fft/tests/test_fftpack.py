@@ -19,5 +19,153 @@ class TestFFT1D(TestCase):
         assert_array_almost_equal(fft1(x), np.fft.fft(x))
 
 
+class TestBluestein(TestCase):
+    def test_prime_lengths(self):
+        rand = np.random.random
+        for n in (101, 211, 1009, 2*211, 3*257):
+            x = rand(n) + 1j*rand(n)
+            y = np.fft.fft(x)
+            assert_array_almost_equal(y, fft1(x))
+            assert_array_almost_equal(np.fft.ifft(y), x)
+            self.assertTrue(n in np.fft.fftpack._chirp_cache)
+
+    def test_real(self):
+        rand = np.random.random
+        for n in (211, 2*211):
+            x = rand((3, n))
+            y = np.fft.rfft(x)
+            assert_array_almost_equal(y, np.fft.fft(x)[:, :n//2 + 1])
+            assert_array_almost_equal(np.fft.irfft(y, n), x)
+
+    def test_axes(self):
+        rand = np.random.random
+        x = rand((4, 211, 3)) + 1j*rand((4, 211, 3))
+        y = np.fft.fftn(x)
+        assert_array_almost_equal(np.fft.fft(x, axis=1),
+                                  np.apply_along_axis(fft1, 1, x))
+        assert_array_almost_equal(np.fft.ifftn(y), x)
+
+
+class TestFFTND(TestCase):
+    def test_fftn(self):
+        rand = np.random.random
+        x = rand((4, 5, 6)) + 1j*rand((4, 5, 6))
+        y = x
+        for axis in (2, 1, 0):
+            y = np.apply_along_axis(fft1, axis, y)
+        assert_array_almost_equal(np.fft.fftn(x), y)
+        assert_array_almost_equal(np.fft.ifftn(np.fft.fftn(x)), x)
+
+    def test_axes_and_shape(self):
+        rand = np.random.random
+        x = rand((4, 5, 6)) + 1j*rand((4, 5, 6))
+        y = np.fft.fft(np.fft.fft(x, 3, axis=2), 7, axis=0)
+        assert_array_almost_equal(np.fft.fftn(x, (7, 3), (0, -1)), y)
+        assert_array_almost_equal(np.fft.fft2(x.T), np.fft.fft2(x.T.copy()))
+        self.assertRaises(IndexError, np.fft.fftn, x, None, (0, 3))
+        self.assertRaises(ValueError, np.fft.fftn, x, (0, 3), (0, 1))
+
+
+class TestRealFFTND(TestCase):
+    def test_rfftn(self):
+        x = np.random.random((6, 7, 8))
+        for s, axes in [(None, None), ((5, 9, 10), None), ((4, 7), (2, 0)),
+                        ((3, 11), (-1, -2)), ((6, 211), (0, 1))]:
+            y = np.fft.fftn(x, s, axes)
+            last = (axes or [-1])[-1]
+            index = [slice(None)] * 3
+            index[last] = slice(0, y.shape[last] // 2 + 1)
+            assert_array_almost_equal(np.fft.rfftn(x, s, axes), y[index])
+            if s is None:
+                s = x.shape
+            assert_array_almost_equal(
+                np.fft.irfftn(np.fft.rfftn(x, s, axes), s, axes),
+                np.fft.ifftn(y, s, axes).real)
+
+    def test_strided(self):
+        x = np.random.random((8, 10, 12))[::2, :, 1::3].transpose(2, 0, 1)
+        assert_array_almost_equal(np.fft.rfft2(x), np.fft.rfft2(x.copy()))
+        assert_array_almost_equal(np.fft.rfft(x, axis=1),
+                                  np.fft.fft(x, axis=1)[:, :3])
+        y = np.fft.rfft2(x)
+        assert_array_almost_equal(np.fft.irfft2(y.transpose(1, 0, 2),
+                                                axes=(0, 2)),
+                                  x.transpose(1, 0, 2))
+
+    def test_irfft_empty_output(self):
+        self.assertRaises(ValueError, np.fft.irfft, np.array([2.+0j]))
+        self.assertRaises(ValueError, np.fft.irfft, np.ones(4, complex), 0)
+        self.assertRaises(ValueError, np.fft.irfftn, np.ones((3, 1)))
+
+
+class TestThreadedFFT(TestCase):
+    def setUp(self):
+        self.nthreads = np.setnumthreads(4)
+        self.threshold = np.setthreadthreshold(10)
+
+    def tearDown(self):
+        np.setnumthreads(self.nthreads)
+        np.setthreadthreshold(self.threshold)
+
+    def test_threads(self):
+        rand = np.random.random
+        x = rand((37, 24))
+        z = x + 1j*rand((37, 24))
+        for f, a in [(np.fft.fft, z), (np.fft.ifft, z), (np.fft.rfft, x),
+                     (np.fft.irfft, z), (np.fft.hfft, z), (np.fft.ihfft, x),
+                     (np.fft.fftn, z), (np.fft.ifftn, z), (np.fft.rfftn, x),
+                     (np.fft.irfftn, z)]:
+            y = f(a, threads=1)
+            for threads in (None, 2, 3, 8):
+                assert_array_equal(f(a, threads=threads), y)
+        assert_array_equal(np.fft.fft(z, axis=0, threads=3),
+                           np.fft.fft(z, axis=0, threads=1))
+        self.assertRaises(ValueError, np.fft.fft, z, threads=0)
+
+
+class TestFFTCache(TestCase):
+    def test_lru(self):
+        cache = np.fft.fftpack._FFTCache(max_size=3)
+        init = np.fft.fftpack.fftpack.cffti
+        for n in (4, 5, 6):
+            cache.get(n, init)
+        cache.get(4, init)
+        cache.get(7, init)
+        self.assertEqual(len(cache), 3)
+        self.assertTrue(5 not in cache)
+        self.assertTrue(4 in cache and 7 in cache)
+
+    def test_nbytes(self):
+        init = np.fft.fftpack.fftpack.cffti
+        cache = np.fft.fftpack._FFTCache(max_bytes=init(100).nbytes)
+        cache.get(100, init)
+        cache.get(10, init)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.nbytes, init(10).nbytes)
+        # The last work array is kept even if it is too large
+        cache.get(1000, init)
+        self.assertEqual(len(cache), 1)
+        self.assertTrue(1000 in cache)
+
+    def test_threads(self):
+        import threading
+        x = np.random.random((16, 32)) + 0j
+        y = np.fft.fft(x)
+        errors = []
+        def worker(sizes):
+            for n in sizes:
+                if not np.allclose(np.fft.fft(x, n)[:, :1], y[:, :1]):
+                    errors.append(n)
+        np.fft.fftpack._fft_cache.clear()
+        threads = [threading.Thread(target=worker,
+                                    args=(range(32 + i, 100, 3),))
+                   for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+
+
 if __name__ == "__main__":
     run_module_suite()
@@ -4,7 +4,7 @@
 """
 
 from numpy.testing import *
-from numpy.fft import fftshift,ifftshift,fftfreq
+from numpy.fft import fftshift,ifftshift,fftfreq,next_fast_len
 
 from numpy import pi
 
@@ -46,5 +46,19 @@ class TestFFTFreq(TestCase):
         assert_array_almost_equal(10*pi*fftfreq(10,pi),x)
 
 
+class TestNextFastLen(TestCase):
+    def test_definition(self):
+        def smooth(n):
+            for p in (2, 3, 5):
+                while n % p == 0:
+                    n //= p
+            return n == 1
+        fast = [n for n in range(1, 1000) if smooth(n)]
+        for n in range(1, 900):
+            assert_equal(next_fast_len(n), [m for m in fast if m >= n][0])
+        assert_equal(next_fast_len(1000003), 1012500)
+        self.assertRaises(ValueError, next_fast_len, 0)
+
+
 if __name__ == "__main__":
     run_module_suite()
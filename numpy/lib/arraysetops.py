@@ -1,5 +1,5 @@
 """
-Set operations for 1D numeric arrays based on sorting.
+Set operations for 1D numeric arrays based on sorting or hashing.
 
 :Contains:
   ediff1d,
@@ -20,9 +20,13 @@ Set operations for 1D numeric arrays based on sorting.
 For floating point arrays, inaccurate results may appear due to usual round-off
 and floating point comparison issues.
 
-Speed could be gained in some operations by an implementation of
-sort(), that can provide directly the permutation vectors, avoiding
-thus calls to argsort().
+The functions taking a `method` argument can either sort the values or
+put them in a hash table.  Hashing takes linear time and avoids the
+argsort() calls needed to find indices, but is only available for
+boolean, integer, datetime, single and double precision floating point
+and complex, and string types.  With method='auto' hashing is used for
+large arrays of these types when sorting all the values is not needed,
+but not for subclasses of ndarray such as masked arrays.
 
 To do: Optionally return indices analogously to unique for all functions.
 
@@ -33,6 +37,37 @@ __all__ = ['ediff1d', 'unique1d', 'intersect1d', 'intersect1d_nu', 'setxor1d',
 
 import numpy as np
 from numpy.lib.utils import deprecate
+from numpy.lib._compiled_base import _can_hash, _hash_unique, _hash_in1d
+
+# Inputs with fewer elements are sorted when method is 'auto'.
+_HASH_MIN_SIZE = 1000
+
+def _use_hash(method, dtype, size, exact=True):
+    """
+    Return whether to hash values of `dtype` rather than sort them.  With
+    method 'auto', subclasses of ndarray (`exact` False) are sorted, as
+    their own methods may do it differently.
+    """
+    dtype = np.dtype(dtype).newbyteorder('=')
+    if method == 'sort':
+        return False
+    elif method == 'hash':
+        if not _can_hash(dtype):
+            raise TypeError("cannot hash the elements of %s arrays" % dtype)
+        return True
+    elif method == 'auto':
+        return exact and size >= _HASH_MIN_SIZE and _can_hash(dtype)
+    raise ValueError("method must be one of 'auto', 'sort' or 'hash'")
+
+def _native(ar):
+    """`ar` in the native byte order, which hashing needs."""
+    if not ar.dtype.isnative:
+        ar = ar.astype(ar.dtype.newbyteorder('='))
+    return ar
+
+def _common_type(ar1, ar2):
+    """The type of the concatenation of two arrays."""
+    return np.concatenate((ar1[:0], ar2[:0])).dtype
 
 def ediff1d(ary, to_end=None, to_begin=None):
     """
@@ -92,14 +127,16 @@ def ediff1d(ary, to_end=None, to_begin=None):
 
     return ed
 
-def unique(ar, return_index=False, return_inverse=False):
+def unique(ar, return_index=False, return_inverse=False,
+           return_counts=False, ordered=True, method='auto'):
     """
     Find the unique elements of an array.
 
-    Returns the sorted unique elements of an array. There are two optional
+    Returns the sorted unique elements of an array. There are three optional
     outputs in addition to the unique elements: the indices of the input array
-    that give the unique values, and the indices of the unique array that
-    reconstruct the input array.
+    that give the unique values, the indices of the unique array that
+    reconstruct the input array, and the number of times each unique value
+    occurs in the input array.
 
     Parameters
     ----------
@@ -111,23 +148,47 @@ def unique(ar, return_index=False, return_inverse=False):
     return_inverse : bool, optional
         If True, also return the indices of the unique array that can be used
         to reconstruct `ar`.
+    return_counts : bool, optional
+        If True, also return the number of times each unique value occurs
+        in `ar`.
+    ordered : bool, optional
+        If True (default), the unique values are sorted.  Otherwise they
+        are returned in the order of their first occurrence in `ar`, which
+        allows them to be found without sorting.
+    method : {'auto', 'sort', 'hash'}, optional
+        Whether to find the unique values by sorting `ar` or with a hash
+        table.  The default, 'auto', hashes large arrays of the supported
+        types when indices or counts are requested or `ordered` is False,
+        but not the instances of subclasses of ndarray.
 
     Returns
     -------
     unique : ndarray
-        The sorted unique values.
+        The unique values.
     unique_indices : ndarray, optional
         The indices of the unique values in the (flattened) original array.
         Only provided if `return_index` is True.
     unique_inverse : ndarray, optional
         The indices to reconstruct the (flattened) original array from the
         unique array. Only provided if `return_inverse` is True.
+    unique_counts : ndarray, optional
+        The number of occurrences of each unique value in the original
+        array. Only provided if `return_counts` is True.
 
     See Also
     --------
     numpy.lib.arraysetops : Module with a number of other functions for
                             performing set operations on arrays.
 
+    Notes
+    -----
+    When hashing, each unique value is found once and the unique values are
+    sorted afterwards if `ordered` is True.  Both methods give the same
+    results, with `unique_indices` pointing to the first occurrence of each
+    value, except for the order of nans.  Like with ``==``, every nan is a
+    different value; if `ordered` is True they all come last, in an order
+    which depends on the method.
+
     Examples
     --------
     >>> np.unique([1, 1, 2, 2, 3, 3])
@@ -160,45 +221,93 @@ def unique(ar, return_index=False, return_inverse=False):
     >>> u[indices]
     array([1, 2, 6, 4, 2, 3, 2])
 
+    Count the values in the order they first appear:
+
+    >>> np.unique([3, 1, 3, 2, 1, 3], return_counts=True, ordered=False)
+    (array([3, 1, 2]), array([3, 2, 1]))
+
     """
+    extras = return_index or return_inverse or return_counts
     try:
         ar = ar.flatten()
     except AttributeError:
-        if not return_inverse and not return_index:
+        if not extras and ordered and method in ('auto', 'sort'):
             items = sorted(set(ar))
             return np.asarray(items)
         else:
             ar = np.asanyarray(ar).flatten()
 
     if ar.size == 0:
-        if return_inverse and return_index:
-            return ar, np.empty(0, np.bool), np.empty(0, np.bool)
-        elif return_inverse or return_index:
-            return ar, np.empty(0, np.bool)
-        else:
-            return ar
+        ret = (ar,)
+        for flag in [return_index, return_inverse, return_counts]:
+            if flag:
+                ret += (np.empty(0, np.bool),)
+        if len(ret) == 1:
+            return ret[0]
+        return ret
+
+    if method == 'auto' and ordered and not extras:
+        # Sorting all the values in place is faster than hashing them
+        # and sorting the unique ones unless there are very few of them.
+        method = 'sort'
+    use_hash = _use_hash(method, ar.dtype, ar.size, type(ar) is np.ndarray)
+    if not use_hash and ordered and not extras:
+        ar.sort()
+        flag = np.concatenate(([True], ar[1:] != ar[:-1]))
+        return ar[flag]
 
-    if return_inverse or return_index:
+    # Both methods find the values in some order, which is then changed
+    # to the requested one if needed.
+    order = None
+    if use_hash:
+        aux, index, inverse, counts = _hash_unique(_native(ar), return_index,
+                                                   return_inverse,
+                                                   return_counts)
+        if not ar.dtype.isnative:
+            aux = aux.astype(ar.dtype)
+        if ordered:
+            order = aux.argsort(kind='mergesort')
+    else:
         perm = ar.argsort()
         aux = ar[perm]
         flag = np.concatenate(([True], aux[1:] != aux[:-1]))
+        aux = aux[flag]
+        # argsort is not stable, so look for the first occurrence of each
+        # value among the equal ones
+        index = np.minimum.reduceat(perm, np.nonzero(flag)[0])
         if return_inverse:
-            iflag = np.cumsum(flag) - 1
-            iperm = perm.argsort()
-            if return_index:
-                return aux[flag], perm[flag], iflag[iperm]
-            else:
-                return aux[flag], iflag[iperm]
-        else:
-            return aux[flag], perm[flag]
+            inverse = np.empty(ar.size, np.intp)
+            inverse[perm] = np.cumsum(flag) - 1
+        if return_counts:
+            counts = np.diff(np.concatenate((np.nonzero(flag)[0],
+                                             [ar.size])))
+        if not ordered:
+            order = index.argsort()
+
+    if order is not None:
+        aux = aux[order]
+        if return_index:
+            index = index[order]
+        if return_counts:
+            counts = counts[order]
+        if return_inverse:
+            rank = np.empty(len(order), np.intp)
+            rank[order] = np.arange(len(order))
+            inverse = rank[inverse]
 
-    else:
-        ar.sort()
-        flag = np.concatenate(([True], ar[1:] != ar[:-1]))
-        return ar[flag]
+    ret = (aux,)
+    if return_index:
+        ret += (index,)
+    if return_inverse:
+        ret += (inverse,)
+    if return_counts:
+        ret += (counts,)
+    if len(ret) == 1:
+        return ret[0]
+    return ret
 
 
-def intersect1d(ar1, ar2, assume_unique=False):
+def intersect1d(ar1, ar2, assume_unique=False, method='auto'):
     """
     Find the intersection of two arrays.
 
@@ -211,6 +320,10 @@ def intersect1d(ar1, ar2, assume_unique=False):
     assume_unique : bool
         If True, the input arrays are both assumed to be unique, which
         can speed up the calculation.  Default is False.
+    method : {'auto', 'sort', 'hash'}, optional
+        Whether to compare the values by sorting them or with a hash
+        table.  The default, 'auto', hashes large arrays of the types
+        supported.
 
     Returns
     -------
@@ -228,6 +341,19 @@ def intersect1d(ar1, ar2, assume_unique=False):
     array([1, 3])
 
     """
+    ar1 = np.asanyarray(ar1).ravel()
+    ar2 = np.asanyarray(ar2).ravel()
+    dtype = _common_type(ar1, ar2)
+    exact = type(ar1) is np.ndarray and type(ar2) is np.ndarray
+    if _use_hash(method, dtype, ar1.size + ar2.size, exact):
+        # Only the unique values of ar1 have to be sorted.
+        if not assume_unique:
+            ar1 = unique(ar1, method=method)
+        ar1 = np.asarray(ar1, dtype)
+        aux = ar1[_hash_in1d(_native(ar1), _native(np.asarray(ar2, dtype)))]
+        if assume_unique:
+            aux.sort()
+        return aux
     if not assume_unique:
         # Might be faster than unique( intersect1d( ar1, ar2 ) )?
         ar1 = unique(ar1)
@@ -236,7 +362,7 @@ def intersect1d(ar1, ar2, assume_unique=False):
     aux.sort()
     return aux[aux[1:] == aux[:-1]]
 
-def setxor1d(ar1, ar2, assume_unique=False):
+def setxor1d(ar1, ar2, assume_unique=False, method='auto'):
     """
     Find the set exclusive-or of two arrays.
 
@@ -250,6 +376,10 @@ def setxor1d(ar1, ar2, assume_unique=False):
     assume_unique : bool
         If True, the input arrays are both assumed to be unique, which
         can speed up the calculation.  Default is False.
+    method : {'auto', 'sort', 'hash'}, optional
+        Whether to compare the values by sorting them or with a hash
+        table.  The default, 'auto', hashes large arrays of the types
+        supported.
 
     Returns
     -------
@@ -266,13 +396,22 @@ def setxor1d(ar1, ar2, assume_unique=False):
 
     """
     if not assume_unique:
-        ar1 = unique(ar1)
-        ar2 = unique(ar2)
+        ar1 = unique(ar1, method=method)
+        ar2 = unique(ar2, method=method)
 
     aux = np.concatenate( (ar1, ar2) )
     if aux.size == 0:
         return aux
 
+    if _use_hash(method, aux.dtype, aux.size, type(aux) is np.ndarray):
+        ar1 = aux[:len(ar1)]
+        ar2 = aux[len(ar1):]
+        (native1, native2) = (_native(ar1), _native(ar2))
+        aux = np.concatenate((ar1[~_hash_in1d(native1, native2)],
+                              ar2[~_hash_in1d(native2, native1)]))
+        aux.sort()
+        return aux
+
     aux.sort()
 #    flag = ediff1d( aux, to_end = 1, to_begin = 1 ) == 0
     flag = np.concatenate( ([True], aux[1:] != aux[:-1], [True] ) )
@@ -280,7 +419,7 @@ def setxor1d(ar1, ar2, assume_unique=False):
     flag2 = flag[1:] == flag[:-1]
     return aux[flag2]
 
-def in1d(ar1, ar2, assume_unique=False):
+def in1d(ar1, ar2, assume_unique=False, method='auto'):
     """
     Test whether each element of a 1D array is also present in a second array.
 
@@ -296,6 +435,11 @@ def in1d(ar1, ar2, assume_unique=False):
     assume_unique : bool, optional
         If True, the input arrays are both assumed to be unique, which
         can speed up the calculation.  Default is False.
+    method : {'auto', 'sort', 'hash'}, optional
+        Whether to compare the values by sorting them or by looking them
+        up in a hash table of the values of `ar2`, which takes linear
+        time.  The default, 'auto', hashes large arrays of the types
+        supported.
 
     Returns
     -------
@@ -326,9 +470,16 @@ def in1d(ar1, ar2, assume_unique=False):
     array([0, 2, 0])
 
     """
+    ar1 = np.asarray(ar1).ravel()
+    ar2 = np.asarray(ar2).ravel()
+    dtype = _common_type(ar1, ar2)
+    if _use_hash(method, dtype, ar1.size + ar2.size):
+        dtype = np.dtype(dtype).newbyteorder('=')
+        return _hash_in1d(np.asarray(ar1, dtype), np.asarray(ar2, dtype))
+
     if not assume_unique:
-        ar1, rev_idx = np.unique(ar1, return_inverse=True)
-        ar2 = np.unique(ar2)
+        ar1, rev_idx = np.unique(ar1, return_inverse=True, method='sort')
+        ar2 = np.unique(ar2, method='sort')
 
     ar = np.concatenate( (ar1, ar2) )
     # We need this to be a stable sort, so always use 'mergesort'
@@ -345,7 +496,7 @@ def in1d(ar1, ar2, assume_unique=False):
     else:
         return flag[indx][rev_idx]
 
-def union1d(ar1, ar2):
+def union1d(ar1, ar2, method='auto'):
     """
     Find the union of two arrays.
 
@@ -356,6 +507,9 @@ def union1d(ar1, ar2):
     ----------
     ar1, ar2 : array_like
         Input arrays. They are flattened if they are not already 1D.
+    method : {'auto', 'sort', 'hash'}, optional
+        Whether to find the unique values by sorting them or with a hash
+        table, see `unique`.
 
     Returns
     -------
@@ -373,9 +527,9 @@ def union1d(ar1, ar2):
     array([-2, -1,  0,  1,  2])
 
     """
-    return unique( np.concatenate( (ar1, ar2) ) )
+    return unique( np.concatenate( (ar1, ar2) ), method=method )
 
-def setdiff1d(ar1, ar2, assume_unique=False):
+def setdiff1d(ar1, ar2, assume_unique=False, method='auto'):
     """
     Find the set difference of two arrays.
 
@@ -390,6 +544,10 @@ def setdiff1d(ar1, ar2, assume_unique=False):
     assume_unique : bool
         If True, the input arrays are both assumed to be unique, which
         can speed up the calculation.  Default is False.
+    method : {'auto', 'sort', 'hash'}, optional
+        Whether to compare the values by sorting them or with a hash
+        table.  The default, 'auto', hashes large arrays of the types
+        supported.
 
     Returns
     -------
@@ -410,9 +568,8 @@ def setdiff1d(ar1, ar2, assume_unique=False):
 
     """
     if not assume_unique:
-        ar1 = unique(ar1)
-        ar2 = unique(ar2)
-    aux = in1d(ar1, ar2, assume_unique=True)
+        ar1 = unique(ar1, method=method)
+    aux = in1d(ar1, ar2, assume_unique=assume_unique, method=method)
     if aux.size == 0:
         return aux
     else:
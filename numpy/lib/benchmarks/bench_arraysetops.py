@@ -61,5 +61,66 @@ def bench_unique1d( plot_results = False ):
         plotMe( 2, pylab.plot, nItems, dt1s, dt2s )
         pylab.show()
 
+def bench_method( plot_results = False ):
+    """Compare the 'sort' and 'hash' methods of the set operations."""
+    exponents = np.linspace( 2, 7, 9 )
+    nItems = []
+    results = {}
+    for ii in exponents:
+
+        nItem = int( 10 ** ii )
+        print 'using %d items:' % nItem
+        a = np.fix( nItem / 10 * np.random.random( nItem ) ).astype( int )
+        b = a[:nItem // 10 + 1] + nItem // 20
+
+        tests = [('unique', unique, (a,), {}),
+                 ('unique inverse', unique, (a,), {'return_inverse' : True}),
+                 ('unique counts', unique, (a,), {'return_counts' : True}),
+                 ('in1d', in1d, (a, b), {}),
+                 ('intersect1d', intersect1d, (a, b), {}),
+                 ('setdiff1d', setdiff1d, (a, b), {})]
+
+        for name, fun, args, kwargs in tests:
+            dts = []
+            for method in ('sort', 'hash'):
+                tt = time.clock()
+                res = fun( *args, **dict( kwargs, method = method ) )
+                dts.append( time.clock() - tt )
+                if method == 'sort':
+                    expected = res
+                else:
+                    if isinstance( res, tuple ):
+                        res, expected = res[0], expected[0]
+                    assert np.alltrue( res == expected )
+            if dts[1] < 1e-8:
+                ratio = 'ND'
+            else:
+                ratio = dts[0] / dts[1]
+            print '%s: sort %f, hash %f, ratio: %s' % ((name,) + tuple( dts )
+                                                       + (ratio,))
+            results.setdefault( name, [] ).append( dts )
+        print
+
+        nItems.append( nItem )
+
+    print nItems
+    for name in sorted( results ):
+        print name, results[name]
+
+    if plot_results:
+        import pylab
+
+        for fig, name in enumerate( sorted( results ) ):
+            dts = np.array( results[name] )
+            pylab.figure( fig + 1 )
+            pylab.loglog( nItems, dts[:,0], 'g-o', linewidth = 2, markersize = 8 )
+            pylab.loglog( nItems, dts[:,1], 'b-x', linewidth = 2, markersize = 8 )
+            pylab.legend( ('sort', 'hash') )
+            pylab.title( name )
+            pylab.xlabel( 'nItem' )
+            pylab.ylabel( 'time [s]' )
+        pylab.show()
+
 if __name__ == '__main__':
     bench_unique1d( plot_results = True )
+    bench_method( plot_results = True )
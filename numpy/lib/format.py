@@ -128,6 +128,30 @@ Consumers can figure out the number of bytes by multiplying the number
 of elements given by the shape (noting that ``shape=()`` means there is
 1 element) by ``dtype.itemsize``.
 
+Format Version 2.0
+------------------
+
+Version 2.0 stores an array in chunks of rows, so that rows can be
+appended along the first axis without rewriting the file and read back
+without reading the other rows.  The magic string, the header length and
+the header are as in version 1.0, but the dictionary contains these keys:
+
+    "compression" : None or "zlib"
+      How the data of the chunks is compressed.
+    "descr" : dtype.descr
+      As in version 1.0.
+    "rowshape" : tuple of int
+      The shape of a row, that is the shape of the array without its
+      first axis.
+
+Following the header come the chunks, one after the other up to the end of
+the file.  A chunk starts with two little-endian unsigned 64-bit integers:
+the number of rows in the chunk and the number of bytes of its data, which
+follow.  The data is the C-contiguous bytes of the rows, compressed with
+zlib if the header says so.  The number of rows of the array is the sum of
+those of the chunks; a reader finds the chunks from their headers.  Arrays
+of Python objects cannot be stored in this version.
+
 Notes
 -----
 The ``.npy`` format, including reasons for creating it and a comparison of
@@ -147,6 +171,11 @@ if sys.platform == 'cli':
 else:
     MAGIC_PREFIX = asbytes('\x93NUMPY')
 MAGIC_LEN = len(MAGIC_PREFIX) + 2
+# The header of a chunk in a 2.0 file: its number of rows and of bytes.
+CHUNK_HEADER = '<QQ'
+COMPRESSIONS = (None, 'zlib')
+# Bytes of data written at a time to filelike objects that are not files.
+WRITE_BUFSIZE = 1 << 24
 
 def magic(major, minor):
     """ Return the magic string for the given file format version.
@@ -288,6 +317,48 @@ def write_array_header_1_0(fp, d):
     fp.write(header_len_str)
     fp.write(header)
 
+def _read_header_dict(fp):
+    """
+    Read the length and the dictionary of an array header.
+    """
+    # Read an unsigned, little-endian short int which has the length of the
+    # header.
+    import struct
+    hlength_str = fp.read(2)
+    if len(hlength_str) != 2:
+        msg = "EOF at %s before reading array header length"
+        raise ValueError(msg % fp.tell())
+    header_length = struct.unpack('<H', hlength_str)[0]
+    header = fp.read(header_length)
+    if len(header) != header_length:
+        raise ValueError("EOF at %s before reading array header" % fp.tell())
+
+    # The header is a pretty-printed string representation of a literal Python
+    # dictionary with trailing newlines padded to a 16-byte boundary. The keys
+    # are strings.
+    try:
+        d = safe_eval(header)
+    except SyntaxError, e:
+        msg = "Cannot parse header: %r\nException: %r"
+        raise ValueError(msg % (header, e))
+    if not isinstance(d, dict):
+        msg = "Header is not a dictionary: %r"
+        raise ValueError(msg % d)
+    return d
+
+def _check_shape(shape, key='shape'):
+    if (not isinstance(shape, tuple) or
+        not numpy.all([isinstance(x, (int,long)) for x in shape])):
+        msg = "%s is not valid: %r"
+        raise ValueError(msg % (key, shape))
+
+def _check_descr(descr):
+    try:
+        return numpy.dtype(descr)
+    except TypeError, e:
+        msg = "descr is not a valid dtype descriptor: %r"
+        raise ValueError(msg % (descr,))
+
 def read_array_header_1_0(fp):
     """
     Read an array header from a filelike object using the 1.0 file format
@@ -317,32 +388,10 @@ def read_array_header_1_0(fp):
         If the data is invalid.
 
     """
-    # Read an unsigned, little-endian short int which has the length of the
-    # header.
-    import struct
-    hlength_str = fp.read(2)
-    if len(hlength_str) != 2:
-        msg = "EOF at %s before reading array header length"
-        raise ValueError(msg % fp.tell())
-    header_length = struct.unpack('<H', hlength_str)[0]
-    header = fp.read(header_length)
-    if len(header) != header_length:
-        raise ValueError("EOF at %s before reading array header" % fp.tell())
-
-    # The header is a pretty-printed string representation of a literal Python
-    # dictionary with trailing newlines padded to a 16-byte boundary. The keys
-    # are strings.
     #   "shape" : tuple of int
     #   "fortran_order" : bool
     #   "descr" : dtype.descr
-    try:
-        d = safe_eval(header)
-    except SyntaxError, e:
-        msg = "Cannot parse header: %r\nException: %r"
-        raise ValueError(msg % (header, e))
-    if not isinstance(d, dict):
-        msg = "Header is not a dictionary: %r"
-        raise ValueError(msg % d)
+    d = _read_header_dict(fp)
     keys = d.keys()
     keys.sort()
     if keys != ['descr', 'fortran_order', 'shape']:
@@ -350,21 +399,123 @@ def read_array_header_1_0(fp):
         raise ValueError(msg % (keys,))
 
     # Sanity-check the values.
-    if (not isinstance(d['shape'], tuple) or
-        not numpy.all([isinstance(x, (int,long)) for x in d['shape']])):
-        msg = "shape is not valid: %r"
-        raise ValueError(msg % (d['shape'],))
+    _check_shape(d['shape'])
     if not isinstance(d['fortran_order'], bool):
         msg = "fortran_order is not a valid bool: %r"
         raise ValueError(msg % (d['fortran_order'],))
-    try:
-        dtype = numpy.dtype(d['descr'])
-    except TypeError, e:
-        msg = "descr is not a valid dtype descriptor: %r"
-        raise ValueError(msg % (d['descr'],))
+    dtype = _check_descr(d['descr'])
 
     return d['shape'], d['fortran_order'], dtype
 
+def write_array_header_2_0(fp, dtype, rowshape, compression=None):
+    """ Write the header for a chunked array using the 2.0 format.
+
+    Parameters
+    ----------
+    fp : filelike object
+    dtype : dtype
+        The dtype of the array.
+    rowshape : tuple of int
+        The shape of the rows of the array.
+    compression : {None, 'zlib'}, optional
+        How the chunks are compressed.
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError("compression must be one of %s" % (COMPRESSIONS,))
+    d = dict(descr=dtype_to_descr(dtype), rowshape=tuple(rowshape),
+             compression=compression)
+    write_array_header_1_0(fp, d)
+
+def read_array_header_2_0(fp):
+    """
+    Read the header of a chunked array from a filelike object using the 2.0
+    file format version.
+
+    This will leave the file object located just after the header, at the
+    first chunk.
+
+    Parameters
+    ----------
+    fp : filelike object
+        A file object or something with a `.read()` method like a file.
+
+    Returns
+    -------
+    rowshape : tuple of int
+        The shape of the rows of the array.
+    dtype : dtype
+        The dtype of the file's data.
+    compression : {None, 'zlib'}
+        How the chunks are compressed.
+
+    Raises
+    ------
+    ValueError :
+        If the data is invalid.
+
+    """
+    d = _read_header_dict(fp)
+    keys = d.keys()
+    keys.sort()
+    if keys != ['compression', 'descr', 'rowshape']:
+        msg = "Header does not contain the correct keys: %r"
+        raise ValueError(msg % (keys,))
+    _check_shape(d['rowshape'], 'rowshape')
+    if d['compression'] not in COMPRESSIONS:
+        msg = "compression is not valid: %r"
+        raise ValueError(msg % (d['compression'],))
+    dtype = _check_descr(d['descr'])
+    if dtype.hasobject:
+        raise ValueError("Chunked arrays cannot contain Python objects.")
+    return d['rowshape'], dtype, d['compression']
+
+def _write_chunk(fp, rows, compression):
+    """
+    Write the array `rows` as a chunk of a 2.0 file.
+    """
+    import struct
+    data = rows.tostring('C')
+    if compression == 'zlib':
+        import zlib
+        data = zlib.compress(data)
+    fp.write(struct.pack(CHUNK_HEADER, len(rows), len(data)))
+    fp.write(data)
+
+def _decode_chunk(data, nrows, dtype, rowshape, compression):
+    """
+    Return the `nrows` rows of a chunk of a 2.0 file from the bytes of its
+    data.  The number of rows is given since rows of no bytes have none.
+    """
+    if compression == 'zlib':
+        import zlib
+        data = zlib.decompress(data)
+    rows = numpy.fromstring(data, dtype=dtype)
+    return rows.reshape((nrows,) + tuple(rowshape))
+
+def _read_chunk_index(fp):
+    """
+    Read the headers of the chunks of a 2.0 file, from the first one, and
+    return the list of their (first row, number of rows, offset of their
+    data, number of bytes).  A last chunk whose data is not all there is
+    left out.
+    """
+    import struct
+    chunks = []
+    row = 0
+    offset = fp.tell()
+    fp.seek(0, 2)
+    end = fp.tell()
+    hsize = struct.calcsize(CHUNK_HEADER)
+    while offset + hsize <= end:
+        fp.seek(offset)
+        (nrows, nbytes) = struct.unpack(CHUNK_HEADER, fp.read(hsize))
+        if offset + hsize + nbytes > end:
+            break
+        chunks.append((row, nrows, offset + hsize, nbytes))
+        row += nrows
+        offset += hsize + nbytes
+    return chunks
+
 def write_array(fp, array, version=(1,0)):
     """
     Write an array to an NPY file, including a header.
@@ -393,8 +544,11 @@ def write_array(fp, array, version=(1,0)):
         are not picklable.
 
     """
+    if version == (2, 0):
+        _write_chunked_array(fp, array)
+        return
     if version != (1, 0):
-        msg = "we only support format version (1,0), not %s"
+        msg = "we only support format versions (1,0) and (2,0), not %s"
         raise ValueError(msg % (version,))
     fp.write(magic(*version))
     write_array_header_1_0(fp, header_data_from_array_1_0(array))
@@ -406,14 +560,41 @@ def write_array(fp, array, version=(1,0)):
         if isfileobj(fp):
             array.T.tofile(fp)
         else:
-            fp.write(array.T.tostring('C'))
+            _write_pieces(fp, array.T)
     else:
         if isfileobj(fp):
             array.tofile(fp)
         else:
-            # XXX: We could probably chunk this using something like
-            # arrayterator.
-            fp.write(array.tostring('C'))
+            _write_pieces(fp, array)
+
+def _write_chunked_array(fp, array):
+    """
+    Write an array as a 2.0 file, in chunks of about WRITE_BUFSIZE bytes.
+    """
+    if array.dtype.hasobject:
+        raise ValueError("Chunked arrays cannot contain Python objects.")
+    if array.ndim == 0:
+        raise ValueError("Chunked arrays must have at least one dimension.")
+    fp.write(magic(2, 0))
+    write_array_header_2_0(fp, array.dtype, array.shape[1:])
+    rows = max(WRITE_BUFSIZE // max(array[0:1].nbytes, 1), 1)
+    for i in range(0, len(array), rows):
+        _write_chunk(fp, array[i:i + rows], None)
+
+def _write_pieces(fp, array):
+    """
+    Write the data of `array` in C order to the filelike object `fp`, in
+    pieces of about WRITE_BUFSIZE bytes so that no copy of all of it is
+    made.
+    """
+    if array.nbytes <= WRITE_BUFSIZE:
+        fp.write(array.tostring('C'))
+        return
+    if array.flags.c_contiguous:
+        array = array.ravel()
+    rows = max(WRITE_BUFSIZE // array[0].nbytes, 1)
+    for i in range(0, len(array), rows):
+        fp.write(array[i:i + rows].tostring('C'))
 
 def read_array(fp):
     """
@@ -437,6 +618,8 @@ def read_array(fp):
 
     """
     version = read_magic(fp)
+    if version == (2, 0):
+        return _read_chunked_array(fp)
     if version != (1, 0):
         msg = "only support version (1,0) of file format, not %r"
         raise ValueError(msg % (version,))
@@ -470,6 +653,247 @@ def read_array(fp):
     return array
 
 
+def _read_chunked_array(fp):
+    """
+    Read all the rows of a 2.0 file after its magic string.
+    """
+    import struct
+    rowshape, dtype, compression = read_array_header_2_0(fp)
+    hsize = struct.calcsize(CHUNK_HEADER)
+    chunks = []
+    while True:
+        header = fp.read(hsize)
+        if len(header) < hsize:
+            break
+        (nrows, nbytes) = struct.unpack(CHUNK_HEADER, header)
+        data = fp.read(nbytes)
+        if len(data) < nbytes:
+            # The last chunk was not completely written
+            break
+        chunks.append(_decode_chunk(data, nrows, dtype, rowshape,
+                                    compression))
+    if not chunks:
+        return numpy.empty((0,) + rowshape, dtype=dtype)
+    return numpy.concatenate(chunks)
+
+
+class ChunkedArrayFile(object):
+    """
+    ChunkedArrayFile(filename, mode='r', dtype=None, rowshape=(),
+                     compression=None)
+
+    An array stored in chunks of rows in a ``.npy`` file of version 2.0.
+
+    Rows can be appended to the array with `append`, which writes them as
+    a new chunk at the end of the file.  Indexing the object or calling
+    `read` returns rows of the array, reading only the chunks that
+    contain them, and only the requested rows of uncompressed chunks.
+
+    Parameters
+    ----------
+    filename : str
+        The name of the file on disk. This may not be a file-like object.
+    mode : {'r', 'r+', 'w+'}, optional
+        Open an existing file to read it ('r', the default) or to read and
+        append to it ('r+'), or create a new file ('w+').  The other modes
+        of `numpy.memmap` are accepted too.
+    dtype : dtype, optional
+        The data type of the array if a new file is created.
+    rowshape : tuple of int, optional
+        The shape of the rows, that is of the array without its first axis,
+        if a new file is created.  Default is () for a 1-D array.
+    compression : {None, 'zlib'}, optional
+        How the chunks of a new file are compressed.  Default is None.
+
+    Attributes
+    ----------
+    dtype : dtype
+        The data type of the array.
+    shape : tuple of int
+        The shape of the array.
+    compression : {None, 'zlib'}
+        How the chunks are compressed.
+    chunks : list of tuples
+        The first row, number of rows, offset and number of bytes of the
+        data of each chunk.
+
+    See Also
+    --------
+    open_memmap
+
+    Examples
+    --------
+    >>> from numpy.lib import format
+    >>> f = format.ChunkedArrayFile('/tmp/rows.npy', 'w+', dtype=float,
+    ...                             rowshape=(3,))
+    >>> f.append(np.ones((2, 3)))
+    >>> f.append(np.zeros((1, 3)))
+    >>> f.shape
+    (3, 3)
+    >>> f[1:]
+    array([[ 1.,  1.,  1.],
+           [ 0.,  0.,  0.]])
+    >>> f.close()
+    >>> np.load('/tmp/rows.npy').shape
+    (3, 3)
+
+    """
+    def __init__(self, filename, mode='r', dtype=None, rowshape=(),
+                 compression=None):
+        if not isinstance(filename, basestring):
+            raise ValueError("Filename must be a string.  Chunked files cannot"
+                             " use existing file handles.")
+        mode = {'c': 'r', 'readonly': 'r', 'copyonwrite': 'r',
+                'readwrite': 'r+', 'write': 'w+'}.get(mode, mode)
+        if mode not in ('r', 'r+', 'w+'):
+            raise ValueError("mode must be one of 'r', 'r+' or 'w+'")
+        if mode == 'w+':
+            dtype = numpy.dtype(dtype)
+            if dtype.hasobject:
+                raise ValueError("Chunked arrays cannot contain Python "
+                                 "objects.")
+            rowshape = tuple(rowshape)
+            fp = open(filename, 'w+b')
+            fp.write(magic(2, 0))
+            write_array_header_2_0(fp, dtype, rowshape, compression)
+            self.chunks = []
+            self._end = fp.tell()
+        else:
+            fp = open(filename, mode + 'b')
+            try:
+                version = read_magic(fp)
+                if version != (2, 0):
+                    msg = "only files of version (2,0) are chunked, not %r"
+                    raise ValueError(msg % (version,))
+                rowshape, dtype, compression = read_array_header_2_0(fp)
+                self._end = fp.tell()
+                self.chunks = _read_chunk_index(fp)
+            except:
+                fp.close()
+                raise
+            if self.chunks:
+                (row, nrows, offset, nbytes) = self.chunks[-1]
+                self._end = offset + nbytes
+        self.fp = fp
+        self.mode = mode
+        self.dtype = dtype
+        self.rowshape = rowshape
+        self.compression = compression
+
+    def __len__(self):
+        if not self.chunks:
+            return 0
+        (row, nrows, offset, nbytes) = self.chunks[-1]
+        return row + nrows
+
+    @property
+    def shape(self):
+        return (len(self),) + self.rowshape
+
+    def append(self, rows):
+        """
+        Append rows to the array as a new chunk.
+
+        Parameters
+        ----------
+        rows : array_like
+            The rows to append, with the shape of a row or an array of
+            rows.  They are cast to the data type of the file.
+        """
+        import struct
+        if self.mode == 'r':
+            raise ValueError("Cannot append to a file opened read-only.")
+        rows = numpy.asarray(rows, dtype=self.dtype)
+        if rows.shape == self.rowshape:
+            rows = rows.reshape((1,) + self.rowshape)
+        if rows.shape[1:] != self.rowshape:
+            msg = "cannot append rows of shape %r to rows of shape %r"
+            raise ValueError(msg % (rows.shape[1:], self.rowshape))
+        if not len(rows):
+            return
+        # Write over a last chunk that was not completely written
+        self.fp.seek(self._end)
+        self.fp.truncate()
+        _write_chunk(self.fp, rows, self.compression)
+        self.fp.flush()
+        offset = self._end + struct.calcsize(CHUNK_HEADER)
+        self._end = self.fp.tell()
+        self.chunks.append((len(self), len(rows), offset,
+                            self._end - offset))
+
+    def read(self, start=0, stop=None):
+        """
+        Return the rows `start` to `stop` (excluded) of the array.
+        """
+        import bisect
+        (start, stop, step) = slice(start, stop).indices(len(self))
+        stop = max(start, stop)
+        rowsize = self.dtype.itemsize * int(numpy.multiply.reduce(self.rowshape))
+        first = bisect.bisect_right([c[0] for c in self.chunks], start) - 1
+        pieces = []
+        for (row, nrows, offset, nbytes) in self.chunks[max(first, 0):]:
+            if row >= stop:
+                break
+            a = max(start - row, 0)
+            b = min(stop - row, nrows)
+            if self.compression is None:
+                # Read only the rows that are needed
+                self.fp.seek(offset + a * rowsize)
+                data = self.fp.read((b - a) * rowsize)
+                rows = _decode_chunk(data, b - a, self.dtype,
+                                     self.rowshape, None)
+            else:
+                self.fp.seek(offset)
+                rows = _decode_chunk(self.fp.read(nbytes), nrows, self.dtype,
+                                     self.rowshape, self.compression)[a:b]
+            pieces.append(rows)
+        if not pieces:
+            return numpy.empty((0,) + self.rowshape, dtype=self.dtype)
+        if len(pieces) == 1:
+            return pieces[0]
+        return numpy.concatenate(pieces)
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if not key:
+            return self.read()
+        (index, rest) = (key[0], key[1:])
+        if isinstance(index, slice):
+            (start, stop, step) = index.indices(len(self))
+            if step == 1:
+                rows = self.read(start, stop)
+            else:
+                indices = numpy.arange(start, stop, step)
+                if not len(indices):
+                    rows = self.read(0, 0)
+                else:
+                    low = indices.min()
+                    rows = self.read(low, indices.max() + 1)[indices - low]
+            return rows[(slice(None),) + rest]
+        if isinstance(index, (int, long, numpy.integer)):
+            n = len(self)
+            if index < 0:
+                index += n
+            if not 0 <= index < n:
+                raise IndexError("index out of bounds")
+            return self.read(index, index + 1)[(0,) + rest]
+        # Ellipsis, index arrays and the like
+        return self.read()[key]
+
+    def __array__(self, dtype=None):
+        array = self.read()
+        if dtype is not None:
+            array = array.astype(dtype)
+        return array
+
+    def flush(self):
+        self.fp.flush()
+
+    def close(self):
+        self.fp.close()
+
+
 def open_memmap(filename, mode='r+', dtype=None, shape=None,
                 fortran_order=False, version=(1,0)):
     """
@@ -496,12 +920,16 @@ def open_memmap(filename, mode='r+', dtype=None, shape=None,
         C-contiguous (False) if we are creating a new file in "write" mode.
     version : tuple of int (major, minor)
         If the mode is a "write" mode, then this is the version of the file
-        format used to create the file.
+        format used to create the file.  With version (2,0), the file is
+        created with no rows and the shape only gives the shape of its rows.
 
     Returns
     -------
-    marray : numpy.memmap
-        The memory-mapped array.
+    marray : numpy.memmap or ChunkedArrayFile
+        The memory-mapped array.  Files of version 2.0 store their rows in
+        chunks, which cannot be memory-mapped; a `ChunkedArrayFile` is
+        returned for them instead, which reads only the chunks of the rows
+        that are indexed.
 
     Raises
     ------
@@ -512,7 +940,7 @@ def open_memmap(filename, mode='r+', dtype=None, shape=None,
 
     See Also
     --------
-    numpy.memmap
+    numpy.memmap, ChunkedArrayFile
 
     """
     if not isinstance(filename, basestring):
@@ -522,6 +950,9 @@ def open_memmap(filename, mode='r+', dtype=None, shape=None,
     if 'w' in mode:
         # We are creating the file, not reading it.
         # Check if we ought to create the file.
+        if version == (2, 0):
+            return ChunkedArrayFile(filename, mode='w+', dtype=dtype,
+                                    rowshape=tuple(shape or (0,))[1:])
         if version != (1, 0):
             msg = "only support version (1,0) of file format, not %r"
             raise ValueError(msg % (version,))
@@ -549,6 +980,9 @@ def open_memmap(filename, mode='r+', dtype=None, shape=None,
         fp = open(filename, 'rb')
         try:
             version = read_magic(fp)
+            if version == (2, 0):
+                # Chunks cannot be memory-mapped, but can be read one by one
+                return ChunkedArrayFile(filename, mode=mode)
             if version != (1, 0):
                 msg = "only support version (1,0) of file format, not %r"
                 raise ValueError(msg % (version,))
@@ -8,7 +8,7 @@ __all__ = ['select', 'piecewise', 'trim_zeros',
            'corrcoef', 'msort', 'median', 'sinc', 'hamming', 'hanning',
            'bartlett', 'blackman', 'kaiser', 'trapz', 'i0', 'add_newdoc',
            'add_docstring', 'meshgrid', 'delete', 'insert', 'append',
-           'interp'
+           'interp', 'topk'
            ]
 import warnings
 
@@ -22,7 +22,8 @@ from numpy.core.numeric import ScalarType, dot, where, newaxis, intp, \
      integer, isscalar
 from numpy.core.umath import pi, multiply, add, arctan2,  \
      frompyfunc, isnan, cos, less_equal, sqrt, sin, mod, exp, log10
-from numpy.core.fromnumeric import ravel, nonzero, choose, sort, mean
+from numpy.core.fromnumeric import ravel, nonzero, choose, sort, mean, \
+     partition, argpartition
 from numpy.core.numerictypes import typecodes, number
 from numpy.core import atleast_1d, atleast_2d
 from numpy.lib.twodim_base import diag
@@ -2804,7 +2805,7 @@ def median(a, axis=None, out=None, overwrite_input=False):
        calculations. The input array will be modified by the call to
        median. This will save memory when you do not need to preserve
        the contents of the input array. Treat the input as undefined,
-       but it will probably be fully or partially sorted. Default is
+       but it will probably be partially sorted. Default is
        False. Note that, if `overwrite_input` is True and the input
        is not already an ndarray, an error will be raised.
 
@@ -2819,7 +2820,7 @@ def median(a, axis=None, out=None, overwrite_input=False):
 
     See Also
     --------
-    mean, percentile
+    mean, percentile, partition
 
     Notes
     -----
@@ -2828,6 +2829,9 @@ def median(a, axis=None, out=None, overwrite_input=False):
     odd.  When N is even, it is the average of the two middle values of
     ``V_sorted``.
 
+    The middle values are found with `partition`, which takes linear time,
+    instead of sorting the data.
+
     Examples
     --------
     >>> a = np.array([[10, 7, 4], [3, 2, 1]])
@@ -2856,27 +2860,39 @@ def median(a, axis=None, out=None, overwrite_input=False):
     >>> assert not np.all(a==b)
 
     """
-    if overwrite_input:
+    if not overwrite_input:
+        a = np.asanyarray(a)
+    if axis is None:
+        n = a.size
+    else:
+        n = a.shape[axis]
+    index = n // 2
+    if n % 2 == 1:
+        kth = [index]
+    else:
+        kth = [index-1, index]
+    if n == 0:
+        part = a
+    elif overwrite_input:
         if axis is None:
-            sorted = a.ravel()
-            sorted.sort()
+            part = a.ravel()
+            part.partition(kth)
         else:
-            a.sort(axis=axis)
-            sorted = a
+            a.partition(kth, axis=axis)
+            part = a
     else:
-        sorted = sort(a, axis=axis)
+        part = partition(a, kth, axis=axis)
     if axis is None:
         axis = 0
-    indexer = [slice(None)] * sorted.ndim
-    index = int(sorted.shape[axis]/2)
-    if sorted.shape[axis] % 2 == 1:
+    indexer = [slice(None)] * part.ndim
+    if n % 2 == 1:
         # index with slice to allow mean (below) to work
         indexer[axis] = slice(index, index+1)
     else:
         indexer[axis] = slice(index-1, index+1)
     # Use mean in odd and even case to coerce data type
     # and check, use out array.
-    return mean(sorted[indexer], axis=axis, out=out)
+    return mean(part[indexer], axis=axis, out=out)
 
 def percentile(a, q, axis=None, out=None, overwrite_input=False):
     """
@@ -2902,7 +2918,7 @@ def percentile(a, q, axis=None, out=None, overwrite_input=False):
        calculations. The input array will be modified by the call to
        median. This will save memory when you do not need to preserve
        the contents of the input array. Treat the input as undefined,
-       but it will probably be fully or partially sorted. Default is
+       but it will probably be partially sorted. Default is
        False. Note that, if `overwrite_input` is True and the input
        is not already an ndarray, an error will be raised.
 
@@ -2917,7 +2933,7 @@ def percentile(a, q, axis=None, out=None, overwrite_input=False):
 
     See Also
     --------
-    mean, median
+    mean, median, partition
 
     Notes
     -----
@@ -2962,21 +2978,38 @@ def percentile(a, q, axis=None, out=None, overwrite_input=False):
     elif q == 100:
         return a.max(axis=axis, out=out)
         
-    if overwrite_input:
+    # Only the elements next to each percentile are needed, so partition
+    # the data around them instead of sorting it.
+    if axis is None:
+        n = a.size
+    else:
+        n = a.shape[axis]
+    kth = []
+    for qi in np.ravel(q):
+        index = (qi / 100.0)*(n-1)
+        if 0 <= index <= n-1:
+            i = int(index)
+            kth.append(i)
+            if i != index:
+                kth.append(i+1)
+
+    if not kth:
+        sorted = a
+    elif overwrite_input:
         if axis is None:
             sorted = a.ravel()
-            sorted.sort()
+            sorted.partition(kth)
         else:
-            a.sort(axis=axis)
+            a.partition(kth, axis=axis)
             sorted = a
     else:
-        sorted = sort(a, axis=axis)
+        sorted = partition(a, kth, axis=axis)
     if axis is None:
         axis = 0
 
     return _compute_qth_percentile(sorted, q, axis, out)
 
-# handle sequence of q's without calling sort multiple times
+# handle sequence of q's without partitioning multiple times
 def _compute_qth_percentile(sorted, q, axis, out):
     if not isscalar(q):
         p = [_compute_qth_percentile(sorted, qi, axis, None)
@@ -3012,6 +3045,91 @@ def _compute_qth_percentile(sorted, q, axis, out):
     #   check and use out array.
     return add.reduce(sorted[indexer]*weights, axis=axis, out=out)/sumval
 
+def topk(a, k, axis=-1, largest=True, return_index=False):
+    """
+    Return the `k` largest or smallest elements along an axis.
+
+    The elements are selected with `argpartition`, so only the `k`
+    selected elements are sorted.
+
+    Parameters
+    ----------
+    a : array_like
+        Input array.
+    k : int
+        Number of elements to return.  Must not be larger than the length
+        of `a` along `axis`.
+    axis : int or None, optional
+        Axis along which to select.  If None, the flattened array is used.
+        Default is -1 (the last axis).
+    largest : bool, optional
+        If True (default) return the largest elements in descending order,
+        otherwise the smallest elements in ascending order.
+    return_index : bool, optional
+        If True, also return the indices of the selected elements along
+        `axis`.
+
+    Returns
+    -------
+    values : ndarray
+        Array with the shape of `a`, except that the length along `axis`
+        is `k`, holding the selected elements.
+    indices : ndarray, optional
+        The indices of `values` along `axis`, only returned if
+        `return_index` is True.
+
+    See Also
+    --------
+    partition, argpartition, sort
+
+    Notes
+    -----
+    Equal elements are returned in order of their index when `largest`
+    is False and in reverse order when it is True.  As in `sort`, nan
+    values are larger than any other value.
+
+    Examples
+    --------
+    >>> a = np.array([3, 9, 1, 7, 5])
+    >>> np.topk(a, 2)
+    array([9, 7])
+    >>> np.topk(a, 2, largest=False, return_index=True)
+    (array([1, 3]), array([2, 0]))
+    >>> np.topk([[1, 4, 2], [6, 3, 5]], 1, axis=0)
+    array([[6, 4, 5]])
+
+    """
+    a = np.asanyarray(a)
+    if axis is None:
+        a = a.ravel()
+        axis = -1
+    if a.ndim == 0:
+        raise ValueError("topk requires an array of at least one dimension")
+    b = a.swapaxes(axis, -1)
+    shape = b.shape
+    n = shape[-1]
+    if k < 0 or k > n:
+        raise ValueError("k(=%d) out of bounds (%d)" % (k, n))
+    b = b.reshape(-1, n)
+    rows = np.arange(b.shape[0])[:, newaxis]
+    if k == 0:
+        index = np.empty((b.shape[0], 0), dtype=intp)
+    elif largest:
+        index = argpartition(b, n-k, axis=-1)[:, n-k:]
+    else:
+        index = argpartition(b, k-1, axis=-1)[:, :k]
+    values = b[rows, index]
+    order = values.argsort(axis=-1, kind='mergesort')
+    if largest:
+        order = order[:, ::-1]
+    index = index[rows, order]
+    values = values[rows, order]
+    shape = shape[:-1] + (k,)
+    values = values.reshape(shape).swapaxes(axis, -1)
+    if return_index:
+        return values, index.reshape(shape).swapaxes(axis, -1)
+    return values
+
 def trapz(y, x=None, dx=1.0, axis=-1):
     """
     Integrate along the given axis using the composite trapezoidal rule.
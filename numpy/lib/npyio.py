@@ -1,6 +1,7 @@
 __all__ = ['savetxt', 'loadtxt', 'genfromtxt', 'ndfromtxt', 'mafromtxt',
         'recfromtxt', 'recfromcsv', 'load', 'loads', 'save', 'savez',
-        'packbits', 'unpackbits', 'fromregex', 'DataSource']
+        'packbits', 'unpackbits', 'fromregex', 'DataSource', 'load_many',
+        'savez_compressed']
 
 import numpy as np
 import format
@@ -14,19 +15,23 @@ from operator import itemgetter
 from cPickle import load as _cload, loads
 from _datasource import DataSource
 if sys.platform != 'cli':
-    from _compiled_base import packbits, unpackbits
+    from _compiled_base import packbits, unpackbits, _can_parse_text, \
+                               _parse_text, _split_text, _convert_strings
 else:
     def packbits(*args, **kw):
         raise NotImplementedError()
     def unpackbits(*args, **kw):
         raise NotImplementedError()
+    _can_parse_text = _parse_text = None
+    _split_text = _convert_strings = None
 
 from _iotools import LineSplitter, NameValidator, StringConverter, \
                      ConverterError, ConverterLockError, ConversionWarning, \
                      _is_string_like, has_nested_fields, flatten_dtype, \
-                     easy_dtype, _bytes_to_name
+                     easy_dtype, _bytes_to_name, _is_bytes_like, \
+                     _bytes_to_complex
 
-from numpy.compat import asbytes, asstr, asbytes_nested, bytes
+from numpy.compat import asbytes, asstr, asbytes_nested, bytes, isfileobj
 
 if sys.version_info[0] >= 3:
     from io import BytesIO
@@ -118,7 +123,7 @@ class BagObj(object):
 
 class NpzFile(object):
     """
-    NpzFile(fid)
+    NpzFile(fid, mmap_mode=None)
 
     A dictionary-like object with lazy-loading of files in the zipped
     archive provided on construction.
@@ -131,7 +136,12 @@ class NpzFile(object):
     getitem access using ``obj['key']`` or attribute lookup using
     ``obj.f.key``. A list of all files (without ".npy" extensions) can
     be obtained with ``obj.files`` and the ZipFile object itself using
-    ``obj.zip``.
+    ``obj.zip``.  The directory of the archive is only read when one of
+    them is first used, and the header of an array when it is loaded.
+
+    The arrays stored uncompressed in an archive on disk are read directly
+    from their place in the archive, or memory-mapped there if `mmap_mode`
+    is given.
 
     Attributes
     ----------
@@ -148,6 +158,12 @@ class NpzFile(object):
     fid : file or str
         The zipped archive to open. This is either a file-like object
         or a string containing the path to the archive.
+    mmap_mode : {None, 'r', 'c'}, optional
+        If not None, the arrays stored uncompressed in an archive on disk
+        are returned as memory-maps (see `numpy.memmap`) opened with this
+        mode.  The arrays that are compressed or contain Python objects are
+        read into memory, and so are all the arrays with the other modes,
+        which would write to the archive.
 
     Examples
     --------
@@ -169,30 +185,81 @@ class NpzFile(object):
     array([0, 1, 2, 3, 4, 5, 6, 7, 8, 9])
 
     """
-    def __init__(self, fid):
+    def __init__(self, fid, mmap_mode=None):
+        if isinstance(fid, basestring):
+            fid = open(fid, 'rb')
+        if mmap_mode not in ('r', 'c', 'readonly', 'copyonwrite'):
+            # Writing would break the CRC of the members.
+            mmap_mode = None
+        self.fid = fid
+        self.mmap_mode = mmap_mode
+        self._zip = None
+        self._headers = {}
+        self.f = BagObj(self)
+
+    def _read_directory(self):
         # Import is postponed to here since zipfile depends on gzip, an optional
         # component of the so-called standard library.
         import zipfile
-        _zip = zipfile.ZipFile(fid)
+        _zip = zipfile.ZipFile(self.fid)
         self._files = _zip.namelist()
-        self.files = []
+        self._names = []
         for x in self._files:
             if x.endswith('.npy'):
-                self.files.append(x[:-4])
+                self._names.append(x[:-4])
             else:
-                self.files.append(x)
-        self.zip = _zip
-        self.f = BagObj(self)
+                self._names.append(x)
+        self._zip = _zip
+
+    @property
+    def zip(self):
+        if self._zip is None:
+            self._read_directory()
+        return self._zip
+
+    @property
+    def files(self):
+        if self._zip is None:
+            self._read_directory()
+        return self._names
+
+    def _array_header(self, key):
+        """
+        Return the offset of the data of the array in the member `key` of
+        the archive, and its shape, order and dtype, or None if the array
+        cannot be read from its place in the archive.
+        """
+        if key in self._headers:
+            return self._headers[key]
+        import zipfile
+        import struct
+        header = None
+        info = self.zip.getinfo(key)
+        if (isfileobj(self.fid) and
+            info.compress_type == zipfile.ZIP_STORED and
+            not info.flag_bits & 0x1):
+            # The data follows the local header of the member
+            fp = self.fid
+            fp.seek(info.header_offset)
+            local = fp.read(30)
+            if local[:4] == asbytes('PK\x03\x04'):
+                (namelen, extralen) = struct.unpack('<HH', local[26:30])
+                fp.seek(info.header_offset + 30 + namelen + extralen)
+                N = len(format.MAGIC_PREFIX)
+                magic = fp.read(N)
+                fp.seek(-N, 1)
+                if magic == format.MAGIC_PREFIX and \
+                   format.read_magic(fp) == (1, 0):
+                    (shape, fortran_order, dtype) = \
+                        format.read_array_header_1_0(fp)
+                    if not dtype.hasobject:
+                        header = (fp.tell(), shape, fortran_order, dtype)
+        self._headers[key] = header
+        return header
 
     def __getitem__(self, key):
-        # FIXME: This seems like it will copy strings around
-        #   more than is strictly necessary.  The zipfile
-        #   will read the string and then
-        #   the format.read_array will copy the string
-        #   to another place in memory.
-        #   It would be better if the zipfile could read
-        #   (or at least uncompress) the data
-        #   directly into the array memory.
+        if self._zip is None:
+            self._read_directory()
         member = 0
         if key in self._files:
             member = 1
@@ -200,6 +267,30 @@ class NpzFile(object):
             member = 1
             key += '.npy'
         if member:
+            header = self._array_header(key)
+            if header is not None:
+                (offset, shape, fortran_order, dtype) = header
+                count = int(np.multiply.reduce(shape))
+                order = (fortran_order and 'F') or 'C'
+                if self.mmap_mode and count:
+                    return np.memmap(self.fid, dtype=dtype, shape=shape,
+                                     order=order, mode=self.mmap_mode,
+                                     offset=offset)
+                self.fid.seek(offset)
+                array = np.fromfile(self.fid, dtype=dtype, count=count)
+                if fortran_order:
+                    array.shape = shape[::-1]
+                    return array.transpose()
+                array.shape = shape
+                return array
+            # FIXME: This seems like it will copy strings around
+            #   more than is strictly necessary.  The zipfile
+            #   will read the string and then
+            #   the format.read_array will copy the string
+            #   to another place in memory.
+            #   It would be better if the zipfile could read
+            #   (or at least uncompress) the data
+            #   directly into the array memory.
             bytes = self.zip.read(key)
             if bytes.startswith(format.MAGIC_PREFIX):
                 value = BytesIO(bytes)
@@ -237,6 +328,111 @@ class NpzFile(object):
         return self.files.__contains__(key)
 
 
+class NpzWriter(object):
+    """
+    NpzWriter(file, compress=False, mode='w')
+
+    Write arrays into a ``.npz`` archive one after the other.
+
+    Each array is written in ``.npy`` format into its member of the
+    archive, deflated if `compress` is True.  Arrays can be added until the
+    archive is closed, which writes its directory.
+
+    Parameters
+    ----------
+    file : str or file
+        Either the file name (string) or an open file (file-like object)
+        where the data will be saved. If file is a string, the ``.npz``
+        extension will be appended to the file name if it is not already
+        there.
+    compress : bool, optional
+        Whether to compress the arrays.  Default is False.
+    mode : {'w', 'a'}, optional
+        Whether to create a new archive (the default), or to add arrays to
+        an existing one.
+
+    See Also
+    --------
+    savez, savez_compressed, NpzFile
+
+    Examples
+    --------
+    >>> from tempfile import TemporaryFile
+    >>> outfile = TemporaryFile()
+    >>> writer = np.lib.npyio.NpzWriter(outfile, compress=True)
+    >>> writer.add(x=np.arange(10))
+    >>> writer['y'] = np.ones(3)
+    >>> writer.close()
+    >>> outfile.seek(0)
+    >>> sorted(np.load(outfile).files)
+    ['x', 'y']
+
+    """
+    def __init__(self, file, compress=False, mode='w'):
+        # Import is postponed to here since zipfile depends on gzip, an optional
+        # component of the so-called standard library.
+        import zipfile
+        if mode not in ('w', 'a'):
+            raise ValueError("mode must be 'w' or 'a'")
+        if isinstance(file, basestring):
+            if not file.endswith('.npz'):
+                file = file + '.npz'
+        if compress:
+            compression = zipfile.ZIP_DEFLATED
+        else:
+            compression = zipfile.ZIP_STORED
+        self.zip = zipfile.ZipFile(file, mode=mode, compression=compression,
+                                   allowZip64=True)
+
+    def add(self, *args, **kwds):
+        """
+        Add arrays to the archive.
+
+        The arrays given as keywords are named after them, the others
+        "arr_0", "arr_1", and so on, after the ones already in the archive.
+        """
+        # Import is postponed to here since zipfile depends on gzip, an optional
+        # component of the so-called standard library.
+        import zipfile
+        import time
+        arrays = []
+        names = self.zip.namelist()
+        nunnamed = len([name for name in names if name.startswith('arr_')])
+        for (i, val) in enumerate(args):
+            key = 'arr_%d' % (nunnamed + i)
+            if key in kwds:
+                raise ValueError, "Cannot use un-named variables and keyword %s" % key
+            arrays.append((key, val))
+        arrays.extend(kwds.items())
+        for (key, val) in arrays:
+            if key + '.npy' in names:
+                raise ValueError("%s is already in the archive" % key)
+        for (key, val) in arrays:
+            # Serialize the array in memory and add it as a whole, which
+            # zipfile deflates as it writes it.
+            fid = BytesIO()
+            format.write_array(fid, np.asanyarray(val))
+            info = zipfile.ZipInfo(key + '.npy',
+                                   time.localtime(time.time())[:6])
+            info.compress_type = self.zip.compression
+            info.external_attr = 0600 << 16
+            self.zip.writestr(info, fid.getvalue())
+            fid.close()
+
+    def __setitem__(self, key, value):
+        self.add(**{key: value})
+
+    def close(self):
+        """Write the directory of the archive and close it."""
+        self.zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
 def load(file, mmap_mode=None):
     """
     Load a pickled, ``.npy``, or ``.npz`` binary file.
@@ -248,8 +444,13 @@ def load(file, mmap_mode=None):
         If the filename extension is ``.gz``, the file is first decompressed.
     mmap_mode: {None, 'r+', 'r', 'w+', 'c'}, optional
         If not None, then memory-map the file, using the given mode
-        (see `numpy.memmap`).  The mode has no effect for pickled or
-        zipped files.
+        (see `numpy.memmap`).  The mode has no effect for pickled files.
+        The arrays stored uncompressed in a zipped file are memory-mapped
+        at their place in it when they are loaded, which is only done with
+        the modes 'r' and 'c'; the other modes are ignored for them.  The
+        rows of a chunked ``.npy`` file (format version 2.0) are not
+        memory-mapped, but read chunk by chunk when they are indexed (see
+        `numpy.lib.format.ChunkedArrayFile`).
         A memory-mapped array is stored on disk, and not directly loaded
         into memory.  However, it can be accessed and sliced like any
         ndarray.  Memory mapping is especially useful for accessing
@@ -312,7 +513,7 @@ def load(file, mmap_mode=None):
     magic = fid.read(N)
     fid.seek(-N, 1) # back-up
     if magic.startswith(_ZIP_PREFIX):  # zip-file (assume .npz)
-        return NpzFile(fid)
+        return NpzFile(fid, mmap_mode=mmap_mode)
     elif magic == format.MAGIC_PREFIX: # .npy file
         if mmap_mode:
             return format.open_memmap(file, mode=mmap_mode)
@@ -373,7 +574,7 @@ def save(file, arr):
 
 def savez(file, *args, **kwds):
     """
-    Save several arrays into a single, compressed file in ``.npz`` format.
+    Save several arrays into a single file in uncompressed ``.npz`` format.
 
     If arguments are passed in with no keywords, the corresponding variable
     names, in the .npz file, are 'arr_0', 'arr_1', etc. If keyword arguments
@@ -403,6 +604,7 @@ def savez(file, *args, **kwds):
     --------
     save : Save a single array to a binary file in NumPy format.
     savetxt : Save an array to a file as plain text.
+    savez_compressed : Save several arrays into a compressed .npz file format.
 
     Notes
     -----
@@ -445,44 +647,105 @@ def savez(file, *args, **kwds):
 
     """
 
-    # Import is postponed to here since zipfile depends on gzip, an optional
-    # component of the so-called standard library.
-    import zipfile
-    # Import deferred for startup time improvement
-    import tempfile
+    _savez(file, args, kwds, False)
 
-    if isinstance(file, basestring):
-        if not file.endswith('.npz'):
-            file = file + '.npz'
+def savez_compressed(file, *args, **kwds):
+    """
+    Save several arrays into a single file in compressed ``.npz`` format.
+
+    If keyword arguments are given, then filenames are taken from the keywords.
+    If arguments are passed in with no keywords, then stored file names are
+    arr_0, arr_1, etc.
+
+    Parameters
+    ----------
+    file : str or file
+        Either the file name (string) or an open file (file-like object)
+        where the data will be saved. If file is a string, the ``.npz``
+        extension will be appended to the file name if it is not already there.
+    \\*args : Arguments, optional
+        Arrays to save to the file. Since it is not possible for Python to
+        know the names of the arrays outside `savez_compressed`, the arrays
+        will be saved with names "arr_0", "arr_1", and so on. These arguments
+        can be any expression.
+    \\*\\*kwds : Keyword arguments, optional
+        Arrays to save to the file. Arrays will be saved in the file with the
+        keyword names.
 
-    namedict = kwds
-    for i, val in enumerate(args):
-        key = 'arr_%d' % i
-        if key in namedict.keys():
-            raise ValueError, "Cannot use un-named variables and keyword %s" % key
-        namedict[key] = val
+    Returns
+    -------
+    None
 
-    zip = zipfile.ZipFile(file, mode="w")
+    See Also
+    --------
+    savez : Save several arrays into an uncompressed ``.npz`` file format.
+    NpzWriter : Write arrays into a ``.npz`` archive one after the other.
 
-    # Stage arrays in a temporary file on disk, before writing to zip.
-    fd, tmpfile = tempfile.mkstemp(suffix='-numpy.npy')
-    os.close(fd)
+    Examples
+    --------
+    >>> from tempfile import TemporaryFile
+    >>> outfile = TemporaryFile()
+    >>> x = np.arange(10)
+    >>> np.savez_compressed(outfile, x=x)
+    >>> outfile.seek(0)
+    >>> np.load(outfile)['x']
+    array([0, 1, 2, 3, 4, 5, 6, 7, 8, 9])
+
+    """
+    _savez(file, args, kwds, True)
+
+def _savez(file, args, kwds, compress):
+    writer = NpzWriter(file, compress=compress)
     try:
-        for key, val in namedict.iteritems():
-            fname = key + '.npy'
-            fid = open(tmpfile, 'wb')
-            try:
-                format.write_array(fid, np.asanyarray(val))
-                fid.close()
-                fid = None
-                zip.write(tmpfile, arcname=fname)
-            finally:
-                if fid:
-                    fid.close()
+        writer.add(*args, **kwds)
     finally:
-        os.remove(tmpfile)
+        writer.close()
+
+# Bytes read at a time, and rows allocated at first, by the text parser.
+_TEXT_BLOCKSIZE = 1 << 20
+_TEXT_MINROWS = 1024
 
-    zip.close()
+def _parse_text_chunks(fh, data, lineno, rowdtype, colmap, delimiter,
+                       comments, chunksize=None):
+    """
+    Parse the lines in `data` and the rest of the file `fh` into arrays of
+    the flat structured dtype `rowdtype`, `chunksize` rows at a time, or
+    all of them in one array if `chunksize` is None.
+
+    `lineno` is the number of lines before `data`, and the column i of a
+    line goes to the field ``colmap[i]`` (see `_parse_text`).
+    """
+    types = [rowdtype.fields[name][0].num for name in rowdtype.names]
+    offsets = [rowdtype.fields[name][1] for name in rowdtype.names]
+    pos = 0
+    eof = False
+    while True:
+        out = np.empty(chunksize or _TEXT_MINROWS, rowdtype)
+        row = 0
+        while True:
+            row, pos, lineno = _parse_text(data, pos, eof, out, row, lineno,
+                                           types, offsets, colmap,
+                                           delimiter, comments)
+            if row == len(out):
+                if chunksize is not None:
+                    break
+                out.resize(2 * len(out), refcheck=False)
+            elif eof:
+                break
+            else:
+                block = asbytes(fh.read(_TEXT_BLOCKSIZE))
+                eof = not block
+                data = data[pos:] + block
+                pos = 0
+        if row < len(out):
+            out.resize(row, refcheck=False)
+        if chunksize is None:
+            yield out
+            return
+        if row:
+            yield out
+        if row < chunksize:
+            return
 
 # Adapted from matplotlib
 
@@ -504,7 +767,8 @@ def _getconv(dtype):
 
 
 def loadtxt(fname, dtype=float, comments='#', delimiter=None,
-            converters=None, skiprows=0, usecols=None, unpack=False):
+            converters=None, skiprows=0, usecols=None, unpack=False,
+            chunksize=None, ndmin=0):
     """
     Load data from a text file.
 
@@ -539,11 +803,22 @@ def loadtxt(fname, dtype=float, comments='#', delimiter=None,
     unpack : bool, optional
         If True, the returned array is transposed, so that arguments may be
         unpacked using ``x, y, z = loadtxt(...)``. Default is False.
+    chunksize : int, optional
+        If given, return an iterator over arrays of `chunksize` rows (the
+        last one may have fewer) instead of reading the whole file at once,
+        so that files larger than the memory can be processed.  The chunks
+        are not squeezed: they are 2-D, or 1-D if a single column is read or
+        the data-type is structured.
+    ndmin : int, optional
+        The returned array has at least `ndmin` dimensions: the axes of
+        length one are squeezed, except that with 2 a plain data-type gives
+        the array of rows and columns as read, and a structured one a
+        column.  Legal values are 0 (default), 1 or 2.
 
     Returns
     -------
-    out : ndarray
-        Data read from the text file.
+    out : ndarray or iterator of ndarrays
+        Data read from the text file, or its chunks if `chunksize` is given.
 
     See Also
     --------
@@ -557,6 +832,11 @@ def loadtxt(fname, dtype=float, comments='#', delimiter=None,
     `genfromtxt` function provides more sophisticated handling of, e.g.,
     lines with missing values.
 
+    Unless `converters` are used, values of boolean, integer and single or
+    double precision floating point types are parsed in C straight into the
+    resulting array, reading the file in blocks.  Integers may be written
+    as floating point numbers, which are truncated.
+
     Examples
     --------
     >>> from StringIO import StringIO   # StringIO behaves like a file object
@@ -578,6 +858,12 @@ def loadtxt(fname, dtype=float, comments='#', delimiter=None,
     >>> y
     array([ 2.,  4.])
 
+    >>> c = StringIO("1 2\n3 4\n5 6")
+    >>> for chunk in np.loadtxt(c, dtype=int, chunksize=2):
+    ...     print chunk.sum(axis=0)
+    [4 6]
+    [5 6]
+
     """
     # Type conversions for Py3 convenience
     comments = asbytes(comments)
@@ -589,6 +875,13 @@ def loadtxt(fname, dtype=float, comments='#', delimiter=None,
     if usecols is not None:
         usecols = list(usecols)
 
+    if chunksize is not None:
+        chunksize = int(chunksize)
+        if chunksize < 1:
+            raise ValueError('chunksize must be a positive integer')
+    if ndmin not in (0, 1, 2):
+        raise ValueError('ndmin must be 0, 1 or 2')
+
     isstring = False
     if _is_string_like(fname):
         isstring = True
@@ -604,7 +897,6 @@ def loadtxt(fname, dtype=float, comments='#', delimiter=None,
         fh = fname
     else:
         raise ValueError('fname must be a string or file handle')
-    X = []
 
     def flatten_dtype(dt):
         """Unpack a structured data-type."""
@@ -637,6 +929,7 @@ def loadtxt(fname, dtype=float, comments='#', delimiter=None,
         # Skip the first `skiprows` lines
         for i in xrange(skiprows):
             fh.readline()
+        lineno = skiprows
 
         # Read until we find a line with some values, and use
         # it to estimate the number of columns, N.
@@ -646,6 +939,7 @@ def loadtxt(fname, dtype=float, comments='#', delimiter=None,
             if not first_line: # EOF reached
                 raise IOError('End-of-file reached before encountering data.')
             first_vals = split_line(first_line)
+            lineno += 1
         N = len(usecols or first_vals)
 
         dtype_types = flatten_dtype(dtype)
@@ -653,11 +947,14 @@ def loadtxt(fname, dtype=float, comments='#', delimiter=None,
             # We're dealing with a structured array, each field of
             # the dtype matches a column
             converters = [_getconv(dt) for dt in dtype_types]
+            field_types = dtype_types
         else:
             # All fields have the same dtype
             converters = [defconv for i in xrange(N)]
+            field_types = [dtype] * N
 
         # By preference, use the converters specified by the user
+        converted = False
         for i, conv in (user_converters or {}).iteritems():
             if usecols:
                 try:
@@ -666,44 +963,97 @@ def loadtxt(fname, dtype=float, comments='#', delimiter=None,
                     # Unused converter specified
                     continue
             converters[i] = conv
-
-        # Parse each line, including the first
-        for i, line in enumerate(itertools.chain([first_line], fh)):
-            vals = split_line(line)
-            if len(vals) == 0:
-                continue
-
-            if usecols:
-                vals = [vals[i] for i in usecols]
-
-            # Convert each value according to its column and store
-            X.append(tuple([conv(val) for (conv, val) in zip(converters, vals)]))
-    finally:
+            converted = True
+
+        # With neither converters nor types that need Python, parse the
+        # values in C instead of splitting the lines and converting them
+        # one by one.
+        use_parser = (_parse_text is not None and not converted and
+                      hasattr(fh, 'read') and len(field_types) <= N and
+                      (not usecols or (min(usecols) >= 0 and
+                                       len(set(usecols)) == len(usecols))) and
+                      np.all([_can_parse_text(dt) for dt in field_types]))
+    except:
         if isstring:
             fh.close()
+        raise
+
+    # First, read the values into an array (or a list of tuples) with the
+    # flattened dtype [('', t) for t in dtype_types], so that for a
+    # structured dtype such as [('x', int), ('y', [('s', int), ('t', float)])]
+    # it is [('', int), ('', int), ('', float)], and then view or convert it
+    # to the specified dtype.
+    def finish(X):
+        if len(dtype_types) > 1:
+            if use_parser:
+                X = X.view(dtype)
+            else:
+                try:
+                    X = np.array(X, dtype=np.dtype([('', t)
+                                                    for t in dtype_types]))
+                    X = X.view(dtype)
+                except TypeError:
+                    # In the case we have an object dtype
+                    X = np.array(X, dtype=dtype)
+        else:
+            if use_parser:
+                X = X.view(dtype).reshape(len(X), N)
+            else:
+                X = np.array(X, dtype)
+            if N == 1 and chunksize is not None:
+                X = X.reshape(len(X))
+        if chunksize is None and (ndmin < 2 or X.ndim < 2):
+            X = np.squeeze(X)
+            if X.ndim < ndmin:
+                if ndmin == 1:
+                    X = np.atleast_1d(X)
+                else:
+                    X = np.atleast_2d(X).T
+        if unpack:
+            return X.T
+        else:
+            return X
 
-    if len(dtype_types) > 1:
-        # We're dealing with a structured array, with a dtype such as
-        # [('x', int), ('y', [('s', int), ('t', float)])]
-        #
-        # First, create the array using a flattened dtype:
-        # [('x', int), ('s', int), ('t', float)]
-        #
-        # Then, view the array using the specified dtype.
+    def read_chunks():
         try:
-            X = np.array(X, dtype=np.dtype([('', t) for t in dtype_types]))
-            X = X.view(dtype)
-        except TypeError:
-            # In the case we have an object dtype
-            X = np.array(X, dtype=dtype)
-    else:
-        X = np.array(X, dtype)
+            if use_parser:
+                colmap = None
+                if usecols:
+                    colmap = [-1] * (max(usecols) + 1)
+                    for i, col in enumerate(usecols[:len(field_types)]):
+                        colmap[col] = i
+                rowdtype = np.dtype([('', t) for t in field_types])
+                for X in _parse_text_chunks(fh, asbytes(first_line),
+                                            lineno - 1, rowdtype, colmap,
+                                            delimiter, comments, chunksize):
+                    yield finish(X)
+                return
+
+            # Parse each line, including the first
+            X = []
+            for line in itertools.chain([first_line], fh):
+                vals = split_line(line)
+                if len(vals) == 0:
+                    continue
 
-    X = np.squeeze(X)
-    if unpack:
-        return X.T
-    else:
+                if usecols:
+                    vals = [vals[i] for i in usecols]
+
+                # Convert each value according to its column and store
+                X.append(tuple([conv(val) for (conv, val) in zip(converters, vals)]))
+                if len(X) == chunksize:
+                    yield finish(X)
+                    X = []
+            if X or chunksize is None:
+                yield finish(X)
+        finally:
+            if isstring:
+                fh.close()
+
+    if chunksize is None:
+        X, = list(read_chunks())
         return X
+    return read_chunks()
 
 
 def savetxt(fname, X, fmt='%.18e', delimiter=' ', newline='\n'):
@@ -932,6 +1282,194 @@ def fromregex(file, regexp, dtype):
 #---- --- ASCII functions ---
 #####--------------------------------------------------------------------------
 
+# The kinds of values genfromtxt tries in turn for a column when guessing its
+# type, in the order of StringConverter._mapper.
+_COLUMN_KINDS = ['b', 'i', 'f', 'c', 'S']
+
+class _ColumnTypeChange(Exception):
+    """
+    Raised by `_read_text_columns` when a column needs a type that the
+    values already read cannot be cast to, with the kinds to start from.
+    """
+    pass
+
+def _tell(fh):
+    "Return the position in the file `fh`, or None if it has none."
+    try:
+        return fh.tell()
+    except (AttributeError, IOError):
+        return None
+
+def _column_kind(dtype):
+    """
+    Return the kind `_convert_text_column` converts the values of a column
+    of the given dtype with, or None if they need a converter.
+    """
+    dtype = np.dtype(dtype)
+    if not dtype.isnative:
+        return None
+    if dtype.kind == 'b':
+        return 'b'
+    if dtype.kind in 'iu':
+        return 'I'
+    if dtype.kind == 'f' and dtype.itemsize in (4, 8):
+        return 'f'
+    if dtype.kind == 'c' and dtype.itemsize in (8, 16):
+        return 'c'
+    if dtype.kind == 'S':
+        return 'S'
+    return None
+
+def _convert_text_column(strings, raw, kind):
+    """
+    Convert the values of a column like the function of StringConverter
+    for `kind` would: `strings` are the stripped values, and `raw` the
+    values as they were split, which booleans and strings are made of.
+    Return the converted values and which of them could be converted.
+    """
+    if kind == 'S':
+        return (raw, np.ones(len(raw), bool))
+    if kind == 'c':
+        values = np.zeros(len(strings), complex)
+        ok = np.ones(len(strings), bool)
+        for (i, value) in enumerate(strings.tolist()):
+            try:
+                values[i] = _bytes_to_complex(value)
+            except ValueError:
+                ok[i] = False
+        return (values, ok)
+    if kind == 'b':
+        return _convert_strings(raw, kind)
+    return _convert_strings(strings, kind)
+
+def _read_text_columns(fh, data, lineno, cols, nbcols, usecols, kinds, guess,
+                       missing_values, delimiter, comments, autostrip, loose,
+                       usemask, skip_footer):
+    """
+    Read the lines in `data` and the rest of the file `fh` for genfromtxt,
+    one column at a time.
+
+    The lines are split into string arrays of the columns `cols` a block
+    at a time, and each column is converted to the kind given in `kinds`
+    (see `_convert_text_column`).  If `guess` is True, these are the kinds
+    to start from and the next ones of _COLUMN_KINDS are tried until every
+    value of the column converts or is missing, as StringConverter.upgrade
+    does; _ColumnTypeChange is raised when the values of the previous
+    blocks cannot be cast to the new kind.  Otherwise, values that do not
+    convert are errors unless `loose` is True or they are missing.
+
+    Lines without enough values are skipped, and the last `skip_footer`
+    valid ones are dropped.  Return the arrays of values of the columns,
+    of the values that did not convert, of the missing values (if
+    `usemask` is True), the kinds of the columns and the list of the
+    (line, number of values) of the invalid lines.
+    """
+    kinds = list(kinds)
+    missing_values = [np.array(sorted(m), dtype=np.string_)
+                      for m in missing_values]
+    if autostrip or delimiter is None:
+        rawcols = []
+    else:
+        rawcols = list(cols)
+    values = [[] for _ in cols]
+    failed = [[] for _ in cols]
+    masks = [[] for _ in cols]
+    converted = [False] * len(cols)
+    invalid = []
+    footer = None
+    eof = False
+    while not eof:
+        block = asbytes(fh.read(_TEXT_BLOCKSIZE))
+        eof = not block
+        data += block
+        (strings, raw, counts, lines, pos, lineno) = \
+            _split_text(data, 0, eof, cols, lineno, delimiter, comments,
+                        rawcols)
+        data = data[pos:]
+        if not rawcols:
+            raw = strings
+        # Skip the lines without the right number of values
+        if usecols:
+            valid = (counts > max(usecols))
+        else:
+            valid = (counts == nbcols)
+        if not valid.all():
+            invalid.extend(zip(lines[~valid].tolist(),
+                               counts[~valid].tolist()))
+            strings = [s[valid] for s in strings]
+            raw = [r[valid] for r in raw]
+        # Keep the last skip_footer lines for the next block
+        if skip_footer > 0:
+            if footer is not None:
+                strings = [np.concatenate(_) for _ in zip(footer[0], strings)]
+                raw = [np.concatenate(_) for _ in zip(footer[1], raw)]
+            n = max(len(strings[0]) - skip_footer, 0)
+            footer = ([s[n:] for s in strings], [r[n:] for r in raw])
+            strings = [s[:n] for s in strings]
+            raw = [r[:n] for r in raw]
+        restart = False
+        for (i, kind) in enumerate(kinds):
+            missing = np.in1d(strings[i], missing_values[i])
+            (colvalues, ok) = _convert_text_column(strings[i], raw[i], kind)
+            if guess:
+                while kind != 'S' and not (ok | missing).all():
+                    kind = _COLUMN_KINDS[_COLUMN_KINDS.index(kind) + 1]
+                    (colvalues, ok) = _convert_text_column(strings[i], raw[i],
+                                                           kind)
+                if kind != kinds[i]:
+                    # Strings and booleans are not made of the values of
+                    # the other kinds
+                    if ((kind == 'S' and sum([len(v) for v in values[i]]))
+                        or (kinds[i] == 'b' and converted[i])):
+                        restart = True
+                    else:
+                        values[i] = [v.astype(colvalues.dtype)
+                                     for v in values[i]]
+                    kinds[i] = kind
+            elif not loose and not (ok | missing).all():
+                errmsg = "Cannot convert string '%s'"
+                raise ValueError(errmsg % raw[i][~(ok | missing)][0])
+            converted[i] = converted[i] or ok.any()
+            values[i].append(colvalues)
+            failed[i].append(~ok)
+            if usemask:
+                masks[i].append(missing)
+        if restart:
+            raise _ColumnTypeChange(kinds)
+    values = [np.concatenate(_) for _ in values]
+    for (i, kind) in enumerate(kinds):
+        if kind == 'S' and len(values[i]):
+            # The strings are as long as the longest value of their block,
+            # which may be in a dropped line.
+            width = max(np.char.str_len(values[i]).max(), 1)
+            values[i] = values[i].astype((np.string_, width))
+    failed = [np.concatenate(_) for _ in failed]
+    if usemask:
+        masks = [np.concatenate(_) for _ in masks]
+    return (values, failed, masks, kinds, invalid)
+
+def _stack_columns(columns, dtype):
+    """
+    Return an array of `dtype` with the 1-d arrays `columns` as its fields
+    or, if it has none, as its columns.
+    """
+    dtype = np.dtype(dtype)
+    if dtype.names:
+        output = np.empty(len(columns[0]), dtype)
+        for (name, column) in zip(dtype.names, columns):
+            output[name] = column
+        return output
+    # Strings are as long as the longest value
+    if dtype.char == 'S' and not dtype.itemsize:
+        columns = [column.astype(np.string_) for column in columns]
+        dtype = np.dtype((np.string_, max([c.itemsize for c in columns])))
+    if not len(columns[0]):
+        # Like np.array([], dtype)
+        return np.empty(0, dtype)
+    output = np.empty((len(columns[0]), len(columns)), dtype)
+    for (i, column) in enumerate(columns):
+        output[:, i] = column
+    return output
 
 
 def genfromtxt(fname, dtype=float, comments='#', delimiter=None,
@@ -940,7 +1478,8 @@ def genfromtxt(fname, dtype=float, comments='#', delimiter=None,
                usecols=None, names=None,
                excludelist=None, deletechars=None, replace_space='_',
                autostrip=False, case_sensitive=True, defaultfmt="f%i",
-               unpack=None, usemask=False, loose=True, invalid_raise=True):
+               unpack=None, usemask=False, loose=True, invalid_raise=True,
+               ndmin=0):
     """
     Load data from a text file, with missing values handled as specified.
 
@@ -1012,6 +1551,11 @@ def genfromtxt(fname, dtype=float, comments='#', delimiter=None,
         If True, an exception is raised if an inconsistency is detected in the
         number of columns.
         If False, a warning is emitted and the offending lines are skipped.
+    ndmin : int, optional
+        The returned array has at least `ndmin` dimensions: the axes of
+        length one are squeezed, except that with 2 a plain data-type gives
+        the array of rows and columns as read, and a structured one a
+        column.  Legal values are 0 (default), 1 or 2.
 
     Returns
     -------
@@ -1094,6 +1638,9 @@ def genfromtxt(fname, dtype=float, comments='#', delimiter=None,
             "(got '%s' instead)"
         raise TypeError(errmsg % type(user_converters))
 
+    if ndmin not in (0, 1, 2):
+        raise ValueError('ndmin must be 0, 1 or 2')
+
     # Initialize the filehandle, the LineSplitter and the NameValidator
     if isinstance(fname, basestring):
         fhd = np.lib._datasource.open(fname, 'U')
@@ -1118,9 +1665,11 @@ def genfromtxt(fname, dtype=float, comments='#', delimiter=None,
     # Skip the first `skip_header` rows
     for i in xrange(skip_header):
         fhd.readline()
-    # Keep on until we find the first valid values
+    # Keep on until we find the first valid values, and remember where the
+    # data starts in case it has to be read again
     first_values = None
     while not first_values:
+        data_start = _tell(fhd)
         first_line = fhd.readline()
         if not first_line:
             raise IOError('End-of-file reached before encountering data.')
@@ -1133,6 +1682,7 @@ def genfromtxt(fname, dtype=float, comments='#', delimiter=None,
         fval = first_values[0].strip()
         if fval in comments:
             del first_values[0]
+        data_start = _tell(fhd)
 
     # Check the columns to use
     if usecols is not None:
@@ -1321,68 +1871,124 @@ def genfromtxt(fname, dtype=float, comments='#', delimiter=None,
 
     miss_chars = [_.missing_values for _ in converters]
 
+    # Read the values column by column into typed arrays when the
+    # converters are the ones for the dtypes, instead of keeping each row
+    # as a tuple of strings and converting them one by one.  Guessing the
+    # dtypes may require reading the data again.
+    use_columns = (_split_text is not None and not user_converters and
+                   len(StringConverter._mapper) == 5 and
+                   (delimiter is None or _is_bytes_like(delimiter)) and
+                   len(converters) <= nbcols and
+                   (not usecols or min(usecols) >= 0))
+    if use_columns:
+        if dtype is None:
+            kinds = [_COLUMN_KINDS[0]] * len(converters)
+            use_columns = data_start is not None
+        else:
+            if len(dtype_flat) > 1:
+                kinds = [_column_kind(dt) for dt in dtype_flat]
+            else:
+                kinds = [_column_kind(dtype)] * len(converters)
+            use_columns = (None not in kinds and
+                           (len(dtype_flat) > 1 or not dtype.names))
 
-    # Initialize the output lists ...
-    # ... rows
-    rows = []
-    append_to_rows = rows.append
-    # ... masks
-    if usemask:
-        masks = []
-        append_to_masks = masks.append
-    # ... invalid
-    invalid = []
-    append_to_invalid = invalid.append
-
-    # Parse each line
-    for (i, line) in enumerate(itertools.chain([first_line, ], fhd)):
-        values = split_line(line)
-        nbvalues = len(values)
-        # Skip an empty line
-        if nbvalues == 0:
-            continue
-        # Select only the columns we need
-        if usecols:
+    if use_columns:
+        (data, lineno) = (asbytes(first_line), int(not first_line))
+        while True:
             try:
-                values = [values[_] for _ in usecols]
-            except IndexError:
+                (columns, failed, masks, kinds, invalid) = \
+                    _read_text_columns(fhd, data, lineno,
+                                       usecols or range(len(converters)),
+                                       nbcols, usecols, kinds,
+                                       dtype is None, miss_chars, delimiter,
+                                       comments, autostrip, loose, usemask,
+                                       skip_footer)
+                break
+            except _ColumnTypeChange, e:
+                kinds = e.args[0]
+                fhd.seek(data_start)
+                data = asbytes('')
+        nbrows = len(columns[0])
+
+        # Set the converters to the types that were found
+        if dtype is None:
+            for (converter, kind, fail) in zip(converters, kinds, failed):
+                _status = _COLUMN_KINDS.index(kind)
+                if _status:
+                    (converter.type, converter.func, default) = \
+                        converter._mapper[_status]
+                    if converter._initial_default is not None:
+                        converter.default = converter._initial_default
+                    else:
+                        converter.default = default
+                    converter._status = _status
+                converter._checked = not (_status == 0 and fail.any())
+        # Fill in the values that could not be converted
+        for (column, converter, fail) in zip(columns, converters, failed):
+            if fail.any():
+                column[fail] = converter.default
+    else:
+        # Initialize the output lists ...
+        # ... rows
+        rows = []
+        append_to_rows = rows.append
+        # ... masks
+        if usemask:
+            masks = []
+            append_to_masks = masks.append
+        # ... invalid
+        invalid = []
+        append_to_invalid = invalid.append
+
+        # Parse each line
+        for (i, line) in enumerate(itertools.chain([first_line, ], fhd)):
+            values = split_line(line)
+            nbvalues = len(values)
+            # Skip an empty line
+            if nbvalues == 0:
+                continue
+            # Select only the columns we need
+            if usecols:
+                try:
+                    values = [values[_] for _ in usecols]
+                except IndexError:
+                    append_to_invalid((i, nbvalues))
+                    continue
+            elif nbvalues != nbcols:
                 append_to_invalid((i, nbvalues))
                 continue
-        elif nbvalues != nbcols:
-            append_to_invalid((i, nbvalues))
-            continue
-        # Store the values
-        append_to_rows(tuple(values))
-        if usemask:
-            append_to_masks(tuple([v.strip() in m
-                                   for (v, m) in zip(values, missing_values)]))
+            # Store the values
+            append_to_rows(tuple(values))
+            if usemask:
+                append_to_masks(tuple([v.strip() in m
+                                       for (v, m) in zip(values, missing_values)]))
 
-    # Strip the last skip_footer data
-    if skip_footer > 0:
-        rows = rows[:-skip_footer]
-        if usemask:
-            masks = masks[:-skip_footer]
+        # Strip the last skip_footer data
+        if skip_footer > 0:
+            rows = rows[:-skip_footer]
+            if usemask:
+                masks = masks[:-skip_footer]
 
-    # Upgrade the converters (if needed)
-    if dtype is None:
-        for (i, converter) in enumerate(converters):
-            current_column = map(itemgetter(i), rows)
-            try:
-                converter.iterupgrade(current_column)
-            except ConverterLockError:
-                errmsg = "Converter #%i is locked and cannot be upgraded: " % i
-                current_column = itertools.imap(itemgetter(i), rows)
-                for (j, value) in enumerate(current_column):
-                    try:
-                        converter.upgrade(value)
-                    except (ConverterError, ValueError):
-                        errmsg += "(occurred line #%i for value '%s')"
-                        errmsg %= (j + 1 + skip_header, value)
-                        raise ConverterError(errmsg)
+        # Upgrade the converters (if needed)
+        if dtype is None:
+            for (i, converter) in enumerate(converters):
+                current_column = map(itemgetter(i), rows)
+                try:
+                    converter.iterupgrade(current_column)
+                except ConverterLockError:
+                    errmsg = "Converter #%i is locked and cannot be upgraded: " % i
+                    current_column = itertools.imap(itemgetter(i), rows)
+                    for (j, value) in enumerate(current_column):
+                        try:
+                            converter.upgrade(value)
+                        except (ConverterError, ValueError):
+                            errmsg += "(occurred line #%i for value '%s')"
+                            errmsg %= (j + 1 + skip_header, value)
+                            raise ConverterError(errmsg)
+        nbrows = len(rows)
 
     # Check that we don't have invalid values
     if len(invalid) > 0:
-        nbrows = len(rows)
         # Construct the error message
         template = "    Line #%%i (got %%i columns instead of %i)" % nbcols
         if skip_footer > 0:
@@ -1402,23 +2008,16 @@ def genfromtxt(fname, dtype=float, comments='#', delimiter=None,
             else:
                 warnings.warn(errmsg, ConversionWarning)
 
-    # Convert each value according to the converter:
-    # We want to modify the list in place to avoid creating a new one...
-#    if loose:
-#        conversionfuncs = [conv._loose_call for conv in converters]
-#    else:
-#        conversionfuncs = [conv._strict_call for conv in converters]
-#    for (i, vals) in enumerate(rows):
-#        rows[i] = tuple([convert(val)
-#                         for (convert, val) in zip(conversionfuncs, vals)])
-    if loose:
-        rows = zip(*[map(converter._loose_call, map(itemgetter(i), rows))
-                     for (i, converter) in enumerate(converters)])
-    else:
-        rows = zip(*[map(converter._strict_call, map(itemgetter(i), rows))
-                     for (i, converter) in enumerate(converters)])
-    # Reset the dtype
-    data = rows
+    if not use_columns:
+        # Convert each value according to the converter:
+        # We want to modify the list in place to avoid creating a new one...
+        if loose:
+            rows = zip(*[map(converter._loose_call, map(itemgetter(i), rows))
+                         for (i, converter) in enumerate(converters)])
+        else:
+            rows = zip(*[map(converter._strict_call, map(itemgetter(i), rows))
+                         for (i, converter) in enumerate(converters)])
+        data = rows
     if dtype is None:
         # Get the dtypes from the types of the converters
         column_types = [conv.type for conv in converters]
@@ -1427,7 +2026,10 @@ def genfromtxt(fname, dtype=float, comments='#', delimiter=None,
                      if v in (type('S'), np.string_)]
         # ... and take the largest number of chars.
         for i in strcolidx:
-            column_types[i] = "|S%i" % max(len(row[i]) for row in data)
+            if use_columns:
+                column_types[i] = "|S%i" % columns[i].itemsize
+            else:
+                column_types[i] = "|S%i" % max(len(row[i]) for row in data)
         #
         if names is None:
             # If the dtype is uniform, don't define names, else use ''
@@ -1443,9 +2045,14 @@ def genfromtxt(fname, dtype=float, comments='#', delimiter=None,
         else:
             ddtype = zip(names, column_types)
             mdtype = zip(names, [np.bool] * len(column_types))
-        output = np.array(data, dtype=ddtype)
-        if usemask:
-            outputmask = np.array(masks, dtype=mdtype)
+        if use_columns:
+            output = _stack_columns(columns, ddtype)
+            if usemask:
+                outputmask = _stack_columns(masks, mdtype)
+        else:
+            output = np.array(data, dtype=ddtype)
+            if usemask:
+                outputmask = np.array(masks, dtype=mdtype)
     else:
         # Overwrite the initial dtype names if needed
         if names and dtype.names:
@@ -1463,14 +2070,19 @@ def genfromtxt(fname, dtype=float, comments='#', delimiter=None,
                     raise NotImplementedError(errmsg)
                 else:
                     output = np.array(data, dtype=dtype)
+            elif use_columns:
+                rows = _stack_columns(columns, [('', _) for _ in dtype_flat])
+                output = rows.view(dtype)
             else:
                 rows = np.array(data, dtype=[('', _) for _ in dtype_flat])
                 output = rows.view(dtype)
             # Now, process the rowmasks the same way
             if usemask:
-                rowmasks = np.array(masks,
-                                    dtype=np.dtype([('', np.bool)
-                                    for t in dtype_flat]))
+                rowmasks_dtype = np.dtype([('', np.bool) for t in dtype_flat])
+                if use_columns:
+                    rowmasks = _stack_columns(masks, rowmasks_dtype)
+                else:
+                    rowmasks = np.array(masks, dtype=rowmasks_dtype)
                 # Construct the new dtype
                 mdtype = make_mask_descr(dtype)
                 outputmask = rowmasks.view(mdtype)
@@ -1498,13 +2110,19 @@ def genfromtxt(fname, dtype=float, comments='#', delimiter=None,
                     else:
                         dtype = np.dtype(ttype)
             #
-            output = np.array(data, dtype)
             if usemask:
                 if dtype.names:
                     mdtype = [(_, np.bool) for _ in dtype.names]
                 else:
                     mdtype = np.bool
-                outputmask = np.array(masks, dtype=mdtype)
+            if use_columns:
+                output = _stack_columns(columns, dtype)
+                if usemask:
+                    outputmask = _stack_columns(masks, mdtype)
+            else:
+                output = np.array(data, dtype)
+                if usemask:
+                    outputmask = np.array(masks, dtype=mdtype)
     # Try to take care of the missing data we missed
     names = output.dtype.names
     if usemask and names:
@@ -1517,9 +2135,16 @@ def genfromtxt(fname, dtype=float, comments='#', delimiter=None,
     if usemask:
         output = output.view(MaskedArray)
         output._mask = outputmask
+    if ndmin < 2 or output.ndim < 2:
+        output = output.squeeze()
+        if output.ndim < ndmin:
+            if ndmin == 1:
+                output = output.reshape(-1)
+            else:
+                output = output.reshape(-1, 1)
     if unpack:
-        return output.squeeze().T
-    return output.squeeze()
+        return output.T
+    return output
 
 
 
@@ -1616,3 +2241,288 @@ def recfromcsv(fname, **kwargs):
     else:
         output = output.view(np.recarray)
     return output
+
+
+def _file_pieces(fname, splits):
+    """
+    Return the byte ranges `load_many` reads the file `fname` in, each
+    starting at the beginning of a line, or [None] to read it whole.
+    """
+    if (splits <= 1 or not isinstance(fname, basestring) or
+        not os.path.isfile(fname) or
+        os.path.splitext(fname)[1] in ('.gz', '.bz2')):
+        return [None]
+    size = os.path.getsize(fname)
+    starts = [0]
+    fh = open(fname, 'rb')
+    try:
+        for k in range(1, splits):
+            offset = k * size // splits
+            if offset <= starts[-1]:
+                continue
+            # Move to the end of the line the offset is in
+            fh.seek(offset - 1)
+            fh.readline()
+            starts.append(fh.tell())
+    finally:
+        fh.close()
+    starts.append(size)
+    return [(start, stop) for (start, stop) in zip(starts[:-1], starts[1:])
+            if start < stop]
+
+def _load_piece(loader, fname, piece, kwargs):
+    "Load the byte range `piece` of `fname`, or all of it, with `loader`."
+    if piece is None:
+        return loader(fname, **kwargs)
+    fh = open(fname, 'rb')
+    try:
+        fh.seek(piece[0])
+        data = fh.read(piece[1] - piece[0])
+    finally:
+        fh.close()
+    if not _has_data(data, kwargs):
+        return None
+    return loader(BytesIO(data), **kwargs)
+
+def _has_data(data, kwargs):
+    """
+    Whether the text `data` has a line that is not blank or a comment after
+    the lines skipped by the arguments `kwargs` of the loader.
+    """
+    skip = kwargs.get('skip_header', 0) or kwargs.get('skiprows', 0)
+    comments = kwargs.get('comments', '#')
+    for line in data.splitlines()[skip:]:
+        if comments:
+            line = line.split(asbytes(comments))[0]
+        if line.strip():
+            return True
+    return False
+
+def _run_threads(func, tasks, nthreads):
+    """
+    Call `func` on each item of `tasks` with `nthreads` threads, and return
+    the list of the results or of the exceptions raised.
+    """
+    results = [None] * len(tasks)
+    if nthreads <= 1 or len(tasks) <= 1:
+        for (i, task) in enumerate(tasks):
+            try:
+                results[i] = func(*task)
+            except Exception, e:
+                results[i] = e
+        return results
+    import threading
+    lock = threading.Lock()
+    todo = iter(range(len(tasks)))
+    def work():
+        while True:
+            lock.acquire()
+            try:
+                i = next(todo, None)
+            finally:
+                lock.release()
+            if i is None:
+                return
+            try:
+                results[i] = func(*tasks[i])
+            except Exception, e:
+                results[i] = e
+    threads = [threading.Thread(target=work)
+               for _ in range(min(nthreads, len(tasks)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def _common_dtype(dtypes):
+    """
+    Return the dtype all of `dtypes` can be cast to; fields are matched by
+    position and named after the first dtype.
+    """
+    first = dtypes[0]
+    if not first.names:
+        if [dt for dt in dtypes if dt.names]:
+            raise ValueError("The pieces do not have the same fields")
+        strings = [dt.itemsize for dt in dtypes if dt.char == 'S']
+        if strings and len(strings) < len(dtypes):
+            # Long enough for the str of the numbers
+            return np.dtype((np.string_, max(strings + [32])))
+        return np.find_common_type(dtypes, [])
+    if [dt for dt in dtypes if len(dt.names or ()) != len(first.names)]:
+        raise ValueError("The pieces do not have the same fields")
+    return np.dtype([(name, _common_dtype([dt.fields[dt.names[i]][0]
+                                           for dt in dtypes]))
+                     for (i, name) in enumerate(first.names)])
+
+def _cast_piece(a, dtype):
+    "Cast the array `a` to `dtype`, copying its fields by position."
+    if a.dtype == dtype:
+        return a
+    if isinstance(a, np.ma.MaskedArray):
+        mask = np.ma.getmaskarray(a).view(np.ma.make_mask_descr(dtype))
+        return np.ma.array(_cast_piece(a.data, dtype), mask=mask)
+    if not dtype.names:
+        return a.astype(dtype)
+    out = np.empty(a.shape, dtype)
+    for (name, field) in zip(dtype.names, a.dtype.names):
+        out[name] = a[field]
+    return out
+
+def load_many(fnames, loader=None, splits=1, nthreads=None, errors='raise',
+              **kwargs):
+    """
+    Load data from several text files, or pieces of them, in parallel.
+
+    Each file, or each piece of a file, is read by `loader` in a pool of
+    threads, and the results are joined into one array.
+
+    Parameters
+    ----------
+    fnames : str, file or sequence
+        The files to read, as file names or file handles.  Files whose names
+        end in ``.gz`` or ``.bz2`` are decompressed.
+    loader : callable, optional
+        The function reading each file or piece, called as
+        ``loader(fh, **kwargs)``.  The default is `loadtxt`; `genfromtxt`,
+        `fromregex` or any function like them can be used too.
+    splits : int, optional
+        The number of pieces each uncompressed file given by name is split
+        into.  The pieces are byte ranges of the same size, moved to the
+        start of the next line.  Only the first piece of a file skips the
+        `skiprows` or `skip_header` lines and reads the names of the fields
+        (``names=True``), and only the last one drops the `skip_footer`
+        lines.  Default is 1.
+    nthreads : int, optional
+        The number of threads.  Default is the number of threads of
+        numpy (see `getnumthreads`).
+    errors : {'raise', 'warn'}, optional
+        If some files or pieces could not be read, either raise a
+        ValueError listing their errors (the default), or issue a
+        ConversionWarning with that list and return the data of the
+        others.
+    **kwargs
+        The arguments of `loader`.
+
+    Returns
+    -------
+    out : ndarray
+        The arrays of the files and pieces in order, joined along the first
+        axis (or the last one with ``unpack=True``).  They are cast to a
+        dtype they all fit in; the fields of structured arrays are matched
+        by position and take the names of the first array.
+
+    See Also
+    --------
+    loadtxt, genfromtxt, fromregex
+
+    Notes
+    -----
+    The parsers of `loadtxt` and `genfromtxt` do not hold the interpreter
+    lock for most of their work, so the threads read files at the same
+    time.  Python converters and the line by line code of `genfromtxt`
+    hold it, and gain little from more threads.
+
+    Examples
+    --------
+    >>> for i in range(3):
+    ...     np.savetxt('/tmp/shard%i.txt' % i, [[i, -i]])
+    >>> np.load_many(['/tmp/shard%i.txt' % i for i in range(3)])
+    array([[ 0.,  0.],
+           [ 1., -1.],
+           [ 2., -2.]])
+
+    """
+    if isinstance(fnames, basestring) or hasattr(fnames, 'read'):
+        fnames = [fnames]
+    if loader is None:
+        loader = loadtxt
+    if errors not in ('raise', 'warn'):
+        raise ValueError("errors must be 'raise' or 'warn'")
+    if nthreads is None:
+        nthreads = np.getnumthreads()
+    unpack = kwargs.pop('unpack', False)
+    # Keep the pieces with a single row 2-D, to squeeze only the result
+    squeeze = (loader in (loadtxt, genfromtxt, ndfromtxt, mafromtxt) and
+               'ndmin' not in kwargs)
+    if squeeze:
+        kwargs['ndmin'] = 2
+
+    # Make the tasks for the pieces of the files
+    tasks = []
+    labels = []
+    later = []
+    for fname in fnames:
+        pieces = _file_pieces(fname, splits)
+        for (i, piece) in enumerate(pieces):
+            kw = dict(kwargs)
+            if i > 0:
+                for key in ('skiprows', 'skip_header'):
+                    if key in kw:
+                        kw[key] = 0
+                if kw.get('names') is True:
+                    later.append(len(tasks))
+            if i < len(pieces) - 1 and 'skip_footer' in kw:
+                kw['skip_footer'] = 0
+            tasks.append((loader, fname, piece, kw))
+            label = getattr(fname, 'name', fname)
+            if piece is not None:
+                label = "%s (bytes %i to %i)" % ((label,) + piece)
+            labels.append(label)
+
+    # The pieces after the first of a file take the names it read
+    first = [i for i in range(len(tasks)) if i not in later]
+    results = [None] * len(tasks)
+    for (i, result) in zip(first, _run_threads(_load_piece,
+                                               [tasks[i] for i in first],
+                                               nthreads)):
+        results[i] = result
+    if later:
+        names = None
+        for i in range(len(tasks)):
+            if i not in later:
+                descr = getattr(results[i], 'dtype', None)
+                names = descr is not None and descr.names
+            elif names:
+                tasks[i][3]['names'] = list(names)
+            else:
+                tasks[i][3]['names'] = None
+        for (i, result) in zip(later, _run_threads(_load_piece,
+                                                   [tasks[i] for i in later],
+                                                   nthreads)):
+            results[i] = result
+
+    # Report the errors
+    errmsg = ["    %s: %s" % (label, result)
+              for (label, result) in zip(labels, results)
+              if isinstance(result, Exception)]
+    if errmsg:
+        errmsg.insert(0, "Some files could not be loaded:")
+        errmsg = "\n".join(errmsg)
+        if errors == 'raise':
+            raise ValueError(errmsg)
+        warnings.warn(errmsg, ConversionWarning)
+    arrays = [result for result in results
+              if result is not None and not isinstance(result, Exception)]
+    if not arrays:
+        raise IOError("No data could be loaded.")
+
+    # Undo the squeezing of the pieces with a single row or value, which
+    # is only known from the pieces with several
+    ndim = max([a.ndim for a in arrays])
+    if ndim == 2:
+        ncols = [a.shape[1] for a in arrays if a.ndim == 2][0]
+        arrays = [a.reshape(-1, ncols) for a in arrays]
+    else:
+        arrays = [a.reshape(-1) for a in arrays]
+    dtype = _common_dtype([a.dtype for a in arrays])
+    arrays = [_cast_piece(a, dtype) for a in arrays]
+    if [a for a in arrays if isinstance(a, np.ma.MaskedArray)]:
+        output = np.ma.concatenate(arrays)
+    else:
+        output = np.concatenate(arrays)
+    if squeeze:
+        output = output.squeeze()
+    if unpack:
+        return output.T
+    return output
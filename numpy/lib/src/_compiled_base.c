@@ -4,6 +4,8 @@
 #include "numpy/npy_3kcompat.h"
 #include "npy_api.h"
 #include "npy_descriptor.h"
+#include "npy_hashset.h"
+#include "npy_textparse.h"
 #include "npy_config.h"
 
 
@@ -896,6 +898,520 @@ io_unpack(PyObject *NPY_UNUSED(self), PyObject *args, PyObject *kwds)
     return pack_or_unpack_bits(obj, axis, 1);
 }
 
+/*
+ * Hash based set operations used by numpy.lib.arraysetops.
+ */
+
+/* Steals the reference to arr and returns its interface object. */
+static PyObject *
+_wrap_array(NpyArray *arr)
+{
+    PyObject *ret;
+
+    if (arr == NULL) {
+        Py_INCREF(Py_None);
+        return Py_None;
+    }
+    ret = (PyObject *)Npy_INTERFACE(arr);
+    Py_INCREF(ret);
+    Npy_DECREF(arr);
+    return ret;
+}
+
+static PyObject *
+arr_can_hash(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyArray_Descr *descr = NULL;
+    PyObject *arr;
+    int ret;
+
+    if (!PyArg_ParseTuple(args, "O&", PyArray_DescrConverter, &descr)) {
+        return NULL;
+    }
+    arr = PyArray_Zeros(0, NULL, descr, 0);
+    if (arr == NULL) {
+        return NULL;
+    }
+    ret = NpyArray_CanHash(PyArray_DESCR(arr));
+    Py_DECREF(arr);
+    return PyBool_FromLong(ret);
+}
+
+static PyObject *
+arr_hash_unique(PyObject *NPY_UNUSED(self), PyObject *args, PyObject *kwds)
+{
+    PyObject *obj, *arr;
+    int return_index = 0, return_inverse = 0, return_counts = 0;
+    NpyArray *ret, *index = NULL, *inverse = NULL, *counts = NULL;
+    static char *kwlist[] = {"ar", "return_index", "return_inverse",
+                             "return_counts", NULL};
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|iii", kwlist, &obj,
+                                     &return_index, &return_inverse,
+                                     &return_counts)) {
+        return NULL;
+    }
+    arr = PyArray_FROM_O(obj);
+    if (arr == NULL) {
+        return NULL;
+    }
+    ret = NpyArray_HashUnique(PyArray_ARRAY(arr),
+                              return_index ? &index : NULL,
+                              return_inverse ? &inverse : NULL,
+                              return_counts ? &counts : NULL);
+    Py_DECREF(arr);
+    if (ret == NULL) {
+        return NULL;
+    }
+    return Py_BuildValue("NNNN", _wrap_array(ret), _wrap_array(index),
+                         _wrap_array(inverse), _wrap_array(counts));
+}
+
+static PyObject *
+arr_hash_in1d(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyObject *obj1, *obj2, *ar1, *ar2;
+    NpyArray *ret;
+
+    if (!PyArg_ParseTuple(args, "OO", &obj1, &obj2)) {
+        return NULL;
+    }
+    ar1 = PyArray_FROM_O(obj1);
+    if (ar1 == NULL) {
+        return NULL;
+    }
+    ar2 = PyArray_FROM_O(obj2);
+    if (ar2 == NULL) {
+        Py_DECREF(ar1);
+        return NULL;
+    }
+    ret = NpyArray_HashIn1d(PyArray_ARRAY(ar1), PyArray_ARRAY(ar2));
+    Py_DECREF(ar1);
+    Py_DECREF(ar2);
+    if (ret == NULL) {
+        return NULL;
+    }
+    return _wrap_array(ret);
+}
+
+/*
+ * Text parsing used by numpy.lib.npyio.loadtxt.
+ */
+
+static PyObject *
+arr_can_parse_text(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyArray_Descr *descr = NULL;
+    int ret;
+
+    if (!PyArg_ParseTuple(args, "O&", PyArray_DescrConverter, &descr)) {
+        return NULL;
+    }
+    ret = (NpyArray_ISNBO(descr->descr->byteorder) &&
+           NpyText_CanParse(descr->descr->type_num));
+    Py_DECREF(descr);
+    return PyBool_FromLong(ret);
+}
+
+/* Converts a sequence of integers to a new int array. */
+static int *
+_int_sequence(PyObject *seq, int *n)
+{
+    PyObject *fast;
+    int *ret;
+    int i;
+
+    fast = PySequence_Fast(seq, "expected a sequence of integers");
+    if (fast == NULL) {
+        return NULL;
+    }
+    *n = PySequence_Fast_GET_SIZE(fast);
+    ret = (int *)malloc((*n + 1)*sizeof(int));
+    if (ret == NULL) {
+        Py_DECREF(fast);
+        PyErr_NoMemory();
+        return NULL;
+    }
+    for (i = 0; i < *n; i++) {
+        ret[i] = PyInt_AsLong(PySequence_Fast_GET_ITEM(fast, i));
+        if (ret[i] == -1 && PyErr_Occurred()) {
+            Py_DECREF(fast);
+            free(ret);
+            return NULL;
+        }
+    }
+    Py_DECREF(fast);
+    return ret;
+}
+
+static char arr_parse_text__doc__[] =
+    "_parse_text(data, pos, final, out, row, lineno, types, offsets, "
+    "colmap, delimiter, comments)\n\n"
+    "Parse the lines of the buffer data from pos on into the rows of the\n"
+    "1-d contiguous array out from row on, until out is full or the data\n"
+    "ends; the last line is only parsed if final is true or it ends in a\n"
+    "newline.  The value in column i of a line goes to the field colmap[i]\n"
+    "(the i-th one if colmap is None, none if it is negative), which has\n"
+    "the type number types[j] and the offset offsets[j] in a row.\n"
+    "Returns the new (row, pos, lineno).";
+
+static PyObject *
+arr_parse_text(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyObject *data, *out, *otypes, *ooffsets, *ocolmap;
+    const char *buf;
+    Py_ssize_t len;
+    npy_intp pos, row, lineno, nrows = -1, k;
+    int final, nfields, noffsets, i;
+    int *types = NULL, *offsets = NULL, *colmap = NULL;
+    npy_intp *loffsets = NULL;
+    NpyTextFormat fmt;
+    NpyTextError err;
+
+    fmt.delimiter = fmt.comments = NULL;
+    fmt.delimlen = fmt.commentslen = 0;
+    if (!PyArg_ParseTuple(args, "O" NPY_SSIZE_T_PYFMT "iO!" NPY_SSIZE_T_PYFMT
+                          NPY_SSIZE_T_PYFMT "OOOz#z#", &data, &pos, &final,
+                          &PyArray_Type, &out, &row, &lineno, &otypes,
+                          &ooffsets, &ocolmap, &fmt.delimiter, &fmt.delimlen,
+                          &fmt.comments, &fmt.commentslen)) {
+        return NULL;
+    }
+    if (PyObject_AsReadBuffer(data, (const void **)&buf, &len) < 0) {
+        return NULL;
+    }
+    if (PyArray_NDIM(out) != 1 || !PyArray_ISCARRAY(out)) {
+        PyErr_SetString(PyExc_ValueError,
+                        "out must be a 1-d, contiguous, writeable array");
+        return NULL;
+    }
+    if (pos < 0 || pos > len || row < 0 || row > PyArray_DIM(out, 0)) {
+        PyErr_SetString(PyExc_ValueError, "pos or row out of bounds");
+        return NULL;
+    }
+    if (fmt.delimiter != NULL && fmt.delimlen == 0) {
+        PyErr_SetString(PyExc_ValueError, "empty delimiter");
+        return NULL;
+    }
+    if (fmt.comments != NULL && fmt.commentslen == 0) {
+        fmt.comments = NULL;
+    }
+
+    types = _int_sequence(otypes, &nfields);
+    if (types == NULL) {
+        goto fail;
+    }
+    offsets = _int_sequence(ooffsets, &noffsets);
+    if (offsets == NULL) {
+        goto fail;
+    }
+    if (noffsets != nfields) {
+        PyErr_SetString(PyExc_ValueError,
+                        "types and offsets must have the same length");
+        goto fail;
+    }
+    loffsets = (npy_intp *)malloc((nfields + 1)*sizeof(npy_intp));
+    if (loffsets == NULL) {
+        PyErr_NoMemory();
+        goto fail;
+    }
+    for (i = 0; i < nfields; i++) {
+        NpyArray_Descr *descr;
+        int elsize;
+
+        if (!NpyText_CanParse(types[i])) {
+            PyErr_SetString(PyExc_ValueError, "invalid field type");
+            goto fail;
+        }
+        descr = NpyArray_DescrFromType(types[i]);
+        elsize = descr->elsize;
+        Npy_DECREF(descr);
+        if (offsets[i] < 0 || offsets[i] + elsize > PyArray_ITEMSIZE(out)) {
+            PyErr_SetString(PyExc_ValueError, "invalid field offset");
+            goto fail;
+        }
+        loffsets[i] = offsets[i];
+    }
+    fmt.ncols = nfields;
+    if (ocolmap != Py_None) {
+        colmap = _int_sequence(ocolmap, &fmt.ncols);
+        if (colmap == NULL) {
+            goto fail;
+        }
+        for (i = 0; i < fmt.ncols; i++) {
+            if (colmap[i] >= nfields) {
+                PyErr_SetString(PyExc_ValueError, "invalid column map");
+                goto fail;
+            }
+        }
+    }
+    fmt.nfields = nfields;
+    fmt.types = types;
+    fmt.offsets = loffsets;
+    fmt.rowsize = PyArray_ITEMSIZE(out);
+    fmt.colmap = colmap;
+
+    Py_BEGIN_ALLOW_THREADS;
+    nrows = NpyText_Parse(&fmt, buf, len, &pos, final,
+                          PyArray_BYTES(out) + row*fmt.rowsize,
+                          PyArray_DIM(out, 0) - row, &lineno, &err);
+    Py_END_ALLOW_THREADS;
+    if (nrows < 0) {
+        NpyText_SetError(&err);
+    }
+
+ fail:
+    free(types);
+    free(offsets);
+    free(loffsets);
+    free(colmap);
+    if (nrows < 0) {
+        return NULL;
+    }
+    k = row + nrows;
+    return Py_BuildValue("(" NPY_SSIZE_T_PYFMT NPY_SSIZE_T_PYFMT
+                         NPY_SSIZE_T_PYFMT ")", k, pos, lineno);
+}
+
+#define _ISSPACE(c) ((c) == ' ' || (c) == '\t' || (c) == '\n' || \
+                     (c) == '\r' || (c) == '\v' || (c) == '\f')
+
+/*
+ * Returns a new 1-d string array with the n values [cells[0], cells[1])
+ * of buf, taking every stride-th pair of cells.
+ */
+static PyObject *
+_gather_strings(const char *buf, const npy_intp *cells, npy_intp stride,
+                npy_intp n, int strip)
+{
+    PyObject *ret;
+    const char *s, *e;
+    char *dst;
+    npy_intp i, width = 1;
+
+    for (i = 0; i < n; i++) {
+        s = buf + cells[i*stride];
+        e = buf + cells[i*stride + 1];
+        if (strip) {
+            while (s < e && _ISSPACE(*s)) {
+                s++;
+            }
+            while (e > s && _ISSPACE(e[-1])) {
+                e--;
+            }
+        }
+        if (e - s > width) {
+            width = e - s;
+        }
+    }
+    ret = PyArray_New(&PyArray_Type, 1, &n, PyArray_STRING, NULL, NULL,
+                      width, 0, NULL);
+    if (ret == NULL) {
+        return NULL;
+    }
+    dst = PyArray_BYTES(ret);
+    for (i = 0; i < n; i++, dst += width) {
+        s = buf + cells[i*stride];
+        e = buf + cells[i*stride + 1];
+        if (strip) {
+            while (s < e && _ISSPACE(*s)) {
+                s++;
+            }
+            while (e > s && _ISSPACE(e[-1])) {
+                e--;
+            }
+        }
+        memcpy(dst, s, e - s);
+        memset(dst + (e - s), 0, width - (e - s));
+    }
+    return ret;
+}
+
+/* Returns a new 1-d intp array with a copy of the n values in data. */
+static PyObject *
+_intp_array(const npy_intp *data, npy_intp n)
+{
+    PyObject *ret;
+
+    ret = PyArray_New(&PyArray_Type, 1, &n, PyArray_INTP, NULL, NULL, 0, 0,
+                      NULL);
+    if (ret != NULL) {
+        memcpy(PyArray_BYTES(ret), data, n*sizeof(npy_intp));
+    }
+    return ret;
+}
+
+static char arr_split_text__doc__[] =
+    "_split_text(data, pos, final, cols, lineno, delimiter, comments, "
+    "rawcols)\n\n"
+    "Split the lines of the buffer data from pos on like genfromtxt.\n"
+    "Returns (strings, raw, counts, lines, pos, lineno), where strings has\n"
+    "a string array with the stripped values of each column in cols, raw\n"
+    "one with the unstripped values of each column in rawcols, counts the\n"
+    "number of values in each row, and lines the number of its line.";
+
+static PyObject *
+arr_split_text(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyObject *data, *ocols, *orawcols, *strings = NULL, *raw = NULL;
+    PyObject *ret = NULL, *item;
+    const char *buf, *p;
+    Py_ssize_t len;
+    npy_intp pos, lineno, maxrows, nrows;
+    npy_intp *cells = NULL, *counts = NULL, *lines = NULL;
+    int final, ncols, nrawcols, i;
+    int *cols = NULL, *rawcols = NULL;
+    NpyTextFormat fmt;
+
+    memset(&fmt, 0, sizeof(fmt));
+    if (!PyArg_ParseTuple(args, "O" NPY_SSIZE_T_PYFMT "iO" NPY_SSIZE_T_PYFMT
+                          "z#z#O", &data, &pos, &final, &ocols, &lineno,
+                          &fmt.delimiter, &fmt.delimlen, &fmt.comments,
+                          &fmt.commentslen, &orawcols)) {
+        return NULL;
+    }
+    if (PyObject_AsReadBuffer(data, (const void **)&buf, &len) < 0) {
+        return NULL;
+    }
+    if (pos < 0 || pos > len) {
+        PyErr_SetString(PyExc_ValueError, "pos out of bounds");
+        return NULL;
+    }
+    if (fmt.delimiter != NULL && fmt.delimlen == 0) {
+        fmt.delimiter = NULL;
+    }
+    if (fmt.comments != NULL && fmt.commentslen == 0) {
+        fmt.comments = NULL;
+    }
+    cols = _int_sequence(ocols, &ncols);
+    if (cols == NULL) {
+        goto finish;
+    }
+    rawcols = _int_sequence(orawcols, &nrawcols);
+    if (rawcols == NULL) {
+        goto finish;
+    }
+    fmt.ncols = 1;
+    for (i = 0; i < ncols + nrawcols; i++) {
+        int col = (i < ncols) ? cols[i] : rawcols[i - ncols];
+
+        if (col < 0) {
+            PyErr_SetString(PyExc_ValueError, "negative column");
+            goto finish;
+        }
+        if (col >= fmt.ncols) {
+            fmt.ncols = col + 1;
+        }
+    }
+
+    /* There are at most as many rows as lines. */
+    maxrows = 1;
+    for (p = buf + pos; (p = memchr(p, '\n', buf + len - p)) != NULL; p++) {
+        maxrows++;
+    }
+    cells = (npy_intp *)malloc(maxrows*2*fmt.ncols*sizeof(npy_intp));
+    counts = (npy_intp *)malloc(maxrows*sizeof(npy_intp));
+    lines = (npy_intp *)malloc(maxrows*sizeof(npy_intp));
+    if (cells == NULL || counts == NULL || lines == NULL) {
+        PyErr_NoMemory();
+        goto finish;
+    }
+    Py_BEGIN_ALLOW_THREADS;
+    nrows = NpyText_Split(&fmt, buf, len, &pos, final, cells, counts, lines,
+                          maxrows, &lineno);
+    Py_END_ALLOW_THREADS;
+
+    strings = PyList_New(ncols);
+    raw = PyList_New(nrawcols);
+    if (strings == NULL || raw == NULL) {
+        goto finish;
+    }
+    for (i = 0; i < ncols + nrawcols; i++) {
+        int col = (i < ncols) ? cols[i] : rawcols[i - ncols];
+
+        item = _gather_strings(buf, cells + 2*col, 2*fmt.ncols, nrows,
+                               i < ncols);
+        if (item == NULL) {
+            goto finish;
+        }
+        if (i < ncols) {
+            PyList_SET_ITEM(strings, i, item);
+        }
+        else {
+            PyList_SET_ITEM(raw, i - ncols, item);
+        }
+    }
+    ret = Py_BuildValue("OONN" NPY_SSIZE_T_PYFMT NPY_SSIZE_T_PYFMT, strings,
+                        raw, _intp_array(counts, nrows),
+                        _intp_array(lines, nrows), pos, lineno);
+
+ finish:
+    Py_XDECREF(strings);
+    Py_XDECREF(raw);
+    free(cols);
+    free(rawcols);
+    free(cells);
+    free(counts);
+    free(lines);
+    return ret;
+}
+
+static char arr_convert_strings__doc__[] =
+    "_convert_strings(strings, kind)\n\n"
+    "Convert a string array like genfromtxt: kind 'b' to booleans, 'i' to\n"
+    "int64 like int(), 'I' to int64 like int(float()) and 'f' to doubles.\n"
+    "Returns the values and a boolean array telling which could be\n"
+    "converted.";
+
+static PyObject *
+arr_convert_strings(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyObject *obj, *arr, *values, *ok;
+    char kind;
+    int type;
+    npy_intp n;
+
+    if (!PyArg_ParseTuple(args, "Oc", &obj, &kind)) {
+        return NULL;
+    }
+    switch (kind) {
+        case 'b':
+            type = PyArray_BOOL;
+            break;
+        case 'i':
+        case 'I':
+            type = PyArray_INT64;
+            break;
+        case 'f':
+            type = PyArray_DOUBLE;
+            break;
+        default:
+            PyErr_SetString(PyExc_ValueError, "invalid kind");
+            return NULL;
+    }
+    arr = PyArray_ContiguousFromAny(obj, PyArray_STRING, 1, 1);
+    if (arr == NULL) {
+        return NULL;
+    }
+    n = PyArray_DIM(arr, 0);
+    values = PyArray_New(&PyArray_Type, 1, &n, type, NULL, NULL, 0, 0, NULL);
+    ok = PyArray_New(&PyArray_Type, 1, &n, PyArray_BOOL, NULL, NULL, 0, 0,
+                     NULL);
+    if (values == NULL || ok == NULL) {
+        Py_DECREF(arr);
+        Py_XDECREF(values);
+        Py_XDECREF(ok);
+        return NULL;
+    }
+    Py_BEGIN_ALLOW_THREADS;
+    NpyText_ConvertStrings(PyArray_BYTES(arr), n, PyArray_ITEMSIZE(arr),
+                           kind, PyArray_BYTES(values),
+                           (npy_bool *)PyArray_BYTES(ok));
+    Py_END_ALLOW_THREADS;
+    Py_DECREF(arr);
+    return Py_BuildValue("NN", values, ok);
+}
+
 static struct PyMethodDef methods[] = {
     {"_insert", (PyCFunction)arr_insert,
         METH_VARARGS | METH_KEYWORDS, arr_insert__doc__},
@@ -911,6 +1427,20 @@ static struct PyMethodDef methods[] = {
         METH_VARARGS | METH_KEYWORDS, NULL},
     {"unpackbits", (PyCFunction)io_unpack,
         METH_VARARGS | METH_KEYWORDS, NULL},
+    {"_can_hash", (PyCFunction)arr_can_hash,
+        METH_VARARGS, NULL},
+    {"_hash_unique", (PyCFunction)arr_hash_unique,
+        METH_VARARGS | METH_KEYWORDS, NULL},
+    {"_hash_in1d", (PyCFunction)arr_hash_in1d,
+        METH_VARARGS, NULL},
+    {"_can_parse_text", (PyCFunction)arr_can_parse_text,
+        METH_VARARGS, NULL},
+    {"_parse_text", (PyCFunction)arr_parse_text,
+        METH_VARARGS, arr_parse_text__doc__},
+    {"_split_text", (PyCFunction)arr_split_text,
+        METH_VARARGS, arr_split_text__doc__},
+    {"_convert_strings", (PyCFunction)arr_convert_strings,
+        METH_VARARGS, arr_convert_strings__doc__},
     {NULL, NULL, 0, NULL}    /* sentinel */
 };
 
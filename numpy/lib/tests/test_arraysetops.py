@@ -40,6 +40,96 @@ class TestAso(TestCase):
 
         assert_array_equal([], unique([]))
 
+    def test_unique_counts( self ):
+        a = np.array( [3, 1, 3, 2, 1, 3] )
+        for method in ['sort', 'hash']:
+            vals, idx, inv, cnt = unique( a, return_index=True,
+                                          return_inverse=True,
+                                          return_counts=True, method=method )
+            assert_array_equal( vals, [1, 2, 3] )
+            assert_array_equal( idx, [1, 3, 0] )
+            assert_array_equal( inv, [2, 0, 2, 1, 0, 2] )
+            assert_array_equal( cnt, [2, 1, 3] )
+
+            vals, idx, inv, cnt = unique( a, return_index=True,
+                                          return_inverse=True,
+                                          return_counts=True, ordered=False,
+                                          method=method )
+            assert_array_equal( vals, [3, 1, 2] )
+            assert_array_equal( idx, [0, 1, 3] )
+            assert_array_equal( inv, [0, 1, 0, 2, 1, 0] )
+            assert_array_equal( cnt, [3, 2, 1] )
+
+        vals, cnt = unique( [], return_counts=True )
+        assert_array_equal( vals, [] )
+        assert_array_equal( cnt, [] )
+
+    def test_unique_methods( self ):
+        np.random.seed( 1 )
+        for dt in ['?', 'b', 'H', 'i', 'q', 'f', 'd', 'F', 'D', 'S3', 'U2',
+                   'M8[s]']:
+            a = np.random.randint( 0, 100, 3000 ).astype( dt )
+            r1 = unique( a, True, True, True, method='sort' )
+            r2 = unique( a, True, True, True, method='hash' )
+            for x, y in zip( r1, r2 ):
+                assert_array_equal( x, y )
+            assert_array_equal( a, r2[0][r2[2]] )
+            assert_array_equal( a[r2[1]], r2[0] )
+
+    def test_unique_byteorder( self ):
+        np.random.seed( 1 )
+        for dt in ['>f8', '<f8', '>c16', '<c8', '>i4', '>U2']:
+            a = np.random.randint( 0, 100, 3000 ).astype( dt )
+            b = np.arange( 50 ).astype( dt )
+            r1 = unique( a, True, True, True, method='sort' )
+            r2 = unique( a, True, True, True, method='hash' )
+            for x, y in zip( r1, r2 ):
+                assert_array_equal( x, y )
+            assert_equal( r2[0].dtype, a.dtype )
+            for fun in [intersect1d, setxor1d, in1d]:
+                assert_array_equal( fun( a, b, method='hash' ),
+                                    fun( a, b, method='sort' ) )
+
+    def test_unique_float( self ):
+        a = np.array( [np.nan, 0.0, -0.0, 1.0, np.nan, 1.0] )
+        olderr = np.seterr(invalid='ignore')
+        try:
+            for method in ['sort', 'hash']:
+                vals, cnt = unique( a, return_counts=True, method=method )
+                assert_array_equal( vals, [0.0, 1.0, np.nan, np.nan] )
+                assert_array_equal( cnt, [2, 2, 1, 1] )
+                assert_array_equal( in1d( a, [np.nan, 0.0], method=method ),
+                                    [False, True, True, False, False, False] )
+        finally:
+            np.seterr(**olderr)
+
+    def test_unique_method_errors( self ):
+        assert_raises( ValueError, unique, [1, 2], method='spam' )
+        assert_raises( ValueError, in1d, [1, 2], [1], method='spam' )
+        a = np.array( [1, 'a', None], dtype=object )
+        assert_raises( TypeError, unique, a, method='hash' )
+        assert_raises( TypeError, in1d, a, a, method='hash' )
+        assert_array_equal( unique( a[[0, 0]], method='auto' ), [1] )
+
+    def test_set_methods( self ):
+        np.random.seed( 2 )
+        a = np.random.randint( 0, 2000, 5000 )
+        b = np.random.randint( 1000, 3000, 4000 )
+        for fun in [intersect1d, setxor1d, union1d, setdiff1d]:
+            assert_array_equal( fun( a, b, method='hash' ),
+                                fun( a, b, method='sort' ) )
+        assert_array_equal( in1d( a, b, method='hash' ),
+                            in1d( a, b, method='sort' ) )
+        ua, ub = unique( a ), unique( b )
+        for fun in [intersect1d, setxor1d, setdiff1d, in1d]:
+            assert_array_equal( fun( ua, ub, True, method='hash' ),
+                                fun( ua, ub, True, method='sort' ) )
+        # Mixed types are compared in their common type.
+        assert_array_equal( in1d( [1, 2, 3], [2.0, 3.5], method='hash' ),
+                            [False, True, False] )
+        assert_array_equal( intersect1d( ['ab', 'c'], ['c', 'abc'],
+                                         method='hash' ), ['c'] )
+
     def test_intersect1d( self ):
         # unique inputs
         a = np.array( [5, 7, 1, 2] )
@@ -429,6 +429,17 @@ def test_roundtrip():
         arr2 = roundtrip(arr)
         yield assert_array_equal, arr, arr2
 
+def test_roundtrip_pieces():
+    # Arrays larger than the pieces written at a time
+    bufsize = format.WRITE_BUFSIZE
+    format.WRITE_BUFSIZE = 64
+    try:
+        for arr in basic_arrays + record_arrays:
+            arr2 = roundtrip(arr)
+            yield assert_array_equal, arr, arr2
+    finally:
+        format.WRITE_BUFSIZE = bufsize
+
 def test_memmap_roundtrip():
     # XXX: test crashes nose on windows. Fix this
     if not (sys.platform == 'win32' or sys.platform == 'cygwin'):
@@ -478,7 +489,6 @@ def test_write_version_1_0():
         (1, 1),
         (0, 0),
         (0, 1),
-        (2, 0),
         (2, 2),
         (255, 255),
     ]
@@ -490,6 +500,110 @@ def test_write_version_1_0():
         else:
             raise AssertionError("we should have raised a ValueError for the bad version %r" % (version,))
 
+def roundtrip_chunked(arr):
+    f = StringIO()
+    format.write_array(f, arr, version=(2, 0))
+    f2 = StringIO(f.getvalue())
+    arr2 = format.read_array(f2)
+    return arr2
+
+def test_roundtrip_chunked():
+    bufsize = format.WRITE_BUFSIZE
+    format.WRITE_BUFSIZE = 64
+    try:
+        for arr in basic_arrays + record_arrays:
+            if arr.dtype.hasobject or arr.ndim == 0:
+                continue
+            arr2 = roundtrip_chunked(arr)
+            yield assert_array_equal, arr, arr2
+    finally:
+        format.WRITE_BUFSIZE = bufsize
+
+def test_chunked_append():
+    fn = os.path.join(tempdir, 'chunked.npy')
+    for compression in format.COMPRESSIONS:
+        f = format.ChunkedArrayFile(fn, 'w+', dtype=np.int32, rowshape=(3,),
+                                    compression=compression)
+        f.append(np.arange(12).reshape(4, 3))
+        f.append([12, 13, 14])
+        f.close()
+        f = format.ChunkedArrayFile(fn, 'r+')
+        assert_equal(f.shape, (5, 3))
+        assert_equal(f.compression, compression)
+        f.append(np.arange(15, 30).reshape(5, 3))
+        f.close()
+
+        a = np.arange(30, dtype=np.int32).reshape(10, 3)
+        f = format.ChunkedArrayFile(fn)
+        assert_equal(len(f.chunks), 3)
+        assert_equal(f.dtype, a.dtype)
+        assert_array_equal(f[:], a)
+        assert_array_equal(f[3:7], a[3:7])
+        assert_array_equal(f[4:5], a[4:5])
+        assert_array_equal(f[8:], a[8:])
+        assert_array_equal(f[-2], a[-2])
+        assert_array_equal(f[2, 1], a[2, 1])
+        assert_array_equal(f[1:9:3, ::2], a[1:9:3, ::2])
+        assert_array_equal(f[::-2], a[::-2])
+        assert_array_equal(f[6:2], a[6:2])
+        assert_array_equal(f.read(2, 6), a[2:6])
+        assert_array_equal(np.asarray(f), a)
+        assert_raises(IndexError, f.__getitem__, 10)
+        assert_raises(ValueError, f.append, a)
+        f.close()
+
+        # np.load reads the whole array, or returns the file with mmap_mode
+        assert_array_equal(np.load(fn), a)
+        f = np.load(fn, mmap_mode='r')
+        assert_array_equal(f[2:5], a[2:5])
+        f.close()
+
+def test_chunked_empty_rows():
+    # Rows of no bytes, whose number cannot be told from the data
+    for arr in [np.zeros((3, 0)), np.zeros((4, 2, 0), dtype=np.int8)]:
+        yield assert_equal, roundtrip_chunked(arr).shape, arr.shape
+    fn = os.path.join(tempdir, 'empty_rows.npy')
+    for compression in format.COMPRESSIONS:
+        f = format.ChunkedArrayFile(fn, 'w+', dtype=float, rowshape=(0,),
+                                    compression=compression)
+        f.append(np.zeros((2, 0)))
+        f.append(np.zeros((3, 0)))
+        f.close()
+        f = format.ChunkedArrayFile(fn)
+        yield assert_equal, f.shape, (5, 0)
+        yield assert_equal, f[1:4].shape, (3, 0)
+        yield assert_equal, f[4].shape, (0,)
+        f.close()
+        yield assert_equal, np.load(fn).shape, (5, 0)
+
+def test_chunked_truncated():
+    fn = os.path.join(tempdir, 'truncated.npy')
+    f = format.open_memmap(fn, mode='w+', dtype=np.float64, shape=(0, 2),
+                           version=(2, 0))
+    f.append(np.ones((3, 2)))
+    f.append(np.zeros((3, 2)))
+    f.close()
+    # Cut the last chunk short, as if the writer had been interrupted
+    fp = open(fn, 'r+b')
+    fp.seek(-8, 2)
+    fp.truncate()
+    fp.close()
+    assert_array_equal(np.load(fn), np.ones((3, 2)))
+    f = format.open_memmap(fn)
+    assert_equal(f.shape, (3, 2))
+    f.append(2 * np.ones((1, 2)))
+    f.close()
+    assert_array_equal(np.load(fn), [[1, 1], [1, 1], [1, 1], [2, 2]])
+
+def test_chunked_bad_arrays():
+    f = StringIO()
+    assert_raises(ValueError, format.write_array, f,
+                  np.array([None, 1], dtype=object), version=(2, 0))
+    assert_raises(ValueError, format.write_array, f, np.array(1),
+                  version=(2, 0))
+    assert_raises(ValueError, format.write_array_header_2_0, f,
+                  np.dtype(float), (), compression='lzma')
+
 
 bad_version_magic = asbytes_nested([
     '\x93NUMPY\x01\x01',
@@ -1035,6 +1035,79 @@ def test_percentile_out():
     np.percentile(x, p, axis=1, out=y)
     assert_equal(y, np.percentile(x, p, axis=1))
 
+def test_percentile_overwrite():
+    a = np.array([[10, 7, 4, 3], [3, 2, 1, 8]])
+    for axis in [None, 0, 1]:
+        for q in [0, 25, 50, 73.1, 100, [10, 90]]:
+            desired = np.percentile(a, q, axis=axis)
+            b = a.copy()
+            assert_almost_equal(np.percentile(b, q, axis=axis,
+                                              overwrite_input=True), desired)
+    b = a.copy()
+    np.percentile(b, 30)
+    assert_equal(b, a)
+
+
+class TestMedian(TestCase):
+    def test_basic(self):
+        a = np.array([[10, 7, 4], [3, 2, 1]])
+        assert_equal(np.median(a), 3.5)
+        assert_equal(np.median(a, axis=0), [6.5, 4.5, 2.5])
+        assert_equal(np.median(a, axis=1), [7, 2])
+        assert_equal(np.median(a[0]), 7)
+        assert_equal(np.median([4, 1, 3, 2]), 2.5)
+
+    def test_random(self):
+        a = np.random.rand(11, 12, 13)
+        for axis in [None, 0, 1, 2]:
+            s = np.sort(a, axis=axis)
+            if axis is None:
+                n = a.size
+                desired = (s[(n-1)//2] + s[n//2])/2
+            else:
+                n = a.shape[axis]
+                s = np.rollaxis(s, axis)
+                desired = (s[(n-1)//2] + s[n//2])/2
+            assert_almost_equal(np.median(a, axis=axis), desired)
+
+    def test_overwrite_input(self):
+        a = np.random.rand(9, 10)
+        for axis in [None, 0, 1]:
+            desired = np.median(a, axis=axis)
+            b = a.copy()
+            assert_equal(np.median(b, axis=axis, overwrite_input=True),
+                         desired)
+            assert_equal(np.sort(b, axis=None), np.sort(a, axis=None))
+        b = a.copy()
+        np.median(b, axis=0)
+        assert_equal(b, a)
+
+
+class TestTopk(TestCase):
+    def test_basic(self):
+        a = np.array([3, 9, 1, 7, 5])
+        assert_equal(np.topk(a, 2), [9, 7])
+        assert_equal(np.topk(a, 3, largest=False), [1, 3, 5])
+        v, i = np.topk(a, 2, return_index=True)
+        assert_equal(i, [1, 3])
+        assert_equal(np.topk(a, 0), [])
+        assert_equal(np.topk(a, 5), np.sort(a)[::-1])
+        assert_raises(ValueError, np.topk, a, 6)
+        assert_raises(ValueError, np.topk, a, -1)
+
+    def test_axis(self):
+        a = np.random.rand(4, 5, 6)
+        for axis in [0, 1, 2]:
+            v, i = np.topk(a, 3, axis=axis, return_index=True)
+            s = np.sort(a, axis=axis)
+            assert_equal(np.rollaxis(v, axis), np.rollaxis(s, axis)[:-4:-1])
+            assert_equal(np.rollaxis(np.topk(a, 3, axis=axis, largest=False),
+                                     axis), np.rollaxis(s, axis)[:3])
+            index = list(np.indices(i.shape))
+            index[axis] = i
+            assert_equal(a[tuple(index)], v)
+        assert_equal(np.topk(a, 4, axis=None), np.sort(a.ravel())[:-5:-1])
+
 
 if __name__ == "__main__":
     run_module_suite()
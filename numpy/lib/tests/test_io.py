@@ -136,6 +136,34 @@ class TestSavezLoad(RoundtripTest, TestCase):
         assert_equal(a, l['file_a'])
         assert_equal(b, l['file_b'])
 
+    @np.testing.dec.knownfailureif(sys.platform == 'win32', "Fail on Win32")
+    def test_mmap_members(self):
+        f, name = mkstemp(suffix='.npz')
+        os.close(f)
+        try:
+            a = np.arange(12.).reshape(3, 4)
+            b = np.arange(6, dtype=np.int32).reshape(3, 2).T.copy().T
+            c = np.array([(1, 2.5)], dtype=[('x', 'i4'), ('y', 'f8')])
+            d = np.array([1, 'x'], dtype=object)
+            np.savez(name, a=a, b=b, c=c, d=d, e=np.zeros((0, 2)))
+            l = np.load(name, mmap_mode='r')
+            self.assertTrue(l._zip is None)
+            for (key, value) in [('a', a), ('b', b), ('c', c)]:
+                self.assertTrue(isinstance(l[key], np.memmap))
+                assert_equal(l[key], value)
+            self.assertTrue(l['b'].flags.f_contiguous)
+            assert_equal(l['d'], d)
+            assert_equal(l['e'].shape, (0, 2))
+            m = np.load(name, mmap_mode='c')['a']
+            m[0, 0] = 10
+            assert_equal(np.load(name)['a'], a)
+            l = np.load(name, mmap_mode='r+')
+            self.assertTrue(isinstance(l, np.lib.npyio.NpzFile))
+            self.assertFalse(isinstance(l['a'], np.memmap))
+            assert_equal(l['a'], a)
+        finally:
+            os.remove(name)
+
     def test_savez_filename_clashes(self):
         if hasattr(sys, 'gettotalrefcount'):
             # skip this test when Python was compiled using
@@ -168,6 +196,78 @@ class TestSavezLoad(RoundtripTest, TestCase):
         if errors:
             raise AssertionError(errors)
 
+class TestSavezCompressedLoad(RoundtripTest, TestCase):
+    def roundtrip(self, *args, **kwargs):
+        RoundtripTest.roundtrip(self, np.savez_compressed, *args, **kwargs)
+        for n, arr in enumerate(self.arr):
+            assert_equal(arr, self.arr_reloaded['arr_%d' % n])
+
+    def test_multiple_arrays(self):
+        a = np.array([[1, 2], [3, 4]], float)
+        b = np.array([[1 + 2j, 2 + 7j], [3 - 6j, 4 + 12j]], complex)
+        self.roundtrip(a, b)
+
+    def test_compressed(self):
+        c = StringIO()
+        np.savez_compressed(c, a=np.zeros(10000))
+        self.assertTrue(len(c.getvalue()) < 1000)
+
+class TestNpzWriter(TestCase):
+    def test_add(self):
+        import zipfile
+        a = np.arange(12.).reshape(3, 4)
+        b = np.array([1, 'x'], dtype=object)
+        for compress in (False, True):
+            c = StringIO()
+            w = np.lib.npyio.NpzWriter(c, compress=compress)
+            w.add(a, a.T, b, c=a[::2, ::3])
+            w['d'] = 1
+            assert_raises(ValueError, w.add, d=2)
+            w.close()
+            c.seek(0)
+            self.assertTrue(zipfile.ZipFile(c).testzip() is None)
+            c.seek(0)
+            l = np.load(c)
+            assert_equal(sorted(l.files),
+                         ['arr_0', 'arr_1', 'arr_2', 'c', 'd'])
+            assert_equal(l['arr_0'], a)
+            assert_equal(l['arr_1'], a.T)
+            assert_equal(l['arr_2'], b)
+            assert_equal(l['c'], a[::2, ::3])
+            assert_equal(l['d'], 1)
+
+    def test_no_temporary_file(self):
+        import tempfile
+        def fail(*args, **kwds):
+            raise AssertionError("a temporary file was made")
+        tempfile.mkstemp = fail
+        try:
+            for compress in (False, True):
+                c = StringIO()
+                w = np.lib.npyio.NpzWriter(c, compress=compress)
+                w.add(np.arange(3), x=np.ones(2))
+                w.close()
+                c.seek(0)
+                assert_equal(np.load(c)['x'], np.ones(2))
+        finally:
+            tempfile.mkstemp = mkstemp
+
+    def test_append(self):
+        f, name = mkstemp(suffix='.npz')
+        os.close(f)
+        try:
+            np.savez(name, np.arange(3), x=np.ones(2))
+            w = np.lib.npyio.NpzWriter(name, mode='a', compress=True)
+            w.add(np.arange(4), y=np.zeros(2))
+            w.close()
+            l = np.load(name)
+            assert_equal(sorted(l.files), ['arr_0', 'arr_1', 'x', 'y'])
+            assert_equal(l['arr_0'], np.arange(3))
+            assert_equal(l['arr_1'], np.arange(4))
+            assert_equal(l['y'], np.zeros(2))
+        finally:
+            os.remove(name)
+
 class TestSaveTxt(TestCase):
     def test_array(self):
         a = np.array([[1, 2], [3, 4]], float)
@@ -430,6 +530,185 @@ class TestLoadTxt(TestCase):
         finally:
             os.unlink(name)
 
+    def test_parsed_types(self):
+        c = StringIO()
+        c.write(asbytes('1 2.5e1 -3 # comment\n\n 4\t5 6.75 \r\n'))
+        for dt in [np.int8, np.int16, np.int32, np.int64,
+                   np.float32, np.float64]:
+            c.seek(0)
+            x = np.loadtxt(c, dtype=dt)
+            a = np.array([[1, 25, -3], [4, 5, 6.75]])
+            assert_equal(x.dtype, dt)
+            assert_array_equal(x, a.astype(dt))
+        c = StringIO(asbytes('1 0 -2\n'))
+        assert_array_equal(np.loadtxt(c, dtype=bool), [True, False, True])
+        c = StringIO(asbytes('-1 1e400\nnan inf\n'))
+        x = np.loadtxt(c)
+        assert_array_equal(x, [[-1, np.inf], [np.nan, np.inf]])
+        c = StringIO(asbytes('9007199254740993\n'))
+        assert_equal(np.loadtxt(c, dtype=np.int64), 9007199254740993)
+
+    def test_parse_errors(self):
+        c = StringIO(asbytes('1 2\n3 a\n'))
+        assert_raises(ValueError, np.loadtxt, c)
+        c = StringIO(asbytes('1 2\n3\n'))
+        assert_raises(ValueError, np.loadtxt, c)
+        c = StringIO(asbytes('1,,2\n'))
+        assert_raises(ValueError, np.loadtxt, c, delimiter=',')
+        c = StringIO(asbytes('1.5\n'))
+        assert_raises(ValueError, np.loadtxt, c, dtype=bool)
+        # strtod forms that float() refuses
+        for text in ('0x10', 'nan(123)', '1e', '.', '+'):
+            for dt in (float, np.float32, int):
+                c = StringIO(asbytes('1 %s\n' % text))
+                assert_raises(ValueError, np.loadtxt, c, dtype=dt)
+        # NUL bytes do not end a value or a line
+        for text in ('1\x002\n', '1 2\x00\n', '1\x00,2\n'):
+            for dt in (float, int, bool):
+                c = StringIO(asbytes(text))
+                assert_raises(ValueError, np.loadtxt, c, dtype=dt,
+                              delimiter=',' if ',' in text else None)
+        # Integers out of the range of their type
+        for (text, dt) in [('255', np.int8), ('-129', np.int8),
+                           ('-1', np.uint8), ('70000', np.uint16),
+                           ('300.5', np.int8), ('1e10', np.int32),
+                           ('9223372036854775808', np.int64),
+                           ('-1', np.uint64)]:
+            c = StringIO(asbytes('%s\n' % text))
+            assert_raises(ValueError, np.loadtxt, c, dtype=dt)
+        for (text, dt, value) in [('127', np.int8, 127),
+                                  ('-128.9', np.int8, -128),
+                                  ('18446744073709551615', np.uint64,
+                                   18446744073709551615L)]:
+            c = StringIO(asbytes('%s\n' % text))
+            assert_equal(np.loadtxt(c, dtype=dt), value)
+
+    def test_large_file(self):
+        # Longer than the blocks the file is read in
+        a = np.arange(300000.).reshape(-1, 3) / 7
+        c = StringIO()
+        np.savetxt(c, a, delimiter=',')
+        c.seek(0)
+        assert_array_equal(np.loadtxt(c, delimiter=','), a)
+        c.seek(0)
+        x = np.loadtxt(c, delimiter=',', usecols=(2, 0), dtype=np.float32)
+        assert_array_equal(x, a[:, [2, 0]].astype(np.float32))
+
+    def test_chunksize(self):
+        c = StringIO()
+        c.write(asbytes('\n'.join(['%d %d' % (i, -i) for i in range(10)])))
+        c.seek(0)
+        chunks = list(np.loadtxt(c, dtype=int, chunksize=4))
+        assert_equal([x.shape for x in chunks], [(4, 2), (4, 2), (2, 2)])
+        assert_array_equal(np.concatenate(chunks)[:, 1], -np.arange(10))
+
+        c.seek(0)
+        chunks = list(np.loadtxt(c, dtype=int, usecols=(1,), chunksize=5))
+        assert_equal([x.shape for x in chunks], [(5,), (5,)])
+
+        c.seek(0)
+        chunks = list(np.loadtxt(c, dtype=[('x', int), ('y', float)],
+                                 chunksize=3))
+        assert_equal(len(chunks), 4)
+        assert_array_equal(chunks[3]['y'], [-9])
+
+        c.seek(0)
+        chunks = list(np.loadtxt(c, converters={0: lambda s: 2*int(s)},
+                                 unpack=True, chunksize=10))
+        assert_equal(len(chunks), 1)
+        assert_array_equal(chunks[0][0], 2*np.arange(10))
+
+        assert_raises(ValueError, np.loadtxt, c, chunksize=0)
+
+    def test_ndmin(self):
+        c = StringIO(asbytes('1 2\n'))
+        assert_equal(np.loadtxt(c, ndmin=1).shape, (2,))
+        c.seek(0)
+        assert_equal(np.loadtxt(c, ndmin=2).shape, (1, 2))
+        c = StringIO(asbytes('1\n'))
+        assert_equal(np.loadtxt(c).shape, ())
+        c.seek(0)
+        assert_equal(np.loadtxt(c, ndmin=1).shape, (1,))
+        c.seek(0)
+        assert_equal(np.loadtxt(c, ndmin=2).shape, (1, 1))
+        c = StringIO(asbytes('1 2\n3 4\n'))
+        assert_equal(np.loadtxt(c, dtype='i4,i4', ndmin=2).shape, (2, 1))
+        assert_raises(ValueError, np.loadtxt, c, ndmin=3)
+
+
+class TestLoadMany(TestCase):
+    def setUp(self):
+        self.names = []
+
+    def tearDown(self):
+        for name in self.names:
+            os.unlink(name)
+
+    def write(self, text):
+        f, name = mkstemp()
+        os.write(f, asbytes(text))
+        os.close(f)
+        self.names.append(name)
+        return name
+
+    def test_files(self):
+        names = [self.write('%i %i\n' % (i, -i)) for i in range(3)]
+        x = np.load_many(names)
+        assert_array_equal(x, [[0, 0], [1, -1], [2, -2]])
+        x = np.load_many(names, nthreads=2, unpack=True, dtype=int)
+        assert_array_equal(x, [[0, 1, 2], [0, -1, -2]])
+        x = np.load_many(names[:1] + [StringIO('3 4\n5 6')], nthreads=2)
+        assert_array_equal(x, [[0, 0], [3, 4], [5, 6]])
+
+    def test_splits(self):
+        a = np.arange(3000).reshape(-1, 3) / 7.
+        name = self.write('')
+        np.savetxt(name, a, delimiter=',')
+        for splits in (1, 2, 7, 5000):
+            x = np.load_many(name, splits=splits, nthreads=3, delimiter=',')
+            assert_array_equal(x, a)
+
+    def test_genfromtxt(self):
+        name = self.write('a,b\n' +
+                          ''.join(['%i,%i\n' % (i, -i) for i in range(100)]) +
+                          '0.5,x\n')
+        x = np.load_many(name, loader=np.genfromtxt, splits=4, dtype=None,
+                         delimiter=',', names=True)
+        assert_equal(x.dtype.names, ('a', 'b'))
+        assert_equal(x['a'].dtype, np.float)
+        assert_equal(x['b'][-2:], ['-99', 'x'])
+        x = np.load_many(name, loader=np.genfromtxt, splits=4, delimiter=',',
+                         skip_header=1, skip_footer=1, usemask=True)
+        assert_array_equal(x[:, 0], np.arange(100))
+        self.assertTrue(isinstance(x, ma.MaskedArray))
+
+    def test_genfromtxt_single_rows(self):
+        names = [self.write('%i,%i\n' % (i, -i)) for i in range(3)]
+        x = np.load_many(names, loader=np.genfromtxt, delimiter=',')
+        assert_array_equal(x, [[0, 0], [1, -1], [2, -2]])
+        x = np.load_many(names[0], loader=np.genfromtxt, delimiter=',')
+        assert_array_equal(x, [0, 0])
+        names = [self.write('%i\n%i\n' % (i, -i)) for i in range(3)]
+        x = np.load_many(names, loader=np.genfromtxt)
+        assert_array_equal(x, [0, 0, 1, -1, 2, -2])
+
+    def test_empty_pieces(self):
+        name = self.write('1 2\n' + '# comment\n' * 50 + '\n' * 50 +
+                          '3 4\n')
+        for loader in (np.loadtxt, np.genfromtxt):
+            x = np.load_many(name, loader=loader, splits=10)
+            assert_array_equal(x, [[1, 2], [3, 4]])
+
+    def test_errors(self):
+        names = [self.write('1 2\n'), self.write('3 x\n'),
+                 self.write('5 6\n')]
+        assert_raises(ValueError, np.load_many, names)
+        ret = {}
+        def f(_ret={}):
+            _ret['x'] = np.load_many(names, errors='warn')
+        assert_warns(ConversionWarning, f, _ret=ret)
+        assert_array_equal(ret['x'], [[1, 2], [5, 6]])
+
 
 class Testfromregex(TestCase):
     def test_record(self):
@@ -546,6 +825,10 @@ class TestFromTxt(TestCase):
         ctrl = np.array([("%f" % i, "%f" % i, "%f" % i) for i in range(40)],
                         dtype=[(_, float) for _ in "ABC"])
         assert_equal(test, ctrl)
+        # The strings are not as long as those of the footer
+        data = StringIO("a,1\nb,2\nc,3\nlongfooter,4\n")
+        test = np.genfromtxt(data, delimiter=",", dtype=None, skip_footer=1)
+        assert_equal(test.dtype, np.dtype([('f0', '|S1'), ('f1', int)]))
 
     def test_header(self):
         "Test retrieving a header"
@@ -808,6 +1091,23 @@ M   33  21.99
         assert_equal(test['stid'], asbytes_nested(["JOE", "BOB"]))
         assert_equal(test['temp'], [25.3, 27.9])
 
+    def test_usecols_with_strings_and_booleans(self):
+        "Test usecols picking columns of strings and booleans"
+        data = "a,1,x,True\nb,2,y,False\n"
+        test = np.genfromtxt(StringIO(data), delimiter=',', dtype=None,
+                             usecols=(2,))
+        assert_equal(test, asbytes_nested(['x', 'y']))
+        test = np.genfromtxt(StringIO(data), delimiter=',', dtype=None,
+                             usecols=(0, 2))
+        assert_equal(test, asbytes_nested([['a', 'x'], ['b', 'y']]))
+        test = np.genfromtxt(StringIO(data), delimiter=',', dtype=None,
+                             usecols=(3, 2))
+        assert_equal(test['f0'], [True, False])
+        assert_equal(test['f1'], asbytes_nested(['x', 'y']))
+        test = np.genfromtxt(StringIO(data), delimiter=',',
+                             dtype=[('a', 'S1'), ('b', int)], usecols=(2, 1))
+        assert_equal(test, np.array([('x', 1), ('y', 2)], dtype=test.dtype))
+
     def test_usecols_with_integer(self):
         "Test usecols with an integer"
         test = np.genfromtxt(StringIO("1 2 3\n4 5 6"), usecols=0)
@@ -1137,6 +1437,34 @@ M   33  21.99
         test = np.ndfromtxt(StringIO(data), **kwargs)
         assert_equal(test, ctrl)
 
+    def test_large_file(self):
+        "Test the types guessed from a file read in several blocks"
+        data = StringIO()
+        data.write(asbytes('\n'.join(['%i,%i,True' % (i, -i)
+                                      for i in range(200000)])))
+        data.seek(0)
+        test = np.genfromtxt(data, delimiter=',', dtype=None)
+        control = [('f0', int), ('f1', int), ('f2', bool)]
+        assert_equal(test.dtype, np.dtype(control))
+        assert_equal(test['f1'], -np.arange(200000))
+        # Changes of type in the last lines
+        data.write(asbytes('\n0.5,,x'))
+        data.seek(0)
+        test = np.genfromtxt(data, delimiter=',', dtype=None, usemask=True)
+        control = [('f0', float), ('f1', int), ('f2', '|S4')]
+        assert_equal(test.dtype, np.dtype(control))
+        assert_equal(test['f0'][-2:], [199999, 0.5])
+        assert_equal(test['f2'][-2:], ['True', 'x'])
+        assert_equal(test.mask['f1'].nonzero()[0], [200000])
+        data.seek(0)
+        test = np.genfromtxt(data, delimiter=',', dtype=None, skip_footer=1)
+        control = [('f0', int), ('f1', int), ('f2', bool)]
+        assert_equal(test.dtype, np.dtype(control))
+        assert_equal(len(test), 200000)
+        data.seek(0)
+        test = np.genfromtxt(data, delimiter=',', usecols=(0,))
+        assert_equal(test[-1], 0.5)
+
 
     def test_recfromtxt(self):
         #
@@ -1184,6 +1512,22 @@ M   33  21.99
         self.assertTrue(isinstance(test, np.recarray))
         assert_equal(test, control)
 
+    def test_ndmin(self):
+        "Test the ndmin argument"
+        data = StringIO(asbytes('1 2\n'))
+        assert_equal(np.genfromtxt(data).shape, (2,))
+        data.seek(0)
+        assert_equal(np.genfromtxt(data, ndmin=2).shape, (1, 2))
+        data = StringIO(asbytes('1\n'))
+        assert_equal(np.genfromtxt(data, ndmin=1).shape, (1,))
+        data.seek(0)
+        assert_equal(np.genfromtxt(data, ndmin=2).shape, (1, 1))
+        data = StringIO(asbytes('1 2\n3 4\n'))
+        test = np.genfromtxt(data, dtype='i4,i4', ndmin=2, usemask=True)
+        assert_equal(test.shape, (2, 1))
+        self.assertTrue(isinstance(test, ma.MaskedArray))
+        assert_raises(ValueError, np.genfromtxt, data, ndmin=3)
+
 
 def test_gzip_load():
     if hasattr(sys, 'gettotalrefcount'):
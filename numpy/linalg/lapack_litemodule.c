@@ -4,6 +4,7 @@ More modifications by Jeff Whitaker
 */
 
 #include "Python.h"
+#include <float.h>
 #include "numpy/noprefix.h"
 #include "numpy/ndarraytypes.h"
 #include "npy_descriptor.h"
@@ -63,6 +64,13 @@ extern int FNAME(zgetrf)(int *m, int *n,
                           f2c_doublecomplex a[], int *lda, int ipiv[],
                           int *info);
 
+extern int FNAME(dgetrs)(char *trans, int *n, int *nrhs,
+                          double a[], int *lda, int ipiv[],
+                          double b[], int *ldb, int *info);
+extern int FNAME(zgetrs)(char *trans, int *n, int *nrhs,
+                          f2c_doublecomplex a[], int *lda, int ipiv[],
+                          f2c_doublecomplex b[], int *ldb, int *info);
+
 extern int FNAME(dpotrf)(char *uplo, int *n, double a[], int *lda, int *info);
 extern int FNAME(zpotrf)(char *uplo, int *n,
                           f2c_doublecomplex a[], int *lda, int *info);
@@ -411,6 +419,33 @@ lapack_lite_dgesv(PyObject *NPY_UNUSED(self), PyObject *args)
                          "ldb",ldb,"info",info);
 }
 
+/*
+ * The smallest workspace dgesdd can get by with; its own query sometimes
+ * asks for less.
+ */
+static long
+dgesdd_lwork(char jobz, int m, int n, long work0)
+{
+    int mn = MIN(m,n);
+    int mx = MAX(m,n);
+
+    switch(jobz){
+    case 'N':
+            work0 = MAX(work0,3*mn + MAX(mx,6*mn)+500);
+            break;
+    case 'O':
+            work0 = MAX(work0,3*mn*mn +                 \
+                        MAX(mx,5*mn*mn+4*mn+500));
+            break;
+    case 'S':
+    case 'A':
+            work0 = MAX(work0,3*mn*mn +                 \
+                        MAX(mx,4*mn*(mn+1))+500);
+            break;
+    }
+    return work0;
+}
+
 static PyObject *
 lapack_lite_dgesdd(PyObject *NPY_UNUSED(self), PyObject *args)
 {
@@ -451,25 +486,8 @@ lapack_lite_dgesdd(PyObject *NPY_UNUSED(self), PyObject *args)
                too small.
                Change it to the maximum of the minimum and the optimal.
             */
-            long work0 = (long) *DDATA(work);
-            int mn = MIN(m,n);
-            int mx = MAX(m,n);
-
-            switch(jobz){
-            case 'N':
-                    work0 = MAX(work0,3*mn + MAX(mx,6*mn)+500);
-                    break;
-            case 'O':
-                    work0 = MAX(work0,3*mn*mn +                 \
-                                MAX(mx,5*mn*mn+4*mn+500));
-                    break;
-            case 'S':
-            case 'A':
-                    work0 = MAX(work0,3*mn*mn +                 \
-                                MAX(mx,4*mn*(mn+1))+500);
-                    break;
-            }
-            *DDATA(work) = (double) work0;
+            *DDATA(work) = (double) dgesdd_lwork(jobz, m, n,
+                                                 (long) *DDATA(work));
     }
     return Py_BuildValue("{s:i,s:c,s:i,s:i,s:i,s:i,s:i,s:i,s:i}","dgesdd_",
                          lapack_lite_status__,"jobz",jobz,"m",m,"n",n,
@@ -800,6 +818,722 @@ lapack_lite_zungqr(PyObject *NPY_UNUSED(self), PyObject *args)
                              "info",info);
 }
 
+/*
+ * Batched routines.
+ *
+ * These take C contiguous stacks of matrices, arrays of shape (..., M, N)
+ * and type double or cdouble, and run a LAPACK routine on each matrix in
+ * turn so that the loop over the stack stays in C.  A matrix stored in C
+ * order is its transpose in Fortran order, so the matrices are handed to
+ * LAPACK where they are and the transpose is accounted for in how the
+ * routine is called.  The arrays are overwritten with the results, and
+ * the return value is 0 or the info of the first matrix that failed.
+ *
+ * Real matrices of order SMALL_ORDER or less are inverted and solved with
+ * an inline LU factorization with partial pivoting, which skips the LAPACK
+ * call overhead.  Matrices that are not finite or that have a zero or
+ * subnormal pivot still go to LAPACK, which decides singularity.
+ */
+
+#define SMALL_ORDER 3
+
+/*
+ * The last workspace query of a batched routine, for real and complex
+ * matrices, so that repeated calls with the same shape skip it.  The GIL
+ * is held throughout, which keeps them consistent.
+ */
+typedef struct {
+    int valid;
+    char jobz, uplo;
+    int m, n;
+    int lwork, lrwork, liwork;
+} workspace_query;
+
+static workspace_query heevd_query[2], gesdd_query[2];
+
+static int
+check_stack(PyObject *ob, char *funname, npy_intp *count, int *m, int *n)
+{
+    int i, nd;
+
+    if (!PyArray_Check(ob) || (PyArray_TYPE(ob) != PyArray_DOUBLE &&
+                               PyArray_TYPE(ob) != PyArray_CDOUBLE)) {
+        PyErr_Format(LapackError,
+                     "Parameter a is not of type PyArray_DOUBLE or "
+                     "PyArray_CDOUBLE in lapack_lite.%s", funname);
+        return 0;
+    }
+    if (!check_object(ob, PyArray_TYPE(ob), "a", "", funname)) {
+        return 0;
+    }
+    nd = PyArray_NDIM(ob);
+    if (nd < 2) {
+        PyErr_Format(LapackError,
+                     "Parameter a is not a stack of matrices in lapack_lite.%s",
+                     funname);
+        return 0;
+    }
+    *count = 1;
+    for (i = 0; i < nd - 2; i++) {
+        *count *= PyArray_DIM(ob, i);
+    }
+    *m = (int) PyArray_DIM(ob, nd - 2);
+    *n = (int) PyArray_DIM(ob, nd - 1);
+    return 1;
+}
+
+static int
+check_result(PyObject *ob, int t, char *obname, char *funname,
+             npy_intp size)
+{
+    npy_intp n = 1;
+    int i;
+
+    if (!check_object(ob, t, obname,
+                      t == PyArray_DOUBLE ? "PyArray_DOUBLE" : "PyArray_CDOUBLE",
+                      funname)) {
+        return 0;
+    }
+    for (i = 0; i < PyArray_NDIM(ob); i++) {
+        n *= PyArray_DIM(ob, i);
+    }
+    if (n != size) {
+        PyErr_Format(LapackError,
+                     "Parameter %s has the wrong size in lapack_lite.%s",
+                     obname, funname);
+        return 0;
+    }
+    return 1;
+}
+
+/*
+ * LU factorization with partial pivoting of a real matrix of order
+ * n <= SMALL_ORDER, as dgetf2 does it for the transpose of a, which is
+ * what LAPACK sees of a C-order matrix.  lu receives the factors in C
+ * order of that transpose and ipiv the row interchanges.  Returns 0,
+ * leaving the matrix to LAPACK, if a is not finite or a pivot is zero or
+ * subnormal.
+ */
+static int
+small_lu(const double *a, double *lu, int *ipiv, int n)
+{
+    int i, j, k, p;
+    double t;
+
+    for (i = 0; i < n; i++) {
+        for (j = 0; j < n; j++) {
+            if (!Py_IS_FINITE(a[j*n + i])) {
+                return 0;
+            }
+            lu[i*n + j] = a[j*n + i];
+        }
+    }
+    for (k = 0; k < n; k++) {
+        p = k;
+        for (i = k + 1; i < n; i++) {
+            if (fabs(lu[i*n + k]) > fabs(lu[p*n + k])) {
+                p = i;
+            }
+        }
+        if (fabs(lu[p*n + k]) < DBL_MIN) {
+            return 0;
+        }
+        ipiv[k] = p;
+        if (p != k) {
+            for (j = 0; j < n; j++) {
+                t = lu[k*n + j];
+                lu[k*n + j] = lu[p*n + j];
+                lu[p*n + j] = t;
+            }
+        }
+        t = 1.0/lu[k*n + k];
+        for (i = k + 1; i < n; i++) {
+            lu[i*n + k] *= t;
+            for (j = k + 1; j < n; j++) {
+                lu[i*n + j] -= lu[i*n + k]*lu[k*n + j];
+            }
+        }
+    }
+    return 1;
+}
+
+/*
+ * Solve a x = b, or its transpose, for the nrhs rows of b, as
+ * gesv_batch does with LAPACK.  Returns 0 without touching b if small_lu
+ * leaves the matrix to LAPACK.
+ */
+static int
+small_solve(const double *a, double *b, int n, int nrhs, int trans)
+{
+    double lu[SMALL_ORDER*SMALL_ORDER], t;
+    int ipiv[SMALL_ORDER];
+    int r, i, j;
+
+    if (!small_lu(a, lu, ipiv, n)) {
+        return 0;
+    }
+    for (r = 0; r < nrhs; r++, b += n) {
+        if (trans) {
+            /* The factored transpose of a: P L U x = b */
+            for (i = 0; i < n; i++) {
+                t = b[i];
+                b[i] = b[ipiv[i]];
+                b[ipiv[i]] = t;
+            }
+            for (i = 1; i < n; i++) {
+                for (j = 0; j < i; j++) {
+                    b[i] -= lu[i*n + j]*b[j];
+                }
+            }
+            for (i = n - 1; i >= 0; i--) {
+                for (j = i + 1; j < n; j++) {
+                    b[i] -= lu[i*n + j]*b[j];
+                }
+                b[i] /= lu[i*n + i];
+            }
+        }
+        else {
+            /* Its transpose: U' L' P' x = b */
+            for (i = 0; i < n; i++) {
+                for (j = 0; j < i; j++) {
+                    b[i] -= lu[j*n + i]*b[j];
+                }
+                b[i] /= lu[i*n + i];
+            }
+            for (i = n - 2; i >= 0; i--) {
+                for (j = i + 1; j < n; j++) {
+                    b[i] -= lu[j*n + i]*b[j];
+                }
+            }
+            for (i = n - 1; i >= 0; i--) {
+                t = b[i];
+                b[i] = b[ipiv[i]];
+                b[ipiv[i]] = t;
+            }
+        }
+    }
+    return 1;
+}
+
+/*
+ * Inverse of a real matrix of order n <= SMALL_ORDER.  The rows of the
+ * inverse are the solutions of the transposed systems against the rows
+ * of the identity.
+ */
+static int
+small_inv(const double *a, double *out, int n)
+{
+    int i;
+
+    memset(out, 0, n*n*sizeof(double));
+    for (i = 0; i < n; i++) {
+        out[i*(n + 1)] = 1.0;
+    }
+    return small_solve(a, out, n, n, 1);
+}
+
+static int *
+alloc_ipiv(int n)
+{
+    int *ipiv = PyMem_Malloc(MAX(n, 1)*sizeof(int));
+
+    if (ipiv == NULL) {
+        PyErr_NoMemory();
+    }
+    return ipiv;
+}
+
+/*
+ * a has shape (..., n, n) and b has shape (..., nrhs, n); each row of b is
+ * a right hand side, overwritten with the solution.  The LU factorization
+ * is of the transpose of a, so the solve uses its transpose again, unless
+ * trans is given to solve with the transposes of the matrices in a.
+ */
+static PyObject *
+lapack_lite_gesv_batch(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyObject *a, *b;
+    npy_intp count, i, elsize;
+    int m, n, nrhs, lda, info = 0, cplx, transposed = 0;
+    int *ipiv;
+    char trans;
+    char *ap, *bp;
+
+    TRY(PyArg_ParseTuple(args, "OO|i", &a, &b, &transposed));
+    TRY(check_stack(a, "gesv_batch", &count, &m, &n));
+    cplx = (PyArray_TYPE(a) == PyArray_CDOUBLE);
+    if (m != n || !PyArray_Check(b) || PyArray_NDIM(b) != PyArray_NDIM(a) ||
+            PyArray_DIM(b, PyArray_NDIM(b) - 1) != n) {
+        PyErr_SetString(LapackError,
+                        "Parameters a and b do not match in "
+                        "lapack_lite.gesv_batch");
+        return NULL;
+    }
+    nrhs = (int) PyArray_DIM(b, PyArray_NDIM(b) - 2);
+    TRY(check_result(b, PyArray_TYPE(a), "b", "gesv_batch",
+                     count*nrhs*n));
+    TRY(ipiv = alloc_ipiv(n));
+
+    elsize = PyArray_ITEMSIZE(a);
+    lda = MAX(n, 1);
+    trans = transposed ? 'N' : 'T';
+    for (i = 0; i < count && info == 0; i++) {
+        ap = PyArray_BYTES(a) + i*n*n*elsize;
+        bp = PyArray_BYTES(b) + i*nrhs*n*elsize;
+        if (cplx) {
+            FNAME(zgetrf)(&n, &n, (f2c_doublecomplex *)ap, &lda, ipiv, &info);
+            if (info == 0) {
+                FNAME(zgetrs)(&trans, &n, &nrhs, (f2c_doublecomplex *)ap,
+                              &lda, ipiv, (f2c_doublecomplex *)bp, &lda,
+                              &info);
+            }
+        }
+        else if (n > SMALL_ORDER ||
+                 !small_solve((double *)ap, (double *)bp, n, nrhs,
+                              transposed)) {
+            FNAME(dgetrf)(&n, &n, (double *)ap, &lda, ipiv, &info);
+            if (info == 0) {
+                FNAME(dgetrs)(&trans, &n, &nrhs, (double *)ap, &lda, ipiv,
+                              (double *)bp, &lda, &info);
+            }
+        }
+    }
+    PyMem_Free(ipiv);
+    return Py_BuildValue("i", info);
+}
+
+/*
+ * b, of the same shape as a, is set to the inverses.  Solving the
+ * transposed systems against the identity leaves the transpose of the
+ * inverse of the transpose in Fortran order, which is the inverse in C
+ * order.
+ */
+static PyObject *
+lapack_lite_inv_batch(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyObject *a, *b;
+    npy_intp count, i, j, elsize;
+    int m, n, lda, info = 0, cplx;
+    int *ipiv;
+    char *ap, *bp;
+
+    TRY(PyArg_ParseTuple(args, "OO", &a, &b));
+    TRY(check_stack(a, "inv_batch", &count, &m, &n));
+    if (m != n) {
+        PyErr_SetString(LapackError,
+                        "Parameter a is not square in lapack_lite.inv_batch");
+        return NULL;
+    }
+    cplx = (PyArray_TYPE(a) == PyArray_CDOUBLE);
+    TRY(check_result(b, PyArray_TYPE(a), "b", "inv_batch", count*n*n));
+    TRY(ipiv = alloc_ipiv(n));
+
+    elsize = PyArray_ITEMSIZE(a);
+    lda = MAX(n, 1);
+    for (i = 0; i < count && info == 0; i++) {
+        ap = PyArray_BYTES(a) + i*n*n*elsize;
+        bp = PyArray_BYTES(b) + i*n*n*elsize;
+        if (!cplx && n <= SMALL_ORDER &&
+                small_inv((double *)ap, (double *)bp, n)) {
+            continue;
+        }
+        memset(bp, 0, n*n*elsize);
+        for (j = 0; j < n; j++) {
+            *(double *)(bp + j*(n + 1)*elsize) = 1.0;
+        }
+        if (cplx) {
+            FNAME(zgesv)(&n, &n, (f2c_doublecomplex *)ap, &lda, ipiv,
+                         (f2c_doublecomplex *)bp, &lda, &info);
+        }
+        else {
+            FNAME(dgesv)(&n, &n, (double *)ap, &lda, ipiv, (double *)bp,
+                         &lda, &info);
+        }
+    }
+    PyMem_Free(ipiv);
+    return Py_BuildValue("i", info);
+}
+
+/*
+ * sign, of the type of a, and logdet, of type double, have shape (...).
+ * Singular matrices get a sign of 0 and a logdet of -inf.
+ */
+static PyObject *
+lapack_lite_slogdet_batch(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyObject *a, *sign, *logdet;
+    npy_intp count, i, elsize;
+    int m, n, j, lda, info, cplx;
+    int *ipiv;
+    char *ap;
+    double *lp;
+
+    TRY(PyArg_ParseTuple(args, "OOO", &a, &sign, &logdet));
+    TRY(check_stack(a, "slogdet_batch", &count, &m, &n));
+    if (m != n) {
+        PyErr_SetString(LapackError,
+                        "Parameter a is not square in "
+                        "lapack_lite.slogdet_batch");
+        return NULL;
+    }
+    cplx = (PyArray_TYPE(a) == PyArray_CDOUBLE);
+    TRY(check_result(sign, PyArray_TYPE(a), "sign", "slogdet_batch", count));
+    TRY(check_result(logdet, PyArray_DOUBLE, "logdet", "slogdet_batch",
+                     count));
+    TRY(ipiv = alloc_ipiv(n));
+
+    elsize = PyArray_ITEMSIZE(a);
+    lda = MAX(n, 1);
+    for (i = 0; i < count; i++) {
+        ap = PyArray_BYTES(a) + i*n*n*elsize;
+        lp = DDATA(logdet) + i;
+        if (cplx) {
+            f2c_doublecomplex *z = (f2c_doublecomplex *)ap;
+            f2c_doublecomplex *s = ZDATA(sign) + i;
+            double re, absd;
+
+            FNAME(zgetrf)(&n, &n, z, &lda, ipiv, &info);
+            s->r = 1.0;
+            s->i = 0.0;
+            *lp = 0.0;
+            for (j = 0; j < n && info == 0; j++) {
+                absd = hypot(z[j*(n + 1)].r, z[j*(n + 1)].i);
+                re = s->r;
+                s->r = (re*z[j*(n + 1)].r - s->i*z[j*(n + 1)].i)/absd;
+                s->i = (re*z[j*(n + 1)].i + s->i*z[j*(n + 1)].r)/absd;
+                if (ipiv[j] != j + 1) {
+                    s->r = -s->r;
+                    s->i = -s->i;
+                }
+                *lp += log(absd);
+            }
+            if (info > 0) {
+                s->r = 0.0;
+                s->i = 0.0;
+            }
+        }
+        else {
+            double *x = (double *)ap;
+            double *s = DDATA(sign) + i;
+
+            FNAME(dgetrf)(&n, &n, x, &lda, ipiv, &info);
+            *s = 1.0;
+            *lp = 0.0;
+            for (j = 0; j < n && info == 0; j++) {
+                /* Divided rather than compared, so that NaN propagates */
+                *s *= x[j*(n + 1)]/fabs(x[j*(n + 1)]);
+                if (ipiv[j] != j + 1) {
+                    *s = -*s;
+                }
+                *lp += log(fabs(x[j*(n + 1)]));
+            }
+            if (info > 0) {
+                *s = 0.0;
+            }
+        }
+        if (info > 0) {
+            *lp = -Py_HUGE_VAL;
+        }
+        else if (info < 0) {
+            break;
+        }
+    }
+    PyMem_Free(ipiv);
+    return Py_BuildValue("i", info < 0 ? info : 0);
+}
+
+/*
+ * Overwrites a with the lower triangular Cholesky factors: the upper
+ * factor of the transpose, zeroed above the diagonal in C order.
+ */
+static PyObject *
+lapack_lite_potrf_batch(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyObject *a;
+    npy_intp count, i, elsize;
+    int m, n, j, lda, info = 0;
+    char uplo = 'U';
+    char *ap;
+
+    TRY(PyArg_ParseTuple(args, "O", &a));
+    TRY(check_stack(a, "potrf_batch", &count, &m, &n));
+    if (m != n) {
+        PyErr_SetString(LapackError,
+                        "Parameter a is not square in "
+                        "lapack_lite.potrf_batch");
+        return NULL;
+    }
+
+    elsize = PyArray_ITEMSIZE(a);
+    lda = MAX(n, 1);
+    for (i = 0; i < count && info == 0; i++) {
+        ap = PyArray_BYTES(a) + i*n*n*elsize;
+        if (PyArray_TYPE(a) == PyArray_CDOUBLE) {
+            FNAME(zpotrf)(&uplo, &n, (f2c_doublecomplex *)ap, &lda, &info);
+        }
+        else {
+            FNAME(dpotrf)(&uplo, &n, (double *)ap, &lda, &info);
+        }
+        for (j = 0; j < n - 1; j++) {
+            memset(ap + (j*n + j + 1)*elsize, 0, (n - j - 1)*elsize);
+        }
+    }
+    return Py_BuildValue("i", info);
+}
+
+/*
+ * w, of type double, has shape (..., n) and gets the eigenvalues.  The
+ * transpose of a Hermitian matrix is its conjugate, so uplo is switched
+ * and, for jobz 'V', the eigenvectors come out conjugated in the rows;
+ * they are conjugate transposed in place to leave them in the columns.
+ */
+static PyObject *
+lapack_lite_heevd_batch(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyObject *a, *w;
+    npy_intp count, i, elsize;
+    int m, n, j, k, lda, info = 0, cplx;
+    int lwork = -1, lrwork = -1, liwork = -1, iwork0;
+    workspace_query *q;
+    char jobz, uplo;
+    char *ap, *work = NULL;
+    double work0[2], rwork0, *rwork = NULL;
+    int *iwork = NULL;
+
+    TRY(PyArg_ParseTuple(args, "OOcc", &a, &w, &jobz, &uplo));
+    TRY(check_stack(a, "heevd_batch", &count, &m, &n));
+    if (m != n) {
+        PyErr_SetString(LapackError,
+                        "Parameter a is not square in "
+                        "lapack_lite.heevd_batch");
+        return NULL;
+    }
+    cplx = (PyArray_TYPE(a) == PyArray_CDOUBLE);
+    TRY(check_result(w, PyArray_DOUBLE, "w", "heevd_batch", count*n));
+    if (count == 0 || n == 0) {
+        return Py_BuildValue("i", 0);
+    }
+    if (uplo == 'L' || uplo == 'l') {
+        uplo = 'U';
+    }
+    else if (uplo == 'U' || uplo == 'u') {
+        uplo = 'L';
+    }
+
+    /* One workspace query serves the whole stack. */
+    elsize = PyArray_ITEMSIZE(a);
+    lda = n;
+    q = &heevd_query[cplx];
+    if (!q->valid || q->jobz != jobz || q->uplo != uplo || q->n != n) {
+        if (cplx) {
+            FNAME(zheevd)(&jobz, &uplo, &n,
+                          (f2c_doublecomplex *)PyArray_BYTES(a), &lda,
+                          DDATA(w), (f2c_doublecomplex *)work0, &lwork,
+                          &rwork0, &lrwork, &iwork0, &liwork, &info);
+            lrwork = MAX((int) rwork0, 1);
+        }
+        else {
+            FNAME(dsyevd)(&jobz, &uplo, &n, DDATA(a), &lda, DDATA(w), work0,
+                          &lwork, &iwork0, &liwork, &info);
+        }
+        if (info != 0) {
+            return Py_BuildValue("i", info);
+        }
+        q->jobz = jobz;
+        q->uplo = uplo;
+        q->n = n;
+        q->lwork = MAX((int) work0[0], 1);
+        q->lrwork = lrwork;
+        q->liwork = MAX(iwork0, 5*n + 3);
+        q->valid = 1;
+    }
+    lwork = q->lwork;
+    lrwork = q->lrwork;
+    liwork = q->liwork;
+    work = PyMem_Malloc(lwork*elsize);
+    rwork = cplx ? PyMem_Malloc(lrwork*sizeof(double)) : NULL;
+    iwork = PyMem_Malloc(liwork*sizeof(int));
+    if (work == NULL || (cplx && rwork == NULL) || iwork == NULL) {
+        PyErr_NoMemory();
+        goto fail;
+    }
+
+    for (i = 0; i < count && info == 0; i++) {
+        ap = PyArray_BYTES(a) + i*n*n*elsize;
+        if (cplx) {
+            f2c_doublecomplex *z = (f2c_doublecomplex *)ap, t;
+
+            FNAME(zheevd)(&jobz, &uplo, &n, z, &lda, DDATA(w) + i*n,
+                          (f2c_doublecomplex *)work, &lwork, rwork, &lrwork,
+                          iwork, &liwork, &info);
+            if (jobz != 'V') {
+                continue;
+            }
+            for (j = 0; j < n; j++) {
+                z[j*(n + 1)].i = -z[j*(n + 1)].i;
+                for (k = j + 1; k < n; k++) {
+                    t = z[j*n + k];
+                    z[j*n + k].r = z[k*n + j].r;
+                    z[j*n + k].i = -z[k*n + j].i;
+                    z[k*n + j].r = t.r;
+                    z[k*n + j].i = -t.i;
+                }
+            }
+        }
+        else {
+            double *x = (double *)ap, t;
+
+            FNAME(dsyevd)(&jobz, &uplo, &n, x, &lda, DDATA(w) + i*n,
+                          (double *)work, &lwork, iwork, &liwork, &info);
+            if (jobz != 'V') {
+                continue;
+            }
+            for (j = 0; j < n; j++) {
+                for (k = j + 1; k < n; k++) {
+                    t = x[j*n + k];
+                    x[j*n + k] = x[k*n + j];
+                    x[k*n + j] = t;
+                }
+            }
+        }
+    }
+    PyMem_Free(work);
+    PyMem_Free(rwork);
+    PyMem_Free(iwork);
+    return Py_BuildValue("i", info);
+
+ fail:
+    PyMem_Free(work);
+    PyMem_Free(rwork);
+    PyMem_Free(iwork);
+    return NULL;
+}
+
+/*
+ * a has shape (..., m, n) and s, of type double, has shape (..., k) with
+ * k = min(m, n).  For jobz 'A' u has shape (..., m, m) and vt has shape
+ * (..., n, n); for jobz 'S' they have shapes (..., m, k) and (..., k, n);
+ * for jobz 'N' they are not used.  Decomposing the transpose of a as
+ * U' S V'^H in Fortran order leaves V'^H in C order as u and U' in C
+ * order as vt, so vt is passed as LAPACK's u and u as its vt.
+ */
+static PyObject *
+lapack_lite_gesdd_batch(PyObject *NPY_UNUSED(self), PyObject *args)
+{
+    PyObject *a, *s, *u, *vt;
+    npy_intp count, i, elsize, usize = 0, vtsize = 0;
+    int m, n, k, lda, ldu, ldvt, info = 0, cplx;
+    int lwork = -1;
+    workspace_query *q;
+    char jobz;
+    char *ap, *up, *vtp, *work = NULL;
+    double work0[2], dummy[2], *rwork = NULL;
+    int *iwork = NULL;
+
+    TRY(PyArg_ParseTuple(args, "OOOOc", &a, &s, &u, &vt, &jobz));
+    TRY(check_stack(a, "gesdd_batch", &count, &m, &n));
+    cplx = (PyArray_TYPE(a) == PyArray_CDOUBLE);
+    k = MIN(m, n);
+    TRY(check_result(s, PyArray_DOUBLE, "s", "gesdd_batch", count*k));
+    if (jobz == 'A') {
+        usize = (npy_intp)m*m;
+        vtsize = (npy_intp)n*n;
+    }
+    else if (jobz == 'S') {
+        usize = (npy_intp)m*k;
+        vtsize = (npy_intp)k*n;
+    }
+    if (usize > 0) {
+        TRY(check_result(u, PyArray_TYPE(a), "u", "gesdd_batch",
+                         count*usize));
+        TRY(check_result(vt, PyArray_TYPE(a), "vt", "gesdd_batch",
+                         count*vtsize));
+    }
+    if (count == 0 || k == 0) {
+        return Py_BuildValue("i", 0);
+    }
+
+    elsize = PyArray_ITEMSIZE(a);
+    lda = n;
+    ldu = usize > 0 ? n : 1;
+    ldvt = jobz == 'A' ? m : (usize > 0 ? k : 1);
+    up = usize > 0 ? PyArray_BYTES(vt) : (char *)dummy;
+    vtp = usize > 0 ? PyArray_BYTES(u) : (char *)dummy;
+
+    /* One workspace query serves the whole stack. */
+    iwork = PyMem_Malloc(8*k*sizeof(int));
+    if (iwork == NULL) {
+        PyErr_NoMemory();
+        goto fail;
+    }
+    q = &gesdd_query[cplx];
+    if (!q->valid || q->jobz != jobz || q->m != m || q->n != n) {
+        if (cplx) {
+            FNAME(zgesdd)(&jobz, &n, &m,
+                          (f2c_doublecomplex *)PyArray_BYTES(a), &lda,
+                          DDATA(s), (f2c_doublecomplex *)up, &ldu,
+                          (f2c_doublecomplex *)vtp, &ldvt,
+                          (f2c_doublecomplex *)work0, &lwork, NULL, iwork,
+                          &info);
+            lwork = MAX((int) work0[0], 1);
+        }
+        else {
+            FNAME(dgesdd)(&jobz, &n, &m, DDATA(a), &lda, DDATA(s),
+                          (double *)up, &ldu, (double *)vtp, &ldvt, work0,
+                          &lwork, iwork, &info);
+            lwork = (int) dgesdd_lwork(jobz, n, m, (long) work0[0]);
+        }
+        if (info != 0) {
+            goto done;
+        }
+        q->jobz = jobz;
+        q->m = m;
+        q->n = n;
+        q->lwork = lwork;
+        q->valid = 1;
+    }
+    lwork = q->lwork;
+    if (cplx) {
+        rwork = PyMem_Malloc(MAX(7*k, 5*k*k + 5*k)*sizeof(double));
+    }
+    work = PyMem_Malloc(lwork*elsize);
+    if (work == NULL || (cplx && rwork == NULL)) {
+        PyErr_NoMemory();
+        goto fail;
+    }
+
+    for (i = 0; i < count && info == 0; i++) {
+        ap = PyArray_BYTES(a) + i*m*n*elsize;
+        if (usize > 0) {
+            up = PyArray_BYTES(vt) + i*vtsize*elsize;
+            vtp = PyArray_BYTES(u) + i*usize*elsize;
+        }
+        if (cplx) {
+            FNAME(zgesdd)(&jobz, &n, &m, (f2c_doublecomplex *)ap, &lda,
+                          DDATA(s) + i*k, (f2c_doublecomplex *)up, &ldu,
+                          (f2c_doublecomplex *)vtp, &ldvt,
+                          (f2c_doublecomplex *)work, &lwork, rwork, iwork,
+                          &info);
+        }
+        else {
+            FNAME(dgesdd)(&jobz, &n, &m, (double *)ap, &lda, DDATA(s) + i*k,
+                          (double *)up, &ldu, (double *)vtp, &ldvt,
+                          (double *)work, &lwork, iwork, &info);
+        }
+    }
+
+ done:
+    PyMem_Free(work);
+    PyMem_Free(rwork);
+    PyMem_Free(iwork);
+    return Py_BuildValue("i", info);
+
+ fail:
+    PyMem_Free(work);
+    PyMem_Free(rwork);
+    PyMem_Free(iwork);
+    return NULL;
+}
 
 
 #define STR(x) #x
@@ -823,6 +1557,12 @@ static struct PyMethodDef lapack_lite_module_methods[] = {
     lameth(zpotrf),
     lameth(zgeqrf),
     lameth(zungqr),
+    lameth(gesv_batch),
+    lameth(inv_batch),
+    lameth(slogdet_batch),
+    lameth(potrf_batch),
+    lameth(heevd_batch),
+    lameth(gesdd_batch),
     { NULL,NULL,0, NULL}
 };
 
@@ -18,8 +18,8 @@ import sys
 from numpy.core import array, asarray, zeros, empty, transpose, \
         intc, single, double, csingle, cdouble, inexact, complexfloating, \
         newaxis, ravel, all, Inf, dot, add, multiply, identity, sqrt, \
-        maximum, flatnonzero, diagonal, arange, fastCopyAndTranspose, sum, \
-        isfinite, size, finfo, absolute, log, exp
+        maximum, flatnonzero, diagonal, arange, sum, \
+        isfinite, size, finfo, absolute, log, exp, conjugate
 from numpy.lib import triu
 if sys.platform != 'cli':
     from numpy.linalg import lapack_lite
@@ -32,6 +32,8 @@ _V = asbytes('V')
 _A = asbytes('A')
 _S = asbytes('S')
 _L = asbytes('L')
+_U = asbytes('U')
+_swapped_uplo = {_L: _U, _U: _L}
 
 fortran_int = intc
 
@@ -122,9 +124,19 @@ def _commonType(*arrays):
         t = double
     return t, result_type
 
-# _fastCopyAndTranpose assumes the input is 2D (as all the calls in here are).
+# Optimal workspace sizes from the lwork=-1 queries of LAPACK routines, by
+# routine and problem shape, so that repeated calls skip the query.
+_workspace_cache = {}
+_WORKSPACE_CACHE_SIZE = 64
 
-_fastCT = fastCopyAndTranspose
+def _workspace(key, query):
+    sizes = _workspace_cache.get(key)
+    if sizes is None:
+        sizes = query()
+        if len(_workspace_cache) >= _WORKSPACE_CACHE_SIZE:
+            _workspace_cache.clear()
+        _workspace_cache[key] = sizes
+    return sizes
 
 def _to_native_byte_order(*arrays):
     ret = []
@@ -138,27 +150,51 @@ def _to_native_byte_order(*arrays):
     else:
         return ret
 
+# _fastCopyAndTranpose assumes the input is 2D (as all the calls in here are).
+# It makes a single copy, which also converts the type and byte order, and
+# is a plain copy for input in Fortran order.
+
 def _fastCopyAndTranspose(type, *arrays):
     cast_arrays = ()
     for a in arrays:
-        if a.dtype.type is type:
-            cast_arrays = cast_arrays + (_fastCT(a),)
-        else:
-            cast_arrays = cast_arrays + (_fastCT(a.astype(type)),)
+        cast_arrays = cast_arrays + (_lapackCopy(type, a.transpose()),)
     if len(cast_arrays) == 1:
         return cast_arrays[0]
     else:
         return cast_arrays
 
+def _lapackCopy(type, a, overwrite=False):
+    # LAPACK works in place, here on C contiguous arrays of double or
+    # cdouble.  With overwrite, a that already is one is used as it is.
+    if overwrite and a.dtype == type and a.flags.c_contiguous and \
+           a.flags.writeable:
+        return a
+    return array(a, dtype=type, order='C')
+
+def _lapackStack(type, a, overwrite=False):
+    # The batched routines in lapack_lite take stacks of matrices in C order.
+    # Matrices in Fortran order go in as their transposes, which are, and
+    # the caller is told so that it can adjust for it.
+    at = a.swapaxes(-1, -2)
+    if at.flags.c_contiguous and not a.flags.c_contiguous:
+        return _lapackCopy(type, at, overwrite), True
+    return _lapackCopy(type, a, overwrite), False
+
 def _assertRank2(*arrays):
     for a in arrays:
         if len(a.shape) != 2:
             raise LinAlgError, '%d-dimensional array given. Array must be \
             two-dimensional' % len(a.shape)
 
+def _assertRankAtLeast2(*arrays):
+    for a in arrays:
+        if len(a.shape) < 2:
+            raise LinAlgError, '%d-dimensional array given. Array must be \
+            at least two-dimensional' % len(a.shape)
+
 def _assertSquareness(*arrays):
     for a in arrays:
-        if max(a.shape) != min(a.shape):
+        if a.shape[-1] != a.shape[-2]:
             raise LinAlgError, 'Array must be square'
 
 def _assertFinite(*arrays):
@@ -243,7 +279,7 @@ def tensorsolve(a, b, axes=None):
     res.shape = oldshape
     return res
 
-def solve(a, b):
+def solve(a, b, overwrite_a=False, overwrite_b=False):
     """
     Solve a linear matrix equation, or system of linear scalar equations.
 
@@ -252,14 +288,23 @@ def solve(a, b):
 
     Parameters
     ----------
-    a : array_like, shape (M, M)
-        Coefficient matrix.
-    b : array_like, shape (M,) or (M, N)
-        Ordinate or "dependent variable" values.
+    a : array_like, shape (..., M, M)
+        Coefficient matrix, or a stack of them.
+    b : array_like, shape (..., M) or (..., M, N)
+        Ordinate or "dependent variable" values, with the same leading
+        dimensions as `a`.
+    overwrite_a : bool, optional
+        Allow `a` to be overwritten, which saves copying it when it is
+        already an array of double or cdouble in C or Fortran order.
+        False by default.
+    overwrite_b : bool, optional
+        Allow `b` to be overwritten with the solution, which is then
+        returned in it, when `b` is a double or cdouble array in Fortran
+        order or a contiguous vector.  False by default.
 
     Returns
     -------
-    x : ndarray, shape (M,) or (M, N) depending on b
+    x : ndarray, shape (..., M) or (..., M, N) depending on b
         Solution to the system a x = b
 
     Raises
@@ -284,6 +329,13 @@ def solve(a, b):
     `lstsq` for the least-squares best "solution" of the
     system/equation.
 
+    When `a` has more than two dimensions, each of the matrices in its last
+    two is solved against the matching entry of `b`, in a single call to
+    LAPACK's driver.  Real systems of three or fewer equations are solved
+    with an inline LU decomposition with partial pivoting instead, which
+    skips the overhead of the LAPACK call; the systems that it finds
+    singular or not finite are left to LAPACK.
+
     References
     ----------
     .. [1] G. Strang, *Linear Algebra and Its Applications*, 2nd Ed., Orlando,
@@ -307,31 +359,30 @@ def solve(a, b):
     """
     a, _ = _makearray(a)
     b, wrap = _makearray(b)
-    one_eq = len(b.shape) == 1
-    if one_eq:
-        b = b[:, newaxis]
-    _assertRank2(a, b)
+    _assertRankAtLeast2(a)
     _assertSquareness(a)
-    n_eq = a.shape[0]
-    n_rhs = b.shape[1]
-    if n_eq != b.shape[0]:
+    one_eq = len(b.shape) == len(a.shape) - 1
+    # The right hand sides are the rows of the transpose of b; a single
+    # one is reshaped rather than transposed, which keeps it contiguous.
+    if one_eq:
+        bt = b.reshape(b.shape[:-1] + (1,) + b.shape[-1:])
+    else:
+        bt = b.swapaxes(-1, -2)
+    if len(bt.shape) != len(a.shape) or bt.shape[:-2] != a.shape[:-2] or \
+           bt.shape[-1] != a.shape[-1]:
         raise LinAlgError, 'Incompatible dimensions'
     t, result_t = _commonType(a, b)
-#    lapack_routine = _findLapackRoutine('gesv', t)
-    if isComplexType(t):
-        lapack_routine = lapack_lite.zgesv
-    else:
-        lapack_routine = lapack_lite.dgesv
-    a, b = _fastCopyAndTranspose(t, a, b)
-    a, b = _to_native_byte_order(a, b)
-    pivots = zeros(n_eq, fortran_int)
-    results = lapack_routine(n_eq, n_rhs, a, n_eq, pivots, b, n_eq, 0)
-    if results['info'] > 0:
+    a, trans = _lapackStack(t, a, overwrite_a)
+    b = _lapackCopy(t, bt, overwrite_b)
+    if lapack_lite.gesv_batch(a, b, trans) > 0:
         raise LinAlgError, 'Singular matrix'
     if one_eq:
-        return wrap(b.ravel().astype(result_t))
+        x = b[..., 0, :]
     else:
-        return wrap(b.transpose().astype(result_t))
+        x = b.swapaxes(-1, -2)
+    if (x.dtype != result_t):
+        x = x.astype(result_t)
+    return wrap(x)
 
 
 def tensorinv(a, ind=2):
@@ -403,7 +454,7 @@ def tensorinv(a, ind=2):
 
 # Matrix inversion
 
-def inv(a):
+def inv(a, overwrite_a=False):
     """
     Compute the (multiplicative) inverse of a matrix.
 
@@ -412,12 +463,16 @@ def inv(a):
 
     Parameters
     ----------
-    a : array_like, shape (M, M)
-        Matrix to be inverted.
+    a : array_like, shape (..., M, M)
+        Matrix to be inverted, or a stack of them.
+    overwrite_a : bool, optional
+        Allow `a` to be overwritten, which saves copying it when it is
+        already an array of double or cdouble in C or Fortran order.
+        False by default.
 
     Returns
     -------
-    ainv : ndarray or matrix, shape (M, M)
+    ainv : ndarray or matrix, shape (..., M, M)
         (Multiplicative) inverse of the matrix `a`.
 
     Raises
@@ -444,12 +499,23 @@ def inv(a):
 
     """
     a, wrap = _makearray(a)
-    return wrap(solve(a, identity(a.shape[0], dtype=a.dtype)))
+    _assertRankAtLeast2(a)
+    _assertSquareness(a)
+    t, result_t = _commonType(a)
+    a, trans = _lapackStack(t, a, overwrite_a)
+    ainv = empty(a.shape, t)
+    if lapack_lite.inv_batch(a, ainv) > 0:
+        raise LinAlgError, 'Singular matrix'
+    if trans:
+        ainv = ainv.swapaxes(-1, -2)
+    if (ainv.dtype != result_t):
+        ainv = ainv.astype(result_t)
+    return wrap(ainv)
 
 
 # Cholesky decomposition
 
-def cholesky(a):
+def cholesky(a, overwrite_a=False):
     """
     Cholesky decomposition.
 
@@ -461,13 +527,17 @@ def cholesky(a):
 
     Parameters
     ----------
-    a : array_like, shape (M, M)
+    a : array_like, shape (..., M, M)
         Hermitian (symmetric if all elements are real), positive-definite
-        input matrix.
+        input matrix, or a stack of them.
+    overwrite_a : bool, optional
+        Allow `a` to be overwritten, which saves copying it when it is
+        already an array of double or cdouble in C or Fortran order; for
+        C order the factor is returned in it.  False by default.
 
     Returns
     -------
-    L : ndarray, or matrix object if `a` is, shape (M, M)
+    L : ndarray, or matrix object if `a` is, shape (..., M, M)
         Lower-triangular Cholesky factor of a.
 
     Raises
@@ -516,22 +586,16 @@ def cholesky(a):
 
     """
     a, wrap = _makearray(a)
-    _assertRank2(a)
+    _assertRankAtLeast2(a)
     _assertSquareness(a)
     t, result_t = _commonType(a)
-    a = _fastCopyAndTranspose(t, a)
-    a = _to_native_byte_order(a)
-    m = a.shape[0]
-    n = a.shape[1]
-    if isComplexType(t):
-        lapack_routine = lapack_lite.zpotrf
-    else:
-        lapack_routine = lapack_lite.dpotrf
-    results = lapack_routine(_L, n, a, m, 0)
-    if results['info'] > 0:
+    s, trans = _lapackStack(t, a, overwrite_a)
+    if lapack_lite.potrf_batch(s) > 0:
         raise LinAlgError, 'Matrix is not positive definite - \
         Cholesky decomposition cannot be computed'
-    s = triu(a, k=0).transpose()
+    if trans and isComplexType(t):
+        # The transpose of a Hermitian matrix is its conjugate.
+        conjugate(s, s)
     if (s.dtype != result_t):
         s = s.astype(result_t)
     return wrap(s)
@@ -641,14 +705,16 @@ def qr(a, mode='full'):
         routine_name = 'dgeqrf'
 
     # calculate optimal size of work data 'work'
-    lwork = 1
-    work = zeros((lwork,), t)
-    results = lapack_routine(m, n, a, m, tau, work, -1, 0)
-    if results['info'] != 0:
-        raise LinAlgError, '%s returns %d' % (routine_name, results['info'])
+    def query():
+        work = zeros((1,), t)
+        results = lapack_routine(m, n, a, m, tau, work, -1, 0)
+        if results['info'] != 0:
+            raise LinAlgError, '%s returns %d' % (routine_name,
+                                                  results['info'])
+        return int(abs(work[0]))
 
     # do qr decomposition
-    lwork = int(abs(work[0]))
+    lwork = _workspace((routine_name, m, n), query)
     work = zeros((lwork,), t)
     results = lapack_routine(m, n, a, m, tau, work, lwork, 0)
 
@@ -680,14 +746,16 @@ def qr(a, mode='full'):
         routine_name = 'dorgqr'
 
     # determine optimal lwork
-    lwork = 1
-    work = zeros((lwork,), t)
-    results = lapack_routine(m, mn, mn, a, m, tau, work, -1, 0)
-    if results['info'] != 0:
-        raise LinAlgError, '%s returns %d' % (routine_name, results['info'])
+    def query():
+        work = zeros((1,), t)
+        results = lapack_routine(m, mn, mn, a, m, tau, work, -1, 0)
+        if results['info'] != 0:
+            raise LinAlgError, '%s returns %d' % (routine_name,
+                                                  results['info'])
+        return int(abs(work[0]))
 
     # compute q
-    lwork = int(abs(work[0]))
+    lwork = _workspace((routine_name, m, mn), query)
     work = zeros((lwork,), t)
     results = lapack_routine(m, mn, mn, a, m, tau, work, lwork, 0)
     if results['info'] != 0:
@@ -777,11 +845,12 @@ def eigvals(a):
         lapack_routine = lapack_lite.zgeev
         w = zeros((n,), t)
         rwork = zeros((n,), real_t)
-        lwork = 1
-        work = zeros((lwork,), t)
-        results = lapack_routine(_N, _N, n, a, n, w,
-                                 dummy, 1, dummy, 1, work, -1, rwork, 0)
-        lwork = int(abs(work[0]))
+        def query():
+            work = zeros((1,), t)
+            lapack_routine(_N, _N, n, a, n, w,
+                           dummy, 1, dummy, 1, work, -1, rwork, 0)
+            return int(abs(work[0]))
+        lwork = _workspace(('zgeev', _N, n), query)
         work = zeros((lwork,), t)
         results = lapack_routine(_N, _N, n, a, n, w,
                                  dummy, 1, dummy, 1, work, lwork, rwork, 0)
@@ -789,11 +858,12 @@ def eigvals(a):
         lapack_routine = lapack_lite.dgeev
         wr = zeros((n,), t)
         wi = zeros((n,), t)
-        lwork = 1
-        work = zeros((lwork,), t)
-        results = lapack_routine(_N, _N, n, a, n, wr, wi,
-                                 dummy, 1, dummy, 1, work, -1, 0)
-        lwork = int(work[0])
+        def query():
+            work = zeros((1,), t)
+            lapack_routine(_N, _N, n, a, n, wr, wi,
+                           dummy, 1, dummy, 1, work, -1, 0)
+            return int(work[0])
+        lwork = _workspace(('dgeev', _N, n), query)
         work = zeros((lwork,), t)
         results = lapack_routine(_N, _N, n, a, n, wr, wi,
                                  dummy, 1, dummy, 1, work, lwork, 0)
@@ -808,7 +878,7 @@ def eigvals(a):
     return w.astype(result_t)
 
 
-def eigvalsh(a, UPLO='L'):
+def eigvalsh(a, UPLO='L', overwrite_a=False):
     """
     Compute the eigenvalues of a Hermitian or real symmetric matrix.
 
@@ -816,16 +886,20 @@ def eigvalsh(a, UPLO='L'):
 
     Parameters
     ----------
-    a : array_like, shape (M, M)
+    a : array_like, shape (..., M, M)
         A complex- or real-valued matrix whose eigenvalues are to be
-        computed.
+        computed, or a stack of them.
     UPLO : {'L', 'U'}, optional
         Specifies whether the calculation is done with the lower triangular
         part of `a` ('L', default) or the upper triangular part ('U').
+    overwrite_a : bool, optional
+        Allow `a` to be overwritten, which saves copying it when it is
+        already an array of double or cdouble in C or Fortran order.
+        False by default.
 
     Returns
     -------
-    w : ndarray, shape (M,)
+    w : ndarray, shape (..., M)
         The eigenvalues, not necessarily ordered, each repeated according to
         its multiplicity.
 
@@ -857,48 +931,21 @@ def eigvalsh(a, UPLO='L'):
     """
     UPLO = asbytes(UPLO)
     a, wrap = _makearray(a)
-    _assertRank2(a)
+    _assertRankAtLeast2(a)
     _assertSquareness(a)
     t, result_t = _commonType(a)
     real_t = _linalgRealType(t)
-    a = _fastCopyAndTranspose(t, a)
-    a = _to_native_byte_order(a)
-    n = a.shape[0]
-    liwork = 5*n+3
-    iwork = zeros((liwork,), fortran_int)
-    if isComplexType(t):
-        lapack_routine = lapack_lite.zheevd
-        w = zeros((n,), real_t)
-        lwork = 1
-        work = zeros((lwork,), t)
-        lrwork = 1
-        rwork = zeros((lrwork,), real_t)
-        results = lapack_routine(_N, UPLO, n, a, n, w, work, -1,
-                                 rwork, -1, iwork, liwork,  0)
-        lwork = int(abs(work[0]))
-        work = zeros((lwork,), t)
-        lrwork = int(rwork[0])
-        rwork = zeros((lrwork,), real_t)
-        results = lapack_routine(_N, UPLO, n, a, n, w, work, lwork,
-                                rwork, lrwork, iwork, liwork,  0)
-    else:
-        lapack_routine = lapack_lite.dsyevd
-        w = zeros((n,), t)
-        lwork = 1
-        work = zeros((lwork,), t)
-        results = lapack_routine(_N, UPLO, n, a, n, w, work, -1,
-                                 iwork, liwork, 0)
-        lwork = int(work[0])
-        work = zeros((lwork,), t)
-        results = lapack_routine(_N, UPLO, n, a, n, w, work, lwork,
-                                 iwork, liwork, 0)
-    if results['info'] > 0:
+    a, trans = _lapackStack(t, a, overwrite_a)
+    if trans:
+        UPLO = _swapped_uplo.get(UPLO.upper(), UPLO)
+    w = empty(a.shape[:-1], real_t)
+    if lapack_lite.heevd_batch(a, w, _N, UPLO) > 0:
         raise LinAlgError, 'Eigenvalues did not converge'
     return w.astype(result_t)
 
 def _convertarray(a):
     t, result_t = _commonType(a)
-    a = _fastCT(a.astype(t))
+    a = _fastCopyAndTranspose(t, a)
     return a, t, result_t
 
 
@@ -1027,12 +1074,13 @@ def eig(a):
         lapack_routine = lapack_lite.zgeev
         w = zeros((n,), t)
         v = zeros((n, n), t)
-        lwork = 1
-        work = zeros((lwork,), t)
         rwork = zeros((2*n,), real_t)
-        results = lapack_routine(_N, _V, n, a, n, w,
-                                 dummy, 1, v, n, work, -1, rwork, 0)
-        lwork = int(abs(work[0]))
+        def query():
+            work = zeros((1,), t)
+            lapack_routine(_N, _V, n, a, n, w,
+                           dummy, 1, v, n, work, -1, rwork, 0)
+            return int(abs(work[0]))
+        lwork = _workspace(('zgeev', _V, n), query)
         work = zeros((lwork,), t)
         results = lapack_routine(_N, _V, n, a, n, w,
                                  dummy, 1, v, n, work, lwork, rwork, 0)
@@ -1041,11 +1089,12 @@ def eig(a):
         wr = zeros((n,), t)
         wi = zeros((n,), t)
         vr = zeros((n, n), t)
-        lwork = 1
-        work = zeros((lwork,), t)
-        results = lapack_routine(_N, _V, n, a, n, wr, wi,
-                                  dummy, 1, vr, n, work, -1, 0)
-        lwork = int(work[0])
+        def query():
+            work = zeros((1,), t)
+            lapack_routine(_N, _V, n, a, n, wr, wi,
+                           dummy, 1, vr, n, work, -1, 0)
+            return int(work[0])
+        lwork = _workspace(('dgeev', _V, n), query)
         work = zeros((lwork,), t)
         results = lapack_routine(_N, _V, n, a, n, wr, wi,
                                   dummy, 1, vr, n, work, lwork, 0)
@@ -1068,7 +1117,7 @@ def eig(a):
     return w.astype(result_t), wrap(vt)
 
 
-def eigh(a, UPLO='L'):
+def eigh(a, UPLO='L', overwrite_a=False):
     """
     Return the eigenvalues and eigenvectors of a Hermitian or symmetric matrix.
 
@@ -1078,17 +1127,21 @@ def eigh(a, UPLO='L'):
 
     Parameters
     ----------
-    a : array_like, shape (M, M)
-        A complex Hermitian or real symmetric matrix.
+    a : array_like, shape (..., M, M)
+        A complex Hermitian or real symmetric matrix, or a stack of them.
     UPLO : {'L', 'U'}, optional
         Specifies whether the calculation is done with the lower triangular
         part of `a` ('L', default) or the upper triangular part ('U').
+    overwrite_a : bool, optional
+        Allow `a` to be overwritten, which saves copying it when it is
+        already an array of double or cdouble in C or Fortran order.
+        False by default.
 
     Returns
     -------
-    w : ndarray, shape (M,)
+    w : ndarray, shape (..., M)
         The eigenvalues, not necessarily ordered.
-    v : ndarray, or matrix object if `a` is, shape (M, M)
+    v : ndarray, or matrix object if `a` is, shape (..., M, M)
         The column ``v[:, i]`` is the normalized eigenvector corresponding
         to the eigenvalue ``w[i]``.
 
@@ -1150,50 +1203,28 @@ def eigh(a, UPLO='L'):
     """
     UPLO = asbytes(UPLO)
     a, wrap = _makearray(a)
-    _assertRank2(a)
+    _assertRankAtLeast2(a)
     _assertSquareness(a)
     t, result_t = _commonType(a)
     real_t = _linalgRealType(t)
-    a = _fastCopyAndTranspose(t, a)
-    a = _to_native_byte_order(a)
-    n = a.shape[0]
-    liwork = 5*n+3
-    iwork = zeros((liwork,), fortran_int)
-    if isComplexType(t):
-        lapack_routine = lapack_lite.zheevd
-        w = zeros((n,), real_t)
-        lwork = 1
-        work = zeros((lwork,), t)
-        lrwork = 1
-        rwork = zeros((lrwork,), real_t)
-        results = lapack_routine(_V, UPLO, n, a, n, w, work, -1,
-                                 rwork, -1, iwork, liwork,  0)
-        lwork = int(abs(work[0]))
-        work = zeros((lwork,), t)
-        lrwork = int(rwork[0])
-        rwork = zeros((lrwork,), real_t)
-        results = lapack_routine(_V, UPLO, n, a, n, w, work, lwork,
-                                 rwork, lrwork, iwork, liwork,  0)
-    else:
-        lapack_routine = lapack_lite.dsyevd
-        w = zeros((n,), t)
-        lwork = 1
-        work = zeros((lwork,), t)
-        results = lapack_routine(_V, UPLO, n, a, n, w, work, -1,
-                iwork, liwork, 0)
-        lwork = int(work[0])
-        work = zeros((lwork,), t)
-        results = lapack_routine(_V, UPLO, n, a, n, w, work, lwork,
-                iwork, liwork, 0)
-    if results['info'] > 0:
+    a, trans = _lapackStack(t, a, overwrite_a)
+    if trans:
+        # The transpose of a Hermitian matrix is its conjugate, with the
+        # triangles swapped.
+        UPLO = _swapped_uplo.get(UPLO.upper(), UPLO)
+    w = empty(a.shape[:-1], real_t)
+    if lapack_lite.heevd_batch(a, w, _V, UPLO) > 0:
         raise LinAlgError, 'Eigenvalues did not converge'
-    at = a.transpose().astype(result_t)
-    return w.astype(_realType(result_t)), wrap(at)
+    if trans and isComplexType(t):
+        conjugate(a, a)
+    if (a.dtype != result_t):
+        a = a.astype(result_t)
+    return w.astype(_realType(result_t)), wrap(a)
 
 
 # Singular value decomposition
 
-def svd(a, full_matrices=1, compute_uv=1):
+def svd(a, full_matrices=1, compute_uv=1, overwrite_a=False):
     """
     Singular Value Decomposition.
 
@@ -1203,7 +1234,8 @@ def svd(a, full_matrices=1, compute_uv=1):
     Parameters
     ----------
     a : array_like
-        A real or complex matrix of shape (`M`, `N`) .
+        A real or complex matrix of shape (`M`, `N`), or a stack of them
+        of shape (..., `M`, `N`).
     full_matrices : bool, optional
         If True (default), `u` and `v` have the shapes (`M`, `M`) and
         (`N`, `N`), respectively.  Otherwise, the shapes are (`M`, `K`)
@@ -1211,6 +1243,10 @@ def svd(a, full_matrices=1, compute_uv=1):
     compute_uv : bool, optional
         Whether or not to compute `u` and `v` in addition to `s`.  True
         by default.
+    overwrite_a : bool, optional
+        Allow `a` to be overwritten, which saves copying it when it is
+        already an array of double or cdouble in C or Fortran order.
+        False by default.
 
     Returns
     -------
@@ -1224,6 +1260,9 @@ def svd(a, full_matrices=1, compute_uv=1):
         Unitary matrix of shape (`N`, `N`) or (`K`, `N`), depending on
         ``full_matrices``.
 
+    For a stack of matrices, each result has the leading dimensions of
+    `a` in front of the shapes above.
+
     Raises
     ------
     LinAlgError
@@ -1270,60 +1309,37 @@ def svd(a, full_matrices=1, compute_uv=1):
 
     """
     a, wrap = _makearray(a)
-    _assertRank2(a)
+    _assertRankAtLeast2(a)
     _assertNonEmpty(a)
-    m, n = a.shape
     t, result_t = _commonType(a)
     real_t = _linalgRealType(t)
-    a = _fastCopyAndTranspose(t, a)
-    a = _to_native_byte_order(a)
-    s = zeros((min(n, m),), real_t)
+    a, trans = _lapackStack(t, a, overwrite_a)
+    m, n = a.shape[-2:]
+    k = min(m, n)
+    stack = a.shape[:-2]
+    s = empty(stack + (k,), real_t)
     if compute_uv:
         if full_matrices:
-            nu = m
-            nvt = n
+            u = empty(stack + (m, m), t)
+            vt = empty(stack + (n, n), t)
             option = _A
         else:
-            nu = min(n, m)
-            nvt = min(n, m)
+            u = empty(stack + (m, k), t)
+            vt = empty(stack + (k, n), t)
             option = _S
-        u = zeros((nu, m), t)
-        vt = zeros((n, nvt), t)
     else:
         option = _N
-        nu = 1
-        nvt = 1
-        u = empty((1, 1), t)
-        vt = empty((1, 1), t)
-
-    iwork = zeros((8*min(m, n),), fortran_int)
-    if isComplexType(t):
-        lapack_routine = lapack_lite.zgesdd
-        rwork = zeros((5*min(m, n)*min(m, n) + 5*min(m, n),), real_t)
-        lwork = 1
-        work = zeros((lwork,), t)
-        results = lapack_routine(option, m, n, a, m, s, u, m, vt, nvt,
-                                 work, -1, rwork, iwork, 0)
-        lwork = int(abs(work[0]))
-        work = zeros((lwork,), t)
-        results = lapack_routine(option, m, n, a, m, s, u, m, vt, nvt,
-                                 work, lwork, rwork, iwork, 0)
-    else:
-        lapack_routine = lapack_lite.dgesdd
-        lwork = 1
-        work = zeros((lwork,), t)
-        results = lapack_routine(option, m, n, a, m, s, u, m, vt, nvt,
-                                 work, -1, iwork, 0)
-        lwork = int(work[0])
-        work = zeros((lwork,), t)
-        results = lapack_routine(option, m, n, a, m, s, u, m, vt, nvt,
-                                 work, lwork, iwork, 0)
-    if results['info'] > 0:
+        u = vt = empty((1,), t)
+    if lapack_lite.gesdd_batch(a, s, u, vt, option) > 0:
         raise LinAlgError, 'SVD did not converge'
     s = s.astype(_realType(result_t))
     if compute_uv:
-        u = u.transpose().astype(result_t)
-        vt = vt.transpose().astype(result_t)
+        if trans:
+            # These are the factors of the transposes.
+            u, vt = vt.swapaxes(-1, -2), u.swapaxes(-1, -2)
+        if (u.dtype != result_t):
+            u = u.astype(result_t)
+            vt = vt.astype(result_t)
         return wrap(u), s, wrap(vt)
     else:
         return s
@@ -1558,7 +1574,7 @@ def pinv(a, rcond=1e-15 ):
 
 # Determinant
 
-def slogdet(a):
+def slogdet(a, overwrite_a=False):
     """
     Compute the sign and (natural) logarithm of the determinant of an array.
 
@@ -1569,16 +1585,20 @@ def slogdet(a):
 
     Parameters
     ----------
-    a : array_like, shape (M, M)
+    a : array_like, shape (..., M, M)
         Input array.
+    overwrite_a : bool, optional
+        Allow `a` to be overwritten, which saves copying it when it is
+        already an array of double or cdouble in C or Fortran order.
+        False by default.
 
     Returns
     -------
-    sign : float or complex
+    sign : float or complex, or ndarray of shape (...)
         A number representing the sign of the determinant. For a real matrix,
         this is 1, 0, or -1. For a complex matrix, this is a complex number
         with absolute value 1 (i.e., it is on the unit circle), or else 0.
-    logdet : float
+    logdet : float, or ndarray of shape (...)
         The natural log of the absolute value of the determinant.
 
     If the determinant is zero, then `sign` will be 0 and `logdet` will be
@@ -1615,39 +1635,29 @@ def slogdet(a):
 
     """
     a = asarray(a)
-    _assertRank2(a)
+    _assertRankAtLeast2(a)
     _assertSquareness(a)
     t, result_t = _commonType(a)
-    a = _fastCopyAndTranspose(t, a)
-    a = _to_native_byte_order(a)
-    n = a.shape[0]
-    if isComplexType(t):
-        lapack_routine = lapack_lite.zgetrf
-    else:
-        lapack_routine = lapack_lite.dgetrf
-    pivots = zeros((n,), fortran_int)
-    results = lapack_routine(n, n, a, n, pivots, 0)
-    info = results['info']
-    if (info < 0):
+    # The determinant of the transpose is the same.
+    a, trans = _lapackStack(t, a, overwrite_a)
+    sign = empty(a.shape[:-2], t)
+    logdet = empty(a.shape[:-2], _realType(t))
+    if lapack_lite.slogdet_batch(a, sign, logdet) < 0:
         raise TypeError, "Illegal input to Fortran routine"
-    elif (info > 0):
-        return (t(0.0), _realType(t)(-Inf))
-    sign = 1. - 2. * (add.reduce(pivots != arange(1, n + 1)) % 2)
-    d = diagonal(a)
-    absd = absolute(d)
-    sign *= multiply.reduce(d / absd)
-    log(absd, absd)
-    logdet = add.reduce(absd, axis=-1)
-    return sign, logdet
-
-def det(a):
+    return sign[()], logdet[()]
+
+def det(a, overwrite_a=False):
     """
     Compute the determinant of an array.
 
     Parameters
     ----------
-    a : array_like, shape (M, M)
+    a : array_like, shape (..., M, M)
         Input array.
+    overwrite_a : bool, optional
+        Allow `a` to be overwritten, which saves copying it when it is
+        already an array of double or cdouble in C or Fortran order.
+        False by default.
 
     Returns
     -------
@@ -1673,12 +1683,12 @@ def det(a):
       for large matrices where underflow/overflow may occur.
 
     """
-    sign, logdet = slogdet(a)
+    sign, logdet = slogdet(a, overwrite_a)
     return sign * exp(logdet)
 
 # Linear Least Squares
 
-def lstsq(a, b, rcond=-1):
+def lstsq(a, b, rcond=-1, overwrite_a=False, overwrite_b=False):
     """
     Return the least-squares solution to a linear matrix equation.
 
@@ -1701,6 +1711,13 @@ def lstsq(a, b, rcond=-1):
         Cut-off ratio for small singular values of `a`.
         Singular values are set to zero if they are smaller than `rcond`
         times the largest singular value of `a`.
+    overwrite_a : bool, optional
+        Allow `a` to be overwritten, which saves copying it when it is a
+        double or cdouble array in Fortran order.  False by default.
+    overwrite_b : bool, optional
+        Allow `b` to be overwritten, which saves copying it when it is a
+        double or cdouble array in Fortran order, or a contiguous vector,
+        and ``M >= N``.  False by default.
 
     Returns
     -------
@@ -1765,7 +1782,10 @@ def lstsq(a, b, rcond=-1):
     b, wrap = _makearray(b)
     is_1d = len(b.shape) == 1
     if is_1d:
+        bt = b.reshape(1, -1)
         b = b[:, newaxis]
+    else:
+        bt = b.transpose()
     _assertRank2(a, b)
     m  = a.shape[0]
     n  = a.shape[1]
@@ -1775,39 +1795,43 @@ def lstsq(a, b, rcond=-1):
         raise LinAlgError, 'Incompatible dimensions'
     t, result_t = _commonType(a, b)
     real_t = _linalgRealType(t)
-    bstar = zeros((ldb, n_rhs), t)
-    bstar[:b.shape[0],:n_rhs] = b.copy()
-    a, bstar = _fastCopyAndTranspose(t, a, bstar)
-    a, bstar = _to_native_byte_order(a, bstar)
+    # LAPACK takes both in Fortran order, that is, transposed in C order,
+    # and b with room for n rows of solutions.
+    a = _lapackCopy(t, a.transpose(), overwrite_a)
+    if ldb == m:
+        bstar = _lapackCopy(t, bt, overwrite_b)
+    else:
+        bstar = zeros((n_rhs, ldb), t)
+        bstar[:, :m] = bt
     s = zeros((min(m, n),), real_t)
     nlvl = max( 0, int( math.log( float(min(m, n))/2. ) ) + 1 )
     iwork = zeros((3*min(m, n)*nlvl+11*min(m, n),), fortran_int)
+    # The queries only look at the shapes, so they get 1 element arrays.
+    dummy = zeros((1,), t)
+    real_dummy = zeros((1,), real_t)
     if isComplexType(t):
         lapack_routine = lapack_lite.zgelsd
-        lwork = 1
-        rwork = zeros((lwork,), real_t)
-        work = zeros((lwork,), t)
-        results = lapack_routine(m, n, n_rhs, a, m, bstar, ldb, s, rcond,
-                                 0, work, -1, rwork, iwork, 0)
-        lwork = int(abs(work[0]))
-        rwork = zeros((lwork,), real_t)
-        a_real = zeros((m, n), real_t)
-        bstar_real = zeros((ldb, n_rhs,), real_t)
-        results = lapack_lite.dgelsd(m, n, n_rhs, a_real, m,
-                                     bstar_real, ldb, s, rcond,
-                                     0, rwork, -1, iwork, 0)
-        lrwork = int(rwork[0])
+        def query():
+            work = zeros((1,), t)
+            lapack_routine(m, n, n_rhs, dummy, m, dummy, ldb, s, rcond,
+                           0, work, -1, real_dummy, iwork, 0)
+            rwork = zeros((1,), real_t)
+            lapack_lite.dgelsd(m, n, n_rhs, real_dummy, m, real_dummy, ldb,
+                               s, rcond, 0, rwork, -1, iwork, 0)
+            return int(abs(work[0])), int(rwork[0])
+        lwork, lrwork = _workspace(('zgelsd', m, n, n_rhs), query)
         work = zeros((lwork,), t)
         rwork = zeros((lrwork,), real_t)
         results = lapack_routine(m, n, n_rhs, a, m, bstar, ldb, s, rcond,
                                  0, work, lwork, rwork, iwork, 0)
     else:
         lapack_routine = lapack_lite.dgelsd
-        lwork = 1
-        work = zeros((lwork,), t)
-        results = lapack_routine(m, n, n_rhs, a, m, bstar, ldb, s, rcond,
-                                 0, work, -1, iwork, 0)
-        lwork = int(work[0])
+        def query():
+            work = zeros((1,), t)
+            lapack_routine(m, n, n_rhs, dummy, m, dummy, ldb, s, rcond,
+                           0, work, -1, iwork, 0)
+            return int(work[0])
+        lwork = _workspace(('dgelsd', m, n, n_rhs), query)
         work = zeros((lwork,), t)
         results = lapack_routine(m, n, n_rhs, a, m, bstar, ldb, s, rcond,
                                  0, work, lwork, iwork, 0)
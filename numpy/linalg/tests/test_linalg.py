@@ -277,6 +277,191 @@ class TestEigh(HermitianTestCase, TestCase):
         evalues.sort()
         assert_almost_equal(ev, evalues)
 
+class TestStacked(TestCase):
+    """Stacks of matrices give the results of the matrices one by one."""
+    def stacks(self):
+        np.random.seed(1234)
+        for t in (double, cdouble):
+            for n in (1, 2, 3, 4, 6):
+                a = np.random.randn(2, 3, n, n).astype(t)
+                if t is cdouble:
+                    a += 1j * np.random.randn(2, 3, n, n)
+                yield a
+
+    def hermitian(self, a):
+        h = np.empty_like(a)
+        for i in np.ndindex(*a.shape[:-2]):
+            h[i] = dot(a[i], a[i].conj().T) + identity(a.shape[-1])
+        return h
+
+    def test_solve(self):
+        for a in self.stacks():
+            b = np.random.randn(*a.shape[:-1] + (2,)).astype(a.dtype)
+            x = linalg.solve(a, b)
+            xv = linalg.solve(a, b[..., 0])
+            assert_equal(x.shape, b.shape)
+            assert_equal(xv.shape, b.shape[:-1])
+            for i in np.ndindex(*a.shape[:-2]):
+                assert_almost_equal(x[i], linalg.solve(a[i], b[i]))
+                assert_almost_equal(xv[i], linalg.solve(a[i], b[i][:, 0]))
+        assert_raises(linalg.LinAlgError, linalg.solve, a, b[0])
+
+    def test_inv(self):
+        for a in self.stacks():
+            ainv = linalg.inv(a)
+            for i in np.ndindex(*a.shape[:-2]):
+                assert_almost_equal(ainv[i], linalg.inv(a[i]))
+                assert_almost_equal(dot(a[i], ainv[i]),
+                                    identity(a.shape[-1]))
+
+    def test_singular(self):
+        for n in (2, 5):
+            a = np.random.randn(4, n, n)
+            a[2] = 0
+            assert_raises(linalg.LinAlgError, linalg.inv, a)
+            assert_raises(linalg.LinAlgError, linalg.solve, a, a[..., 0])
+            s, ld = linalg.slogdet(a)
+            assert_equal(s[2], 0)
+            assert_equal(ld[2], -inf)
+            assert_equal(linalg.det(a)[2], 0)
+
+    def test_small_badly_scaled(self):
+        a = np.diag([1e-170, 1e-150])
+        assert_almost_equal(linalg.inv(a) * 1e-170, np.diag([1., 1e-20]))
+        s, ld = linalg.slogdet(a)
+        assert_equal(s, 1)
+        assert_almost_equal(ld, np.log(1e-170) + np.log(1e-150))
+        s, ld = linalg.slogdet(np.diag([1e200, 1e200, -1e200]))
+        assert_equal(s, -1)
+        assert_almost_equal(ld, 3 * np.log(1e200))
+        s, ld = linalg.slogdet(np.array([[np.nan, 1], [1, 1]]))
+        assert_(np.isnan(s) and np.isnan(ld))
+        a = np.array([[1., 1, 1], [1, 1 + 1e-12, 1], [0.3, 0.7, 2]])
+        b = np.array([1., 2, 3])
+        x = linalg.solve(a, b)
+        assert_(abs(dot(a, x) - b).max() < 1e-14 * abs(x).max())
+
+    def test_det(self):
+        for a in self.stacks():
+            s, ld = linalg.slogdet(a)
+            d = linalg.det(a)
+            assert_equal(d.shape, a.shape[:-2])
+            for i in np.ndindex(*a.shape[:-2]):
+                s1, ld1 = linalg.slogdet(a[i])
+                assert_almost_equal(s[i], s1)
+                assert_almost_equal(ld[i], ld1)
+                ev = linalg.eigvals(a[i])
+                assert_almost_equal(d[i], multiply.reduce(ev))
+
+    def test_cholesky(self):
+        for a in self.stacks():
+            h = self.hermitian(a)
+            c = linalg.cholesky(h)
+            for i in np.ndindex(*a.shape[:-2]):
+                assert_almost_equal(c[i], linalg.cholesky(h[i]))
+                assert_almost_equal(dot(c[i], c[i].conj().T), h[i])
+                assert_equal(np.triu(c[i], 1), 0)
+
+    def test_eigh(self):
+        for a in self.stacks():
+            h = self.hermitian(a)
+            for uplo in ('L', 'U'):
+                w, v = linalg.eigh(h, uplo)
+                wv = linalg.eigvalsh(h, uplo)
+                for i in np.ndindex(*a.shape[:-2]):
+                    assert_almost_equal(w[i], linalg.eigh(h[i], uplo)[0])
+                    assert_almost_equal(wv[i], w[i])
+                    assert_almost_equal(dot(h[i], v[i]), v[i] * w[i])
+
+    def test_svd(self):
+        np.random.seed(1234)
+        for t in (double, cdouble):
+            for m, n in ((3, 5), (5, 3), (4, 4)):
+                a = np.random.randn(2, m, n).astype(t)
+                if t is cdouble:
+                    a += 1j * np.random.randn(2, m, n)
+                for full in (0, 1):
+                    u, s, vt = linalg.svd(a, full)
+                    for i in range(2):
+                        u1, s1, vt1 = linalg.svd(a[i], full)
+                        assert_equal(u[i].shape, u1.shape)
+                        assert_equal(vt[i].shape, vt1.shape)
+                        assert_almost_equal(s[i], s1)
+                        k = min(m, n)
+                        assert_almost_equal(dot(u[i][:, :k] * s[i], vt[i][:k]),
+                                            a[i])
+                assert_almost_equal(linalg.svd(a, compute_uv=0), s)
+
+
+class TestFortranOrder(TestCase):
+    """Fortran ordered input, and input that may be overwritten."""
+    def fortran(self, a):
+        return a.T.copy().T
+
+    def matrices(self):
+        np.random.seed(1234)
+        for t in (double, cdouble):
+            for n in (2, 5):
+                a = np.random.randn(n, n).astype(t)
+                if t is cdouble:
+                    a += 1j * np.random.randn(n, n)
+                yield a
+
+    def test_fortran(self):
+        for a in self.matrices():
+            f = self.fortran(a)
+            h = dot(a, a.conj().T) + identity(a.shape[0])
+            hf = self.fortran(h)
+            assert f.flags.f_contiguous and not f.flags.c_contiguous
+            assert_almost_equal(linalg.solve(f, a), linalg.solve(a, a))
+            assert_almost_equal(linalg.inv(f), linalg.inv(a))
+            assert_almost_equal(linalg.det(f), linalg.det(a))
+            assert_almost_equal(linalg.cholesky(hf), linalg.cholesky(h))
+            for uplo in ('L', 'U'):
+                w, v = linalg.eigh(hf, uplo)
+                assert_almost_equal(w, linalg.eigvalsh(h, uplo))
+                assert_almost_equal(dot(h, v), v * w)
+            u, s, vt = linalg.svd(f)
+            assert_almost_equal(dot(u * s, vt), a)
+            assert_almost_equal(s, linalg.svd(a, compute_uv=0))
+
+    def test_overwrite(self):
+        for a in self.matrices():
+            b = a[:, 0].copy()
+            x = linalg.solve(a, b)
+            bf = self.fortran(a)
+            xf = linalg.solve(self.fortran(a), bf, overwrite_a=True,
+                              overwrite_b=True)
+            assert_almost_equal(xf, linalg.solve(a, a))
+            assert np.may_share_memory(xf, bf)
+            assert_almost_equal(linalg.solve(a.copy(), b, overwrite_a=True,
+                                             overwrite_b=True), x)
+            assert_almost_equal(b, x)
+
+            h = dot(a, a.conj().T) + identity(a.shape[0])
+            c = h.copy()
+            assert_almost_equal(linalg.cholesky(c, overwrite_a=True),
+                                linalg.cholesky(h))
+            assert_almost_equal(np.triu(c, 1), 0)
+
+            # Input that needs converting is still copied.
+            a32 = a.astype(csingle if a.dtype == cdouble else single)
+            c32 = a32.copy()
+            linalg.inv(a32, overwrite_a=True)
+            assert_equal(a32, c32)
+
+    def test_lstsq(self):
+        np.random.seed(1234)
+        for m, n in ((6, 4), (4, 4), (3, 5)):
+            a = np.random.randn(m, n)
+            b = np.random.randn(m, 2)
+            x = linalg.lstsq(a, b)[0]
+            xf = linalg.lstsq(self.fortran(a), self.fortran(b),
+                              overwrite_a=True, overwrite_b=True)[0]
+            assert_almost_equal(xf, x)
+            assert_almost_equal(linalg.lstsq(a, b[:, 0])[0], x[:, 0])
+
+
 class _TestNorm(TestCase):
     dt = None
     dec = None
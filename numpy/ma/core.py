@@ -4835,7 +4835,7 @@ class MaskedArray(ndarray):
         fill_value : var, optional
             Value used to fill the array before sorting.
             The default is the `fill_value` attribute of the input array.
-        kind : {'quicksort', 'mergesort', 'heapsort'}, optional
+        kind : {'quicksort', 'mergesort', 'heapsort', 'radix', 'timsort'}, optional
             Sorting algorithm.
         order : list, optional
             When `a` is an array with fields defined, this argument specifies
@@ -4967,7 +4967,7 @@ class MaskedArray(ndarray):
     axis : int, optional
         Axis along which to sort. If None, the array is flattened before
         sorting. The default is -1, which sorts along the last axis.
-    kind : {'quicksort', 'mergesort', 'heapsort'}, optional
+    kind : {'quicksort', 'mergesort', 'heapsort', 'radix', 'timsort'}, optional
         Sorting algorithm. Default is 'quicksort'.
     order : list, optional
         When `a` is a structured array, this argument specifies which fields
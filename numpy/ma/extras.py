@@ -602,7 +602,7 @@ def median(a, axis=None, out=None, overwrite_input=False):
         calculations. The input array will be modified by the call to
         median. This will save memory when you do not need to preserve
         the contents of the input array. Treat the input as undefined,
-        but it will probably be fully or partially sorted. Default is
+        but it will probably be partially sorted. Default is
         False. Note that, if `overwrite_input` is True, and the input
         is not already an `ndarray`, an error will be raised.
 
@@ -641,27 +641,27 @@ def median(a, axis=None, out=None, overwrite_input=False):
 
     """
     def _median1D(data):
-        counts = filled(count(data), 0)
+        # Partition the unmasked values around the middle.  compressed
+        # returns a view of the data when nothing is masked.
+        values = data.compressed()
+        if not overwrite_input and getmask(data) is nomask:
+            values = values.copy()
+        counts = values.size
+        if counts == 0:
+            return masked
         (idx, rmd) = divmod(counts, 2)
         if rmd:
-            choice = slice(idx, idx + 1)
+            choice = [idx]
         else:
-            choice = slice(idx - 1, idx + 1)
-        return data[choice].mean(0)
+            choice = [idx - 1, idx]
+        values.partition(choice)
+        return values[choice].mean(0)
     #
-    if overwrite_input:
-        if axis is None:
-            asorted = a.ravel()
-            asorted.sort()
-        else:
-            a.sort(axis=axis)
-            asorted = a
-    else:
-        asorted = sort(a, axis=axis)
+    a = asarray(a)
     if axis is None:
-        result = _median1D(asorted)
+        result = _median1D(a.ravel())
     else:
-        result = apply_along_axis(_median1D, axis, asorted)
+        result = apply_along_axis(_median1D, axis, a)
     if out is not None:
         out = result
     return result
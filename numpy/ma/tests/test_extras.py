@@ -455,6 +455,19 @@ class TestMedian(TestCase):
         x = np.ma.arange(24).reshape(4, 3, 2)
         x[x % 5 == 0] = masked
         assert_equal(median(x, 0), [[12, 10], [8, 9], [16, 17]])
+    #
+    def test_overwrite_input(self):
+        "Tests median w/ overwrite_input"
+        x = masked_array(np.random.rand(10, 11))
+        x[x > 0.8] = masked
+        for axis in [None, 0, 1]:
+            desired = median(x, axis=axis)
+            y = x.copy()
+            assert_equal(median(y, axis=axis, overwrite_input=True), desired)
+        y = np.arange(10.)[::-1]
+        assert_equal(median(y), 4.5)
+        assert_equal(y, np.arange(10.)[::-1])
+        assert_equal(median(masked_array([1, 2], mask=[1, 1])), masked)
 
 
 
@@ -640,6 +653,15 @@ class TestArraySetOps(TestCase):
         assert_equal(test[1], [0, 3, 5, 2])
         assert_equal(test[2], [0, 0, 3, 1, 3, 2])
 
+    def test_unique_large_maskedarray(self):
+        "Test unique on masked data too large to be sorted by default"
+        data = masked_array([1, 1, 1, 2, 2, 3] * 500,
+                            mask=[0, 0, 1, 0, 1, 0] * 500)
+        test = unique(data, return_index=True, return_inverse=True)
+        assert_equal(test[0], masked_array([1, 2, 3, -1], mask=[0, 0, 0, 1]))
+        assert_equal(test[1], [0, 3, 5, 2])
+        assert_equal(test[2], [0, 0, 3, 1, 3, 2] * 500)
+
     def test_unique_allmasked(self):
         "Test all masked"
         data = masked_array([1, 1, 1], mask=True)
@@ -79,6 +79,8 @@ Internal functions
 ==============================================================================
 get_state            Get tuple representing internal state of generator.
 set_state            Set state of generator.
+jump                 Advance the generator by multiples of 2**128 steps.
+spawn                Split off generators with non-overlapping streams.
 ==================== =========================================================
 
 """
@@ -97,6 +99,7 @@ __all__ = [
     'get_state',
     'gumbel',
     'hypergeometric',
+    'jump',
     'laplace',
     'logistic',
     'lognormal',
@@ -120,6 +123,7 @@ __all__ = [
     'seed',
     'set_state',
     'shuffle',
+    'spawn',
     'standard_cauchy',
     'standard_exponential',
     'standard_gamma',
@@ -110,6 +110,96 @@ double rk_standard_exponential(rk_state *state)
     return -log(1.0 - rk_double(state));
 }
 
+void rk_fill_standard_exponential(rk_state *state, double *out, size_t n)
+{
+    size_t i;
+
+    rk_fill_double(state, out, n);
+    for (i = 0; i < n; i++)
+    {
+        out[i] = -log(1.0 - out[i]);
+    }
+}
+
+/* Ziggurat method of Marsaglia and Tsang with 256 layers, drawing the layer
+ * and the 53 bit abscissa from separate bits like rk_gauss_zig. */
+#define ZIG_EXP_R 7.697117470131487
+#define ZIG_EXP_V 3.949659822581572e-3
+
+static double zig_exp_k[256], zig_exp_w[256], zig_exp_f[256];
+static int zig_exp_ready = 0;
+
+void rk_standard_exponential_zig_init(void)
+{
+    const double m = 9007199254740992.0;
+    double de = ZIG_EXP_R, te = de, q;
+    int i;
+
+    if (zig_exp_ready)
+    {
+        return;
+    }
+    q = ZIG_EXP_V/exp(-de);
+    zig_exp_k[0] = (de/q)*m;
+    zig_exp_k[1] = 0;
+    zig_exp_w[0] = q/m;
+    zig_exp_w[255] = de/m;
+    zig_exp_f[0] = 1.0;
+    zig_exp_f[255] = exp(-de);
+    for (i = 254; i >= 1; i--)
+    {
+        de = -log(ZIG_EXP_V/de + exp(-de));
+        zig_exp_k[i+1] = (de/te)*m;
+        te = de;
+        zig_exp_f[i] = exp(-de);
+        zig_exp_w[i] = de/m;
+    }
+    zig_exp_ready = 1;
+}
+
+static double zig_exp(rk_state *state)
+{
+    for (;;)
+    {
+        unsigned long a = rk_random(state), b = rk_random(state);
+        int i = a & 0xff;
+        double u = (long)(a >> 10)*2147483648.0 + (long)(b >> 1);
+        double x = u*zig_exp_w[i];
+
+        if (u < zig_exp_k[i])
+        {
+            return x;
+        }
+        if (i == 0)
+        {
+            /* The tail beyond ZIG_EXP_R is another exponential */
+            return ZIG_EXP_R - log(1.0 - rk_double(state));
+        }
+        if (zig_exp_f[i] + rk_double(state)*(zig_exp_f[i-1] - zig_exp_f[i])
+                < exp(-x))
+        {
+            return x;
+        }
+    }
+}
+
+double rk_standard_exponential_zig(rk_state *state)
+{
+    rk_standard_exponential_zig_init();
+    return zig_exp(state);
+}
+
+void rk_fill_standard_exponential_zig(rk_state *state, double *out, size_t n)
+{
+    size_t i;
+
+    rk_standard_exponential_zig_init();
+    for (i = 0; i < n; i++)
+    {
+        out[i] = zig_exp(state);
+    }
+}
+
 double rk_exponential(rk_state *state, double scale)
 {
     return scale * rk_standard_exponential(state);
@@ -636,6 +726,25 @@ double rk_laplace(rk_state *state, double loc, double scale)
     return U;
 }
 
+void rk_fill_standard_laplace(rk_state *state, double *out, size_t n)
+{
+    size_t i;
+    double U;
+
+    rk_fill_double(state, out, n);
+    for (i = 0; i < n; i++)
+    {
+        U = out[i];
+        if (U < 0.5)
+        {
+            out[i] = log(U + U);
+        } else
+        {
+            out[i] = -log(2.0 - U - U);
+        }
+    }
+}
+
 double rk_gumbel(rk_state *state, double loc, double scale)
 {
     double U;
@@ -644,6 +753,17 @@ double rk_gumbel(rk_state *state, double loc, double scale)
     return loc - scale * log(-log(U));
 }
 
+void rk_fill_standard_gumbel(rk_state *state, double *out, size_t n)
+{
+    size_t i;
+
+    rk_fill_double(state, out, n);
+    for (i = 0; i < n; i++)
+    {
+        out[i] = -log(-log(1.0 - out[i]));
+    }
+}
+
 double rk_logistic(rk_state *state, double loc, double scale)
 {
     double U;
@@ -652,6 +772,17 @@ double rk_logistic(rk_state *state, double loc, double scale)
     return loc + scale * log(U/(1.0 - U));
 }
 
+void rk_fill_standard_logistic(rk_state *state, double *out, size_t n)
+{
+    size_t i;
+
+    rk_fill_double(state, out, n);
+    for (i = 0; i < n; i++)
+    {
+        out[i] = log(out[i]/(1.0 - out[i]));
+    }
+}
+
 double rk_lognormal(rk_state *state, double mean, double sigma)
 {
     return exp(rk_normal(state, mean, sigma));
@@ -662,6 +793,17 @@ double rk_rayleigh(rk_state *state, double mode)
     return mode*sqrt(-2.0 * log(1.0 - rk_double(state)));
 }
 
+void rk_fill_standard_rayleigh(rk_state *state, double *out, size_t n)
+{
+    size_t i;
+
+    rk_fill_double(state, out, n);
+    for (i = 0; i < n; i++)
+    {
+        out[i] = sqrt(-2.0 * log(1.0 - out[i]));
+    }
+}
+
 double rk_wald(rk_state *state, double mean, double scale)
 {
     double U, X, Y;
@@ -45,6 +45,9 @@ extern "C" {
  * Marsaglia, G. and Tsang, W. W. A Simple Method for Generating Gamma
  * Variables. ACM Transactions on Mathematical Software, Vol. 26, No. 3,
  * September 2000, Pages 363–372.
+ *
+ * Marsaglia, G. and Tsang, W. W. The Ziggurat Method for Generating Random
+ *  Variables. Journal of Statistical Software, Vol. 5, No. 8, 2000.
  */
 
 /* Normal distribution with mean=loc and standard deviation=scale. */
@@ -54,6 +57,20 @@ extern double rk_normal(rk_state *state, double loc, double scale);
  * CDF. */
 extern double rk_standard_exponential(rk_state *state);
 
+/* Fills out with n standard exponential deviates, the same as n calls to
+ * rk_standard_exponential. */
+extern void rk_fill_standard_exponential(rk_state *state, double *out,
+                                         size_t n);
+
+/* Standard exponential distribution by the ziggurat method of Marsaglia and
+ * Tsang, which is several times faster than inversion but gives a different
+ * sequence. The tables are computed on the first call, or by
+ * rk_standard_exponential_zig_init. */
+extern double rk_standard_exponential_zig(rk_state *state);
+extern void rk_fill_standard_exponential_zig(rk_state *state, double *out,
+                                             size_t n);
+extern void rk_standard_exponential_zig_init(void);
+
 /* Exponential distribution with mean=scale. */
 extern double rk_exponential(rk_state *state, double scale);
 
@@ -144,18 +161,34 @@ extern double rk_power(rk_state *state, double a);
 /* Laplace distribution */
 extern double rk_laplace(rk_state *state, double loc, double scale);
 
+/* Fills out with n Laplace deviates of loc 0 and scale 1, from which
+ * loc + scale*out gives the values of n calls to rk_laplace. */
+extern void rk_fill_standard_laplace(rk_state *state, double *out, size_t n);
+
 /* Gumbel distribution */
 extern double rk_gumbel(rk_state *state, double loc, double scale);
 
+/* Fills out with n Gumbel deviates of loc 0 and scale 1, from which
+ * loc + scale*out gives the values of n calls to rk_gumbel. */
+extern void rk_fill_standard_gumbel(rk_state *state, double *out, size_t n);
+
 /* Logistic distribution */
 extern double rk_logistic(rk_state *state, double loc, double scale);
 
+/* Fills out with n Logistic deviates of loc 0 and scale 1, from which
+ * loc + scale*out gives the values of n calls to rk_logistic. */
+extern void rk_fill_standard_logistic(rk_state *state, double *out, size_t n);
+
 /* Log-normal distribution */
 extern double rk_lognormal(rk_state *state, double mean, double sigma);
 
 /* Rayleigh distribution */
 extern double rk_rayleigh(rk_state *state, double mode);
 
+/* Fills out with n Rayleigh deviates of mode 1, from which mode*out gives
+ * the values of n calls to rk_rayleigh. */
+extern void rk_fill_standard_rayleigh(rk_state *state, double *out, size_t n);
+
 /* Wald distribution */
 extern double rk_wald(rk_state *state, double mean, double scale);
 
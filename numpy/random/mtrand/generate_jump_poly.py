@@ -0,0 +1,102 @@
+"""
+Compute the polynomial used by rk_jump and write it to randomkit_jump.h.
+
+The state of the Mersenne Twister, seen as the last 624 words it generated,
+is advanced one word at a time by a linear map T over GF(2).  If P is a
+polynomial with P(T) = 0, then T**J = Q(T) where Q = x**J mod P, so the
+state J words ahead can be computed from Q with about 20000 steps of the
+generator and as many additions of 624-word states.  P is x times the
+characteristic polynomial of MT19937 (the extra factor accounts for the low
+bits of the oldest word, which never affect later output), and the
+characteristic polynomial is found with the Berlekamp-Massey algorithm from
+a stretch of output of Python's own MT19937.
+
+See H. Haramoto, M. Matsumoto, T. Nishimura, F. Panneton and P. L'Ecuyer,
+"Efficient Jump Ahead for F2-Linear Random Number Generators", INFORMS
+Journal on Computing 20(3), 2008.
+"""
+import random
+
+MEXP = 19937
+JUMP_LOG2 = 128
+
+
+def parity(x):
+    return bin(x).count('1') & 1
+
+
+def degree(x):
+    return x.bit_length() - 1
+
+
+def berlekamp_massey(bits):
+    """
+    The connection polynomial c (bit i is the coefficient of x**i) and the
+    linear complexity of a sequence of bits.
+    """
+    c, b, l, m, s = 1, 1, 0, 1, 0
+    for n, bit in enumerate(bits):
+        # bit i of s is bits[n - i]
+        s = (s << 1) | bit
+        if parity(c & s):
+            t = c
+            c ^= b << m
+            if 2*l <= n:
+                l, b, m = n + 1 - l, t, 1
+                continue
+        m += 1
+    return c, l
+
+
+def reverse(c, l):
+    r = 0
+    for i in range(l + 1):
+        if (c >> i) & 1:
+            r |= 1 << (l - i)
+    return r
+
+
+def polymod(a, p):
+    dp = degree(p)
+    while a and degree(a) >= dp:
+        a ^= p << (degree(a) - dp)
+    return a
+
+
+def polysquare(a):
+    return int('0'.join(bin(a)[2:]), 2)
+
+
+def jump_polynomial(log2_steps):
+    gen = random.Random(12345)
+    bits = [gen.getrandbits(32) & 1 for i in range(2*MEXP + 100)]
+    c, l = berlekamp_massey(bits)
+    assert l == MEXP
+    p = reverse(c, l) << 1
+    q = 2
+    for i in range(log2_steps):
+        q = polymod(polysquare(q), p)
+    return q
+
+
+def main():
+    q = jump_polynomial(JUMP_LOG2)
+    nwords = (degree(q) + 32) // 32
+    words = [(q >> (32*i)) & 0xffffffff for i in range(nwords)]
+    out = open('randomkit_jump.h', 'w')
+    out.write('/* Generated by generate_jump_poly.py, do not edit. */\n\n')
+    out.write('/*\n * Coefficients of x**(2**%d) modulo the minimal '
+              'polynomial of the\n * MT19937 state, bit i of word j is the '
+              'coefficient of x**(32*j + i).\n */\n' % JUMP_LOG2)
+    out.write('#define RK_JUMP_LOG2 %d\n' % JUMP_LOG2)
+    out.write('#define RK_JUMP_POLY_LEN %d\n\n' % nwords)
+    out.write('static const unsigned long rk_jump_poly[RK_JUMP_POLY_LEN] = {\n')
+    for i in range(0, nwords, 5):
+        out.write('    ' + ', '.join(['0x%08xUL' % w for w in words[i:i+5]])
+                  + ',\n')
+    out.write('};\n')
+    out.close()
+
+
+if __name__ == '__main__':
+    main()
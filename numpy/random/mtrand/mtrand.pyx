@@ -32,6 +32,9 @@ cdef extern from "memory.h":
     void *malloc(long)
     void free(void *)
 
+cdef extern from "limits.h":
+    int INT_MAX
+
 cdef extern from "randomkit.h":
 
     ctypedef struct rk_state:
@@ -57,16 +60,26 @@ cdef extern from "randomkit.h":
     unsigned long rk_ulong(rk_state *state)
     unsigned long rk_interval(unsigned long max, rk_state *state)
     double rk_double(rk_state *state)
+    void rk_fill_double(rk_state *state, double *out, size_t n) nogil
     void rk_fill(void *buffer, size_t size, rk_state *state)
     rk_error rk_devfill(void *buffer, size_t size, int strong)
     rk_error rk_altfill(void *buffer, size_t size, int strong,
                         rk_state *state)
     double rk_gauss(rk_state *state)
+    void rk_fill_gauss(rk_state *state, double *out, size_t n) nogil
+    void rk_fill_gauss_zig(rk_state *state, double *out, size_t n) nogil
+    void rk_gauss_zig_init()
+    void rk_jump(rk_state *state)
 
 cdef extern from "distributions.h":
 
     double rk_normal(rk_state *state, double loc, double scale)
     double rk_standard_exponential(rk_state *state)
+    void rk_fill_standard_exponential(rk_state *state, double *out,
+                                      size_t n) nogil
+    void rk_fill_standard_exponential_zig(rk_state *state, double *out,
+                                          size_t n) nogil
+    void rk_standard_exponential_zig_init()
     double rk_exponential(rk_state *state, double scale)
     double rk_uniform(rk_state *state, double loc, double scale)
     double rk_standard_gamma(rk_state *state, double shape)
@@ -84,10 +97,18 @@ cdef extern from "distributions.h":
     double rk_weibull(rk_state *state, double a)
     double rk_power(rk_state *state, double a)
     double rk_laplace(rk_state *state, double loc, double scale)
+    void rk_fill_standard_laplace(rk_state *state, double *out,
+                                  size_t n) nogil
     double rk_gumbel(rk_state *state, double loc, double scale)
+    void rk_fill_standard_gumbel(rk_state *state, double *out,
+                                 size_t n) nogil
     double rk_logistic(rk_state *state, double loc, double scale)
+    void rk_fill_standard_logistic(rk_state *state, double *out,
+                                   size_t n) nogil
     double rk_lognormal(rk_state *state, double mode, double sigma)
     double rk_rayleigh(rk_state *state, double mode)
+    void rk_fill_standard_rayleigh(rk_state *state, double *out,
+                                   size_t n) nogil
     double rk_wald(rk_state *state, double mean, double scale)
     double rk_triangular(rk_state *state, double left, double mode,
                          double right)
@@ -109,6 +130,8 @@ ctypedef double (* rk_cont1)(rk_state *state, double a)
 ctypedef double (* rk_cont2)(rk_state *state, double a, double b)
 ctypedef double (* rk_cont3)(rk_state *state, double a, double b, double c)
 
+ctypedef void (* rk_contfill)(rk_state *state, double *out, size_t n) nogil
+
 ctypedef long (* rk_disc0)(rk_state *state)
 ctypedef long (* rk_discnp)(rk_state *state, long n, double p)
 ctypedef long (* rk_discdd)(rk_state *state, double n, double p)
@@ -120,8 +143,18 @@ cdef extern from "initarray.h":
    void init_by_array(rk_state *self, unsigned long *init_key,
                       unsigned long key_length)
 
+cdef extern from "npy_threads.h":
+    ctypedef void (* npy_parallel_func)(void *data, npy_intp start,
+                                        npy_intp end, int chunk) nogil
+    int NpyThreads_GetNumThreads()
+    void NpyThreads_ChunkRange(npy_intp n, int nchunks, int chunk,
+                               npy_intp *start, npy_intp *end) nogil
+    void NpyThreads_Run(npy_parallel_func func, void *data, npy_intp n,
+                        int nchunks) nogil
+
 # Initialize numpy
 import numpy as np
+import operator
 
 
 cdef inline void *dataptr(object arr):
@@ -146,6 +179,140 @@ cdef object cont0_array(rk_state *state, rk_cont0 func, object size):
         return arr
 
 
+ctypedef struct fill_job:
+    rk_contfill fill
+    rk_state *states
+    int nstreams
+    double *out
+    npy_intp length
+
+
+cdef void fill_streams(void *data, npy_intp start, npy_intp end,
+                       int chunk) nogil:
+    # Fills the pieces of the output drawn from streams start to end - 1.
+    cdef fill_job *job = <fill_job *>data
+    cdef npy_intp lo, hi
+    cdef int i
+
+    for i from start <= i < end:
+        NpyThreads_ChunkRange(job.length, job.nstreams, i, &lo, &hi)
+        if lo < hi:
+            job.fill(&job.states[i], job.out + lo, hi - lo)
+
+
+cdef int fill_array(rk_state *state, rk_contfill fill, double *out,
+                    npy_intp length, int threads) except -1:
+    # Fills out from state or, if threads is not 0, in that many contiguous
+    # pieces drawn from the streams spawn(threads) would give, on the thread
+    # pool.  The pieces only depend on threads, so the result is the same
+    # however many threads the pool has.
+    cdef fill_job job
+    cdef int i, nchunks
+
+    # More streams than values would only leave pieces empty.
+    if threads > length:
+        threads = <int>length
+    if threads == 0:
+        fill(state, out, length)
+        return 0
+
+    job.states = <rk_state *>malloc(threads*sizeof(rk_state))
+    if job.states == NULL:
+        raise MemoryError("cannot allocate %d generators" % threads)
+    memcpy(&job.states[0], state, sizeof(rk_state))
+    for i from 1 <= i < threads:
+        memcpy(&job.states[i], &job.states[i-1], sizeof(rk_state))
+        rk_jump(&job.states[i])
+    memcpy(state, &job.states[threads-1], sizeof(rk_state))
+    rk_jump(state)
+
+    job.fill = fill
+    job.nstreams = threads
+    job.out = out
+    job.length = length
+    nchunks = NpyThreads_GetNumThreads()
+    if nchunks > threads:
+        nchunks = threads
+    with nogil:
+        NpyThreads_Run(fill_streams, &job, threads, nchunks)
+    free(job.states)
+    return 0
+
+
+cdef int nthreads(object threads) except -1:
+    # The threads argument of the bulk generators, 0 for the default.
+    if threads is None:
+        return 0
+    n = operator.index(threads)
+    if n < 1:
+        raise ValueError("threads < 1")
+    # fill_array caps it at the output length anyway.
+    if n > INT_MAX:
+        return INT_MAX
+    return n
+
+
+cdef object cont0_fill(rk_state *state, rk_contfill fill, object size,
+                       int threads):
+    cdef double x
+
+    if size is None:
+        fill_array(state, fill, &x, 1, threads)
+        return x
+    else:
+        arr = np.empty(size, np.double)
+        fill_array(state, fill, <double *>dataptr(arr), arr.size, threads)
+        return arr
+
+
+cdef object cont2_fill_sc(rk_state *state, rk_contfill fill, object size,
+                          double loc, double scale, int threads):
+    cdef double *data
+    cdef double x
+    cdef npy_intp length, i
+
+    if size is None:
+        fill_array(state, fill, &x, 1, threads)
+        return loc + scale*x
+    else:
+        arr = np.empty(size, np.double)
+        length = arr.size
+        data = <double *>dataptr(arr)
+        fill_array(state, fill, data, length, threads)
+        for i from 0 <= i < length:
+            data[i] = loc + scale*data[i]
+        return arr
+
+
+cdef object fill_broadcast(rk_state *state, rk_contfill fill, object size,
+                           object params, int threads):
+    # An array of size, or of the shape the arrays params broadcast to,
+    # filled in bulk.  The distributions transform it in place with the
+    # ufuncs, which broadcast the params against it.
+    if size is None:
+        if len(params) == 1:
+            arr = np.empty(params[0].shape, np.double)
+        else:
+            arr = np.empty(np.broadcast(*params).shape, np.double)
+    else:
+        arr = np.empty(size, np.double)
+        if np.broadcast(arr, *params).size != arr.size:
+            raise ValueError("size is not compatible with inputs")
+    fill_array(state, fill, <double *>dataptr(arr), arr.size, threads)
+    return arr
+
+
+cdef object cont2_fill(rk_state *state, rk_contfill fill, object size,
+                       object loc, object scale, int threads):
+    # loc + scale*X, with the X drawn in bulk.
+    oloc = np.array(loc, np.double)
+    oscale = np.array(scale, np.double)
+    arr = fill_broadcast(state, fill, size, (oloc, oscale), threads)
+    np.multiply(arr, oscale, arr)
+    np.add(arr, oloc, arr)
+    return arr
+
+
 cdef object cont1_array_sc(rk_state *state, rk_cont1 func, object size,
                            double a):
     cdef double *data
@@ -185,9 +352,9 @@ cdef object cont1_array(rk_state *state, rk_cont1 func, object size,
         if multi.size != arr.size:
             raise ValueError("size is not compatible with inputs")
         for i from 0 <= i < multi.size:
-            oa_data = <double *>NpyArray_MultiIter_DATA(getiter(iter), 1)
+            oa_data = <double *>NpyArray_MultiIter_DATA(getiter(multi), 1)
             arr_data[i] = func(state, oa_data[0])
-            NpyArray_MultiIter_NEXTi(getiter(iter), 1)
+            NpyArray_MultiIter_NEXTi(getiter(multi), 1)
     return arr
 
 
@@ -720,10 +887,100 @@ cdef class RandomState:
     def __reduce__(self):
         return (np.random.__RandomState_ctor, (), self.get_state())
 
+    # Independent streams:
+    def jump(self, jumps=1):
+        """
+        jump(jumps=1)
+
+        Advance the generator by ``jumps * 2**128`` steps.
+
+        A step is one 32-bit number of the Mersenne Twister, from which all
+        the distributions are drawn.  A jump takes a few milliseconds,
+        about as long as a few hundred thousand steps would.
+
+        Parameters
+        ----------
+        jumps : int, optional
+            Number of jumps of ``2**128`` steps to make.
+
+        See Also
+        --------
+        spawn
+
+        Examples
+        --------
+        >>> rs = np.random.RandomState(1234)
+        >>> state = rs.get_state()
+        >>> rs.jump()
+        >>> a = rs.random_sample(5)
+        >>> rs.set_state(state)
+        >>> b = rs.spawn(2)[1].random_sample(5)
+        >>> np.all(a == b)
+        True
+
+        """
+        cdef long i, n
+
+        n = operator.index(jumps)
+        if n < 0:
+            raise ValueError("jumps < 0")
+        for i from 0 <= i < n:
+            rk_jump(self.internal_state)
+
+    def spawn(self, n):
+        """
+        spawn(n)
+
+        Return `n` generators drawing from streams which do not overlap.
+
+        The first generator continues from the current state of this one
+        and each of the others starts ``2**128`` steps further on than the
+        previous one, as with `jump`, so none of them reaches the stream of
+        the next.  This generator is then advanced past all of them, and
+        later calls to `spawn` give new streams.  The streams only depend
+        on the state and on `n`, so work divided between the generators,
+        one per process or thread, is reproducible.
+
+        Parameters
+        ----------
+        n : int
+            Number of generators to return.
+
+        Returns
+        -------
+        out : list of RandomState
+            The new generators.
+
+        See Also
+        --------
+        jump
+
+        Examples
+        --------
+        >>> rs = np.random.RandomState(1234)
+        >>> streams = rs.spawn(4)
+        >>> samples = [s.standard_normal(1000) for s in streams]
+
+        """
+        cdef RandomState child
+        cdef long i, nstreams
+
+        nstreams = operator.index(n)
+        if nstreams < 0:
+            raise ValueError("n < 0")
+        children = []
+        for i from 0 <= i < nstreams:
+            child = RandomState(0)
+            memcpy(child.internal_state, self.internal_state,
+                   sizeof(rk_state))
+            children.append(child)
+            rk_jump(self.internal_state)
+        return children
+
     # Basic distributions:
-    def random_sample(self, size=None):
+    def random_sample(self, size=None, threads=None):
         """
-        random_sample(size=None)
+        random_sample(size=None, threads=None)
 
         Return random floats in the half-open interval [0.0, 1.0).
 
@@ -738,6 +995,15 @@ cdef class RandomState:
         size : int or tuple of ints, optional
             Defines the shape of the returned array of random floats. If None
             (the default), returns a single float.
+        threads : int, optional
+            Draw the samples in this many pieces, each from its own stream
+            as given by `spawn`, generated in parallel on the thread pool
+            (see `numpy.setnumthreads`).  The samples depend on the state
+            and on `threads`, but not on the number of threads the pool
+            has.  This generator is then left as ``spawn(threads)`` leaves
+            it.  A `threads` larger than the number of samples counts as
+            that number.  By default the samples are drawn from this
+            generator's own stream.
 
         Returns
         -------
@@ -762,7 +1028,8 @@ cdef class RandomState:
                [-1.23204345, -1.75224494]])
 
         """
-        return cont0_array(self.internal_state, rk_double, size)
+        return cont0_fill(self.internal_state, rk_fill_double, size,
+                          nthreads(threads))
 
     def tomaxint(self, size=None):
         """
@@ -895,9 +1162,9 @@ cdef class RandomState:
         rk_fill(bytes_ptr, length, self.internal_state)
         return res
 
-    def uniform(self, low=0.0, high=1.0, size=None):
+    def uniform(self, low=0.0, high=1.0, size=None, threads=None):
         """
-        uniform(low=0.0, high=1.0, size=1)
+        uniform(low=0.0, high=1.0, size=1, threads=None)
 
         Draw samples from a uniform distribution.
 
@@ -918,6 +1185,15 @@ cdef class RandomState:
             Shape of output.  If the given size is, for example, (m,n,k),
             m*n*k samples are generated.  If no shape is specified, a single
             sample is returned.
+        threads : int, optional
+            Draw the samples in this many pieces, each from its own stream
+            as given by `spawn`, generated in parallel on the thread pool
+            (see `numpy.setnumthreads`).  The samples depend on the state
+            and on `threads`, but not on the number of threads the pool
+            has.  This generator is then left as ``spawn(threads)`` leaves
+            it.  A `threads` larger than the number of samples counts as
+            that number.  By default the samples are drawn from this
+            generator's own stream.
 
         Returns
         -------
@@ -978,12 +1254,12 @@ cdef class RandomState:
             pass
 
         if sc:
-            return cont2_array_sc(self.internal_state, rk_uniform, size,
-                                  flow, fhigh - flow)
+            return cont2_fill_sc(self.internal_state, rk_fill_double, size,
+                                 flow, fhigh - flow, nthreads(threads))
 
         diff = np.array(high) - np.array(low)
-        return cont2_array(self.internal_state, rk_uniform, size,
-                           low, diff)
+        return cont2_fill(self.internal_state, rk_fill_double, size,
+                          low, diff, nthreads(threads))
 
     def rand(self, *args):
         """
@@ -1163,9 +1439,9 @@ cdef class RandomState:
         return self.randint(low, high + 1, size)
 
     # Complicated, continuous distributions:
-    def standard_normal(self, size=None):
+    def standard_normal(self, size=None, method='polar', threads=None):
         """
-        standard_normal(size=None)
+        standard_normal(size=None, method='polar', threads=None)
 
         Returns samples from a Standard Normal distribution (mean=0, stdev=1).
 
@@ -1174,6 +1450,21 @@ cdef class RandomState:
         size : int or tuple of ints, optional
             Output shape. Default is None, in which case a single value is
             returned.
+        method : {'polar', 'ziggurat'}, optional
+            The algorithm used. 'polar' (the default) is the polar form of
+            the Box-Muller transform, which gives the same samples as
+            `normal` and `randn`. 'ziggurat' is the ziggurat method of
+            Marsaglia and Tsang, which is several times faster but gives a
+            different sequence of samples for the same seed.
+        threads : int, optional
+            Draw the samples in this many pieces, each from its own stream
+            as given by `spawn`, generated in parallel on the thread pool
+            (see `numpy.setnumthreads`).  The samples depend on the state
+            and on `threads`, but not on the number of threads the pool
+            has.  This generator is then left as ``spawn(threads)`` leaves
+            it.  A `threads` larger than the number of samples counts as
+            that number.  By default the samples are drawn from this
+            generator's own stream.
 
         Returns
         -------
@@ -1193,11 +1484,17 @@ cdef class RandomState:
         (3, 4, 2)
 
         """
-        return cont0_array(self.internal_state, rk_gauss, size)
-
-    def normal(self, loc=0.0, scale=1.0, size=None):
+        if method == 'polar':
+            return cont0_fill(self.internal_state, rk_fill_gauss, size,
+                              nthreads(threads))
+        elif method == 'ziggurat':
+            return cont0_fill(self.internal_state, rk_fill_gauss_zig, size,
+                              nthreads(threads))
+        raise ValueError("method must be 'polar' or 'ziggurat'")
+
+    def normal(self, loc=0.0, scale=1.0, size=None, threads=None):
         """
-        normal(loc=0.0, scale=1.0, size=None)
+        normal(loc=0.0, scale=1.0, size=None, threads=None)
 
         Draw random samples from a normal (Gaussian) distribution.
 
@@ -1220,6 +1517,15 @@ cdef class RandomState:
         size : tuple of ints
             Output shape.  If the given shape is, e.g., ``(m, n, k)``, then
             ``m * n * k`` samples are drawn.
+        threads : int, optional
+            Draw the samples in this many pieces, each from its own stream
+            as given by `spawn`, generated in parallel on the thread pool
+            (see `numpy.setnumthreads`).  The samples depend on the state
+            and on `threads`, but not on the number of threads the pool
+            has.  This generator is then left as ``spawn(threads)`` leaves
+            it.  A `threads` larger than the number of samples counts as
+            that number.  By default the samples are drawn from this
+            generator's own stream.
 
         See Also
         --------
@@ -1290,12 +1596,13 @@ cdef class RandomState:
         if sc:
             if fscale <= 0:
                 raise ValueError("scale <= 0")
-            return cont2_array_sc(self.internal_state, rk_normal, size, floc,
-                                  fscale)
+            return cont2_fill_sc(self.internal_state, rk_fill_gauss, size,
+                                 floc, fscale, nthreads(threads))
 
         if np.any(np.less_equal(scale, 0)):
             raise ValueError("scale <= 0")
-        return cont2_array(self.internal_state, rk_normal, size, loc, scale)
+        return cont2_fill(self.internal_state, rk_fill_gauss, size, loc, scale,
+                          nthreads(threads))
 
     def beta(self, a, b, size=None):
         """
@@ -1357,9 +1664,9 @@ cdef class RandomState:
             raise ValueError("b <= 0")
         return cont2_array(self.internal_state, rk_beta, size, a, b)
 
-    def exponential(self, scale=1.0, size=None):
+    def exponential(self, scale=1.0, size=None, threads=None):
         """
-        exponential(scale=1.0, size=None)
+        exponential(scale=1.0, size=None, threads=None)
 
         Exponential distribution.
 
@@ -1384,6 +1691,15 @@ cdef class RandomState:
         size : tuple of ints
             Number of samples to draw.  The output is shaped
             according to `size`.
+        threads : int, optional
+            Draw the samples in this many pieces, each from its own stream
+            as given by `spawn`, generated in parallel on the thread pool
+            (see `numpy.setnumthreads`).  The samples depend on the state
+            and on `threads`, but not on the number of threads the pool
+            has.  This generator is then left as ``spawn(threads)`` leaves
+            it.  A `threads` larger than the number of samples counts as
+            that number.  By default the samples are drawn from this
+            generator's own stream.
 
         References
         ----------
@@ -1407,16 +1723,19 @@ cdef class RandomState:
         if sc:
             if fscale <= 0:
                 raise ValueError("scale <= 0")
-            return cont1_array_sc(self.internal_state, rk_exponential, size,
-                                  fscale)
+            return cont2_fill_sc(self.internal_state,
+                                 rk_fill_standard_exponential, size,
+                                 0.0, fscale, nthreads(threads))
 
         if np.any(np.less_equal(scale, 0.0)):
             raise ValueError("scale <= 0")
-        return cont1_array(self.internal_state, rk_exponential, size, scale)
+        return cont2_fill(self.internal_state, rk_fill_standard_exponential,
+                          size, 0.0, scale, nthreads(threads))
 
-    def standard_exponential(self, size=None):
+    def standard_exponential(self, size=None, method='inversion',
+                             threads=None):
         """
-        standard_exponential(size=None)
+        standard_exponential(size=None, method='inversion', threads=None)
 
         Draw samples from the standard exponential distribution.
 
@@ -1427,6 +1746,21 @@ cdef class RandomState:
         ----------
         size : int or tuple of ints
             Shape of the output.
+        method : {'inversion', 'ziggurat'}, optional
+            The algorithm used. 'inversion' (the default) inverts the
+            cumulative distribution function, which gives the same samples
+            as `exponential`. 'ziggurat' is the ziggurat method of Marsaglia
+            and Tsang, which is several times faster but gives a different
+            sequence of samples for the same seed.
+        threads : int, optional
+            Draw the samples in this many pieces, each from its own stream
+            as given by `spawn`, generated in parallel on the thread pool
+            (see `numpy.setnumthreads`).  The samples depend on the state
+            and on `threads`, but not on the number of threads the pool
+            has.  This generator is then left as ``spawn(threads)`` leaves
+            it.  A `threads` larger than the number of samples counts as
+            that number.  By default the samples are drawn from this
+            generator's own stream.
 
         Returns
         -------
@@ -1440,7 +1774,15 @@ cdef class RandomState:
         >>> n = np.random.standard_exponential((3, 8000))
 
         """
-        return cont0_array(self.internal_state, rk_standard_exponential, size)
+        if method == 'inversion':
+            return cont0_fill(self.internal_state,
+                              rk_fill_standard_exponential, size,
+                              nthreads(threads))
+        elif method == 'ziggurat':
+            return cont0_fill(self.internal_state,
+                              rk_fill_standard_exponential_zig, size,
+                              nthreads(threads))
+        raise ValueError("method must be 'inversion' or 'ziggurat'")
 
     def standard_gamma(self, shape, size=None):
         """
@@ -2056,7 +2398,16 @@ cdef class RandomState:
         >>> plt.show()
 
         """
-        return cont0_array(self.internal_state, rk_standard_cauchy, size)
+        if size is None:
+            return rk_standard_cauchy(self.internal_state)
+        # The ratios of pairs of normals drawn in bulk, as rk_standard_cauchy
+        # draws them
+        arr = np.empty(size, np.double)
+        pairs = np.empty((arr.size, 2), np.double)
+        fill_array(self.internal_state, rk_fill_gauss,
+                   <double *>dataptr(pairs), pairs.size, 0)
+        np.divide(pairs[:, 0], pairs[:, 1], arr.reshape(-1))
+        return arr
 
     def standard_t(self, df, size=None):
         """
@@ -2344,11 +2695,18 @@ cdef class RandomState:
         if sc:
             if fa <= 0:
                 raise ValueError("a <= 0")
-            return cont1_array_sc(self.internal_state, rk_pareto, size, fa)
-
-        if np.any(np.less_equal(a, 0.0)):
+            if size is None:
+                return rk_pareto(self.internal_state, fa)
+        elif np.any(np.less_equal(a, 0.0)):
             raise ValueError("a <= 0")
-        return cont1_array(self.internal_state, rk_pareto, size, a)
+        oa = np.array(a, np.double)
+        arr = fill_broadcast(self.internal_state,
+                             rk_fill_standard_exponential, size, (oa,), 0)
+        # exp(E/a) - 1, as rk_pareto
+        np.divide(arr, oa, arr)
+        np.exp(arr, arr)
+        np.subtract(arr, 1.0, arr)
+        return arr
 
     def weibull(self, a, size=None):
         """
@@ -2446,11 +2804,16 @@ cdef class RandomState:
         if sc:
             if fa <= 0:
                 raise ValueError("a <= 0")
-            return cont1_array_sc(self.internal_state, rk_weibull, size, fa)
-
-        if np.any(np.less_equal(a, 0.0)):
+            if size is None:
+                return rk_weibull(self.internal_state, fa)
+        elif np.any(np.less_equal(a, 0.0)):
             raise ValueError("a <= 0")
-        return cont1_array(self.internal_state, rk_weibull, size, a)
+        oa = np.array(a, np.double)
+        arr = fill_broadcast(self.internal_state,
+                             rk_fill_standard_exponential, size, (oa,), 0)
+        # pow(E, 1/a), as rk_weibull
+        np.power(arr, np.divide(1.0, oa), arr)
+        return arr
 
     def power(self, a, size=None):
         """
@@ -2557,11 +2920,19 @@ cdef class RandomState:
         if sc:
             if fa <= 0:
                 raise ValueError("a <= 0")
-            return cont1_array_sc(self.internal_state, rk_power, size, fa)
-
-        if np.any(np.less_equal(a, 0.0)):
+            if size is None:
+                return rk_power(self.internal_state, fa)
+        elif np.any(np.less_equal(a, 0.0)):
             raise ValueError("a <= 0")
-        return cont1_array(self.internal_state, rk_power, size, a)
+        oa = np.array(a, np.double)
+        arr = fill_broadcast(self.internal_state,
+                             rk_fill_standard_exponential, size, (oa,), 0)
+        # pow(1 - exp(-E), 1/a), as rk_power
+        np.negative(arr, arr)
+        np.exp(arr, arr)
+        np.subtract(1.0, arr, arr)
+        np.power(arr, np.divide(1.0, oa), arr)
+        return arr
 
     def laplace(self, loc=0.0, scale=1.0, size=None):
         """
@@ -2649,12 +3020,14 @@ cdef class RandomState:
         if sc:
             if fscale <= 0:
                 raise ValueError("scale <= 0")
-            return cont2_array_sc(self.internal_state, rk_laplace, size,
-                                  floc, fscale)
+            return cont2_fill_sc(self.internal_state,
+                                 rk_fill_standard_laplace, size,
+                                 floc, fscale, 0)
 
         if np.any(np.less_equal(scale, 0.0)):
             raise ValueError("scale <= 0")
-        return cont2_array(self.internal_state, rk_laplace, size, loc, scale)
+        return cont2_fill(self.internal_state, rk_fill_standard_laplace, size,
+                          loc, scale, 0)
 
 
     def gumbel(self, loc=0.0, scale=1.0, size=None):
@@ -2777,12 +3150,14 @@ cdef class RandomState:
         if sc:
             if fscale <= 0:
                 raise ValueError("scale <= 0")
-            return cont2_array_sc(self.internal_state, rk_gumbel, size,
-                                  floc, fscale)
+            return cont2_fill_sc(self.internal_state,
+                                 rk_fill_standard_gumbel, size,
+                                 floc, fscale, 0)
 
         if np.any(np.less_equal(scale, 0.0)):
             raise ValueError("scale <= 0")
-        return cont2_array(self.internal_state, rk_gumbel, size, loc, scale)
+        return cont2_fill(self.internal_state, rk_fill_standard_gumbel, size,
+                          loc, scale, 0)
 
     def logistic(self, loc=0.0, scale=1.0, size=None):
         """
@@ -2868,12 +3243,14 @@ cdef class RandomState:
         if sc:
             if fscale <= 0:
                 raise ValueError("scale <= 0")
-            return cont2_array_sc(self.internal_state, rk_logistic, size,
-                                  floc, fscale)
+            return cont2_fill_sc(self.internal_state,
+                                 rk_fill_standard_logistic, size,
+                                 floc, fscale, 0)
 
         if np.any(np.less_equal(scale, 0.0)):
             raise ValueError("scale <= 0")
-        return cont2_array(self.internal_state, rk_logistic, size, loc, scale)
+        return cont2_fill(self.internal_state, rk_fill_standard_logistic, size,
+                          loc, scale, 0)
 
     def lognormal(self, mean=0.0, sigma=1.0, size=None):
         """
@@ -3000,13 +3377,19 @@ cdef class RandomState:
         if sc:
             if fsigma <= 0:
                 raise ValueError("sigma <= 0")
-            return cont2_array_sc(self.internal_state, rk_lognormal, size,
-                                  fmean, fsigma)
-
-        if np.any(np.less_equal(sigma, 0.0)):
+            if size is None:
+                return rk_lognormal(self.internal_state, fmean, fsigma)
+        elif np.any(np.less_equal(sigma, 0.0)):
             raise ValueError("sigma <= 0.0")
-        return cont2_array(self.internal_state, rk_lognormal, size,
-                           mean, sigma)
+        omean = np.array(mean, np.double)
+        osigma = np.array(sigma, np.double)
+        arr = fill_broadcast(self.internal_state, rk_fill_gauss, size,
+                             (omean, osigma), 0)
+        # exp(mean + sigma*N), as rk_lognormal
+        np.multiply(arr, osigma, arr)
+        np.add(arr, omean, arr)
+        np.exp(arr, arr)
+        return arr
 
     def rayleigh(self, scale=1.0, size=None):
         """
@@ -3075,12 +3458,14 @@ cdef class RandomState:
         if sc:
             if fscale <= 0:
                 raise ValueError("scale <= 0")
-            return cont1_array_sc(self.internal_state, rk_rayleigh, size,
-                                  fscale)
+            return cont2_fill_sc(self.internal_state,
+                                 rk_fill_standard_rayleigh, size,
+                                 0.0, fscale, 0)
 
         if np.any(np.less_equal(scale, 0.0)):
             raise ValueError("scale <= 0.0")
-        return cont1_array(self.internal_state, rk_rayleigh, size, scale)
+        return cont2_fill(self.internal_state, rk_fill_standard_rayleigh, size,
+                          0.0, scale, 0)
 
     def wald(self, mean, scale, size=None):
         """
@@ -3246,17 +3631,30 @@ cdef class RandomState:
                 raise ValueError("mode > right")
             if fleft == fright:
                 raise ValueError("left == right")
-            return cont3_array_sc(self.internal_state, rk_triangular, size,
-                                  fleft, fmode, fright)
-
-        if np.any(np.greater(left, mode)):
-            raise ValueError("left > mode")
-        if np.any(np.greater(mode, right)):
-            raise ValueError("mode > right")
-        if np.any(np.equal(left, right)):
-            raise ValueError("left == right")
-        return cont3_array(self.internal_state, rk_triangular, size,
-                           left, mode, right)
+            if size is None:
+                return rk_triangular(self.internal_state, fleft, fmode, fright)
+        else:
+            if np.any(np.greater(left, mode)):
+                raise ValueError("left > mode")
+            if np.any(np.greater(mode, right)):
+                raise ValueError("mode > right")
+            if np.any(np.equal(left, right)):
+                raise ValueError("left == right")
+        oleft = np.array(left, np.double)
+        omode = np.array(mode, np.double)
+        oright = np.array(right, np.double)
+        arr = fill_broadcast(self.internal_state, rk_fill_double, size,
+                             (oleft, omode, oright), 0)
+        # left + sqrt(U*(mode - left)*(right - left)) up to the mode and
+        # right - sqrt((1 - U)*(right - mode)*(right - left)) after it, as
+        # rk_triangular
+        base = oright - oleft
+        leftbase = omode - oleft
+        lower = np.less_equal(arr, leftbase / base)
+        arr = np.where(lower, arr * (leftbase * base),
+                       (1.0 - arr) * ((oright - omode) * base))
+        np.sqrt(arr, arr)
+        return np.where(lower, oleft + arr, oright - arr)
 
     # Complicated, discrete distributions:
     def binomial(self, n, p, size=None):
@@ -4294,10 +4692,17 @@ cdef class RandomState:
         return arr
 
 
+# The ziggurat tables are otherwise computed on first use, which must not
+# happen in several threads of the pool at once.
+rk_gauss_zig_init()
+rk_standard_exponential_zig_init()
+
 _rand = RandomState()
 seed = _rand.seed
 get_state = _rand.get_state
 set_state = _rand.set_state
+jump = _rand.jump
+spawn = _rand.spawn
 random_sample = _rand.random_sample
 randint = _rand.randint
 bytes = _rand.bytes
@@ -70,6 +70,7 @@
 #include <errno.h>
 #include <limits.h>
 #include <math.h>
+#include <string.h>
 
 #ifdef _WIN32
 /*
@@ -116,6 +117,7 @@
 #endif
 
 #include "randomkit.h"
+#include "randomkit_jump.h"
 
 #ifndef RK_DEV_URANDOM
 #define RK_DEV_URANDOM "/dev/urandom"
@@ -207,27 +209,44 @@ rk_randomseed(rk_state *state)
 #define UPPER_MASK 0x80000000UL
 #define LOWER_MASK 0x7fffffffUL
 
-/* Slightly optimised reference implementation of the Mersenne Twister */
-unsigned long
-rk_random(rk_state *state)
+#ifdef _MSC_VER
+#define RK_INLINE __inline
+#else
+#define RK_INLINE __inline__
+#endif
+
+/* Refills the key once all of it has been used */
+static void
+rk_reload(rk_state *state)
 {
     unsigned long y;
+    int i;
 
-    if (state->pos == RK_STATE_LEN) {
-        int i;
+    for (i = 0; i < N - M; i++) {
+        y = (state->key[i] & UPPER_MASK) | (state->key[i+1] & LOWER_MASK);
+        state->key[i] = state->key[i+M] ^ (y>>1) ^ (-(y & 1) & MATRIX_A);
+    }
+    for (; i < N - 1; i++) {
+        y = (state->key[i] & UPPER_MASK) | (state->key[i+1] & LOWER_MASK);
+        state->key[i] = state->key[i+(M-N)] ^ (y>>1) ^ (-(y & 1) & MATRIX_A);
+    }
+    y = (state->key[N - 1] & UPPER_MASK) | (state->key[0] & LOWER_MASK);
+    state->key[N - 1] = state->key[M - 1] ^ (y >> 1) ^ (-(y & 1) & MATRIX_A);
 
-        for (i = 0; i < N - M; i++) {
-            y = (state->key[i] & UPPER_MASK) | (state->key[i+1] & LOWER_MASK);
-            state->key[i] = state->key[i+M] ^ (y>>1) ^ (-(y & 1) & MATRIX_A);
-        }
-        for (; i < N - 1; i++) {
-            y = (state->key[i] & UPPER_MASK) | (state->key[i+1] & LOWER_MASK);
-            state->key[i] = state->key[i+(M-N)] ^ (y>>1) ^ (-(y & 1) & MATRIX_A);
-        }
-        y = (state->key[N - 1] & UPPER_MASK) | (state->key[0] & LOWER_MASK);
-        state->key[N - 1] = state->key[M - 1] ^ (y >> 1) ^ (-(y & 1) & MATRIX_A);
+    state->pos = 0;
+}
 
-        state->pos = 0;
+/*
+ * Slightly optimised reference implementation of the Mersenne Twister,
+ * inlined in the bulk generators below.
+ */
+static RK_INLINE unsigned long
+rk_next(rk_state *state)
+{
+    unsigned long y;
+
+    if (state->pos == RK_STATE_LEN) {
+        rk_reload(state);
     }
     y = state->key[state->pos++];
 
@@ -240,6 +259,20 @@ rk_random(rk_state *state)
     return y;
 }
 
+static RK_INLINE double
+rk_next_double(rk_state *state)
+{
+    /* shifts : 67108864 = 0x4000000, 9007199254740992 = 0x20000000000000 */
+    long a = rk_next(state) >> 5, b = rk_next(state) >> 6;
+    return (a * 67108864.0 + b) / 9007199254740992.0;
+}
+
+unsigned long
+rk_random(rk_state *state)
+{
+    return rk_next(state);
+}
+
 long
 rk_long(rk_state *state)
 {
@@ -288,12 +321,100 @@ rk_interval(unsigned long max, rk_state *state)
     return value;
 }
 
+/*
+ * Jump ahead.  Seen as the window of the next N words to be tempered and
+ * output, the state is advanced one word at a time by a linear map T, so
+ * the window J words ahead is T**J applied to the current one.  That is
+ * also Q(T) for the polynomial Q of randomkit_jump.h (see
+ * generate_jump_poly.py), which is evaluated here by Horner's rule with
+ * the windows kept in ring buffers.
+ */
+
+/* Advances the window held in w, oldest word at w[*i], by one word */
+static RK_INLINE void
+rk_jump_step(unsigned long *w, int *i)
+{
+    int k = *i;
+    int k1 = (k + 1 < N) ? k + 1 : 0;
+    int km = (k < N - M) ? k + M : k + M - N;
+    unsigned long y;
+
+    y = (w[k] & UPPER_MASK) | (w[k1] & LOWER_MASK);
+    w[k] = w[km] ^ (y >> 1) ^ (-(y & 1) & MATRIX_A);
+    *i = k1;
+}
+
+/* Adds the window v, oldest word at v[0], to the one starting at w[i] */
+static void
+rk_jump_add(unsigned long *w, int i, const unsigned long *v)
+{
+    int j;
+
+    for (j = 0; j < N - i; j++) {
+        w[i + j] ^= v[j];
+    }
+    for (; j < N; j++) {
+        w[i + j - N] ^= v[j];
+    }
+}
+
+/* Advances the state by the jump with polynomial poly, of len words */
+static void
+rk_jump_by(rk_state *state, const unsigned long *poly, int len)
+{
+    unsigned long start[N], w[N];
+    int i, j, bit;
+
+    /* The window starting at the next word, in start */
+    memcpy(w, state->key, sizeof(w));
+    i = 0;
+    for (j = 0; j < state->pos; j++) {
+        rk_jump_step(w, &i);
+    }
+    memcpy(start, w + i, (N - i)*sizeof(unsigned long));
+    memcpy(start + N - i, w, i*sizeof(unsigned long));
+
+    for (bit = 32*len - 1; bit >= 0; bit--) {
+        if ((poly[bit / 32] >> (bit % 32)) & 1) {
+            break;
+        }
+    }
+    memset(w, 0, sizeof(w));
+    i = 0;
+    for (; bit >= 0; bit--) {
+        rk_jump_step(w, &i);
+        if ((poly[bit / 32] >> (bit % 32)) & 1) {
+            rk_jump_add(w, i, start);
+        }
+    }
+
+    memcpy(state->key, w + i, (N - i)*sizeof(unsigned long));
+    memcpy(state->key + N - i, w, i*sizeof(unsigned long));
+    state->pos = 0;
+    state->gauss = 0;
+    state->has_gauss = 0;
+}
+
+void
+rk_jump(rk_state *state)
+{
+    rk_jump_by(state, rk_jump_poly, RK_JUMP_POLY_LEN);
+}
+
 double
 rk_double(rk_state *state)
 {
-    /* shifts : 67108864 = 0x4000000, 9007199254740992 = 0x20000000000000 */
-    long a = rk_random(state) >> 5, b = rk_random(state) >> 6;
-    return (a * 67108864.0 + b) / 9007199254740992.0;
+    return rk_next_double(state);
+}
+
+void
+rk_fill_double(rk_state *state, double *out, size_t n)
+{
+    size_t i;
+
+    for (i = 0; i < n; i++) {
+        out[i] = rk_next_double(state);
+    }
 }
 
 void
@@ -400,3 +521,126 @@ rk_gauss(rk_state *state)
         return f*x2;
     }
 }
+
+void
+rk_fill_gauss(rk_state *state, double *out, size_t n)
+{
+    size_t i = 0;
+
+    if (n > 0 && state->has_gauss) {
+        out[i++] = state->gauss;
+        state->gauss = 0;
+        state->has_gauss = 0;
+    }
+    while (i < n) {
+        double f, x1, x2, r2;
+
+        do {
+            x1 = 2.0*rk_next_double(state) - 1.0;
+            x2 = 2.0*rk_next_double(state) - 1.0;
+            r2 = x1*x1 + x2*x2;
+        }
+        while (r2 >= 1.0 || r2 == 0.0);
+
+        /* Box-Muller transform, in the same order as rk_gauss */
+        f = sqrt(-2.0*log(r2)/r2);
+        out[i++] = f*x2;
+        if (i < n) {
+            out[i++] = f*x1;
+        }
+        else {
+            state->gauss = f*x1;
+            state->has_gauss = 1;
+        }
+    }
+}
+
+/*
+ * Ziggurat method of Marsaglia and Tsang (2000), with 256 layers.  Each
+ * deviate takes two random words: the layer and the sign come from the low
+ * bits of the first, and the 53 bit abscissa from the rest, so that they
+ * are independent of each other.
+ */
+#define ZIG_NOR_R 3.6541528853610088
+#define ZIG_NOR_V 4.92867323399e-3
+
+static double zig_nor_k[256], zig_nor_w[256], zig_nor_f[256];
+static int zig_nor_ready = 0;
+
+void
+rk_gauss_zig_init(void)
+{
+    const double m = 9007199254740992.0;
+    double dn = ZIG_NOR_R, tn = dn, q;
+    int i;
+
+    if (zig_nor_ready) {
+        return;
+    }
+    q = ZIG_NOR_V/exp(-0.5*dn*dn);
+    zig_nor_k[0] = (dn/q)*m;
+    zig_nor_k[1] = 0;
+    zig_nor_w[0] = q/m;
+    zig_nor_w[255] = dn/m;
+    zig_nor_f[0] = 1.0;
+    zig_nor_f[255] = exp(-0.5*dn*dn);
+    for (i = 254; i >= 1; i--) {
+        dn = sqrt(-2.0*log(ZIG_NOR_V/dn + exp(-0.5*dn*dn)));
+        zig_nor_k[i+1] = (dn/tn)*m;
+        tn = dn;
+        zig_nor_f[i] = exp(-0.5*dn*dn);
+        zig_nor_w[i] = dn/m;
+    }
+    zig_nor_ready = 1;
+}
+
+static RK_INLINE double
+rk_next_gauss_zig(rk_state *state)
+{
+    for (;;) {
+        unsigned long a = rk_next(state), b = rk_next(state);
+        int i = a & 0xff;
+        /* +1 or -1, without a branch that mispredicts half the time */
+        double sign = 1.0 - (double)(long)((a >> 7) & 2);
+        double u = (long)(a >> 10)*2147483648.0 + (long)(b >> 1);
+        double x = u*zig_nor_w[i];
+
+        if (u < zig_nor_k[i]) {
+            return sign*x;
+        }
+        if (i == 0) {
+            /* The tail beyond ZIG_NOR_R */
+            double xx, yy;
+
+            do {
+                xx = -log(1.0 - rk_next_double(state))/ZIG_NOR_R;
+                yy = -log(1.0 - rk_next_double(state));
+            }
+            while (yy + yy < xx*xx);
+            return sign*(ZIG_NOR_R + xx);
+        }
+        if (zig_nor_f[i]
+                + rk_next_double(state)*(zig_nor_f[i-1] - zig_nor_f[i])
+                < exp(-0.5*x*x)) {
+            return sign*x;
+        }
+    }
+}
+
+double
+rk_gauss_zig(rk_state *state)
+{
+    rk_gauss_zig_init();
+    return rk_next_gauss_zig(state);
+}
+
+void
+rk_fill_gauss_zig(rk_state *state, double *out, size_t n)
+{
+    size_t i;
+
+    rk_gauss_zig_init();
+    for (i = 0; i < n; i++) {
+        out[i] = rk_next_gauss_zig(state);
+    }
+}
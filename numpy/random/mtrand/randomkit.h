@@ -133,6 +133,14 @@ extern rk_error rk_randomseed(rk_state *state);
  */
 extern unsigned long rk_random(rk_state *state);
 
+/*
+ * Advances the state by 2**128 calls to rk_random, in a few milliseconds
+ * (the time of a few hundred thousand of them).  Jumping repeatedly from
+ * one seed gives streams which do not overlap in any practical amount of
+ * output.  The cached gaussian deviate is discarded.
+ */
+extern void rk_jump(rk_state *state);
+
 /*
  * Returns a random long between 0 and LONG_MAX inclusive
  */
@@ -153,6 +161,11 @@ extern unsigned long rk_interval(unsigned long max, rk_state *state);
  */
 extern double rk_double(rk_state *state);
 
+/*
+ * fill out with n random doubles, the same as n calls to rk_double
+ */
+extern void rk_fill_double(rk_state *state, double *out, size_t n);
+
 /*
  * fill the buffer with size random bytes
  */
@@ -182,6 +195,25 @@ extern rk_error rk_altfill(void *buffer, size_t size, int strong,
  */
 extern double rk_gauss(rk_state *state);
 
+/*
+ * fill out with n gaussian deviates, the same as n calls to rk_gauss
+ */
+extern void rk_fill_gauss(rk_state *state, double *out, size_t n);
+
+/*
+ * return a gaussian deviate like rk_gauss, generated by the ziggurat method,
+ * which is several times faster but gives a different sequence.  It does not
+ * use the cached deviate of rk_gauss.
+ */
+extern double rk_gauss_zig(rk_state *state);
+extern void rk_fill_gauss_zig(rk_state *state, double *out, size_t n);
+
+/*
+ * compute the tables of rk_gauss_zig, which the functions above do on their
+ * first call.
+ */
+extern void rk_gauss_zig_init(void);
+
 #ifdef __cplusplus
 }
 #endif
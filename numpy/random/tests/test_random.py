@@ -178,6 +178,165 @@ class Test_MTRand(TestCase):
         a = np.random.multivariate_normal(mean, cov, 100)
         self.assertEqual(a.shape, (100, 2))
 
+    def test_exponential_array(self):
+        a = random.exponential([1, 2, 3], size=(4, 3))
+        self.assertEqual(a.shape, (4, 3))
+        self.assertRaises(ValueError, random.exponential, [1, 2, 3], (2,))
+
+
+class TestBulk(TestCase):
+    def setUp(self):
+        self.prng = random.RandomState(1234567890)
+
+    def test_bulk_matches_scalar(self):
+        """ Arrays are filled with the same values as drawn one by one.
+        """
+        state = self.prng.get_state()
+        for f in ['standard_normal', 'random_sample',
+                  'standard_exponential']:
+            self.prng.set_state(state)
+            old = [getattr(self.prng, f)() for i in range(7)]
+            self.prng.set_state(state)
+            new = np.concatenate([getattr(self.prng, f)(size=n)
+                                  for n in [3, 1, 0, 3]])
+            assert_equal(new, old)
+
+    def test_broadcast(self):
+        state = self.prng.get_state()
+        loc, scale = [0., 10.], [[1.], [2.]]
+        a = self.prng.normal(loc, scale)
+        self.prng.set_state(state)
+        b = [[self.prng.normal(l, s[0]) for l in loc] for s in scale]
+        assert_equal(a, b)
+        self.prng.set_state(state)
+        a = self.prng.uniform(loc, 20., size=(3, 2))
+        self.prng.set_state(state)
+        b = [[self.prng.uniform(l, 20.) for l in loc] for i in range(3)]
+        assert_equal(a, b)
+        self.assertRaises(ValueError, self.prng.normal, loc, 1., (3,))
+
+    def test_inversion_matches_scalar(self):
+        """ The distributions drawn by transforming a bulk fill give the
+        values of the scalar draws, parameters broadcast or not.
+        """
+        state = self.prng.get_state()
+        a = [0.5, 1., 2.5]
+        for f, args in [('standard_cauchy', ()),
+                        ('pareto', (a,)), ('weibull', (a,)),
+                        ('power', (a,)), ('rayleigh', (a,)),
+                        ('laplace', (a, 2.)), ('gumbel', (1., a)),
+                        ('logistic', (a, 0.5)), ('lognormal', (a, 0.5)),
+                        ('triangular', (0., [0., 0.3, 1.], 1.))]:
+            self.prng.set_state(state)
+            new = getattr(self.prng, f)(*args, size=(2, 3))
+            self.prng.set_state(state)
+            old = []
+            for i in range(6):
+                old.append(getattr(self.prng, f)(
+                    *[np.broadcast_arrays(x, a)[0][i % 3] for x in args]))
+            assert_equal(new.ravel(), old)
+        self.assertRaises(ValueError, self.prng.pareto, a, (2,))
+        self.assertRaises(ValueError, self.prng.triangular, 0., 2., 1., 3)
+
+    def test_ziggurat(self):
+        state = self.prng.get_state()
+        for f in ['standard_normal', 'standard_exponential']:
+            self.prng.set_state(state)
+            a = getattr(self.prng, f)(size=100000, method='ziggurat')
+            self.prng.set_state(state)
+            b = getattr(self.prng, f)(size=100000, method='ziggurat')
+            assert_equal(a, b)
+            assert_(abs(a.var() - 1) < 0.02)
+            self.assertRaises(ValueError, getattr(self.prng, f), 3, 'x')
+        assert_(abs(a.mean() - 1) < 0.01)
+        a = self.prng.standard_normal(size=100000, method='ziggurat')
+        assert_(abs(a.mean()) < 0.01)
+        assert_(abs(np.mean(a > 1.) - 0.158655) < 0.005)
+
+
+class TestStreams(TestCase):
+    def setUp(self):
+        self.prng = random.RandomState(1234567890)
+
+    def test_jump(self):
+        self.prng.jump()
+        assert_equal(self.prng.randint(0, 1000, 8),
+                     [157, 524, 424, 681, 415, 843, 476, 331])
+        self.prng.seed(1234567890)
+        self.prng.randint(0, 1000, 3)
+        self.prng.jump(2)
+        assert_equal(self.prng.randint(0, 1000, 8),
+                     [166, 274, 293, 525, 196, 850, 133, 348])
+        self.assertRaises(ValueError, self.prng.jump, -1)
+
+    def test_spawn(self):
+        """ The first stream continues from the generator, the others
+        follow at jumps of 2**128, and the generator is left after them.
+        """
+        self.prng.standard_normal(3)
+        state = self.prng.get_state()
+        streams = self.prng.spawn(3)
+        after = self.prng.random_sample(5)
+        for i, s in enumerate(streams):
+            self.prng.set_state(state)
+            self.prng.jump(i)
+            assert_equal(s.standard_normal(5), self.prng.standard_normal(5))
+        self.prng.set_state(state)
+        self.prng.jump(3)
+        assert_equal(self.prng.random_sample(5), after)
+        assert_equal(self.prng.spawn(0), [])
+        self.assertRaises(ValueError, self.prng.spawn, -1)
+        self.assertRaises(TypeError, self.prng.spawn, 2.5)
+        self.assertRaises(TypeError, self.prng.jump, 1.5)
+
+    def test_threads(self):
+        """ Output drawn with threads=n is the output of spawn(n), split
+        in n pieces, whatever the size of the thread pool.
+        """
+        state = self.prng.get_state()
+        old = np.setnumthreads(4)
+        try:
+            a = self.prng.standard_normal(size=(1001, 3), threads=3)
+            after = self.prng.random_sample(5)
+            self.prng.set_state(state)
+            streams = self.prng.spawn(3)
+            assert_equal(self.prng.random_sample(5), after)
+            b = [s.standard_normal(size=1001) for s in streams]
+            assert_equal(a.ravel(), np.concatenate(b))
+            for f, args in [('random_sample', ()),
+                            ('uniform', (-1., [1., 2.])),
+                            ('normal', (2., 3.)),
+                            ('exponential', (2.,)),
+                            ('standard_exponential', ())]:
+                out = []
+                for nthreads in [1, 2, 4]:
+                    np.setnumthreads(nthreads)
+                    self.prng.set_state(state)
+                    out.append(getattr(self.prng, f)(*args, size=(5001, 2),
+                                                     threads=5))
+                assert_equal(out[1], out[0])
+                assert_equal(out[2], out[0])
+        finally:
+            np.setnumthreads(old)
+        self.prng.set_state(state)
+        a = self.prng.random_sample(10, threads=1)
+        self.prng.set_state(state)
+        assert_equal(a, self.prng.random_sample(10))
+        self.assertRaises(ValueError, self.prng.random_sample, 10, 0)
+        self.assertRaises(TypeError, self.prng.random_sample, 10, 2.5)
+        # More threads than samples count as one per sample.
+        self.prng.set_state(state)
+        a = self.prng.normal(size=3, threads=10**6)
+        after = self.prng.random_sample(5)
+        self.prng.set_state(state)
+        assert_equal(a, self.prng.normal(size=3, threads=3))
+        assert_equal(self.prng.random_sample(5), after)
+        self.prng.set_state(state)
+        assert_equal(self.prng.random_sample(0, threads=10**20).shape, (0,))
+        a = self.prng.random_sample(5)
+        self.prng.set_state(state)
+        assert_equal(a, self.prng.random_sample(5))
+
 
 if __name__ == "__main__":
     run_module_suite()